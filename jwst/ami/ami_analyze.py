@@ -26,6 +26,8 @@ def apply_lg_plus(
     chooseholes,
     affine2d,
     run_bpfix,
+    ncores=1,
+    centering_tolerance=0.0,
 ):
     """
     Apply the image plane algorithm (LG-PLUS) to an AMI exposure.
@@ -56,6 +58,11 @@ def apply_lg_plus(
         None or user-defined Affine2d object
     run_bpfix : bool
         Run Fourier bad pixel fix on cropped data
+    ncores : int, optional
+        Number of threads used in the rotation search
+    centering_tolerance : float, optional
+        Largest difference, in pixels, between the PSF offsets of integrations
+        fit with the same fringe model
 
     Returns
     -------
@@ -158,6 +165,7 @@ def apply_lg_plus(
             bandpass,
             oversample,
             holeshape,
+            ncores=ncores,
         )
         log.info(
             f"Found rotation: {affine2d.rotradccw:.4f} rad "
@@ -183,7 +191,12 @@ def apply_lg_plus(
         run_bpfix=run_bpfix,
     )
 
-    ff_t = nrm_core.FringeFitter(niriss, psf_offset_ff=psf_offset_ff, oversample=oversample)
+    ff_t = nrm_core.FringeFitter(
+        niriss,
+        psf_offset_ff=psf_offset_ff,
+        oversample=oversample,
+        centering_tolerance=centering_tolerance,
+    )
 
     oifitsmodel, oifitsmodel_multi, amilgmodel = ff_t.fit_fringes_all(input_copy)
 
@@ -1,8 +1,10 @@
 from stdatamodels.jwst import datamodels
 
+from jwst.lib.pipe_utils import compute_num_cores
 from jwst.stpipe import Step
 from . import ami_analyze
 from . import utils
+from .fringe_model_cache import FRINGE_MODEL_CACHE
 
 import numpy as np
 import asdf
@@ -38,6 +40,9 @@ class AmiAnalyzeStep(Step):
         chooseholes = string(default=None) # If not None, fit only certain fringes e.g. ['B4','B5','B6','C2']
         affine2d = string(default='commissioning') # ASDF file containing user-defined affine parameters OR 'commssioning'
         run_bpfix = boolean(default=True) # Run Fourier bad pixel fix on cropped data
+        fringe_model_cache_dir = string(default=None) # Directory in which to save fringe models for reuse by later runs
+        maximum_cores = string(default='1') # Number of threads to use in the rotation search: an integer, 'quarter', 'half', or 'all'
+        centering_tolerance = float(default=0.0, min=0.0) # Largest PSF offset difference [pixels] between integrations fit with the same fringe model
     """  # noqa: E501
 
     reference_file_types = ["throughput", "nrm"]
@@ -209,6 +214,13 @@ class AmiAnalyzeStep(Step):
         if oversample % 2 == 0:
             raise ValueError("Oversample value must be an odd integer.")
 
+        # Fringe models are reused between integrations and, if a cache
+        # directory is given, between runs. Offsets within the centering
+        # tolerance may share a model, so they are rounded to it.
+        FRINGE_MODEL_CACHE.configure(
+            cache_dir=self.fringe_model_cache_dir, offset_resolution=self.centering_tolerance
+        )
+
         # Open the input data model. Can be 2D or 3D image
         with datamodels.open(input_data) as input_model:
             # Get the name of the filter throughput reference file to use
@@ -261,6 +273,8 @@ class AmiAnalyzeStep(Step):
                     chooseholes,
                     affine2d,
                     run_bpfix,
+                    ncores=compute_num_cores(self.maximum_cores),
+                    centering_tolerance=self.centering_tolerance,
                 )
 
         amilgmodel.meta.cal_step.ami_analyze = "COMPLETE"
@@ -162,6 +162,47 @@ def harmonicfringes(fov, pitch, baseline, lam, oversample, affine2d, psf_offset=
     return cosine_fringes, sine_fringes
 
 
+def harmonicfringes_all(fov, pitch, baselines, lam, oversample, affine2d, psf_offset=(0, 0)):
+    """
+    Calculate the sine and cosine fringes of several baselines at once.
+
+    This is equivalent to calling `harmonicfringes` for each baseline, but
+    the distorted image plane coordinates are computed only once.
+
+    Parameters
+    ----------
+    fov : int
+        Number of detector pixels on a side
+    pitch : float
+        Sampling pitch in radians in image plane
+    baselines : 2D float array
+        Hole center vectors of shape (nbaselines, 2), units of meters.
+    lam : float
+        Wavelength in meters.
+    oversample : int
+        Number of samples per detector pixel pitch
+    affine2d : Affine2d object
+        The affine2d object
+    psf_offset : 2D float array, optional
+        Offset from image center in detector pixels, default is (0,0).
+
+    Returns
+    -------
+    (cosine_fringes, sine_fringes) : tuple
+        Sine and cosine fringes: float arrays of shape
+        (nbaselines, fov * oversample, fov * oversample)
+    """
+    cpitch = pitch / oversample
+    im_ctr = image_center(fov, oversample, psf_offset)
+
+    kx, ky = np.indices((fov * oversample, fov * oversample), dtype=float)
+    kxprime, kyprime = affine2d.distort_f_args(kx - im_ctr[0], ky - im_ctr[1])
+
+    baselines = np.asarray(baselines)[:, :, np.newaxis, np.newaxis]
+    phase = 2 * np.pi * cpitch * (kxprime * baselines[:, 0] + kyprime * baselines[:, 1]) / lam
+    return 2 * np.cos(phase), 2 * np.sin(phase)
+
+
 def phasor(kx, ky, hx, hy, lam, phi_m, pitch, affine2d):
     """
     Calculate the wavefront for a single hole.
@@ -306,8 +347,9 @@ def model_array(
     -------
     primary_beam : float 2D array
         Array of primary beam,
-    ffmodel : list of fringe arrays
-        List of fringe arrays
+    ffmodel : float 3D array
+        Stack of fringe arrays: a constant term followed by the cosine and sine
+        fringes of each baseline
     """
     nholes = ctrs.shape[0]
     if phi is None:
@@ -329,29 +371,22 @@ def model_array(
 
     primary_beam = (asf_pb * asf_pb.conj()).real
 
-    alist = []
-    for i in range(nholes - 1):
-        for j in range(nholes - 1):
-            if j + i + 1 < nholes:
-                alist = np.append(alist, i)
-                alist = np.append(alist, j + i + 1)
-    alist = alist.reshape((len(alist) // 2, 2))
-
-    ffmodel = []
-    ffmodel.append(nholes * np.ones(modelshape))
-    for basepair in alist:
-        baseline = ctrs[int(basepair[0])] - ctrs[int(basepair[1])]
-        cosfringe, sinfringe = harmonicfringes(
-            fov=fov,
-            pitch=pitch,
-            psf_offset=psf_offset,
-            baseline=baseline,
-            oversample=oversample,
-            lam=lam,
-            affine2d=affine2d,
-        )
-        ffmodel.append(cosfringe)
-        ffmodel.append(sinfringe)
+    # Baselines of all hole pairs (i, j), i < j
+    first, second = np.triu_indices(nholes, k=1)
+    baselines = ctrs[first] - ctrs[second]
+
+    # Cosine and sine fringes of all baselines, interleaved after the constant term
+    ffmodel = np.empty((2 * len(baselines) + 1, *modelshape))
+    ffmodel[0] = nholes
+    ffmodel[1::2], ffmodel[2::2] = harmonicfringes_all(
+        fov=fov,
+        pitch=pitch,
+        psf_offset=psf_offset,
+        baselines=baselines,
+        oversample=oversample,
+        lam=lam,
+        affine2d=affine2d,
+    )
 
     return primary_beam, ffmodel
 
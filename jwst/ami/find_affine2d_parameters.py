@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import numpy as np
 
@@ -32,7 +33,7 @@ def create_afflist_rot(rotdegs):
 
 
 def find_rotation(
-    imagedata, nrm_model, psf_offset, rotdegs, pixel, npix, bandpass, over, holeshape
+    imagedata, nrm_model, psf_offset, rotdegs, pixel, npix, bandpass, over, holeshape, ncores=1
 ):
     """
     Create an affine2d object using the known rotation and scale.
@@ -57,6 +58,8 @@ def find_rotation(
         Oversampling factor
     holeshape : str
         Shape of hole; possible values are 'circ', 'hex', and 'fringe'
+    ncores : int, optional
+        Number of threads used to simulate the PSFs of the rotations searched.
 
     Returns
     -------
@@ -68,9 +71,7 @@ def find_rotation(
 
     affine2d_list = create_afflist_rot(rotdegs)
 
-    crosscorr_rots = []
-
-    for _rot, aff in zip(rotdegs, affine2d_list, strict=False):
+    def rotation_crosscorr(aff):
         jw = lg_model.LgModel(
             nrm_model,
             bandpass=bandpass,
@@ -85,8 +86,14 @@ def find_rotation(
         #  Some numerical testing needed for big eg 90 degree affine2d rotations.  Later.
         jw.simulate(fov=npix, psf_offset=psf_offset)
 
-        crosscorr_rots.append(utils.rcrosscorrelate(imagedata, jw.psf).max())
-        del jw
+        return utils.rcrosscorrelate(imagedata, jw.psf).max()
+
+    # The PSFs of the rotations are independent, so they can be simulated in parallel
+    if ncores > 1 and len(affine2d_list) > 1:
+        with ThreadPoolExecutor(max_workers=min(ncores, len(affine2d_list))) as executor:
+            crosscorr_rots = list(executor.map(rotation_crosscorr, affine2d_list))
+    else:
+        crosscorr_rots = [rotation_crosscorr(aff) for aff in affine2d_list]
 
     rot_measured_d, _max_cor = utils.findpeak_1d(rotdegs, crosscorr_rots)
 
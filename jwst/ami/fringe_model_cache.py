@@ -0,0 +1,293 @@
+"""Cache of analytic fringe models, shared between AMI fringe fits."""
+
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+from pathlib import Path
+import tempfile
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+__all__ = ["FringeModelCache", "FRINGE_MODEL_CACHE", "fringe_model_key"]
+
+# Arrays making up a cached fringe model, as set by LgModel.make_model
+_NAMES = ["model", "model_beam", "fringes"]
+
+
+def fringe_model_key(lgmodel, fov, psf_offset):
+    """
+    Compute the key identifying the fringe model of an LgModel.
+
+    The key covers everything the model depends on: the bandpass (filter
+    throughput times source spectrum), the pixel scale, the oversampling, the
+    mask geometry and hole shape, the affine distortion, the field of view and
+    the PSF offset.
+
+    Parameters
+    ----------
+    lgmodel : LgModel
+        The object making the model.
+    fov : int
+        Number of detector pixels on a side.
+    psf_offset : tuple of float
+        Center offset from center of array, in detector pixels.
+
+    Returns
+    -------
+    key : str
+        Hexadecimal digest of the model parameters.
+    """
+    affine2d = lgmodel.affine2d
+    params = [
+        lgmodel.pixel,
+        lgmodel.d,
+        affine2d.mx,
+        affine2d.my,
+        affine2d.sx,
+        affine2d.sy,
+        affine2d.xo,
+        affine2d.yo,
+        *psf_offset,
+    ]
+    digest = hashlib.sha256()
+    digest.update(f"{lgmodel.holeshape} {lgmodel.over} {fov}".encode())
+    digest.update(np.asarray(params, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(lgmodel.ctrs, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(lgmodel.bandpass, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class FringeModelCache:
+    """
+    Least-recently-used cache of analytic fringe models.
+
+    Making the fringe model of an AMI image evaluates the primary beam and the
+    cosine and sine fringes of every baseline at each wavelength of the
+    bandpass, which dominates the time needed to fit an integration. The
+    model only depends on the parameters in `fringe_model_key`, so it can be
+    reused by fits with the same parameters.
+
+    Up to ``max_models`` models are kept in memory. If ``cache_dir`` is set,
+    models are also saved to it and read back by later runs, including runs in
+    other processes; only the ``max_files`` most recently used files are kept.
+    All cached arrays are read-only.
+
+    PSF offsets differ slightly between integrations, so models made at their
+    exact offsets would rarely be reused. If ``offset_resolution`` is set,
+    offsets are rounded to multiples of it by `round_offset` before models are
+    made and looked up.
+    """
+
+    def __init__(self, max_models=4, cache_dir=None, max_files=100, offset_resolution=0.0):
+        """
+        Initialize an empty cache.
+
+        Parameters
+        ----------
+        max_models : int, optional
+            Maximum number of models held in memory. If 0, models are
+            not kept in memory.
+        cache_dir : str or None, optional
+            Directory in which models are saved and looked up. If None,
+            models are not saved to disk.
+        max_files : int, optional
+            Maximum number of models kept in ``cache_dir``. The least
+            recently used files are removed beyond this number.
+        offset_resolution : float, optional
+            Resolution, in detector pixels, to which PSF offsets are rounded.
+            If 0, offsets are not rounded.
+        """
+        self._memory = OrderedDict()
+        self.max_models = max_models
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        self.offset_resolution = offset_resolution
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._memory)
+
+    def configure(self, max_models=4, cache_dir=None, max_files=100, offset_resolution=0.0):
+        """
+        Set the cache limits, the cache directory and the offset resolution.
+
+        Parameters
+        ----------
+        max_models : int, optional
+            Maximum number of models held in memory.
+        cache_dir : str or None, optional
+            Directory in which models are saved and looked up.
+        max_files : int, optional
+            Maximum number of models kept in ``cache_dir``.
+        offset_resolution : float, optional
+            Resolution, in detector pixels, to which PSF offsets are rounded.
+        """
+        self.max_models = max_models
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        self.offset_resolution = offset_resolution
+        self._evict()
+
+    def round_offset(self, psf_offset):
+        """
+        Round a PSF offset to the offset resolution of the cache.
+
+        Parameters
+        ----------
+        psf_offset : tuple of float
+            Center offset from center of array, in detector pixels.
+
+        Returns
+        -------
+        tuple of float
+            The offset rounded to a multiple of ``offset_resolution``,
+            or unchanged if the resolution is 0.
+        """
+        if self.offset_resolution <= 0:
+            return tuple(psf_offset)
+        steps = np.round(np.asarray(psf_offset, dtype=np.float64) / self.offset_resolution)
+        return tuple(float(step * self.offset_resolution) for step in steps)
+
+    def clear(self):
+        """Remove all models from memory, leaving any saved files in place."""
+        self._memory.clear()
+
+    def path(self, key):
+        """
+        Return the file in which a model is saved.
+
+        Parameters
+        ----------
+        key : str
+            Key identifying the model.
+
+        Returns
+        -------
+        Path or None
+            The file name, or None if models are not saved to disk.
+        """
+        if self.cache_dir is None:
+            return None
+        return Path(self.cache_dir) / f"fringe_model_{key}.npz"
+
+    def get(self, key):
+        """
+        Return a cached model.
+
+        Parameters
+        ----------
+        key : str
+            Key identifying the model.
+
+        Returns
+        -------
+        arrays : dict or None
+            The ``model``, ``model_beam`` and ``fringes`` arrays of the model,
+            or None if it is not cached.
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        path = self.path(key)
+        if path is not None and path.exists():
+            try:
+                with np.load(path) as saved:
+                    arrays = {name: saved[name] for name in _NAMES}
+            except (OSError, KeyError, ValueError) as err:
+                log.warning(f"Could not read cached fringe model {path}: {err}")
+            else:
+                log.debug(f"Using fringe model saved in {path}")
+                self.hits += 1
+                # Mark the file as recently used, so that it is kept
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                return self._store(key, arrays)
+
+        self.misses += 1
+        return None
+
+    def put(self, key, arrays):
+        """
+        Add a model to the cache.
+
+        Parameters
+        ----------
+        key : str
+            Key identifying the model.
+        arrays : dict
+            The ``model``, ``model_beam`` and ``fringes`` arrays of the model.
+
+        Returns
+        -------
+        arrays : dict
+            The model with read-only arrays, as returned by `get`.
+        """
+        path = self.path(key)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, so that concurrent runs never
+            # read a partially written model
+            with tempfile.NamedTemporaryFile(
+                dir=path.parent, prefix=".fringe_model_", suffix=".npz", delete=False
+            ) as temp_file:
+                np.savez(temp_file, **{name: arrays[name] for name in _NAMES})
+            Path(temp_file.name).replace(path)
+            log.debug(f"Saved fringe model to {path}")
+            self._evict_files()
+        return self._store(key, arrays)
+
+    def _store(self, key, arrays):
+        """
+        Make the arrays of a model read-only and keep them in memory.
+
+        Parameters
+        ----------
+        key : str
+            Key identifying the model.
+        arrays : dict
+            The ``model``, ``model_beam`` and ``fringes`` arrays of the model.
+
+        Returns
+        -------
+        arrays : dict
+            Read-only copies of the arrays.
+        """
+        arrays = {name: np.array(arrays[name]) for name in _NAMES}
+        for array in arrays.values():
+            array.setflags(write=False)
+        if self.max_models > 0:
+            self._memory[key] = arrays
+            self._evict()
+        return arrays
+
+    def _evict(self):
+        """Evict least recently used models until within the limit."""
+        while len(self._memory) > max(self.max_models, 0):
+            self._memory.popitem(last=False)
+
+    def _evict_files(self):
+        """Remove least recently used files until within the limit."""
+        files = []
+        for path in Path(self.cache_dir).glob("fringe_model_*.npz"):
+            try:
+                files.append((path.stat().st_mtime_ns, path))
+            except FileNotFoundError:
+                # Removed by a concurrent run
+                continue
+        files.sort()
+        for _, path in files[: max(len(files) - max(self.max_files, 1), 0)]:
+            log.debug(f"Removing cached fringe model {path}")
+            path.unlink(missing_ok=True)
+
+
+# Cache shared by all fringe fits in this process, configured by AmiAnalyzeStep
+FRINGE_MODEL_CACHE = FringeModelCache()
@@ -234,6 +234,58 @@ def matrix_operations(img, model, linfit=False, dqm=None):
     return x, res, cond, linfit_result
 
 
+def matrix_operations_multi(imgs, model, dqm=None):
+    """
+    Use least squares matrix operations to solve A x = b for several images.
+
+    All images are fit with the same model and bad pixel mask, so that
+    the model matrix is factorized once and the coefficients of all images
+    are solved with one matrix product. The result for each image is the
+    same as that of `matrix_operations`.
+
+    Parameters
+    ----------
+    imgs : 3D float array
+        Input data, one image per slice
+    model : 3D float array
+        Analytic model
+    dqm : 2D bool array
+        Bad pixel mask, same shape as each image.
+
+    Returns
+    -------
+    x : 2D float array
+        Solution to fit of each image
+    res : 3D float array
+        Residuals in fit of each image
+    cond : float
+        Condition number of the inverse of the product of model and its
+        transpose
+    """
+    nimg = imgs.shape[0]
+    npix = imgs.shape[1] * imgs.shape[2]
+    if dqm is None:
+        good = np.ones(npix, dtype=bool)
+    else:
+        good = ~dqm.reshape(npix).astype(bool)
+    log.info(f"	{npix - np.count_nonzero(good):d} DO_NOT_USE pixels found in data slices")
+
+    # A, with bad pixels removed, and b for all images as columns
+    flatmodel = model.reshape(npix, model.shape[2])[good]
+    flatimgs = imgs.reshape(nimg, npix)[:, good].T
+
+    # inv(At.A)
+    inverse = linalg.inv(np.dot(flatmodel.T, flatmodel))
+    cond = np.linalg.cond(inverse)
+
+    x = np.dot(inverse, np.dot(flatmodel.T, flatimgs))
+    res = np.full((nimg, npix), np.nan)
+    res[:, good] = (flatimgs - np.dot(flatmodel, x)).T
+    log.info(f"Fit {nimg:d} images with a {flatmodel.shape} model matrix")
+
+    return x.T, res.reshape(imgs.shape), cond
+
+
 def multiplyenv(env, fringeterms):
     """
     Multiply the envelope by each fringe 'image'.
@@ -5,6 +5,7 @@ from . import leastsqnrm as leastsqnrm
 from . import analyticnrm2
 from . import utils
 from . import mask_definition_ami
+from .fringe_model_cache import FRINGE_MODEL_CACHE, fringe_model_key
 
 log = logging.getLogger(__name__)
 log.addHandler(logging.NullHandler())
@@ -170,7 +171,8 @@ class LgModel:
         fov : int
             Number of detector pixels on a side
         psf_offset : detector pixels
-            Center offset from center of array
+            Center offset from center of array, rounded to the offset
+            resolution of the fringe model cache
 
         Returns
         -------
@@ -179,26 +181,54 @@ class LgModel:
         """
         self.fov = fov
 
+        # The model only depends on the parameters of the object, so it is
+        # shared with any other fit made with the same parameters and an
+        # offset rounding to the same value
+        psf_offset = FRINGE_MODEL_CACHE.round_offset(psf_offset)
+        key = fringe_model_key(self, fov, psf_offset)
+        arrays = FRINGE_MODEL_CACHE.get(key)
+        if arrays is None:
+            arrays = FRINGE_MODEL_CACHE.put(key, self._compute_model(fov, psf_offset))
+
+        self.model = arrays["model"]
+        self.model_beam = arrays["model_beam"]
+        self.fringes = arrays["fringes"]
+        return self.model
+
+    def _compute_model(self, fov, psf_offset):
+        """
+        Compute the fringe model, summed over the bandpass.
+
+        Parameters
+        ----------
+        fov : int
+            Number of detector pixels on a side
+        psf_offset : detector pixels
+            Center offset from center of array
+
+        Returns
+        -------
+        dict
+            The ``model``, ``model_beam`` and ``fringes`` arrays, as set by `make_model`.
+        """
         # The model shape is (fov) x (fov) x (# solution coefficients)
         # the coefficient refers to the terms in the analytic equation
         # There are N(N-1) independent pistons, double-counted by cosine
         # and sine, one constant term and a DC offset.
 
-        self.model = np.zeros((self.fov, self.fov, self.N * (self.N - 1) + 2))
-        self.model_beam = np.zeros((self.over * self.fov, self.over * self.fov))
-        self.fringes = np.zeros(
-            (self.N * (self.N - 1) + 1, self.over * self.fov, self.over * self.fov)
-        )
+        model = np.zeros((fov, fov, self.N * (self.N - 1) + 2))
+        model_beam = np.zeros((self.over * fov, self.over * fov))
+        fringes = np.zeros((self.N * (self.N - 1) + 1, self.over * fov, self.over * fov))
 
         for w, l in self.bandpass:  # w: weight, l: lambda (wavelength)
-            # model_array returns the envelope and fringe model as a list of
-            #   oversampled fov x fov slices
+            # model_array returns the envelope and the stack of
+            #   oversampled fov x fov fringe slices
             pb, ff = analyticnrm2.model_array(
                 self.ctrs,
                 l,
                 self.over,
                 self.pixel,
-                self.fov,
+                fov,
                 self.d,
                 shape=self.holeshape,
                 psf_offset=psf_offset,
@@ -207,20 +237,17 @@ class LgModel:
 
             log.debug(f"Passed to model_array: psf_offset: {psf_offset}")
             log.debug(f"Primary beam in the model created: {pb}")
-            self.model_beam += pb
-            self.fringes += ff
-
-            # this routine multiplies the envelope by each fringe "image"
-            model_over = leastsqnrm.multiplyenv(pb, ff)
+            model_beam += pb
+            fringes += ff
 
-            model_binned = np.zeros((self.fov, self.fov, model_over.shape[2]))
-            # loop over slices "sl" in the model
-            for sl in range(model_over.shape[2]):
-                model_binned[:, :, sl] = utils.rebin(model_over[:, :, sl], (self.over, self.over))
+            # multiply the envelope by each fringe "image" and bin all the
+            # slices to detector pixels; the last (DC) slice is constant
+            model_over = pb * ff
+            model_binned = model_over.reshape(-1, fov, self.over, fov, self.over).sum(-1).sum(2)
+            model[:, :, :-1] += w * np.moveaxis(model_binned, 0, -1)
+            model[:, :, -1] += w * self.over**2
 
-            self.model += w * model_binned
-
-        return self.model
+        return {"model": model, "model_beam": model_beam, "fringes": fringes}
 
     def fit_image(
         self,
@@ -261,14 +288,33 @@ class LgModel:
             dqm = np.zeros(image.shape, dtype="bool")
 
         if not weighted:
-            self.soln, self.residual, self.cond, self.linfit_result = leastsqnrm.matrix_operations(
+            soln, residual, cond, self.linfit_result = leastsqnrm.matrix_operations(
                 image, self.fittingmodel, dqm=dqm
             )
         else:
-            self.soln, self.residual, self.cond, self.singvals = leastsqnrm.weighted_operations(
+            soln, residual, cond, self.singvals = leastsqnrm.weighted_operations(
                 image, self.fittingmodel, dqm=dqm
             )
 
+        self.set_solution(soln, residual, cond)
+
+    def set_solution(self, soln, residual, cond):
+        """
+        Set the fit solution and the observables derived from it.
+
+        Parameters
+        ----------
+        soln : 1D float array
+            Coefficients of the model slices fit to the image
+        residual : 2D float array
+            Residual of the fit, with NaN at pixels excluded from the fit
+        cond : float or None
+            Condition number of the fit
+        """
+        self.soln = soln
+        self.residual = residual
+        self.cond = cond
+
         self.rawDC = self.soln[-1]
         self.flux = self.soln[0]
         self.soln = self.soln / self.soln[0]
@@ -1,5 +1,7 @@
+import copy
 import logging
 import numpy as np
+from . import leastsqnrm
 from . import lg_model
 from . import utils
 from . import oifits
@@ -26,6 +28,7 @@ class FringeFitter:
         psf_offset_ff=None,
         npix="default",
         weighted=False,
+        centering_tolerance=0.0,
     ):
         """
         Initialize the FringeFitter object.
@@ -44,6 +47,10 @@ class FringeFitter:
         weighted : bool, optional
             If True, use Poisson variance for weighting, otherwise do not apply
             any weighting. Default is False.
+        centering_tolerance : float, optional
+            Largest difference, in detector pixels, between the PSF offsets of
+            integrations fit with the same fringe model. Default is 0, fitting
+            together only integrations with identical offsets.
         """
         self.instrument_data = instrument_data
 
@@ -51,6 +58,7 @@ class FringeFitter:
         self.psf_offset_ff = psf_offset_ff
         self.npix = npix
         self.weighted = weighted
+        self.centering_tolerance = centering_tolerance
 
         if self.weighted:
             log.info("leastsqnrm.weighted_operations() - weighted by Poisson variance")
@@ -102,23 +110,30 @@ class FringeFitter:
         # Model parameters
         solns_arr = np.zeros((nslices, 44))
 
-        for slc in range(nslices):
-            log.info(f"Fitting fringes for iteration {slc} of {nslices}")
-            nrmslc = self.fit_fringes_single_integration(slc)
-
-            # populate the solutions of the lgfit model
-            datapeak = nrmslc.reference.max()
-            ctrd_arr[slc, :, :] = nrmslc.reference
-            n_ctrd_arr[slc, :, :] = nrmslc.reference / datapeak
-            model_arr[slc, :, :] = nrmslc.modelpsf
-            n_model_arr[slc, :, :] = nrmslc.modelpsf / datapeak
-            resid_arr[slc, :, :] = nrmslc.residual
-            n_resid_arr[slc, :, :] = nrmslc.residual / datapeak
-            solns_arr[slc, :] = nrmslc.soln
-
-            # populate the oifits models
-            oifits_model.populate_obsarray(slc, nrmslc)
-            oifits_model_multi.populate_obsarray(slc, nrmslc)
+        # Integrations with the same centering, within the tolerance, and the
+        # same bad pixels are fit together
+        offsets = [self.integration_offset(slc) for slc in range(nslices)]
+        for slices in self.centering_groups(offsets):
+            if len(slices) == 1:
+                log.info(f"Fitting fringes for iteration {slices[0]} of {nslices}")
+            else:
+                log.info(f"Fitting fringes for iterations {slices} of {nslices} together")
+            nrmslcs = self.fit_fringes_integrations(slices, offsets[slices[0]])
+
+            for slc, nrmslc in zip(slices, nrmslcs, strict=True):
+                # populate the solutions of the lgfit model
+                datapeak = nrmslc.reference.max()
+                ctrd_arr[slc, :, :] = nrmslc.reference
+                n_ctrd_arr[slc, :, :] = nrmslc.reference / datapeak
+                model_arr[slc, :, :] = nrmslc.modelpsf
+                n_model_arr[slc, :, :] = nrmslc.modelpsf / datapeak
+                resid_arr[slc, :, :] = nrmslc.residual
+                n_resid_arr[slc, :, :] = nrmslc.residual / datapeak
+                solns_arr[slc, :] = nrmslc.soln
+
+                # populate the oifits models
+                oifits_model.populate_obsarray(slc, nrmslc)
+                oifits_model_multi.populate_obsarray(slc, nrmslc)
 
         # Populate the LGFitModel with the output of the fringe fitting (LG algorithm).
         lgfit = datamodels.AmiLgFitModel()
@@ -140,34 +155,94 @@ class FringeFitter:
 
         return output_model, output_model_multi, lgfit
 
-    def fit_fringes_single_integration(self, slc):
+    def integration_offset(self, slc):
         """
-        Generate the best model to match a single slice.
+        Find the PSF offset of an integration, used to center its fringe model.
 
         Parameters
         ----------
         slc : int
-            Index of the iteration to fit (0 to nslc-1).
+            Index of the integration (0 to nslc-1).
 
         Returns
         -------
-        nrm : LgModel object
-            Model with best fit results for the given slice.
+        psf_offset : tuple of float
+            Offset of the PSF from the array center, in detector pixels.
+        """
+        if self.psf_offset_ff is not None:
+            # user-provided psf_offset offsets from array center are here.
+            return self.psf_offset_ff
+
+        # returned values have offsets x-y flipped:
+        # Finding centroids the Fourier way assumes no bad pixels case:
+        # Fourier domain mean slope
+        centroid = utils.find_centroid(self.scidata[slc])
+        # centroid represents offsets from brightest pixel ctr
+        # use flipped centroids to update centroid of image for JWST:
+        # check parity for GPI, Vizier,...
+        # pixel coordinates: - note the flip of [0] and [1] to match DS9 view
+        return centroid[1], centroid[0]
+
+    def centering_groups(self, offsets):
+        """
+        Group the integrations that can be fit with the same model matrix.
+
+        Unweighted fits of integrations with the same PSF offset and the same
+        bad pixels use the same model matrix. Integrations are grouped in order:
+        each joins the first group with the same bad pixels whose first
+        integration has a PSF offset within ``centering_tolerance`` pixels of
+        its own, in both x and y, and the group is fit with the model made at
+        the offset of its first integration. With a tolerance of 0 (the
+        default), only integrations with identical offsets, e.g. set by
+        ``psf_offset_ff``, are grouped. Weighted fits depend on the data, so
+        each integration is fit on its own.
 
-        Notes
-        -----
-        After nrm.fit_image is called, these attributes are stored in nrm object:
+        Parameters
+        ----------
+        offsets : list of tuple
+            PSF offset of each integration, as returned by `integration_offset`.
 
-        -----------------------------------------------------------------------------
-        soln            --- resulting sin/cos coefficients from least squares fitting
-        fringephase     --- baseline phases in radians
-        fringeamp       --- baseline amplitudes (flux normalized)
-        redundant_cps   --- closure phases in radians
-        redundant_cas   --- closure amplitudes
-        residual        --- fit residuals [data - model solution]
-        cond            --- matrix condition for inversion
-        fringepistons   --- zero-mean piston opd in radians on each hole (eigenphases)
-        -----------------------------------------------------------------------------
+        Returns
+        -------
+        groups : list of list of int
+            Indices of the integrations in each group.
+        """
+        if self.weighted:
+            return [[slc] for slc in range(len(offsets))]
+
+        groups = []
+        for slc, offset in enumerate(offsets):
+            for group in groups:
+                first = group[0]
+                if np.all(
+                    np.abs(np.subtract(offset, offsets[first])) <= self.centering_tolerance
+                ) and np.array_equal(self.dqmask[slc], self.dqmask[first]):
+                    group.append(slc)
+                    break
+            else:
+                groups.append([slc])
+        return groups
+
+    def fit_fringes_integrations(self, slices, psf_offset):
+        """
+        Fit the fringes of integrations sharing the same fringe model.
+
+        The fringe model is made once. A single integration is fit with
+        `LgModel.fit_image`; several integrations are fit together with
+        `leastsqnrm.matrix_operations_multi`, which factorizes the model matrix once.
+
+        Parameters
+        ----------
+        slices : list of int
+            Indices of the integrations to fit, which must have the same
+            bad pixels if there are several of them.
+        psf_offset : tuple of float
+            Offset of the PSF from the array center, in detector pixels.
+
+        Returns
+        -------
+        nrms : list of LgModel
+            Model with best fit results for each integration.
         """
         nrm = lg_model.LgModel(
             self.instrument_data.nrm_model,
@@ -180,41 +255,74 @@ class FringeFitter:
         )
 
         if self.npix == "default":
-            self.npix = self.scidata[slc, :, :].shape[0]
-
-        ctrd = self.scidata[slc]
-        dqslice = self.dqmask[slc]
-
-        nrm.reference = ctrd  # self.ctrd is the cropped image centered on the brightest pixel
+            self.npix = self.scidata[slices[0], :, :].shape[0]
 
         if self.psf_offset_ff is None:
-            # returned values have offsets x-y flipped:
-            # Finding centroids the Fourier way assumes no bad pixels case:
-            # Fourier domain mean slope
-            centroid = utils.find_centroid(ctrd)
-            # centroid represents offsets from brightest pixel ctr
-            # use flipped centroids to update centroid of image for JWST:
-            # check parity for GPI, Vizier,...
-            # pixel coordinates: - note the flip of [0] and [1] to match DS9 view
-            nrm.xpos = centroid[1]  # flip 0 and 1 to convert
-            nrm.ypos = centroid[0]  # flip 0 and 1
-            nrm.psf_offset = nrm.xpos, nrm.ypos  # renamed .bestcenter to .psf_offset
-        else:
-            nrm.psf_offset = (
-                self.psf_offset_ff
-            )  # user-provided psf_offsetoffsets from array center are here.
+            nrm.xpos, nrm.ypos = psf_offset
+        nrm.psf_offset = psf_offset  # renamed .bestcenter to .psf_offset
 
         model = nrm.make_model(
-            fov=ctrd.shape[0],
+            fov=self.scidata.shape[1],
             psf_offset=nrm.psf_offset,
         )
 
-        nrm.fit_image(
-            ctrd,
-            model_in=model,
-            dqm=dqslice,
-            weighted=self.weighted,
+        if len(slices) == 1:
+            # the cropped image centered on the brightest pixel
+            nrm.reference = self.scidata[slices[0]]
+            nrm.fit_image(
+                nrm.reference,
+                model_in=model,
+                dqm=self.dqmask[slices[0]],
+                weighted=self.weighted,
+            )
+            nrm.create_modelpsf()
+            return [nrm]
+
+        solns, residuals, cond = leastsqnrm.matrix_operations_multi(
+            self.scidata[slices], model, dqm=self.dqmask[slices[0]]
         )
+        nrm.weighted = False
+        nrm.fittingmodel = model
+        nrm.linfit_result = None
+
+        nrms = []
+        for slc, soln, residual in zip(slices, solns, residuals, strict=True):
+            # the fit results are set on a copy sharing the model arrays
+            nrmslc = copy.copy(nrm)
+            nrmslc.reference = self.scidata[slc]
+            nrmslc.set_solution(soln, residual, cond)
+            nrmslc.create_modelpsf()
+            nrms.append(nrmslc)
+        return nrms
+
+    def fit_fringes_single_integration(self, slc):
+        """
+        Generate the best model to match a single slice.
+
+        Parameters
+        ----------
+        slc : int
+            Index of the iteration to fit (0 to nslc-1).
+
+        Returns
+        -------
+        nrm : LgModel object
+            Model with best fit results for the given slice.
 
-        nrm.create_modelpsf()
+        Notes
+        -----
+        After nrm.fit_image is called, these attributes are stored in nrm object:
+
+        -----------------------------------------------------------------------------
+        soln            --- resulting sin/cos coefficients from least squares fitting
+        fringephase     --- baseline phases in radians
+        fringeamp       --- baseline amplitudes (flux normalized)
+        redundant_cps   --- closure phases in radians
+        redundant_cas   --- closure amplitudes
+        residual        --- fit residuals [data - model solution]
+        cond            --- matrix condition for inversion
+        fringepistons   --- zero-mean piston opd in radians on each hole (eigenphases)
+        -----------------------------------------------------------------------------
+        """
+        nrm = self.fit_fringes_integrations([slc], self.integration_offset(slc))[0]
         return nrm  # to fit_fringes_all, where output model is created from list of nrm objects
@@ -136,6 +136,31 @@ def test_analyticnrm2_asf_hex(setup_sf):
     assert_allclose(asf, true_asf, atol=1e-7)
 
 
+@pytest.mark.parametrize("psf_offset", [(0, 0), (0.3, -0.2)])
+def test_analyticnrm2_model_array(setup_sf, psf_offset):
+    """Test of model_array() in the analyticnrm2 module"""
+    pixel, fov, oversample, ctrs, d, lam, _phi, _centering, aff_obj = setup_sf
+
+    primary_beam, ffmodel = analyticnrm2.model_array(
+        ctrs, lam, oversample, pixel, fov, d, psf_offset=psf_offset, shape="hex", affine2d=aff_obj
+    )
+    sz = fov * oversample
+    assert primary_beam.shape == (sz, sz)
+    assert ffmodel.shape == (43, sz, sz)
+    assert np.all(ffmodel[0] == 7)
+
+    # Fringes of all baselines match those computed one baseline at a time
+    index = 1
+    for i in range(7):
+        for j in range(i + 1, 7):
+            cosfringe, sinfringe = analyticnrm2.harmonicfringes(
+                fov, pixel, ctrs[i] - ctrs[j], lam, oversample, aff_obj, psf_offset=psf_offset
+            )
+            assert_allclose(ffmodel[index], cosfringe, rtol=1e-12, atol=1e-12)
+            assert_allclose(ffmodel[index + 1], sinfringe, rtol=1e-12, atol=1e-12)
+            index += 2
+
+
 def test_analyticnrm2_interf(setup_sf):
     """Test of interf() in the analyticnrm2 module"""
     ASIZE = 4
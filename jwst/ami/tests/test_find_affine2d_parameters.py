@@ -1,6 +1,7 @@
 """Unit tests for AMI find_affine2d_parameters module."""
 
 import numpy as np
+import pytest
 
 from jwst.ami import find_affine2d_parameters, utils
 from .conftest import PXSC_DEG
@@ -18,7 +19,8 @@ def test_create_afflist_rot():
     assert alist[-1].rotradccw != np.pi * rotdegs[-1] / 180.0
 
 
-def test_find_rotation(example_model, nrm_model, bandpass):
+@pytest.mark.parametrize("ncores", [1, 2])
+def test_find_rotation(example_model, nrm_model, bandpass, ncores):
     imagedata = example_model.data[0]
     psf_offset = np.array([0.0, 0.0])
     rotdegs = np.arange(-3, 4)
@@ -27,7 +29,16 @@ def test_find_rotation(example_model, nrm_model, bandpass):
     holeshape = "hex"
 
     new_affine2d = find_affine2d_parameters.find_rotation(
-        imagedata, nrm_model, psf_offset, rotdegs, PXSC_DEG, npix, bandpass, over, holeshape
+        imagedata,
+        nrm_model,
+        psf_offset,
+        rotdegs,
+        PXSC_DEG,
+        npix,
+        bandpass,
+        over,
+        holeshape,
+        ncores=ncores,
     )
 
     assert isinstance(new_affine2d, utils.Affine2d)
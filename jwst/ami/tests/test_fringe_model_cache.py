@@ -0,0 +1,116 @@
+"""Unit tests for AMI fringe_model_cache module."""
+
+import os
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+from jwst.ami import utils
+from jwst.ami.fringe_model_cache import FringeModelCache, fringe_model_key
+
+
+class SimpleModel:
+    """Stand-in for the LgModel attributes a fringe model depends on."""
+
+    def __init__(self, **kwargs):
+        self.pixel = 3.1e-7
+        self.d = 0.8
+        self.over = 3
+        self.holeshape = "hex"
+        self.ctrs = np.array([[0.0, -2.6], [-2.3, 0.0], [2.3, -1.3]])
+        self.bandpass = np.array([[0.5, 2.4e-6], [0.5, 2.5e-6]])
+        self.affine2d = utils.Affine2d(rotradccw=0.1)
+        self.__dict__.update(kwargs)
+
+
+def make_arrays(value):
+    return {
+        "model": np.full((4, 4, 5), value),
+        "model_beam": np.full((12, 12), value),
+        "fringes": np.full((4, 12, 12), value),
+    }
+
+
+def test_fringe_model_key():
+    key = fringe_model_key(SimpleModel(), 21, (0.1, 0.2))
+    assert key == fringe_model_key(SimpleModel(), 21, (0.1, 0.2))
+    assert key != fringe_model_key(SimpleModel(), 21, (0.1, 0.3))
+    assert key != fringe_model_key(SimpleModel(), 23, (0.1, 0.2))
+    assert key != fringe_model_key(SimpleModel(over=5), 21, (0.1, 0.2))
+    assert key != fringe_model_key(SimpleModel(pixel=3.2e-7), 21, (0.1, 0.2))
+    assert key != fringe_model_key(
+        SimpleModel(affine2d=utils.Affine2d(rotradccw=0.2)), 21, (0.1, 0.2)
+    )
+    bandpass = np.array([[0.5, 2.4e-6], [0.5, 2.6e-6]])
+    assert key != fringe_model_key(SimpleModel(bandpass=bandpass), 21, (0.1, 0.2))
+
+
+def test_memory_cache():
+    cache = FringeModelCache(max_models=2)
+    assert cache.get("a") is None
+
+    arrays = cache.put("a", make_arrays(1.0))
+    assert cache.get("a") is arrays
+    for array in arrays.values():
+        assert not array.flags.writeable
+        with pytest.raises(ValueError):
+            array[...] = 0.0
+
+    # The least recently used model is evicted
+    cache.put("b", make_arrays(2.0))
+    cache.get("a")
+    cache.put("c", make_arrays(3.0))
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is arrays
+    assert (cache.hits, cache.misses) == (3, 2)
+
+    cache.configure(max_models=0)
+    assert len(cache) == 0
+    cache.put("d", make_arrays(4.0))
+    assert cache.get("d") is None
+
+
+def test_disk_cache(tmp_path):
+    cache = FringeModelCache(cache_dir=str(tmp_path / "models"))
+    cache.put("a", make_arrays(1.0))
+    assert cache.path("a").exists()
+    assert list(cache.path("a").parent.iterdir()) == [cache.path("a")]
+
+    # Another cache, e.g. in a later run, reads the saved model
+    other = FringeModelCache(cache_dir=str(tmp_path / "models"))
+    arrays = other.get("a")
+    for name, array in make_arrays(1.0).items():
+        assert_array_equal(arrays[name], array)
+        assert not arrays[name].flags.writeable
+    assert other.get("b") is None
+
+    # Unreadable files are ignored
+    other.path("b").write_text("not a model")
+    assert other.get("b") is None
+
+
+def test_round_offset():
+    cache = FringeModelCache()
+    assert cache.round_offset([0.123, -0.456]) == (0.123, -0.456)
+
+    cache.configure(offset_resolution=0.05)
+    assert cache.round_offset([0.123, -0.456]) == pytest.approx((0.1, -0.45))
+    assert cache.round_offset([0.11, -0.46]) == cache.round_offset([0.123, -0.456])
+
+
+def test_disk_cache_limit(tmp_path):
+    cache = FringeModelCache(max_models=0, cache_dir=str(tmp_path), max_files=2)
+    cache.put("a", make_arrays(1.0))
+    cache.put("b", make_arrays(2.0))
+    os.utime(cache.path("a"), ns=(0, 0))
+    os.utime(cache.path("b"), ns=(0, 1))
+
+    # Reading a model marks it as recently used
+    assert cache.get("a") is not None
+    cache.put("c", make_arrays(3.0))
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        cache.path("a").name,
+        cache.path("c").name,
+    ]
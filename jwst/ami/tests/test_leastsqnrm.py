@@ -37,6 +37,32 @@ def test_matrix_operations(pass_dq):
     assert isinstance(cond, float)
 
 
+@pytest.mark.parametrize("pass_dq", [False, True])
+def test_matrix_operations_multi(pass_dq):
+    rng = np.random.default_rng(0)
+    imgs = rng.normal(size=(3, 6, 5))
+    model = rng.normal(size=(6, 5, 4))
+    if pass_dq:
+        dq = np.zeros((6, 5), dtype="int32")
+        dq[1, 1] = 1
+        dq[4, 0] = 1
+    else:
+        dq = None
+    x, res, cond = leastsqnrm.matrix_operations_multi(imgs, model, dqm=dq)
+
+    # Each image has the same solution as fitting it alone
+    assert x.shape == (3, 4)
+    assert res.shape == imgs.shape
+    for img, x_img, res_img in zip(imgs, x, res, strict=True):
+        expected_x, expected_res, expected_cond, _ = leastsqnrm.matrix_operations(
+            img, model, dqm=dq
+        )
+        assert_allclose(x_img, expected_x, rtol=1e-10)
+        assert_allclose(res_img, expected_res, rtol=1e-10, atol=1e-12)
+        assert_allclose(cond, expected_cond, rtol=1e-10)
+    assert np.isnan(res[:, 1, 1]).all() == pass_dq
+
+
 def test_leastsqnrm_replacenan():
     """Test of replacenan() in leastsqnrm module.
     Replace singularities encountered in the analytical hexagon Fourier
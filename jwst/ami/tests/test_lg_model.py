@@ -5,6 +5,7 @@ import numpy as np
 from numpy.testing import assert_allclose
 
 from jwst.ami import lg_model
+from jwst.ami.fringe_model_cache import FringeModelCache
 from .conftest import PXSC_RAD
 
 
@@ -82,6 +83,34 @@ def test_make_model(lgmodel, psf_offset):
     assert np.all(max_idx == expected_center)
 
 
+def test_make_model_cache(monkeypatch, tmp_path, lgmodel):
+    """Fringe models are reused from memory and from the cache directory."""
+    cache = FringeModelCache(max_models=1, cache_dir=str(tmp_path))
+    monkeypatch.setattr(lg_model, "FRINGE_MODEL_CACHE", cache)
+
+    model = lgmodel.make_model(PSF_FOV, psf_offset=(0.5, -0.5))
+    assert cache.misses == 1
+    assert len(list(tmp_path.glob("fringe_model_*.npz"))) == 1
+    assert not model.flags.writeable
+
+    # Same parameters: the model is taken from memory
+    assert lgmodel.make_model(PSF_FOV, psf_offset=(0.5, -0.5)) is model
+    assert cache.hits == 1
+
+    # Different offset: a new model is computed, evicting the first one from memory
+    other = lgmodel.make_model(PSF_FOV, psf_offset=(0.0, 0.0))
+    assert cache.misses == 2
+    assert not np.allclose(other, model)
+
+    # The first model is read back from disk
+    expected_fringes = lgmodel.fringes.copy()
+    cache.clear()
+    assert_allclose(lgmodel.make_model(PSF_FOV, psf_offset=(0.5, -0.5)), model)
+    assert cache.hits == 2
+    assert_allclose(lgmodel.make_model(PSF_FOV, psf_offset=(0.0, 0.0)), other)
+    assert_allclose(lgmodel.fringes, expected_fringes)
+
+
 @pytest.mark.parametrize("weighted", [True, False])
 def test_fit_image(example_model, lgmodel, weighted):
     """
@@ -10,6 +10,7 @@ from scipy.signal import convolve
 from numpy.testing import assert_allclose
 import stdatamodels.jwst.datamodels as dm
 
+from jwst.ami import leastsqnrm
 from jwst.ami.nrm_core import FringeFitter
 from jwst.ami.instrument_data import NIRISS
 from jwst.ami.bp_fix import filtwl_d
@@ -97,3 +98,72 @@ def test_fringe_fitter(example_model, nrm_model, bandpass, nrm_psf):
     # Why is the shape hard-coded to 44?
     assert coeffs.shape == (example_model.data.shape[0], 44)
     assert np.allclose(coeffs[0], coeffs[1])
+
+
+def test_fit_fringes_all_centering_tolerance(
+    monkeypatch, example_model, nrm_model, bandpass, nrm_psf
+):
+    """Integrations with PSF offsets within the tolerance are fit together."""
+    filt = example_model.meta.instrument.filter
+
+    # The same source in each integration, with noise moving its centroid slightly
+    rng = np.random.default_rng(1)
+    source = np.zeros(example_model.data.shape[1:])
+    source[35, 35] = 1.0
+    sci_data_conv = convolve(source, nrm_psf, mode="same")
+    sci_data_conv *= 1e4 / sci_data_conv.max()
+    for i in range(example_model.data.shape[0]):
+        example_model.data[i] = rng.poisson(sci_data_conv + 10.0)
+
+    multi_fits = []
+    matrix_operations_multi = leastsqnrm.matrix_operations_multi
+
+    def count_multi_fits(data, *args, **kwargs):
+        multi_fits.append(len(data))
+        return matrix_operations_multi(data, *args, **kwargs)
+
+    monkeypatch.setattr(leastsqnrm, "matrix_operations_multi", count_multi_fits)
+
+    # By default, each integration is fit with the model at its own offset
+    fitter = FringeFitter(NIRISS(filt, nrm_model, bandpass))
+    _, expected_multi, expected_lgfit = fitter.fit_fringes_all(example_model.copy())
+    assert multi_fits == []
+
+    # Offsets differ by hundredths of a pixel, so all integrations are fit together
+    fitter = FringeFitter(NIRISS(filt, nrm_model, bandpass), centering_tolerance=0.05)
+    _, output_model_multi, lgfit = fitter.fit_fringes_all(example_model)
+    assert multi_fits == [example_model.data.shape[0]]
+
+    # Each integration keeps its own fit, close to its fit at its own offset
+    # compared to the differences between integrations
+    assert_allclose(lgfit.centered_image, expected_lgfit.centered_image)
+    coeffs = lgfit.solns_table["coeffs"]
+    expected_coeffs = expected_lgfit.solns_table["coeffs"]
+    scatter = np.abs(expected_coeffs - expected_coeffs[0]).max()
+    assert np.abs(coeffs - expected_coeffs).max() < 0.1 * scatter
+    visamp = output_model_multi.vis["VISAMP"]
+    expected_visamp = expected_multi.vis["VISAMP"]
+    scatter = np.abs(expected_visamp - expected_visamp[:, :1]).max()
+    assert np.abs(visamp - expected_visamp).max() < 0.1 * scatter
+
+
+@pytest.mark.parametrize(
+    "weighted, centering_tolerance, expected",
+    [
+        (False, 0.0, [[0, 2], [1, 4], [3], [5]]),
+        (False, 0.01, [[0, 2, 5], [1, 4], [3]]),
+        (False, 0.15, [[0, 1, 2, 4, 5], [3]]),
+        (True, 0.15, [[0], [1], [2], [3], [4], [5]]),
+    ],
+)
+def test_centering_groups(weighted, centering_tolerance, expected):
+    """
+    Unweighted fits of integrations with the same bad pixels, and the same centering
+    within the tolerance, are grouped.
+    """
+    fitter = FringeFitter(None, weighted=weighted, centering_tolerance=centering_tolerance)
+    fitter.dqmask = np.zeros((6, 4, 4), dtype=bool)
+    fitter.dqmask[3, 1, 1] = True
+    offsets = [(0.1, 0.2), (0.1, 0.3), (0.1, 0.2), (0.1, 0.2), (0.1, 0.3), (0.105, 0.195)]
+
+    assert fitter.centering_groups(offsets) == expected
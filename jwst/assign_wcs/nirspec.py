@@ -7,6 +7,7 @@ Calls create_pipeline() which redirects based on EXP_TYPE.
 import copy
 import logging
 import warnings
+import weakref
 
 import gwcs
 import numpy as np
@@ -18,6 +19,7 @@ from astropy.modeling import fix_inputs, models, bind_bounding_box
 from astropy.modeling.models import Mapping, Identity, Const1D, Scale, Tabular1D
 from gwcs import coordinate_frames as cf
 from gwcs import selector
+from gwcs.utils import _toindex
 from gwcs.wcstools import grid_from_bounding_box
 
 from stdatamodels.jwst.datamodels import (
@@ -60,6 +62,15 @@ FIXED_SLIT_NUMS = {"NONE": 0, "S200A1": 1, "S200A2": 2, "S400A1": 3, "S1600A1":
 # Approximate fallback values for MSA slit scaling
 MSA_SLIT_SCALES = (1.35, 1.15)
 
+# Transforms in a multi-slit WCS pipeline that select a model for each slit;
+# all other transforms only pass the slit name through.
+SLIT_SELECTOR_TRANSFORMS = ("gwa2slit", "slit2msa")
+
+# Pixel grids of each slit mapped through the WCS, cached per WCS object
+_SLIT_GRID_CACHE: weakref.WeakKeyDictionary[gwcs.WCS, dict[str, tuple[np.ndarray, ...]]] = (
+    weakref.WeakKeyDictionary()
+)
+
 __all__ = [
     "create_pipeline",
     "imaging",
@@ -70,6 +81,8 @@ __all__ = [
     "nrs_fs_slit_id",
     "nrs_fs_slit_name",
     "nrs_wcs_set_input",
+    "nrs_wcs_evaluate_slits",
+    "nrs_slit_grids",
     "nrs_ifu_wcs",
     "get_spectral_order_wrange",
 ]
@@ -2566,10 +2579,7 @@ def nrs_wcs_set_input(input_model, slit_name):
             return nrs_wcs_set_input_legacy(input_model, slit_name)
 
     # Convert FS slit names to numbers
-    if str(slit_name).upper() in FIXED_SLIT_NUMS.keys():
-        slit_id = nrs_fs_slit_id(str(slit_name).upper())
-    else:
-        slit_id = slit_name
+    slit_id = _nrs_slit_id(slit_name)
 
     # Check slit ID to make sure it's present in the slits
     if "gwa" in full_wcs.available_frames:
@@ -2611,6 +2621,223 @@ def nrs_wcs_set_input(input_model, slit_name):
     return slit_wcs
 
 
+def _nrs_slit_id(slit_name):
+    """
+    Get the slit ID used in the WCS transforms for a slit name.
+
+    Parameters
+    ----------
+    slit_name : int or str
+        Slit.name of an open slit.
+
+    Returns
+    -------
+    int or str
+        The slit ID: the standard ID for fixed slit names, otherwise the name.
+    """
+    if str(slit_name).upper() in FIXED_SLIT_NUMS.keys():
+        return nrs_fs_slit_id(str(slit_name).upper())
+    return slit_name
+
+
+def _can_evaluate_slits_together(full_wcs):
+    """
+    Check whether the slits of a WCS can be evaluated in a single batch.
+
+    Parameters
+    ----------
+    full_wcs : `~gwcs.wcs.WCS`
+        WCS object for all open slits in an observation.
+
+    Returns
+    -------
+    bool
+        True for MOS and fixed slit WCS objects whose only slit-specific
+        transforms are the GWA to slit and slit to MSA transforms.
+    """
+    frames = full_wcs.available_frames
+    if "gwa" not in frames or "slit_frame" not in frames or "slicer" in frames:
+        return False
+    for step in full_wcs.pipeline:
+        if isinstance(step.transform, Slit2MsaLegacy):
+            return False
+    return True
+
+
+def nrs_wcs_evaluate_slits(input_model, slit_coords, with_bounding_box=True):
+    """
+    Evaluate the WCS for many slits or slitlets at once.
+
+    The result for each slit is the same as calling the WCS returned by
+    `nrs_wcs_set_input` for that slit, but the transforms shared by all
+    slits (detector to GWA, and MSA to sky) are evaluated once for the
+    coordinates of all slits together. Only the GWA to slit and slit to
+    MSA transforms are evaluated slit by slit.
+
+    WCS objects that do not support batch evaluation (IFU or legacy WCS)
+    are evaluated slit by slit.
+
+    Parameters
+    ----------
+    input_model : JwstDataModel
+        A datamodel that contains a WCS object for all open slitlets in
+        an observation.
+    slit_coords : dict
+        Detector x and y coordinates to evaluate for each slit, keyed by
+        Slit.name of an open slit.
+    with_bounding_box : bool, optional
+        If True, outputs for coordinates outside the bounding box of a slit
+        are set to NaN, as when calling the WCS for the slit.
+
+    Returns
+    -------
+    dict
+        The output coordinates of the WCS for each slit, as a tuple of arrays
+        with the shape of the input coordinates, keyed by slit name.
+    """
+    full_wcs = input_model.meta.wcs
+    if not _can_evaluate_slits_together(full_wcs):
+        results = {}
+        for slit_name, (x, y) in slit_coords.items():
+            slit_wcs = nrs_wcs_set_input(input_model, slit_name)
+            results[slit_name] = slit_wcs(x, y, with_bounding_box=with_bounding_box)
+        return results
+
+    slit_ids = full_wcs.get_transform("gwa", "slit_frame").slit_ids
+    use_bounding_box = with_bounding_box and full_wcs.bounding_box is not None
+
+    # Gather the coordinates to evaluate for all slits, skipping those
+    # outside the bounding box of their slit
+    names = []
+    shapes = []
+    inside = []
+    batch_ids = []
+    batch_x = []
+    batch_y = []
+    for slit_name, (x, y) in slit_coords.items():
+        slit_id = _nrs_slit_id(slit_name)
+        if slit_id not in slit_ids:
+            raise ValueError(f"Input slit name {slit_name} is not present in the input model.")
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        valid = np.ones(x.shape, dtype=bool)
+        if use_bounding_box:
+            bbox = full_wcs.bounding_box[slit_id]
+            for coord_value, (lower, upper) in zip((x, y), (bbox[0], bbox[1]), strict=True):
+                valid &= ~((coord_value < lower) | (coord_value > upper))
+        names.append(slit_name)
+        shapes.append(x.shape)
+        inside.append(valid)
+        batch_ids.append(slit_id)
+        batch_x.append(x[valid])
+        batch_y.append(y[valid])
+
+    bounds = np.cumsum([0] + [len(x) for x in batch_x])
+    values = [np.concatenate(batch_x), np.concatenate(batch_y)]
+
+    # The shared transforms only pass the slit name through, so any
+    # numerical value will do
+    name_placeholder = np.zeros(bounds[-1])
+
+    for step in full_wcs.pipeline:
+        transform = step.transform
+        if transform is None:
+            break
+        if transform.name in SLIT_SELECTOR_TRANSFORMS:
+            outputs = None
+            for i, slit_id in enumerate(batch_ids):
+                start, stop = bounds[i], bounds[i + 1]
+                if start == stop:
+                    continue
+                slit_transform = _fix_slit_name(transform, slit_id)
+                result = slit_transform(*[value[start:stop] for value in values])
+                if slit_transform.n_outputs == 1:
+                    result = (result,)
+                if outputs is None:
+                    outputs = [np.full(bounds[-1], np.nan) for _ in result]
+                for output, value in zip(outputs, result, strict=True):
+                    output[start:stop] = value
+            if outputs is None:
+                outputs = [np.empty(0) for _ in range(transform.n_outputs - 1)]
+        elif "name" in transform.inputs:
+            inputs = list(values)
+            inputs.insert(transform.inputs.index("name"), name_placeholder)
+            outputs = list(transform(*inputs))
+            del outputs[transform.outputs.index("name")]
+        else:
+            outputs = transform(*values)
+            if transform.n_outputs == 1:
+                outputs = (outputs,)
+        values = [np.asarray(value) for value in outputs]
+
+    # Split the results by slit
+    results = {}
+    for i, slit_name in enumerate(names):
+        slit_result = []
+        for value in values:
+            slit_value = np.full(shapes[i], np.nan, dtype=value.dtype)
+            slit_value[inside[i]] = value[bounds[i] : bounds[i + 1]]
+            slit_result.append(slit_value)
+        results[slit_name] = tuple(slit_result)
+    return results
+
+
+def nrs_slit_grids(input_model, slit_names=None):
+    """
+    Map the pixels in the bounding box of each slit through the WCS.
+
+    The pixel grid of each slit covers its bounding box, with pixel indices
+    as used to cut out the slit in ``extract_2d``. The grids are evaluated
+    together with `nrs_wcs_evaluate_slits` and cached with the WCS object of
+    the model, so that later calls for the same slits reuse them. The
+    cached arrays are read-only.
+
+    Parameters
+    ----------
+    input_model : JwstDataModel
+        A datamodel that contains a WCS object for all open slitlets in
+        an observation.
+    slit_names : list of int or str, optional
+        Slit.name of the open slits to map. If not provided, all open slits
+        are mapped.
+
+    Returns
+    -------
+    dict
+        For each slit, keyed by slit name, a tuple of the detector x and y
+        pixel grids followed by the WCS output coordinates for those pixels.
+    """
+    full_wcs = input_model.meta.wcs
+    if slit_names is None:
+        slit_names = [slit.name for slit in full_wcs.get_transform("gwa", "slit_frame").slits]
+
+    cache = _SLIT_GRID_CACHE.setdefault(full_wcs, {})
+    slit_coords = {}
+    for slit_name in slit_names:
+        if slit_name in cache:
+            continue
+        if _can_evaluate_slits_together(full_wcs) and full_wcs.bounding_box is not None:
+            bbox = full_wcs.bounding_box[_nrs_slit_id(slit_name)]
+        else:
+            bbox = nrs_wcs_set_input(input_model, slit_name).bounding_box
+        xlo, xhi = _toindex(bbox[0])
+        ylo, yhi = _toindex(bbox[1])
+        # Broadcast views of the pixel indices take no memory in the cache
+        shape = (yhi - ylo, xhi - xlo)
+        x = np.broadcast_to(np.arange(xlo, xhi), shape)
+        y = np.broadcast_to(np.arange(ylo, yhi)[:, np.newaxis], shape)
+        slit_coords[slit_name] = (x, y)
+
+    if slit_coords:
+        log.debug(f"Mapping the pixels of {len(slit_coords)} slits through the WCS")
+        results = nrs_wcs_evaluate_slits(input_model, slit_coords, with_bounding_box=False)
+        for slit_name, (x, y) in slit_coords.items():
+            for value in results[slit_name]:
+                value.setflags(write=False)
+            cache[slit_name] = (x, y, *results[slit_name])
+
+    return {slit_name: cache[slit_name] for slit_name in slit_names}
+
+
 def validate_open_slits(input_model, open_slits, reference_files):
     """
     Remove slits which do not project on the detector from the list of open slits.
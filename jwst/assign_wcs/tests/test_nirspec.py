@@ -16,6 +16,7 @@ from astropy import table
 from astropy import wcs as astwcs
 from astropy.utils.data import get_pkg_data_filename
 from gwcs import wcs, wcstools
+from gwcs.utils import _toindex
 from numpy.testing import assert_allclose, assert_array_equal
 
 from stdatamodels.jwst import datamodels
@@ -1513,3 +1514,116 @@ def test_slit_bounding_box(wcs_ifu_grating):
         # as the initially computed one.
         new_bb = nirspec.compute_bounding_box(transform, None, wavelength_range)
         assert_allclose(new_bb, bbox_tuple)
+
+
+def _synthetic_multislit_model(shape=(60, 80)):
+    """Make a model with a simple multi-slit WCS with the structure of a MOS WCS."""
+    det, sca, gwa, slit_frame, _, msa_frame, oteip, _, _, _ = nirspec.create_frames()
+    slits = [
+        trmodels.Slit(name=name, slit_id=slit_id, quadrant=quadrant)
+        for name, slit_id, quadrant in [(3, 3, 1), (7, 7, 2), ("S200A1", -101, 5)]
+    ]
+
+    dms2sca = astmodels.Shift(1) & astmodels.Shift(2) & astmodels.Identity(1)
+    dms2sca.inputs = ("x", "y", "name")
+    dms2sca.outputs = ("x", "y", "name")
+    dms2sca.name = "dms2sca"
+
+    angles = (
+        astmodels.Scale(1e-3) & astmodels.Scale(2e-3)
+        | astmodels.Mapping((0, 1, 0))
+        | astmodels.Identity(2) & astmodels.Shift(1)
+    )
+    det2gwa = angles & astmodels.Identity(1) | astmodels.Mapping((3, 0, 1, 2))
+    det2gwa.inputs = ("x", "y", "name")
+    det2gwa.outputs = ("name", "angle1", "angle2", "angle3")
+    det2gwa.name = "det2gwa"
+
+    slit_models = [
+        astmodels.Shift(-0.01 * i) & astmodels.Scale(1 + i) & astmodels.Polynomial1D(2, c1=i, c2=1)
+        for i in range(len(slits))
+    ]
+    gwa2slit = trmodels.Gwa2Slit(slits, slit_models)
+    gwa2slit.name = "gwa2slit"
+
+    msa_models = [astmodels.Shift(i) & astmodels.Scale(0.5 * (i + 1)) for i in range(len(slits))]
+    slit2msa = trmodels.Slit2Msa(slits, msa_models) & astmodels.Identity(1) | astmodels.Mapping(
+        (0, 1, 3, 2)
+    )
+    slit2msa.inputs = ("name", "x_slit", "y_slit", "lam")
+    slit2msa.outputs = ("x_msa", "y_msa", "lam", "name")
+    slit2msa.name = "slit2msa"
+
+    msa2oteip = astmodels.Scale(2) & astmodels.Scale(3) & astmodels.Identity(2)
+    msa2oteip.inputs = ("x_msa", "y_msa", "lam", "name")
+    msa2oteip.outputs = ("x_ote", "y_ote", "lam", "name")
+    msa2oteip.name = "msa2oteip"
+
+    pipeline = [
+        (det, dms2sca),
+        (sca, det2gwa),
+        (gwa, gwa2slit),
+        (slit_frame, slit2msa),
+        (msa_frame, msa2oteip),
+        (oteip, None),
+    ]
+    model = datamodels.ImageModel(shape)
+    model.meta.wcs = wcs.WCS(pipeline)
+
+    bbox_dict = {
+        3: ((4.2, 30.7), (5.5, 20.4)),
+        7: ((20.0, 70.9), (25.3, 40.5)),
+        -101: ((-0.5, 79.5), (44.6, 58.1)),
+    }
+    forward = model.meta.wcs.forward_transform
+    forward.inputs = ("x", "y", "name")
+    model.meta.wcs.bounding_box = nirspec.mbbox.CompoundBoundingBox.validate(
+        forward, bbox_dict, selector_args=[("name", True)], order="F"
+    )
+    return model
+
+
+@pytest.mark.parametrize("with_bounding_box", [True, False])
+def test_nrs_wcs_evaluate_slits(with_bounding_box):
+    model = _synthetic_multislit_model()
+    y, x = np.mgrid[: model.data.shape[0], : model.data.shape[1]]
+    slit_coords = {3: (x, y), 7: (x[::2], y[::2]), "S200A1": (x, y)}
+
+    results = nirspec.nrs_wcs_evaluate_slits(
+        model, slit_coords, with_bounding_box=with_bounding_box
+    )
+    assert list(results.keys()) == list(slit_coords.keys())
+    for name, (slit_x, slit_y) in slit_coords.items():
+        slit_wcs = nirspec.nrs_wcs_set_input(model, name)
+        expected = slit_wcs(slit_x, slit_y, with_bounding_box=with_bounding_box)
+        assert len(results[name]) == len(expected) == 3
+        for value, expected_value in zip(results[name], expected, strict=True):
+            assert value.shape == slit_x.shape
+            assert np.any(np.isfinite(value))
+            assert_array_equal(value, expected_value)
+
+    with pytest.raises(ValueError, match="not present"):
+        nirspec.nrs_wcs_evaluate_slits(model, {5: (x, y)})
+
+
+def test_nrs_slit_grids():
+    model = _synthetic_multislit_model()
+    grids = nirspec.nrs_slit_grids(model)
+    assert list(grids.keys()) == [3, 7, "S200A1"]
+
+    for name, (x, y, *world) in grids.items():
+        slit_wcs = nirspec.nrs_wcs_set_input(model, name)
+        xlo, xhi = _toindex(slit_wcs.bounding_box[0])
+        ylo, yhi = _toindex(slit_wcs.bounding_box[1])
+        assert x.shape == (yhi - ylo, xhi - xlo)
+        assert x[0, 0] == xlo and y[0, 0] == ylo
+        for value, expected_value in zip(
+            world, slit_wcs(x, y, with_bounding_box=False), strict=True
+        ):
+            assert_array_equal(value, expected_value)
+            assert not value.flags.writeable
+
+    # Grids are reused until the WCS is replaced
+    assert nirspec.nrs_slit_grids(model, [7])[7][2] is grids[7][2]
+    model.meta.wcs = _synthetic_multislit_model().meta.wcs
+    assert nirspec.nrs_slit_grids(model, [7])[7][2] is not grids[7][2]
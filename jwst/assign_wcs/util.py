@@ -430,103 +430,31 @@ def _create_grism_bbox(
 
     # this contains the pure information from the catalog with no translations
     skyobject_list = get_object_info(input_model.meta.source_catalog)
-    # get the imaging transform to record the center of the object in the image
-    # here, image is in the imaging reference frame, before going through the
-    # dispersion coefficients
+    skyobject_list = [
+        obj
+        for obj in skyobject_list
+        if obj.isophotal_abmag is not None and not obj.isophotal_abmag >= mmag_extract
+    ]
+    # could add logic to ignore object if too far off image,
 
-    sky_to_detector = input_model.meta.wcs.get_transform("world", "detector")
-    sky_to_grism = input_model.meta.wcs.backward_transform
+    # the transforms are evaluated for all objects at once
+    if len(skyobject_list) > 0:
+        xcenters, ycenters, extents = _grism_extents(
+            input_model, skyobject_list, wavelength_range, wfss_extract_half_height
+        )
 
     grism_objects = []  # the return list of GrismObjects
-    for obj in skyobject_list:
-        if obj.isophotal_abmag is None:
-            continue
-        if obj.isophotal_abmag >= mmag_extract:
-            continue
-        # could add logic to ignore object if too far off image,
-
-        # save the image frame center of the object
-        # takes in ra, dec, wavelength, order but wave and order
-        # don't get used until the detector->grism_detector transform
-        xcenter, ycenter, _, _ = sky_to_detector(
-            obj.sky_centroid.icrs.ra.value, obj.sky_centroid.icrs.dec.value, 1, 1
-        )
+    for i, obj in enumerate(skyobject_list):
+        # the image frame center of the object
+        xcenter = float(xcenters[i])
+        ycenter = float(ycenters[i])
 
         order_bounding = {}
         waverange = {}
         partial_order = {}
         for order in wavelength_range:
-            # range_select = [(x[2], x[3]) for x in wavelengthrange \
-            # if (x[0] == order and x[1] == filter_name)]
-            # The orders of the bounding box in the non-dispersed image
-            # drive the extraction extent. The location of the min and
-            # max wavelengths for each order are used to get the
-            # location of the +/- sides of the bounding box in the
-            # grism image
             lmin, lmax = wavelength_range[order]
-            ra = np.array(
-                [
-                    obj.sky_bbox_ll.ra.value,
-                    obj.sky_bbox_lr.ra.value,
-                    obj.sky_bbox_ul.ra.value,
-                    obj.sky_bbox_ur.ra.value,
-                ]
-            )
-            dec = np.array(
-                [
-                    obj.sky_bbox_ll.dec.value,
-                    obj.sky_bbox_lr.dec.value,
-                    obj.sky_bbox_ul.dec.value,
-                    obj.sky_bbox_ur.dec.value,
-                ]
-            )
-            x1, y1, _, _, _ = sky_to_grism(ra, dec, [lmin] * 4, [order] * 4)
-            x2, y2, _, _, _ = sky_to_grism(ra, dec, [lmax] * 4, [order] * 4)
-
-            xstack = np.hstack([x1, x2])
-            ystack = np.hstack([y1, y2])
-
-            # Subarrays are only allowed in nircam tsgrism mode. The polynomial transforms
-            # only work with the full frame coordinates.
-            # The code here is called during extract_2d,
-            # and is creating bounding boxes which should be in the full frame coordinates,
-            # it just uses the input catalog and the magnitude
-            # to limit the objects that need bounding boxes.
-
-            # Tsgrism is always supposed to have the source object at the same pixel, and that is
-            # hardcoded into the transforms.
-            # At least a while ago, the 2d extraction for tsgrism mode
-            # didn't call this bounding box code. So I think it's safe to leave the subarray
-            # subtraction out, i.e. do not subtract x/ystart.
-
-            xmin = np.nanmin(xstack)
-            xmax = np.nanmax(xstack)
-            ymin = np.nanmin(ystack)
-            ymax = np.nanmax(ystack)
-
-            if wfss_extract_half_height is not None and not obj.is_extended:
-                if input_model.meta.wcsinfo.dispersion_direction == 2:
-                    ra_center, dec_center = (
-                        obj.sky_centroid.ra.value,
-                        obj.sky_centroid.dec.value,
-                    )
-                    center, _, _, _, _ = sky_to_grism(
-                        ra_center, dec_center, (lmin + lmax) / 2, order
-                    )
-                    xmin = center - wfss_extract_half_height
-                    xmax = center + wfss_extract_half_height
-                elif input_model.meta.wcsinfo.dispersion_direction == 1:
-                    ra_center, dec_center = (
-                        obj.sky_centroid.ra.value,
-                        obj.sky_centroid.dec.value,
-                    )
-                    _, center, _, _, _ = sky_to_grism(
-                        ra_center, dec_center, (lmin + lmax) / 2, order
-                    )
-                    ymin = center - wfss_extract_half_height
-                    ymax = center + wfss_extract_half_height
-                else:
-                    raise ValueError("Cannot determine dispersion direction.")
+            xmin, xmax, ymin, ymax = (bound[i] for bound in extents[order])
 
             # Convert floating-point corner values to whole pixel indexes
             xmin = gwutils._toindex(xmin)  # noqa: SLF001
@@ -634,6 +562,118 @@ def _create_grism_bbox(
     return final_objects
 
 
+def _grism_extents(input_model, skyobject_list, wavelength_range, wfss_extract_half_height=None):
+    """
+    Compute the extent of the spectra of catalog objects on the grism image.
+
+    The transforms are evaluated for the bounding box corners of all objects
+    at once rather than object by object, since evaluating them dominates the
+    time needed to make the bounding boxes of catalogs with many sources.
+
+    Parameters
+    ----------
+    input_model : ImageModel
+        Data model which holds the grism image.
+    skyobject_list : list[SkyObject]
+        The catalog objects.
+    wavelength_range : dict
+        Pairs of {spectral_order: (wave_min, wave_max)} for each order.
+    wfss_extract_half_height : int, optional
+        Cross-dispersion extraction half height in pixels, applied to
+        point sources.
+
+    Returns
+    -------
+    xcenters, ycenters : ndarray
+        The centers of the objects in the direct image frame.
+    extents : dict
+        For each order, the arrays ``(xmin, xmax, ymin, ymax)`` giving the
+        extent of the spectra of the objects in the grism image.
+    """
+    # get the imaging transform to record the center of the object in the image
+    # here, image is in the imaging reference frame, before going through the
+    # dispersion coefficients
+    sky_to_detector = input_model.meta.wcs.get_transform("world", "detector")
+    sky_to_grism = input_model.meta.wcs.backward_transform
+    nobjects = len(skyobject_list)
+
+    # save the image frame center of the objects
+    # takes in ra, dec, wavelength, order but wave and order
+    # don't get used until the detector->grism_detector transform
+    xcenters, ycenters, _, _ = sky_to_detector(
+        np.array([obj.sky_centroid.icrs.ra.value for obj in skyobject_list]),
+        np.array([obj.sky_centroid.icrs.dec.value for obj in skyobject_list]),
+        1,
+        1,
+    )
+
+    # The corners of the bounding box of each object in the non-dispersed image
+    corners = [
+        (obj.sky_bbox_ll, obj.sky_bbox_lr, obj.sky_bbox_ul, obj.sky_bbox_ur)
+        for obj in skyobject_list
+    ]
+    ra = np.array([[corner.ra.value for corner in obj_corners] for obj_corners in corners])
+    dec = np.array([[corner.dec.value for corner in obj_corners] for obj_corners in corners])
+    ra = ra.ravel()
+    dec = dec.ravel()
+
+    # Only point sources use the custom extraction height
+    dispaxis = input_model.meta.wcsinfo.dispersion_direction
+    point_sources = np.array([not obj.is_extended for obj in skyobject_list])
+    use_half_height = wfss_extract_half_height is not None and point_sources.any()
+    if use_half_height:
+        if dispaxis not in (1, 2):
+            raise ValueError("Cannot determine dispersion direction.")
+        ra_center = np.array([obj.sky_centroid.ra.value for obj in skyobject_list])
+        dec_center = np.array([obj.sky_centroid.dec.value for obj in skyobject_list])
+
+    extents = {}
+    for order in wavelength_range:
+        # The location of the min and max wavelengths for each order are
+        # used to get the location of the +/- sides of the bounding box in
+        # the grism image
+        lmin, lmax = wavelength_range[order]
+        x1, y1, _, _, _ = sky_to_grism(ra, dec, lmin, order)
+        x2, y2, _, _, _ = sky_to_grism(ra, dec, lmax, order)
+
+        xstack = np.hstack([np.reshape(x1, (nobjects, -1)), np.reshape(x2, (nobjects, -1))])
+        ystack = np.hstack([np.reshape(y1, (nobjects, -1)), np.reshape(y2, (nobjects, -1))])
+
+        # Subarrays are only allowed in nircam tsgrism mode. The polynomial transforms
+        # only work with the full frame coordinates.
+        # The code here is called during extract_2d,
+        # and is creating bounding boxes which should be in the full frame coordinates,
+        # it just uses the input catalog and the magnitude
+        # to limit the objects that need bounding boxes.
+
+        # Tsgrism is always supposed to have the source object at the same pixel, and that is
+        # hardcoded into the transforms.
+        # At least a while ago, the 2d extraction for tsgrism mode
+        # didn't call this bounding box code. So I think it's safe to leave the subarray
+        # subtraction out, i.e. do not subtract x/ystart.
+        xmin = np.nanmin(xstack, axis=1)
+        xmax = np.nanmax(xstack, axis=1)
+        ymin = np.nanmin(ystack, axis=1)
+        ymax = np.nanmax(ystack, axis=1)
+
+        if use_half_height:
+            xcenter, ycenter, _, _, _ = sky_to_grism(
+                ra_center, dec_center, (lmin + lmax) / 2, order
+            )
+            if dispaxis == 2:
+                center = np.reshape(xcenter, nobjects)
+                xmin = np.where(point_sources, center - wfss_extract_half_height, xmin)
+                xmax = np.where(point_sources, center + wfss_extract_half_height, xmax)
+            else:
+                center = np.reshape(ycenter, nobjects)
+                ymin = np.where(point_sources, center - wfss_extract_half_height, ymin)
+                ymax = np.where(point_sources, center + wfss_extract_half_height, ymax)
+
+        extents[order] = (xmin, xmax, ymin, ymax)
+
+    return xcenters, ycenters, extents
+
+
 def transform_bbox_from_shape(shape, order="C"):
     """
     Create a bounding box from the shape of the data.
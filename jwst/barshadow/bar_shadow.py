@@ -6,6 +6,8 @@ from gwcs import wcstools
 from scipy import ndimage
 from stdatamodels.jwst import datamodels
 
+from jwst.lib.wcs_utils import COORDINATE_GRID_CACHE
+
 
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
@@ -156,11 +158,17 @@ def _calc_correction(slitlet, barshadow_model, source_type):
     # make a grid of indices for pixels in the subarray
     x, y = wcstools.grid_from_bounding_box(slitlet.meta.wcs.bounding_box, step=(1, 1))
 
-    # Create the transformation from slit_frame to detector
-    det2slit = slitlet.meta.wcs.get_transform("detector", "slit_frame")
+    if x.shape == slitlet.data.shape[-2:] and x[0, 0] == 0 and y[0, 0] == 0:
+        # The bounding box spans the slit data, so the coordinates may have
+        # been computed already by an earlier step
+        frames = [("detector", "slit_frame")]
+        xslit, yslit, wavelength = COORDINATE_GRID_CACHE.evaluate(slitlet, frames)
+    else:
+        # Create the transformation from slit_frame to detector
+        det2slit = slitlet.meta.wcs.get_transform("detector", "slit_frame")
 
-    # Use this transformation to calculate x, y, and wavelength
-    xslit, yslit, wavelength = det2slit(x, y)
+        # Use this transformation to calculate x, y, and wavelength
+        xslit, yslit, wavelength = det2slit(x, y)
 
     # The returned y values are scaled to where the slit height is 1
     # (i.e. a slit goes from -0.5 to 0.5).  The barshadow array is scaled
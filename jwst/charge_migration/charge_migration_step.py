@@ -44,8 +44,8 @@ class ChargeMigrationStep(Step):
                 input_model.meta.cal_step.charge_migration = "SKIPPED"
                 return input_model
 
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             # Retrieve the parameter value(s)
             signal_threshold = self.signal_threshold
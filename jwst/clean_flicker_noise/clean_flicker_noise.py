@@ -1,3 +1,5 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import warnings
 
@@ -1428,6 +1430,88 @@ def _mask_unusable(mask, dq):
     mask[jump] = False
 
 
+def _group_image(input_model, background_mask, ndim, i, j):
+    """
+    Get the image to clean for an integration and group, with its mask.
+
+    Parameters
+    ----------
+    input_model : `~jwst.datamodel.JwstDataModel`
+        Science data to be corrected.
+    background_mask : array-like of bool
+        The scene mask, for all integrations or one per integration.
+    ndim : int
+        Number of dimensions of the science data.
+    i, j : int
+        Integration and group index. For ramp data, the image is the
+        difference between groups ``j + 1`` and ``j``.
+
+    Returns
+    -------
+    image : array-like of float
+        The image to clean.
+    mask : array-like of bool
+        A copy of the scene mask, with unusable ramp data masked.
+    """
+    # Copy the scene mask, for further flagging
+    if background_mask.ndim == 3:
+        mask = background_mask[i].copy()
+    else:
+        mask = background_mask.copy()
+
+    # Get the relevant image data
+    if ndim == 2:
+        image = input_model.data
+    elif ndim == 3:
+        image = input_model.data[i]
+    else:
+        # Ramp data input:
+        # subtract the current group from the next one
+        image = input_model.data[i, j + 1] - input_model.data[i, j]
+        dq = input_model.groupdq[i, j + 1]
+
+        # Mask any DNU and JUMP pixels
+        _mask_unusable(mask, dq)
+
+    return image, mask
+
+
+def _map_images(func, indices, ncores=1):
+    """
+    Apply a function to each image, on a thread pool if requested.
+
+    At most twice as many images as threads are processed ahead of
+    the result being consumed, to bound the memory used by results.
+
+    Parameters
+    ----------
+    func : callable
+        Function called with each index.
+    indices : list
+        Indices of the images to process.
+    ncores : int, optional
+        Number of threads to use.
+
+    Yields
+    ------
+    Any
+        The result of `func` for each index, in order.
+    """
+    if ncores <= 1 or len(indices) <= 1:
+        for index in indices:
+            yield func(index)
+        return
+
+    with ThreadPoolExecutor(max_workers=ncores) as executor:
+        pending = deque()
+        for index in indices:
+            pending.append(executor.submit(func, index))
+            if len(pending) >= 2 * ncores:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
 def do_correction(
     input_model,
     input_dir=None,
@@ -1444,6 +1528,7 @@ def do_correction(
     save_mask=False,
     save_background=False,
     save_noise=False,
+    ncores=1,
 ):
     """
     Apply the 1/f noise correction.
@@ -1511,6 +1596,9 @@ def do_correction(
     save_noise : bool, optional
         Switch to indicate whether the fit noise should be saved.
 
+    ncores : int, optional
+        Number of threads used to clean the integrations and groups.
+
     Returns
     -------
     output_model : `~jwst.datamodel.JwstDataModel`
@@ -1585,81 +1673,64 @@ def do_correction(
     else:
         background_to_save = None
 
-    # Loop over integrations and groups (even if there's only 1)
-    for i in range(nints):
-        log.debug(f"Working on integration {i + 1}")
-        for j in range(ngroups):
-            log.debug(f"Working on group {j + 1}")
-
-            # Copy the scene mask, for further flagging
-            if background_mask.ndim == 3:
-                mask = background_mask[i].copy()
-            else:
-                mask = background_mask.copy()
+    def clean_group(index):
+        i, j = index
+        log.debug(f"Working on integration {i + 1}, group {j + 1}")
+        image, mask = _group_image(input_model, background_mask, ndim, i, j)
+        return _clean_one_image(
+            image,
+            mask,
+            background_method,
+            background_box_size,
+            n_sigma,
+            fit_method,
+            detector,
+            fc,
+            axis_to_correct,
+            fit_by_channel,
+            flat,
+        )
 
-            # Get the relevant image data
-            if ndim == 2:
-                image = input_model.data
-            elif ndim == 3:
-                image = input_model.data[i]
-            else:
-                # Ramp data input:
-                # subtract the current group from the next one
-                image = input_model.data[i, j + 1] - input_model.data[i, j]
-                dq = input_model.groupdq[i, j + 1]
-
-                # Mask any DNU and JUMP pixels
-                _mask_unusable(mask, dq)
-
-            # Clean the image
-            cleaned_image, background, success = _clean_one_image(
-                image,
-                mask,
-                background_method,
-                background_box_size,
-                n_sigma,
-                fit_method,
-                detector,
-                fc,
-                axis_to_correct,
-                fit_by_channel,
-                flat,
+    # Loop over integrations and groups (even if there's only 1).
+    # Images are cleaned independently, in parallel if requested, but the
+    # results are stored in order, since cleaned ramp groups are accumulated.
+    indices = [(i, j) for i in range(nints) for j in range(ngroups)]
+    results = _map_images(clean_group, indices, ncores=ncores)
+    for (i, j), (cleaned_image, background, success) in zip(indices, results, strict=True):
+        if not success:
+            # Cleaning failed for internal reasons - probably the
+            # mask is not a good match to the data.
+            log.error(f"Cleaning failed for integration {i + 1}, group {j + 1}")
+
+            # Restore input data to make sure any partial changes
+            # are thrown away
+            output_model.data = input_model.data.copy()
+            return output_model, None, None, None, status
+
+        if cleaned_image is None:
+            # Cleaning did not proceed because the image is bad:
+            # leave it as is but continue correcting the rest
+            log.warning(
+                f"No usable data in integration {i + 1}, group {j + 1}. "
+                f"Skipping correction for this image."
             )
-
-            if not success:
-                # Cleaning failed for internal reasons - probably the
-                # mask is not a good match to the data.
-                log.error(f"Cleaning failed for integration {i + 1}, group {j + 1}")
-
-                # Restore input data to make sure any partial changes
-                # are thrown away
-                output_model.data = input_model.data.copy()
-                return output_model, None, None, None, status
-
-            if cleaned_image is None:
-                # Cleaning did not proceed because the image is bad:
-                # leave it as is but continue correcting the rest
-                log.warning(
-                    f"No usable data in integration {i + 1}, group {j + 1}. "
-                    f"Skipping correction for this image."
-                )
-                continue
-
-            # Store the cleaned image in the output model
-            if ndim == 2:
-                output_model.data = cleaned_image
-                if save_background:
-                    background_to_save[:] = background
-            elif ndim == 3:
-                output_model.data[i] = cleaned_image
-                if save_background:
-                    background_to_save[i] = background
-            else:
-                # Add the cleaned data diff to the previously cleaned group,
-                # rather than the noisy input group
-                output_model.data[i, j + 1] = output_model.data[i, j] + cleaned_image
-                if save_background:
-                    background_to_save[i, j + 1] = background
+            continue
+
+        # Store the cleaned image in the output model
+        if ndim == 2:
+            output_model.data = cleaned_image
+            if save_background:
+                background_to_save[:] = background
+        elif ndim == 3:
+            output_model.data[i] = cleaned_image
+            if save_background:
+                background_to_save[i] = background
+        else:
+            # Add the cleaned data diff to the previously cleaned group,
+            # rather than the noisy input group
+            output_model.data[i, j + 1] = output_model.data[i, j] + cleaned_image
+            if save_background:
+                background_to_save[i, j + 1] = background
 
     # Store the background image in a model, if requested
     if save_background:
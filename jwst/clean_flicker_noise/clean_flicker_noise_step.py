@@ -1,5 +1,6 @@
 from stdatamodels.jwst import datamodels
 
+from jwst.lib.pipe_utils import compute_num_cores
 from jwst.stpipe import Step
 from . import clean_flicker_noise
 
@@ -71,6 +72,9 @@ class CleanFlickerNoiseStep(Step):
         Save the computed background image.
     save_noise : bool, optional
         Save the computed noise image.
+    maximum_cores : str, optional
+        Number of threads used to clean integrations and groups in parallel:
+        an integer, or one of 'quarter', 'half' or 'all'.
     """
 
     class_alias = "clean_flicker_noise"
@@ -89,6 +93,7 @@ class CleanFlickerNoiseStep(Step):
         save_mask = boolean(default=False)  # Save the created mask
         save_background = boolean(default=False)  # Save the fit background
         save_noise = boolean(default=False)  # Save the fit noise
+        maximum_cores = string(default='1')  # Number of threads to use: an integer, 'quarter', 'half', or 'all'
         skip = boolean(default=True)  # By default, skip the step
     """  # noqa: E501
 
@@ -140,6 +145,7 @@ class CleanFlickerNoiseStep(Step):
                 save_mask=self.save_mask,
                 save_background=self.save_background,
                 save_noise=self.save_noise,
+                ncores=compute_num_cores(self.maximum_cores),
             )
             output_model, mask_model, background_model, noise_model, status = result
 
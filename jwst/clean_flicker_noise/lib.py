@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import numpy as np
 
 
@@ -93,14 +95,7 @@ class NSClean:
         # each line. Roughly approximate the local density, P, using the reciprocal of
         # convolution by a Gaussian kernel for now. For now, hard code the kernel. We
         # will optimize this later.
-        _weight = np.zeros((self.ny, self.nx), dtype=np.float32)  # Build the kernel here
-        _x = np.arange(self.nx)
-        _mu = self.nx // 2 + 1
-        _sigma = self.weights_kernel_sigma
-        _weight[self.ny // 2 + 1] = (
-            np.exp(-((_x - _mu) ** 2) / _sigma**2 / 2) / _sigma / np.sqrt(2 * np.pi)
-        )
-        _weight_fft = np.fft.rfft2(np.fft.ifftshift(_weight))
+        _weight_fft = _density_kernel_fft(self.ny, self.nx, self.weights_kernel_sigma)
         with np.errstate(divide="ignore"):
             self.p_matrix = 1 / np.fft.irfft2(
                 np.fft.rfft2(np.array(self.mask, dtype=np.float32)) * _weight_fft,
@@ -109,23 +104,8 @@ class NSClean:
         # Illuminated areas carry no weight
         self.p_matrix = np.where(self.mask, self.p_matrix, 0.0)
 
-        # Build a 1-dimensional Gaussian kernel for "buffing". Buffing is in the
-        # dispersion direction only. In detector coordinates, this is axis zero.
-        # Even though the kernel is 1-dimensional, we must still use a 2-dimensional
-        # array to represent it. I tried broadcasting a vector, but that made a kernel
-        # 2048 columns wide (in detector space).
-        _y = np.arange(self.ny)
-        _mu = self.nx // 2 + 1
-        _sigma = self.buffer_sigma  # Standard deviation of kernel
-        _gkern = (
-            np.exp(-(((_y - _mu) / _sigma) ** 2) / 2) / _sigma / np.sqrt(2 * np.pi)
-        )  # Centered kernel as a vector
-        gkern = np.zeros((self.ny, self.nx), dtype=np.float32)  # 2D kernel template
-        gkern[:, _mu] = _gkern  # Copy in the kernel. Normalization is already correct.
-        gkern = np.fft.ifftshift(gkern)  # Shift for Numpy
-
-        # FFT for fast convolution
-        self.fgkern = np.array(np.fft.rfft2(gkern), dtype=np.complex64)
+        # FFT of the 1-dimensional Gaussian kernel for "buffing"
+        self.fgkern = _buffing_kernel_fft(self.ny, self.nx, self.buffer_sigma)
 
     def fit(self, data):
         """
@@ -145,73 +125,65 @@ class NSClean:
 
         Notes
         -----
-        Fitting is done line by line because the matrices get very big if one
-        tries to project out Fourier vectors from the entire 2K x 2K image area.
+        Each line is fit independently, but the fits for all lines are
+        done at once. For a line with samples :math:`d_m` at the unmasked
+        columns :math:`m`, with weights :math:`p_m`, the weighted least squares
+        fit of the lowest ``nvec`` Fourier vectors solves normal equations
+        whose matrix is the Toeplitz matrix of the Fourier transform of
+        :math:`p_m^2` and whose right-hand side is the Fourier transform of
+        :math:`p_m^2 d_m`. Both are computed at the fitted frequencies only,
+        for all lines at once, rather than from an explicit basis matrix and
+        pseudo-inverse per line.
         """
         model = np.zeros((self.ny, self.nx), dtype=np.float32)  # Build the model here
-        for y in np.arange(self.ny)[4:-4]:
-            # Get data and weights for this line
-            d = data[y][self.mask[y]]  # unmasked (usable) data
-            # The line below uses a vector to represent a diagonal weight matrix.
-            # Multiplications by this vector later on may be viewed as
-            # equivalent formulations to multiplication by diag(p).
-            p = self.p_matrix[y][self.mask[y]]  # Weights
-
-            # If none of the pixels in this line is usable (all masked out),
-            # skip and move on to the next line.
-            if len(d) == 0:
-                continue
-
-            # Fill statistical outliers with line median. We know that the rolling
-            # median cleaning technique worked reasonably well, so this is a fast
-            # justifiable approximation.
-            _mu = np.median(d)  # Robust estimate of mean
-            _sigma = 1.4826 * np.median(np.abs(d - _mu))  # Robust estimate of standard deviation
-
-            # Fill outliers
-            d = np.where(
-                np.logical_and(_mu - self.sigrej * _sigma <= d, d <= _mu + self.sigrej * _sigma),
-                d,
-                _mu,
-            )
-
-            # Build the Fourier basis matrix for this line
-            # Must be a column vector to broadcast
-            m = np.arange(self.nx)[self.mask[y]].reshape((-1, 1))
-            # Must be a row vector to broadcast. We can optimize
-            # the code later by putting this into object instantiation
-            # since it is the same for every line. For now, leave it
-            # here since the cost is negligible and it may aid
-            # comprehension.
-            k = np.arange(self.nvec).reshape((1, -1))
-
-            # Build the basis matrix
-            basis = np.array(
-                np.exp(2 * np.pi * 1j * m * k / self.nx) / m.shape[0], dtype=np.complex64
-            )
-
-            # Compute the Moore-Penrose inverse of A = P*B.
-            #     $A^+ = (A^H A)^{-1} A^H$
-            _a = basis * p[:, np.newaxis]
-            _a_h = np.conjugate(_a.transpose())  # Hermitian transpose of A
-            pinv_pb = np.matmul(np.linalg.inv(np.matmul(_a_h, _a)), _a_h)
-
-            # Solve for the Fourier transform of this line's background samples.
-            # The way that we have done it, this multiplies the input data by the
-            # number of samples used for the fit.
-            rfft = np.zeros(self.nx // 2 + 1, dtype=np.complex64)
-            rfft[: k.shape[1]] = np.matmul(pinv_pb, p * d)
-
-            # Numpy requires that the forward transform multiply
-            # the data by n. Correct normalization.
-            rfft *= self.nx / m.shape[0]
-
-            # Apodize if necessary
-            if self.kill_width > 0:
-                rfft[: self.nvec] *= self.apodizer[: self.nvec]
-
-            # Invert the FFT to build the background model for this line
-            model[y] = np.fft.irfft(rfft, self.nx)
+        mask = self.mask[4:-4]
+
+        # Lines with no usable pixels are not fit
+        nsample = mask.sum(axis=1)
+        lines = np.flatnonzero(nsample > 0)
+        if lines.size == 0:
+            return model
+        mask = mask[lines]
+        nsample = nsample[lines]
+        d = np.where(mask, data[4:-4][lines], np.nan)
+
+        # Fill statistical outliers with line median. We know that the rolling
+        # median cleaning technique worked reasonably well, so this is a fast
+        # justifiable approximation.
+        _mu = _line_median(d, nsample)  # Robust estimate of mean
+        _sigma = 1.4826 * _line_median(np.abs(d - _mu), nsample)  # Robust estimate of std
+        d = np.where((_mu - self.sigrej * _sigma <= d) & (d <= _mu + self.sigrej * _sigma), d, _mu)
+        d[~mask] = 0.0
+
+        # Fourier transforms of the squared weights and the weighted data, for
+        # the fitted frequencies only
+        k = np.arange(self.nvec)
+        phase = 2 * np.pi * (np.outer(np.arange(self.nx), k) % self.nx) / self.nx
+        cos, sin = np.cos(phase), np.sin(phase)
+        weight = self.p_matrix[4:-4][lines] ** 2
+        weight_fft = weight @ cos - 1j * (weight @ sin)
+        weight *= d
+        data_fft = weight @ cos - 1j * (weight @ sin)
+
+        # Normal matrix for each line: element (k, l) is the transform of the
+        # squared weights at frequency k - l
+        lag = k[:, np.newaxis] - k[np.newaxis, :]
+        normal = weight_fft[:, np.abs(lag)]
+        normal[:, lag < 0] = np.conjugate(normal[:, lag < 0])
+
+        # Solve for the Fourier transform of each line's background samples,
+        # normalized as Numpy's forward transform
+        rfft = self.nx * np.linalg.solve(normal, data_fft[..., np.newaxis])[..., 0]
+
+        # Apodize if necessary
+        if self.kill_width > 0:
+            rfft *= self.apodizer[: self.nvec]
+
+        # Invert the FFT to build the background model for each line. Only the
+        # fitted frequencies are non-zero, and all but the zero and Nyquist
+        # frequencies stand for a pair of conjugate terms.
+        rfft[:, (k > 0) & (2 * k != self.nx)] *= 2
+        model[4:-4][lines] = (rfft.real @ cos.T - rfft.imag @ sin.T) / self.nx
 
         # Done!
         return model
@@ -275,6 +247,94 @@ class NSClean:
         return data
 
 
+@lru_cache(maxsize=4)
+def _density_kernel_fft(ny, nx, sigma):
+    """
+    Compute the FFT of the kernel used to estimate the local sample density.
+
+    The kernel does not depend on the mask, so it is computed once for
+    all the images of an exposure.
+
+    Parameters
+    ----------
+    ny, nx : int
+        Shape of the image, in detector coordinates.
+    sigma : float
+        Standard deviation of the Gaussian kernel along each line.
+
+    Returns
+    -------
+    ndarray of complex
+        The real FFT of the kernel. The array is read-only.
+    """
+    _weight = np.zeros((ny, nx), dtype=np.float32)  # Build the kernel here
+    _x = np.arange(nx)
+    _mu = nx // 2 + 1
+    _weight[ny // 2 + 1] = np.exp(-((_x - _mu) ** 2) / sigma**2 / 2) / sigma / np.sqrt(2 * np.pi)
+    kernel_fft = np.fft.rfft2(np.fft.ifftshift(_weight))
+    kernel_fft.flags.writeable = False
+    return kernel_fft
+
+
+@lru_cache(maxsize=4)
+def _buffing_kernel_fft(ny, nx, sigma):
+    """
+    Compute the FFT of the kernel used for "buffing" the background model.
+
+    Buffing is in the dispersion direction only. In detector coordinates,
+    this is axis zero. Even though the kernel is 1-dimensional, we must
+    still use a 2-dimensional array to represent it.
+
+    Parameters
+    ----------
+    ny, nx : int
+        Shape of the image, in detector coordinates.
+    sigma : float
+        Standard deviation of the Gaussian kernel.
+
+    Returns
+    -------
+    ndarray of complex64
+        The real FFT of the kernel. The array is read-only.
+    """
+    _y = np.arange(ny)
+    _mu = nx // 2 + 1
+    # Centered kernel as a vector
+    _gkern = np.exp(-(((_y - _mu) / sigma) ** 2) / 2) / sigma / np.sqrt(2 * np.pi)
+    gkern = np.zeros((ny, nx), dtype=np.float32)  # 2D kernel template
+    gkern[:, _mu] = _gkern  # Copy in the kernel. Normalization is already correct.
+    gkern = np.fft.ifftshift(gkern)  # Shift for Numpy
+
+    # FFT for fast convolution
+    kernel_fft = np.array(np.fft.rfft2(gkern), dtype=np.complex64)
+    kernel_fft.flags.writeable = False
+    return kernel_fft
+
+
+def _line_median(d, nsample):
+    """
+    Compute the median of the valid values in each line of an array.
+
+    Parameters
+    ----------
+    d : ndarray
+        2-D array, with NaN for values to ignore.
+    nsample : ndarray of int
+        Number of valid values in each line. Must be at least 1.
+
+    Returns
+    -------
+    ndarray
+        The median of each line, as a column vector.
+    """
+    # NaN values are sorted to the end of each line
+    d = np.sort(d, axis=1)
+    index = np.arange(d.shape[0])
+    lower = d[index, (nsample - 1) // 2]
+    upper = d[index, nsample // 2]
+    return ((lower + upper) / 2).astype(d.dtype)[:, np.newaxis]
+
+
 def make_lowpass_filter(f_half_power, w_cutoff, n, d=1.0):
     """
     Make a lowpass Fourier filter.
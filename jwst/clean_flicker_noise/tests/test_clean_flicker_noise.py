@@ -999,3 +999,37 @@ def test_do_correction_with_flat_subarray(tmp_path, log_watcher):
 
     model.close()
     flat.close()
+
+
+@pytest.mark.parametrize("input_type", ["rateints", "ramp"])
+def test_do_correction_ncores(tmp_path, input_type):
+    shape = (3, 5, 20, 20)
+    if input_type == "ramp":
+        model = make_small_ramp_model(shape)
+    else:
+        model = make_small_rateints_model(shape)
+    rng = np.random.default_rng(0)
+    model.data += rng.normal(0.0, 0.1, model.data.shape).astype(np.float32)
+    model.data[..., 5, :] += 1.0
+
+    mask_model = datamodels.ImageModel(rng.uniform(size=shape[-2:]) > 0.1)
+    user_mask = str(tmp_path / "mask.fits")
+    mask_model.save(user_mask)
+    mask_model.close()
+
+    expected, _, expected_bg, _, _ = cfn.do_correction(
+        model, user_mask=user_mask, save_background=True
+    )
+    cleaned, _, background, _, status = cfn.do_correction(
+        model, user_mask=user_mask, save_background=True, ncores=2
+    )
+
+    # Images are cleaned in threads, but stored in order
+    assert status == "COMPLETE"
+    assert_allclose(cleaned.data, expected.data)
+    assert_allclose(background.data, expected_bg.data)
+    assert not np.allclose(cleaned.data, model.data)
+
+    model.close()
+    expected.close()
+    cleaned.close()
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from jwst.clean_flicker_noise.lib import NSClean
+
+
+def fit_lines(cleaner, data):
+    """Fit each line with an explicit basis matrix and pseudo-inverse."""
+    model = np.zeros(data.shape)
+    for y in range(4, cleaner.ny - 4):
+        use = cleaner.mask[y]
+        if not np.any(use):
+            continue
+        d = data[y][use]
+        p = cleaner.p_matrix[y][use]
+        mu = np.median(d)
+        sigma = 1.4826 * np.median(np.abs(d - mu))
+        d = np.where(np.abs(d - mu) <= cleaner.sigrej * sigma, d, mu)
+
+        m = np.arange(cleaner.nx)[use][:, np.newaxis]
+        k = np.arange(cleaner.nvec)[np.newaxis, :]
+        a = np.exp(2j * np.pi * m * k / cleaner.nx) * p[:, np.newaxis]
+        rfft = np.zeros(cleaner.nx // 2 + 1, dtype=complex)
+        rfft[: cleaner.nvec] = cleaner.nx * (np.linalg.pinv(a) @ (p * d))
+        rfft[: cleaner.nvec] *= cleaner.apodizer[: cleaner.nvec]
+        model[y] = np.fft.irfft(rfft, cleaner.nx)
+    return model
+
+
+@pytest.mark.parametrize("detector", ["NRS1", "NRS2"])
+def test_nsclean_fit(detector):
+    """Fitting all lines at once matches a least squares fit of each line."""
+    rng = np.random.default_rng(0)
+    shape = (96, 128)
+    mask = rng.uniform(size=shape) > 0.3
+    mask[:, 40:50] = False
+    data = rng.normal(size=shape).astype(np.float32)
+    data += np.sin(np.arange(shape[1]) / 5.0).astype(np.float32)
+    data[rng.uniform(size=shape) > 0.99] = 100.0
+
+    cleaner = NSClean(detector, mask, fc=0.05, kill_width=0.02, weights_kernel_sigma=4)
+    assert cleaner.nvec > 1
+
+    data = data.transpose()
+    model = cleaner.fit(data)
+    expected = fit_lines(cleaner, data)
+    np.testing.assert_allclose(model, expected, atol=1e-5)
+
+    # Edge lines and masked-out lines are not fit
+    assert np.all(model[:4] == 0.0)
+    assert np.all(model[-4:] == 0.0)
+    masked_lines = ~np.any(cleaner.mask, axis=1)
+    assert np.sum(masked_lines) == 10
+    assert np.all(model[masked_lines] == 0.0)
+
+
+def test_nsclean_kernels_shared():
+    """Mask-independent kernels are computed once for cleaners of the same shape."""
+    rng = np.random.default_rng(1)
+    mask = rng.uniform(size=(64, 64)) > 0.3
+    cleaner1 = NSClean("NRS1", mask)
+    cleaner2 = NSClean("NRS1", ~mask)
+    assert cleaner1.fgkern is cleaner2.fgkern
+    assert not cleaner1.fgkern.flags.writeable
+    assert not np.allclose(cleaner1.p_matrix, cleaner2.p_matrix)
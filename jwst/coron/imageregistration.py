@@ -10,6 +10,10 @@ import logging
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
+# Number of image slices processed together by the batched Fourier
+# registration, which bounds the memory used by the stacks of FFTs
+BATCH_SIZE = 32
+
 
 def align_fourier_lsq(reference, target, mask=None):
     """
@@ -48,6 +52,156 @@ def align_fourier_lsq(reference, target, mask=None):
     return results
 
 
+def align_fourier_batch(reference, targets, mask=None, max_iter=200):
+    """
+    LSQ optimization with Fourier shift alignment, for a stack of images.
+
+    This fits the same model as :py:func:`align_fourier_lsq` to each image of
+    the stack, starting from the same initial values, but the fits of all
+    images are done together, in batches of `BATCH_SIZE` images: the FFT of the
+    reference is computed once, and the Levenberg-Marquardt iterations use
+    the analytic derivatives of the shifted reference with respect to the
+    shifts, which are evaluated with FFTs for all images at once.
+
+    Parameters
+    ----------
+    reference : numpy.ndarray
+        A 2D (``NxK``) image to be aligned to
+
+    targets : numpy.ndarray
+        A 3D (``MxNxK``) stack of images to align to reference
+
+    mask : numpy.ndarray, None
+        A 2D (``NxK``) image indicating pixels to ignore when
+        performing the minimization. The masks acts as
+        a weighting function in performing the fit.
+
+    max_iter : int, optional
+        Maximum number of iterations.
+
+    Returns
+    -------
+    results : numpy.ndarray
+        A 2D (``Mx3``) array containing (`xshift`, `yshift`, `beta`) values
+        for each image, as returned by :py:func:`align_fourier_lsq`.
+    """
+    nslices = targets.shape[0]
+    results = np.empty((nslices, 3), dtype=np.float64)
+
+    ref_fft = np.fft.fft2(np.asarray(reference, dtype=np.float64))
+    weight = np.ones(reference.shape) if mask is None else np.asarray(mask, dtype=np.float64)
+    for start in range(0, nslices, BATCH_SIZE):
+        batch = slice(start, start + BATCH_SIZE)
+        results[batch] = _fit_shifts(ref_fft, targets[batch] * weight, weight, max_iter)
+
+    return results
+
+
+def _fit_shifts(ref_fft, weighted_targets, weight, max_iter):
+    """
+    Fit shifts and intensity scales of a reference to a batch of images.
+
+    Parameters
+    ----------
+    ref_fft : numpy.ndarray
+        The 2D FFT of the reference image.
+
+    weighted_targets : numpy.ndarray
+        The 3D stack of images to align, multiplied by `weight`.
+
+    weight : numpy.ndarray
+        The 2D weight of each pixel in the fit.
+
+    max_iter : int
+        Maximum number of iterations.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (`xshift`, `yshift`, `beta`) values for each image.
+    """
+    nslices = weighted_targets.shape[0]
+    freq_y = np.fft.fftfreq(ref_fft.shape[0])[:, np.newaxis]
+    freq_x = np.fft.fftfreq(ref_fft.shape[1])[np.newaxis, :]
+
+    def shifted_reference(params, derivatives=False):
+        shifted = ref_fft * _shift_phase(freq_x, freq_y, params[:, 0], params[:, 1])
+        model = np.fft.ifft2(shifted).real * weight
+        if not derivatives:
+            return model
+        d_x = np.fft.ifft2(shifted * (-2j * np.pi * freq_x)).real * weight
+        d_y = np.fft.ifft2(shifted * (-2j * np.pi * freq_y)).real * weight
+        return model, d_x, d_y
+
+    def cost(params, model):
+        residual = weighted_targets[active] - params[:, 2, np.newaxis, np.newaxis] * model
+        return np.sum(residual**2, axis=(1, 2)), residual
+
+    params = np.zeros((nslices, 3))
+    params[:, 2] = 1.0
+    damping = np.full(nslices, 1e-3)
+    active = np.ones(nslices, dtype=bool)
+
+    for _ in range(max_iter):
+        if not np.any(active):
+            break
+        p = params[active]
+        model, d_x, d_y = shifted_reference(p, derivatives=True)
+        current_cost, residual = cost(p, model)
+
+        # Jacobian of the residual with respect to xshift, yshift and beta
+        beta = p[:, 2, np.newaxis, np.newaxis]
+        jacobian = np.stack([-beta * d_x, -beta * d_y, -model], axis=1)
+        jacobian = jacobian.reshape(jacobian.shape[0], 3, -1)
+        normal = jacobian @ jacobian.transpose(0, 2, 1)
+        gradient = jacobian @ residual.reshape(residual.shape[0], -1, 1)
+
+        # Levenberg-Marquardt step
+        lam = damping[active]
+        diagonal = np.maximum(np.diagonal(normal, axis1=1, axis2=2), np.finfo(float).tiny)
+        damped = normal + (lam[:, np.newaxis] * diagonal)[..., np.newaxis] * np.eye(3)
+        step = -np.linalg.solve(damped, gradient)[..., 0]
+        trial = p + step
+        trial_cost, _ = cost(trial, shifted_reference(trial))
+
+        # Stop when the cost or the parameters no longer change significantly
+        accepted = trial_cost <= current_cost
+        converged = accepted & (current_cost - trial_cost <= 1e-12 * current_cost)
+        converged |= np.all(np.abs(step) <= 1e-12 * (np.abs(p) + 1e-12), axis=1)
+        converged |= lam > 1e15
+
+        p[accepted] = trial[accepted]
+        lam = np.where(accepted, lam / 10.0, lam * 10.0)
+        index = np.flatnonzero(active)
+        params[index] = p
+        damping[index] = lam
+        active[index[converged]] = False
+
+    return params
+
+
+def _shift_phase(freq_x, freq_y, xshift, yshift):
+    """
+    Compute the Fourier phase factors of shifts, as used by `scipy.ndimage.fourier_shift`.
+
+    Parameters
+    ----------
+    freq_x, freq_y : numpy.ndarray
+        Sample frequencies along the X and Y axes, broadcastable to an image.
+
+    xshift, yshift : numpy.ndarray
+        1D arrays of shifts in the X and Y directions.
+
+    Returns
+    -------
+    numpy.ndarray
+        3D stack of phase factors, one image for each shift.
+    """
+    xshift = np.asarray(xshift, dtype=np.float64)[:, np.newaxis, np.newaxis]
+    yshift = np.asarray(yshift, dtype=np.float64)[:, np.newaxis, np.newaxis]
+    return np.exp(-2j * np.pi * freq_x * xshift) * np.exp(-2j * np.pi * freq_y * yshift)
+
+
 def shift_subtract(params, reference, target, mask=None):
     """
     Use Fourier Shift theorem for subpixel shifts.
@@ -117,9 +271,15 @@ def fourier_imshift(image, shift):
                 "to the number of slices in the input image."
             )
 
+        # Shift the slices in batches, with the same phase factors as
+        # scipy.ndimage.fourier_shift
+        freq_y = np.fft.fftfreq(image.shape[1])[:, np.newaxis]
+        freq_x = np.fft.fftfreq(image.shape[2])[np.newaxis, :]
         offset = np.empty_like(image, dtype=float)
-        for k in range(nslices):
-            offset[k] = fourier_imshift(image[k], shift[k])
+        for start in range(0, nslices, BATCH_SIZE):
+            batch = slice(start, start + BATCH_SIZE)
+            phase = _shift_phase(freq_x, freq_y, shift[batch, 0], shift[batch, 1])
+            offset[batch] = np.fft.ifft2(np.fft.fft2(image[batch]) * phase).real
 
     else:
         raise ValueError("Input image must be either a 2D or a 3D array.")
@@ -161,21 +321,14 @@ def align_array(reference, target, mask=None, return_aligned=True):
         for details) for each slice in the `target` array.
     """
     if len(target.shape) == 2:
-        shifts = align_fourier_lsq(reference, target, mask=mask)
+        shifts = align_fourier_batch(reference, target[np.newaxis], mask=mask)[0]
         if return_aligned:
             aligned = fourier_imshift(target, -shifts)
 
     elif len(target.shape) == 3:
-        nslices = target.shape[0]
-        shifts = np.empty((nslices, 3), dtype=np.float64)
+        shifts = align_fourier_batch(reference, target, mask=mask)
         if return_aligned:
-            aligned = np.empty_like(target)
-
-        for m in range(nslices):
-            sh = align_fourier_lsq(reference, target[m], mask=mask)
-            shifts[m, :] = sh
-            if return_aligned:
-                aligned[m, :, :] = fourier_imshift(target[m], -sh)
+            aligned = fourier_imshift(target, -shifts).astype(target.dtype, copy=False)
 
     else:
         raise ValueError("Input target image must be either a 2D or 3D array.")
@@ -31,60 +31,78 @@ def klip(target_model, refs_model, truncate):
     output_psf : CubeModel
         CubeModel of PSF fitted to target image
     """
-    # Initialize the output models as copies of the input target model
-    output_target = target_model.copy()
-    output_psf = target_model.copy()
-
-    # Loop over the target integrations
-    for i in range(target_model.data.shape[0]):
-        # Load the target data array and flatten it from 2-D to 1-D
-        target = target_model.data[i].astype(np.float64)
-        tshape = target.shape
-        target = target.reshape(-1)
-
-        # Load the reference psf arrays and flatten them from 3-D to 2-D
-        refs = refs_model.data.astype(np.float64)
-        rshape = refs.shape
-        nrefs = rshape[0]
-        refs = refs.reshape(nrefs, rshape[1] * rshape[2])
-
-        # Make each ref image have zero mean
-        for k in range(nrefs):
-            refs[k] -= np.mean(refs[k], dtype=np.float64)
-
-        # Compute Karhunen-Loeve transform of ref images and normalize vectors
-        klvect, eigval, eigvect = karhunen_loeve_transform(refs, normalize=True)
-
-        # Truncate the Karhunen-Loeve vectors
-        klvect = klvect[:truncate]
-
-        # Compute the PSF fit to the target image
-        psfimg = np.dot(klvect.T, np.dot(target, klvect.T))
-
-        # Subtract the PSF fit from the target image
-        outimg = target - target.mean()
-        outimg -= psfimg
-
-        # Unflatten the PSF and subtracted target images from 1-D to 2-D
-        # and copy them to the output models
-        psfimg = psfimg.reshape(tshape)
-        output_psf.data[i] = psfimg
-        outimg = outimg.reshape(tshape)
-        output_target.data[i] = outimg
-
-        # Compute the ERR for the fitted target image:
-        # the ERR is taken as the std-dev of the KLIP results for all of the
-        # PSF reference images.
-        #
-        # First, apply the PSF fit to each PSF reference image
-        refs_fit = refs * 0.0
-        for k in range(nrefs):
-            refs_fit[k] = refs[k] - np.dot(klvect.T, np.dot(refs[k], klvect.T))
-
-        # Now take the standard deviation of the results
-        output_target.err[i] = np.std(refs_fit, 0).reshape(tshape)
-
-    return output_target, output_psf
+    return klip_truncations(target_model, refs_model, [truncate])[0]
+
+
+def klip_truncations(target_model, refs_model, truncations):
+    """
+    Apply KLIP algorithm to science data, for several truncations at once.
+
+    The Karhunen-Loeve basis of the reference images is computed once, and
+    all target integrations are projected on it with a single matrix
+    product. The PSF fits for increasing truncations are accumulated from
+    the same projection, one group of KL modes after the other.
+
+    Parameters
+    ----------
+    target_model : CubeModel
+        The input images of the target (NINTS x NROWS x NCOLS).
+    refs_model : CubeModel
+        The input 3D stack of aligned reference images (NINTS_PSF x NROWS x NCOLS).
+    truncations : list of int
+        Numbers of rows to keep in the Karhunen-Loeve transform.
+
+    Returns
+    -------
+    list of tuple
+        For each truncation, in the order given, the science target CubeModel
+        with PSF subtracted and the CubeModel of PSF fitted to the target image.
+    """
+    # Flatten the target integrations from 3-D to 2-D
+    target = target_model.data.astype(np.float64)
+    tshape = target.shape
+    target = target.reshape(tshape[0], -1)
+
+    # Load the reference psf arrays, flatten them from 3-D to 2-D,
+    # and make each ref image have zero mean
+    refs = refs_model.data.astype(np.float64)
+    refs = refs.reshape(refs.shape[0], -1)
+    refs -= np.mean(refs, axis=1, dtype=np.float64, keepdims=True)
+
+    # Compute Karhunen-Loeve transform of ref images and normalize vectors,
+    # keeping as many vectors as the largest truncation
+    klvect, _, _ = karhunen_loeve_transform(refs, normalize=True)
+    klvect = klvect[: max(truncations)]
+    nmodes = len(klvect)
+
+    # Project the target and reference images on the KL vectors
+    target_coeffs = target @ klvect.T
+    refs_coeffs = refs @ klvect.T
+
+    # The fitted PSF and the fit to the reference images are built up
+    # mode by mode, in order of increasing truncation
+    psfimg = np.zeros_like(target)
+    refs_fit = refs.copy()
+    target_mean = target.mean(axis=1, keepdims=True)
+    results = {}
+    used = 0
+    for truncate in sorted(set(truncations)):
+        keep = min(truncate, nmodes)
+        psfimg += target_coeffs[:, used:keep] @ klvect[used:keep]
+        refs_fit -= refs_coeffs[:, used:keep] @ klvect[used:keep]
+        used = keep
+
+        # Copy the PSF fit and the PSF subtracted target image to the
+        # output models. The ERR for the fitted target image is taken as
+        # the std-dev of the KLIP results for all of the PSF reference images.
+        output_target = target_model.copy()
+        output_psf = target_model.copy()
+        output_psf.data[:] = psfimg.reshape(tshape)
+        output_target.data[:] = (target - target_mean - psfimg).reshape(tshape)
+        output_target.err[:] = np.std(refs_fit, 0).reshape(tshape[1:])
+        results[truncate] = (output_target, output_psf)
+
+    return [results[truncate] for truncate in truncations]
 
 
 def karhunen_loeve_transform(m, normalize=False):
@@ -118,7 +136,6 @@ def karhunen_loeve_transform(m, normalize=False):
     klvect = np.dot(eigvect.T, m)
 
     if normalize:
-        for k in range(len(klvect)):
-            klvect[k] /= np.linalg.norm(klvect[k])
+        klvect /= np.linalg.norm(klvect, axis=1, keepdims=True)
 
     return klvect, eigval, eigvect
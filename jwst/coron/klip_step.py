@@ -21,6 +21,7 @@ class KlipStep(Step):
 
     spec = """
         truncate = integer(default=50,min=0) # The number of KL transform rows to keep
+        truncate_sweep = int_list(default=None) # Additional non-negative numbers of KL transform rows, for which results are saved
     """  # noqa: E501
 
     def process(self, target, psfrefs):
@@ -39,6 +40,11 @@ class KlipStep(Step):
         psf_sub : CubeModel
             Science target CubeModel with the PSF subtracted
         """
+        if self.truncate_sweep and min(self.truncate_sweep) < 0:
+            raise ValueError(
+                f"truncate_sweep values must be non-negative, got {self.truncate_sweep}"
+            )
+
         with datamodels.open(target) as target_model:
             # Retrieve the parameter values
             truncate = self.truncate
@@ -47,11 +53,21 @@ class KlipStep(Step):
             # Get the PSF reference images
             refs_model = datamodels.open(psfrefs)
 
-            # Call the KLIP routine
-            psf_sub, psf_fit = klip.klip(target_model, refs_model, truncate)
+            # Call the KLIP routine, for all truncations at once
+            truncations = [truncate]
+            if self.truncate_sweep:
+                self.log.info(f"Additional KL transform truncations = {self.truncate_sweep}")
+                truncations += [t for t in self.truncate_sweep if t != truncate]
+            results = klip.klip_truncations(target_model, refs_model, truncations)
+            psf_sub, psf_fit = results[0]
 
         # Update the step completion status
         psf_sub.meta.cal_step.klip = "COMPLETE"
 
+        # Save the results of the additional truncations
+        for sweep_truncate, (sweep_sub, _) in zip(truncations[1:], results[1:], strict=True):
+            sweep_sub.meta.cal_step.klip = "COMPLETE"
+            self.save_model(sweep_sub, suffix=f"psfsub-kl{sweep_truncate}", force=True)
+
         # return psf_sub, psf_fit
         return psf_sub
@@ -1,10 +1,12 @@
 import numpy as np
 import numpy.testing as npt
+import pytest
 
 from stdatamodels.jwst import datamodels
 
 from jwst.coron import imageregistration
 from jwst.coron import klip
+from jwst.coron.klip_step import KlipStep
 
 
 def test_fourier_imshift():
@@ -141,6 +143,51 @@ def test_align_array():
     npt.assert_allclose(shifts, truth_shifts, atol=1e-4, rtol=1e-5)
 
 
+def make_psf_stack(nslices, shape=(24, 26)):
+    rng = np.random.default_rng(5)
+    y, x = np.mgrid[: shape[0], : shape[1]]
+
+    def psf(xcen, ycen):
+        return np.exp(-((x - xcen) ** 2 + (y - ycen) ** 2) / 8.0)
+
+    reference = psf(12.0, 11.0)
+    targets = np.array(
+        [
+            rng.uniform(0.9, 1.1) * psf(12.0 + dx, 11.0 + dy)
+            for dx, dy in rng.uniform(-0.8, 0.8, (nslices, 2))
+        ]
+    )
+    targets += rng.normal(0.0, 1e-3, targets.shape)
+    return reference, targets
+
+
+def test_align_fourier_batch(monkeypatch):
+    """Fits of all slices together match fits of each slice."""
+    monkeypatch.setattr(imageregistration, "BATCH_SIZE", 4)
+    reference, targets = make_psf_stack(7)
+    mask = np.ones(reference.shape)
+    mask[10:13, 10:14] = 0
+
+    shifts = imageregistration.align_fourier_batch(reference, targets, mask)
+    assert shifts.shape == (7, 3)
+    for target, result in zip(targets, shifts, strict=True):
+        expected = imageregistration.align_fourier_lsq(reference, target, mask)
+        npt.assert_allclose(result, expected, atol=1e-7)
+
+
+def test_fourier_imshift_stack(monkeypatch):
+    """Slices of a stack are shifted as each image is."""
+    monkeypatch.setattr(imageregistration, "BATCH_SIZE", 2)
+    _, image = make_psf_stack(5)
+    shifts = np.random.default_rng(6).uniform(-2.0, 2.0, (5, 3))
+
+    result = imageregistration.fourier_imshift(image, shifts)
+    for k in range(5):
+        npt.assert_allclose(
+            result[k], imageregistration.fourier_imshift(image[k], shifts[k]), atol=1e-12
+        )
+
+
 def test_align_models():
     """Test of align_models() in imageregistration.py."""
     temp = np.arange((15), dtype=np.float32).reshape((3, 5))
@@ -344,3 +391,64 @@ def test_klip():
 
     # psf_fit is currently not used in the code, co not compared here
     npt.assert_allclose(psf_sub.data, truth_psf_sub_data, atol=1e-6)
+
+
+def make_klip_models(nints=4, nrefs=6, shape=(8, 10)):
+    rng = np.random.default_rng(0)
+    psf = np.exp(-((np.arange(shape[0])[:, None] - 4) ** 2 + (np.arange(shape[1]) - 5) ** 2) / 8.0)
+    refs = psf * rng.uniform(0.9, 1.1, (nrefs, 1, 1)) + rng.normal(0, 0.01, (nrefs,) + shape)
+    target = psf * 1.05 + rng.normal(0, 0.01, (nints,) + shape)
+    target_model = datamodels.CubeModel(data=target.astype(np.float32))
+    target_model.meta.filename = "target_calints.fits"
+    refs_model = datamodels.CubeModel(data=refs.astype(np.float32))
+    return target_model, refs_model
+
+
+def test_klip_truncations():
+    """A truncation sweep matches KLIP applied separately to each integration."""
+    target_model, refs_model = make_klip_models()
+    truncations = [4, 0, 2, 10]
+    results = klip.klip_truncations(target_model, refs_model, truncations)
+    assert len(results) == len(truncations)
+
+    refs = refs_model.data.astype(np.float64).reshape(6, -1)
+    refs -= refs.mean(axis=1, keepdims=True)
+    klvect, _, _ = klip.karhunen_loeve_transform(refs, normalize=True)
+    for truncate, (psf_sub, psf_fit) in zip(truncations, results, strict=True):
+        kl = klvect[:truncate]
+        refs_fit = refs - (refs @ kl.T) @ kl
+        for i in range(target_model.shape[0]):
+            target = target_model.data[i].astype(np.float64).ravel()
+            psf = kl.T @ (kl @ target)
+            npt.assert_allclose(psf_fit.data[i].ravel(), psf, atol=1e-6)
+            npt.assert_allclose(psf_sub.data[i].ravel(), target - target.mean() - psf, atol=1e-6)
+            npt.assert_allclose(psf_sub.err[i].ravel(), refs_fit.std(axis=0), atol=1e-6)
+
+        sub, fit = klip.klip(target_model, refs_model, truncate)
+        npt.assert_allclose(sub.data, psf_sub.data)
+        npt.assert_allclose(fit.data, psf_fit.data)
+
+
+def test_klip_step_truncate_sweep(tmp_path):
+    """Results for additional truncations are saved by the step."""
+    target_model, refs_model = make_klip_models()
+    step = KlipStep(truncate=3, truncate_sweep=[1, 3, 5], output_dir=str(tmp_path))
+    result = step.run(target_model, refs_model)
+    expected, _ = klip.klip(target_model, refs_model, 3)
+    npt.assert_allclose(result.data, expected.data)
+    assert result.meta.cal_step.klip == "COMPLETE"
+
+    saved = sorted(path.name for path in tmp_path.iterdir())
+    assert saved == ["target_psfsub-kl1.fits", "target_psfsub-kl5.fits"]
+    with datamodels.open(tmp_path / "target_psfsub-kl5.fits") as model:
+        expected, _ = klip.klip(target_model, refs_model, 5)
+        npt.assert_allclose(model.data, expected.data)
+
+
+def test_klip_step_negative_truncate_sweep(tmp_path):
+    """Negative truncations are rejected before any processing."""
+    target_model, refs_model = make_klip_models()
+    step = KlipStep(truncate_sweep=[1, -2], output_dir=str(tmp_path))
+    with pytest.raises(ValueError, match="truncate_sweep values must be non-negative"):
+        step.run(target_model, refs_model)
+    assert not list(tmp_path.iterdir())
@@ -4,6 +4,7 @@ from jwst.lib.pipe_utils import match_nans_and_flags
 from . import cube_build
 from . import ifu_cube
 from . import data_types
+from .point_cloud_cache import POINT_CLOUD_CACHE
 import asdf
 from jwst.assign_wcs.util import update_s_region_keyword
 from jwst.stpipe import Step, record_step_status
@@ -62,6 +63,9 @@ class CubeBuildStep(Step):
          suffix = string(default='s3d')
          offset_file = string(default=None) # Filename containing a list of Ra and Dec offsets to apply to files.
          debug_spaxel = string(default='-1 -1 -1') # Default not used
+         maximum_cores = string(default='1') # cores for building cubes in wavelength slabs. Can be an integer, 'half', 'quarter', or 'all'
+         point_cloud_cache_size = float(default=0.0) # memory (GB) for reusing detector pixels mapped to sky between cubes; 0 disables
+         point_cloud_cache_dir = string(default=None) # directory to spill cached detector pixels mapped to sky evicted from memory
        """  # noqa: E501
 
     reference_file_types = ["cubepar"]
@@ -249,6 +253,12 @@ class CubeBuildStep(Step):
             if offsets is not None:
                 self.offsets = offsets
         # ________________________________________________________________________________
+        # Set up reuse of the detector pixels mapped to sky between cubes built
+        # from the same files, in this and later runs of the step.
+        POINT_CLOUD_CACHE.configure(
+            self.point_cloud_cache_size * 1024**3, self.point_cloud_cache_dir
+        )
+        # ________________________________________________________________________________
         # Read in Cube Parameter Reference file
         # identify what reference file has been associated with these input
 
@@ -294,6 +304,7 @@ class CubeBuildStep(Step):
             "skip_dqflagging": self.skip_dqflagging,
             "suffix": self.suffix,
             "debug_spaxel": self.debug_spaxel,
+            "maximum_cores": self.maximum_cores,
         }
 
         # ________________________________________________________________________________
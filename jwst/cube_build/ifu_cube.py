@@ -1,6 +1,8 @@
 """Work horse routines used for building ifu spectra cubes."""
 
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 import numpy as np
 import logging
@@ -20,9 +22,12 @@ from jwst.assign_wcs import pointing
 from jwst.datamodels import ModelContainer
 from jwst.assign_wcs import nirspec
 from jwst.assign_wcs.util import wrap_ra
+from jwst.lib.pipe_utils import compute_num_cores
+from jwst.lib.wcs_utils import wcs_fingerprint
 from . import cube_build_wcs_util
 from . import cube_internal_cal
 from . import coord
+from .point_cloud_cache import POINT_CLOUD_CACHE
 from jwst.mrs_imatch.mrs_imatch_step import apply_background_2d
 from .cube_match_sky_pointcloud import cube_wrapper  # c extension
 from .cube_match_sky_driz import cube_wrapper_driz  # c extension
@@ -30,6 +35,10 @@ from .cube_match_sky_driz import cube_wrapper_driz  # c extension
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
+# Number of wavelength slabs per core when building a cube in parallel,
+# to balance the load when detector pixels are unevenly spread in wavelength
+SLABS_PER_CORE = 4
+
 
 class IFUCubeData:
     """Combine IFU data onto a regular grid."""
@@ -126,6 +135,7 @@ class IFUCubeData:
         self.weighting = pars_cube.get("weighting")
         self.weight_power = pars_cube.get("weight_power")
         self.skip_dqflagging = pars_cube.get("skip_dqflagging")
+        self.maximum_cores = pars_cube.get("maximum_cores", "1")
         self.suffix = pars_cube.get("suffix")
         self.num_bands = 0
         self.output_name = ""
@@ -752,101 +762,47 @@ class IFUCubeData:
 
                     if self.interpolation == "pointcloud" and build_cube:
                         roiw_ave = np.mean(roiw_pixel)
-                        result = cube_wrapper(
-                            instrument,
-                            flag_dq_plane,
-                            weight_type,
-                            start_region,
-                            end_region,
-                            self.overlap_partial,
-                            self.overlap_full,
-                            self.xcoord,
-                            self.ycoord,
-                            self.zcoord,
-                            coord1,
-                            coord2,
-                            wave,
-                            flux,
-                            err,
-                            slice_no,
-                            rois_pixel,
-                            roiw_pixel,
-                            scalerad_pixel,
-                            weight_pixel,
-                            softrad_pixel,
-                            self.cdelt3_normal,
+                        match_slab = partial(
+                            self.match_pointcloud_slab,
+                            (instrument, flag_dq_plane, weight_type, start_region, end_region),
+                            (
+                                coord1,
+                                coord2,
+                                wave,
+                                flux,
+                                err,
+                                slice_no,
+                                rois_pixel,
+                                roiw_pixel,
+                                scalerad_pixel,
+                                weight_pixel,
+                                softrad_pixel,
+                            ),
                             roiw_ave,
-                            self.cdelt1,
-                            self.cdelt2,
                         )
+                        margin = max(np.max(roiw_pixel), roiw_ave)
+                        self.map_wavelength_slabs(match_slab, wave, margin)
 
-                        spaxel_flux, spaxel_weight, spaxel_var, spaxel_iflux, spaxel_dq = result
-                        self.spaxel_flux = self.spaxel_flux + np.asarray(spaxel_flux, np.float64)
-                        self.spaxel_weight = self.spaxel_weight + np.asarray(
-                            spaxel_weight, np.float64
-                        )
-                        self.spaxel_var = self.spaxel_var + np.asarray(spaxel_var, np.float64)
-                        self.spaxel_iflux = self.spaxel_iflux + np.asarray(spaxel_iflux, np.float64)
-                        spaxel_dq.astype(np.uint)
-                        self.spaxel_dq = np.bitwise_or(self.spaxel_dq, spaxel_dq)
-                        result = None
-                        del result
-                        del spaxel_flux, spaxel_weight, spaxel_var, spaxel_iflux, spaxel_dq
                     if self.weighting == "drizzle" and build_cube:
                         cdelt3_mean = np.nanmean(self.cdelt3_normal)
-                        xi1, eta1, xi2, eta2, xi3, eta3, xi4, eta4 = corner_coord
                         linear = 0
                         if self.linear_wavelength:
                             linear = 1
                         if debug_cube_index >= 0:
                             log.info(f"Input filename: {input_model.meta.filename}")
-                        result = cube_wrapper_driz(
-                            instrument,
-                            flag_dq_plane,
-                            start_region,
-                            end_region,
-                            self.overlap_partial,
-                            self.overlap_full,
-                            self.xcoord,
-                            self.ycoord,
-                            self.zcoord,
-                            coord1,
-                            coord2,
-                            wave,
-                            flux,
-                            err,
-                            slice_no,
-                            xi1,
-                            eta1,
-                            xi2,
-                            eta2,
-                            xi3,
-                            eta3,
-                            xi4,
-                            eta4,
-                            dwave,
-                            self.cdelt3_normal,
-                            self.cdelt1,
-                            self.cdelt2,
+                        match_slab = partial(
+                            self.match_drizzle_slab,
+                            (instrument, flag_dq_plane, start_region, end_region),
+                            (coord1, coord2, wave, flux, err, slice_no, *corner_coord, dwave),
+                            (x_det, y_det),
                             cdelt3_mean,
                             linear,
-                            x_det,
-                            y_det,
                             debug_cube_index,
                         )
-
-                        spaxel_flux, spaxel_weight, spaxel_var, spaxel_iflux, spaxel_dq = result
-                        self.spaxel_flux = self.spaxel_flux + np.asarray(spaxel_flux, np.float64)
-                        self.spaxel_weight = self.spaxel_weight + np.asarray(
-                            spaxel_weight, np.float64
+                        margin = max(
+                            np.max(np.abs(dwave)) + np.max(self.cdelt3_normal), cdelt3_mean
                         )
-                        self.spaxel_var = self.spaxel_var + np.asarray(spaxel_var, np.float64)
-                        self.spaxel_iflux = self.spaxel_iflux + np.asarray(spaxel_iflux, np.float64)
-                        spaxel_dq.astype(np.uint)
-                        self.spaxel_dq = np.bitwise_or(self.spaxel_dq, spaxel_dq)
-                        result = None
-                        del result
-                        del spaxel_flux, spaxel_weight, spaxel_var, spaxel_iflux, spaxel_dq
+                        self.map_wavelength_slabs(match_slab, wave, margin)
 
                 #  AREA - 2d method only works for single files local slicer plane (internal_cal)
                 elif self.interpolation == "area":
@@ -953,6 +909,196 @@ class IFUCubeData:
         result = self.setup_final_ifucube_model(input_model_ref)
         return result
 
+    # ________________________________________________________________________________
+    def map_wavelength_slabs(self, match_slab, wave, margin):
+        """
+        Map detector pixels onto the IFU cube, in wavelength slabs run in parallel.
+
+        The cube is divided into slabs of contiguous wavelength planes. Each slab
+        is matched to the detector pixels whose wavelengths fall within ``margin``
+        of its planes, and the resulting spaxel values are added to the
+        corresponding planes of the cube. As each wavelength plane only depends on
+        the pixels near its own wavelength, the result does not depend on the
+        number of slabs. The C extensions release the GIL, so the slabs are
+        matched on a pool of threads.
+
+        Parameters
+        ----------
+        match_slab : callable
+            Function taking an index array of detector pixels (or a slice) and a
+            slice of wavelength planes, and returning the spaxel flux, weight,
+            variance, iflux and dq arrays for the planes in the slice.
+        wave : ndarray
+            Wavelength of each detector pixel.
+        margin : float
+            Maximum distance in wavelength between a detector pixel and a
+            wavelength plane it contributes to.
+        """
+        nxyplane = self.naxis1 * self.naxis2
+        ncores = compute_num_cores(self.maximum_cores, max_jobs=self.naxis3)
+        if ncores > 1:
+            nslabs = min(self.naxis3, SLABS_PER_CORE * ncores)
+        else:
+            nslabs = 1
+        bounds = np.linspace(0, self.naxis3, nslabs + 1).astype(int)
+
+        def match(iz):
+            planes = slice(bounds[iz], bounds[iz + 1])
+            if nslabs == 1:
+                pixels = slice(None)
+            else:
+                zslab = self.zcoord[planes]
+                pixels = np.flatnonzero(
+                    (wave >= zslab.min() - margin) & (wave <= zslab.max() + margin)
+                )
+                if pixels.size == 0:
+                    return planes, None
+            return planes, match_slab(pixels, planes)
+
+        if nslabs == 1:
+            results = [match(0)]
+        else:
+            log.debug(f"Mapping {nslabs} wavelength slabs on {ncores} threads")
+            with ThreadPoolExecutor(max_workers=ncores) as executor:
+                results = list(executor.map(match, range(nslabs)))
+
+        for planes, result in results:
+            if result is None:
+                continue
+            spaxel_flux, spaxel_weight, spaxel_var, spaxel_iflux, spaxel_dq = result
+            cube = slice(planes.start * nxyplane, planes.stop * nxyplane)
+            self.spaxel_flux[cube] += np.asarray(spaxel_flux, np.float64)
+            self.spaxel_weight[cube] += np.asarray(spaxel_weight, np.float64)
+            self.spaxel_var[cube] += np.asarray(spaxel_var, np.float64)
+            self.spaxel_iflux[cube] += np.asarray(spaxel_iflux, np.float64)
+            self.spaxel_dq[cube] |= spaxel_dq.astype(np.uint32)
+
+    # ________________________________________________________________________________
+    def match_pointcloud_slab(self, options, pixel_data, roiw_ave, pixels, planes):
+        """
+        Match detector pixels to a slab of the IFU cube using the point cloud method.
+
+        Parameters
+        ----------
+        options : tuple
+            Instrument, DQ flagging, weighting type and slice range flags
+            passed to ``cube_wrapper``.
+        pixel_data : tuple of ndarray
+            Per-pixel coordinates, wavelengths, fluxes, errors, slice numbers
+            and region of interest and weighting parameters.
+        roiw_ave : float
+            Average spectral region of interest, used to set the DQ plane.
+        pixels : ndarray or slice
+            Detector pixels to match.
+        planes : slice
+            Wavelength planes of the cube to match.
+
+        Returns
+        -------
+        tuple of ndarray
+            The spaxel flux, weight, variance, iflux and dq for the planes.
+        """
+        instrument, flag_dq_plane, weight_type, start_region, end_region = options
+        return cube_wrapper(
+            instrument,
+            flag_dq_plane,
+            weight_type,
+            start_region,
+            end_region,
+            self.overlap_partial,
+            self.overlap_full,
+            self.xcoord,
+            self.ycoord,
+            self.zcoord[planes],
+            *(values[pixels] for values in pixel_data),
+            self.cdelt3_normal[planes],
+            roiw_ave,
+            self.cdelt1,
+            self.cdelt2,
+        )
+
+    # ________________________________________________________________________________
+    def match_drizzle_slab(
+        self,
+        options,
+        pixel_data,
+        detector_xy,
+        cdelt3_mean,
+        linear,
+        debug_cube_index,
+        pixels,
+        planes,
+    ):
+        """
+        Match detector pixels to a slab of the IFU cube using the drizzle method.
+
+        Parameters
+        ----------
+        options : tuple
+            Instrument, DQ flagging and slice range flags passed to
+            ``cube_wrapper_driz``.
+        pixel_data : tuple of ndarray
+            Per-pixel coordinates, wavelengths, fluxes, errors, slice numbers,
+            pixel corner coordinates and wavelength extents.
+        detector_xy : tuple of ndarray
+            Detector x and y of each pixel, used for debugging.
+        cdelt3_mean : float
+            Average wavelength plane spacing of the cube.
+        linear : int
+            1 if the cube has a linear wavelength grid, 0 otherwise.
+        debug_cube_index : int
+            Index in the full cube of a spaxel to report on, or -1.
+        pixels : ndarray or slice
+            Detector pixels to match.
+        planes : slice
+            Wavelength planes of the cube to match.
+
+        Returns
+        -------
+        tuple of ndarray
+            The spaxel flux, weight, variance, iflux and dq for the planes.
+        """
+        instrument, flag_dq_plane, start_region, end_region = options
+        coord1, coord2, wave, flux, err, slice_no, *corners, dwave = (
+            values[pixels] for values in pixel_data
+        )
+        x_det, y_det = (None if values is None else values[pixels] for values in detector_xy)
+
+        # Index of the debug spaxel within this slab
+        nxyplane = self.naxis1 * self.naxis2
+        if debug_cube_index >= 0:
+            debug_cube_index = debug_cube_index - planes.start * nxyplane
+            if not 0 <= debug_cube_index < (planes.stop - planes.start) * nxyplane:
+                debug_cube_index = -1
+
+        return cube_wrapper_driz(
+            instrument,
+            flag_dq_plane,
+            start_region,
+            end_region,
+            self.overlap_partial,
+            self.overlap_full,
+            self.xcoord,
+            self.ycoord,
+            self.zcoord[planes],
+            coord1,
+            coord2,
+            wave,
+            flux,
+            err,
+            slice_no,
+            *corners,
+            dwave,
+            self.cdelt3_normal[planes],
+            self.cdelt1,
+            self.cdelt2,
+            cdelt3_mean,
+            linear,
+            x_det,
+            y_det,
+            debug_cube_index,
+        )
+
     # ________________________________________________________________________________
     def build_ifucube_single(self):
         """
@@ -1988,11 +2134,6 @@ class IFUCubeData:
             dwave: delta wavelength covered by pixel
             corner_coord: the corners of the pixel mapped to ra,dec
         """
-        wave = None
-        slice_no = None  # Slice number
-        dwave = None
-        corner_coord = None
-
         raoffset = 0.0
         decoffset = 0.0
         # pull out ra dec offset if it exists
@@ -2020,6 +2161,38 @@ class IFUCubeData:
                 if poly_ch == this_par1:
                     apply_background_2d(input_model, poly_ch, subtract=True)
 
+        key = self.point_cloud_key(input_model, this_par1)
+        sky_result = POINT_CLOUD_CACHE.get(key)
+        if sky_result is None:
+            sky_result = POINT_CLOUD_CACHE.put(key, self.miri_wcs_to_sky(input_model, this_par1))
+
+        if offsets is not None:
+            sky_result = self.offset_point_cloud(sky_result, raoffset, decoffset)
+        return sky_result
+
+    # ______________________________________________________________________
+    def miri_wcs_to_sky(self, input_model, this_par1):
+        """
+        Evaluate the WCS of a MIRI model for the detector pixels of a channel.
+
+        Parameters
+        ----------
+        input_model : IFUImageModel
+           Input IFU image model to combine
+        this_par1 : str
+           The channel number, used to select the detector pixels.
+
+        Returns
+        -------
+        sky_result : tuple
+            The detector pixels mapped to sky, as returned by
+            `map_miri_pixel_to_sky`, with no offsets applied.
+        """
+        wave = None
+        slice_no = None  # Slice number
+        dwave = None
+        corner_coord = None
+
         # find the slice number of each pixel and fill in slice_det
         ysize, xsize = input_model.data.shape
         slice_det = np.zeros((ysize, xsize), dtype=int)
@@ -2046,10 +2219,6 @@ class IFUCubeData:
             warnings.filterwarnings("ignore", "invalid value", RuntimeWarning)
             ra, dec, wave = input_model.meta.wcs(x, y)
 
-        # offset the central pixel
-        if offsets is not None:
-            ra, dec = self.offset_coord(ra, dec, raoffset, decoffset)
-
         valid1 = ~np.isnan(ra)
         ra = ra[valid1]
         dec = dec[valid1]
@@ -2109,13 +2278,6 @@ class IFUCubeData:
                 wave,
             )
 
-            # now offset the pixel corners
-            if offsets is not None:
-                ra1, dec1 = self.offset_coord(ra1, dec1, raoffset, decoffset)
-                ra2, dec2 = self.offset_coord(ra2, dec2, raoffset, decoffset)
-                ra3, dec3 = self.offset_coord(ra3, dec3, raoffset, decoffset)
-                ra4, dec4 = self.offset_coord(ra4, dec4, raoffset, decoffset)
-
             corner_coord = [ra1, dec1, ra2, dec2, ra3, dec3, ra4, dec4]
 
         sky_result = (x, y, ra, dec, wave, slice_no, dwave, corner_coord)
@@ -2160,6 +2322,31 @@ class IFUCubeData:
                 input_model.meta.filename,
             )
 
+        key = self.point_cloud_key(input_model)
+        sky_result = POINT_CLOUD_CACHE.get(key)
+        if sky_result is None:
+            sky_result = POINT_CLOUD_CACHE.put(key, self.nirspec_wcs_to_sky(input_model))
+
+        if offsets is not None:
+            sky_result = self.offset_point_cloud(sky_result, raoffset, decoffset)
+        return sky_result
+
+    # ______________________________________________________________________
+    def nirspec_wcs_to_sky(self, input_model):
+        """
+        Evaluate the WCS of each slice of a NIRSpec model for its detector pixels.
+
+        Parameters
+        ----------
+        input_model : IFUImageModel
+            Input IFU image model to combine
+
+        Returns
+        -------
+        sky_result : tuple
+            The detector pixels mapped to sky, as returned by
+            `map_nirspec_pixel_to_sky`, with no offsets applied.
+        """
         # initialize the ra,dec, and wavelength arrays
         # we will loop over slice_nos and fill in values
         # the flag_det will be set when a slice_no pixel is filled in
@@ -2319,20 +2506,77 @@ class IFUCubeData:
         dec3 = dec3_det[valid_data]
         dec4 = dec4_det[valid_data]
 
-        if offsets is not None:
-            # central pixel
-            ra, dec = self.offset_coord(ra, dec, raoffset, decoffset)
-
-            # pixel corners
-            ra1, dec1 = self.offset_coord(ra1, dec1, raoffset, decoffset)
-            ra2, dec2 = self.offset_coord(ra2, dec2, raoffset, decoffset)
-            ra3, dec3 = self.offset_coord(ra3, dec3, raoffset, decoffset)
-            ra4, dec4 = self.offset_coord(ra4, dec4, raoffset, decoffset)
-
         corner_coord = [ra1, dec1, ra2, dec2, ra3, dec3, ra4, dec4]
         sky_result = (x, y, ra, dec, wave, slice_no, dwave, corner_coord)
         return sky_result
 
+    # ______________________________________________________________________
+    def point_cloud_key(self, input_model, this_par1=None):
+        """
+        Define the key identifying the detector pixels of a model mapped to sky.
+
+        Parameters
+        ----------
+        input_model : IFUImageModel
+            Input IFU image model to combine
+        this_par1 : str or None, optional
+            For MIRI, the channel number selecting the detector pixels.
+
+        Returns
+        -------
+        key : tuple or None
+            The file name, WCS parameters, fingerprint of the WCS transforms,
+            reference files and mapping options, or None if the model has no
+            file name to identify it or the cache is disabled.
+        """
+        filename = input_model.meta.filename
+        if filename is None or not POINT_CLOUD_CACHE.enabled:
+            return None
+        wcsinfo = repr(sorted(input_model.meta.wcsinfo.instance.items()))
+        ref_files = repr(sorted(input_model.meta.ref_file.instance.items()))
+        drizzle = self.interpolation == "drizzle"
+        return (
+            filename,
+            wcsinfo,
+            wcs_fingerprint(input_model.meta.wcs),
+            ref_files,
+            self.instrument,
+            this_par1,
+            drizzle,
+        )
+
+    # ______________________________________________________________________
+    def offset_point_cloud(self, sky_result, raoffset, decoffset):
+        """
+        Apply an RA and Dec offset to detector pixels mapped to sky.
+
+        Parameters
+        ----------
+        sky_result : tuple
+            The detector pixels mapped to sky, as returned by
+            `map_miri_pixel_to_sky` or `map_nirspec_pixel_to_sky`.
+        raoffset : astropy.units.Quantity
+            RA offset to apply.
+        decoffset : astropy.units.Quantity
+            Dec offset to apply.
+
+        Returns
+        -------
+        sky_result : tuple
+            The detector pixels mapped to sky with the offset applied to
+            the pixel centers and corners.
+        """
+        x, y, ra, dec, wave, slice_no, dwave, corner_coord = sky_result
+        ra, dec = self.offset_coord(ra, dec, raoffset, decoffset)
+        if corner_coord is not None:
+            corners = []
+            for i in range(0, len(corner_coord), 2):
+                corners.extend(
+                    self.offset_coord(corner_coord[i], corner_coord[i + 1], raoffset, decoffset)
+                )
+            corner_coord = corners
+        return (x, y, ra, dec, wave, slice_no, dwave, corner_coord)
+
     # ________________________________________________________________________________
     def find_closest_wave(
         self,
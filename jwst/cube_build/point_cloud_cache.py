@@ -0,0 +1,251 @@
+"""Cache of detector pixels mapped to the sky, shared between IFU cubes."""
+
+from collections import OrderedDict
+import logging
+from pathlib import Path
+import tempfile
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+__all__ = ["PointCloudCache", "POINT_CLOUD_CACHE"]
+
+# Names of the arrays in a mapped point cloud, in the order of the
+# tuple returned by map_miri_pixel_to_sky and map_nirspec_pixel_to_sky
+_NAMES = ["x", "y", "ra", "dec", "wave", "slice_no", "dwave"]
+_NCORNERS = 8
+
+
+class PointCloudCache:
+    """
+    Least-recently-used cache of detector pixels mapped to the sky.
+
+    Building an IFU cube maps every detector pixel of each input file to
+    (ra, dec, wavelength) through the full WCS, which dominates the run time of
+    cube_build for many configurations. The mapping only depends on the file,
+    its WCS and the pixels selected, so it can be reused by every cube built
+    from the same file.
+
+    Point clouds are kept in memory up to ``max_memory`` bytes. When the limit is
+    reached, the least recently used point clouds are evicted; if ``spill_dir``
+    is set, they are written to disk and read back as read-only memory-mapped
+    arrays when next requested. All cached arrays are read-only.
+    """
+
+    def __init__(self, max_memory=0, spill_dir=None):
+        """
+        Initialize an empty cache.
+
+        Parameters
+        ----------
+        max_memory : float, optional
+            Maximum memory, in bytes, used by point clouds held in memory.
+            If 0, the cache is disabled.
+        spill_dir : str or None, optional
+            Directory in which a temporary directory is created to hold point
+            clouds evicted from memory. If None, evicted point clouds are dropped.
+        """
+        self._memory = OrderedDict()
+        self._disk = OrderedDict()
+        self._nbytes = 0
+        self._tempdir = None
+        self._nspilled = 0
+        self.max_memory = 0
+        self.spill_dir = None
+        self.configure(max_memory, spill_dir)
+
+    @property
+    def enabled(self):  # numpydoc ignore=RT01
+        """Whether point clouds are cached."""
+        return self.max_memory > 0
+
+    @property
+    def nbytes(self):  # numpydoc ignore=RT01
+        """Memory used by point clouds held in memory, in bytes."""
+        return self._nbytes
+
+    def __len__(self):
+        return len(self._memory) + len(self._disk)
+
+    def __contains__(self, key):
+        return key in self._memory or key in self._disk
+
+    def configure(self, max_memory, spill_dir=None):
+        """
+        Set the memory limit and spill directory of the cache.
+
+        Cached point clouds are kept if the cache remains enabled, so that
+        successive runs of cube_build reuse them. Point clouds are evicted
+        as needed to meet a lower memory limit.
+
+        Parameters
+        ----------
+        max_memory : float
+            Maximum memory, in bytes, used by point clouds held in memory.
+            If 0, the cache is disabled and cleared.
+        spill_dir : str or None, optional
+            Directory in which to spill point clouds evicted from memory.
+        """
+        if max_memory <= 0:
+            self.max_memory = 0
+            self.clear()
+            return
+
+        if spill_dir != self.spill_dir:
+            self._clear_disk()
+            self.spill_dir = spill_dir
+        self.max_memory = max_memory
+        self._evict()
+
+    def clear(self):
+        """Remove all point clouds from memory and disk."""
+        self._memory.clear()
+        self._nbytes = 0
+        self._clear_disk()
+
+    def get(self, key):
+        """
+        Return a cached point cloud.
+
+        Parameters
+        ----------
+        key : tuple
+            Key identifying the point cloud.
+
+        Returns
+        -------
+        sky_result : tuple or None
+            The point cloud as ``(x, y, ra, dec, wave, slice_no, dwave, corner_coord)``,
+            or None if it is not cached.
+        """
+        if not self.enabled or key is None:
+            return None
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            arrays = self._memory[key]
+        elif key in self._disk:
+            self._disk.move_to_end(key)
+            arrays = {
+                name: np.load(filename, mmap_mode="r") for name, filename in self._disk[key].items()
+            }
+        else:
+            return None
+        log.debug(f"Using cached point cloud for {key[0]}")
+        return _unpack(arrays)
+
+    def put(self, key, sky_result):
+        """
+        Add a point cloud to the cache.
+
+        The arrays of the point cloud are owned by the cache once added and are
+        made read-only, unless they are views, in which case they are copied.
+
+        Parameters
+        ----------
+        key : tuple
+            Key identifying the point cloud.
+        sky_result : tuple
+            The point cloud as ``(x, y, ra, dec, wave, slice_no, dwave, corner_coord)``.
+
+        Returns
+        -------
+        sky_result : tuple
+            The point cloud with read-only arrays, as returned by `get`.
+        """
+        if not self.enabled or key is None:
+            return sky_result
+        arrays = _pack(sky_result)
+        nbytes = sum(array.nbytes for array in arrays.values())
+        self._memory[key] = arrays
+        self._nbytes += nbytes
+        self._evict()
+        return _unpack(arrays)
+
+    def _evict(self):
+        """Evict least recently used point clouds until within the memory limit."""
+        while self._nbytes > self.max_memory and self._memory:
+            key, arrays = self._memory.popitem(last=False)
+            self._nbytes -= sum(array.nbytes for array in arrays.values())
+            if self.spill_dir is not None:
+                self._spill(key, arrays)
+
+    def _spill(self, key, arrays):
+        """Write a point cloud to disk."""
+        if self._tempdir is None:
+            Path(self.spill_dir).mkdir(parents=True, exist_ok=True)
+            self._tempdir = tempfile.TemporaryDirectory(
+                dir=self.spill_dir, prefix="jwst_point_cloud_"
+            )
+        prefix = Path(self._tempdir.name) / f"cloud{self._nspilled}"
+        self._nspilled += 1
+        filenames = {}
+        for name, array in arrays.items():
+            filenames[name] = f"{prefix}_{name}.npy"
+            np.save(filenames[name], array)
+        self._disk[key] = filenames
+        log.debug(f"Spilled cached point cloud for {key[0]} to {prefix}")
+
+    def _clear_disk(self):
+        """Remove point clouds spilled to disk."""
+        self._disk.clear()
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+            self._tempdir = None
+
+
+def _pack(sky_result):
+    """
+    Convert a point cloud to a dictionary of read-only arrays.
+
+    Parameters
+    ----------
+    sky_result : tuple
+        The point cloud, as returned by ``miri_wcs_to_sky`` or
+        ``nirspec_wcs_to_sky``.
+
+    Returns
+    -------
+    dict
+        The arrays of the point cloud, by name.
+    """
+    *values, corner_coord = sky_result
+    arrays = {name: value for name, value in zip(_NAMES, values, strict=True) if value is not None}
+    if corner_coord is not None:
+        arrays.update({f"corner{i}": corner for i, corner in enumerate(corner_coord)})
+    for name, value in arrays.items():
+        array = np.asarray(value)
+        if array.base is not None:
+            # Do not hold on to a larger array this is a view of
+            array = array.copy()
+        array.setflags(write=False)
+        arrays[name] = array
+    return arrays
+
+
+def _unpack(arrays):
+    """
+    Convert a dictionary of arrays to a point cloud.
+
+    Parameters
+    ----------
+    arrays : dict
+        The arrays of the point cloud, by name, as returned by `_pack`.
+
+    Returns
+    -------
+    tuple
+        The point cloud, as returned by ``miri_wcs_to_sky`` or
+        ``nirspec_wcs_to_sky``.
+    """
+    values = [arrays.get(name) for name in _NAMES]
+    if "corner0" in arrays:
+        corner_coord = [arrays[f"corner{i}"] for i in range(_NCORNERS)]
+    else:
+        corner_coord = None
+    return (*values, corner_coord)
+
+
+# Cache shared by all cube_build runs in this process, configured by CubeBuildStep
+POINT_CLOUD_CACHE = PointCloudCache()
@@ -16,6 +16,8 @@
 
 // routines used from cube_utils.c
 
+extern void set_memory_error(const char *msg);
+
 extern double sh_find_overlap(const double xcenter, const double ycenter, 
 			      const double xlength, const double ylength,
 			      double xPixelCorner[], double yPixelCorner[]);
@@ -41,7 +43,7 @@ int mem_alloc_dq(int nelem, int **idqv) {
     const char *msg = "Couldn't allocate memory for output arrays.";
 
     if (!(*idqv = (int*)calloc(nelem, sizeof(int)))) {
-      PyErr_SetString(PyExc_MemoryError, msg);
+      set_memory_error(msg);
       return 1;
     }
 
@@ -215,10 +215,13 @@ int match_driz(double *xc, double *yc, double *zc,
   // pixel falls on
   zreg =0;
   max_cdelt3 = cdelt3[0];
-  max_dwave = dwave[0];
   for (iw =1; iw < nwave;  iw++){
     if(cdelt3[iw] > max_cdelt3) { max_cdelt3 = cdelt3[iw];}
-    if(dwave[iw] > max_dwave){ max_dwave = dwave[iw];}
+  }
+  // dwave is per detector pixel, so search it over npt rather than nwave
+  max_dwave = dwave[0];
+  for (k =1; k < npt;  k++){
+    if(dwave[k] > max_dwave){ max_dwave = dwave[k];}
   }
 
   // printf("debug_spaxel  %i  \n ", debug_cube_index);
@@ -507,6 +510,10 @@ static PyObject *cube_wrapper_driz(PyObject *module, PyObject *args) {
   
   int status1 = 0;
 
+  // The matching routines only use the raw array data, so release the GIL
+  // to allow cubes to be built on several threads at once.
+  Py_BEGIN_ALLOW_THREADS
+
   if(flag_dq_plane){
     if (instrument == 0){
       status1 = dq_miri(start_region, end_region,overlap_partial, overlap_full,
@@ -565,6 +572,8 @@ static PyObject *cube_wrapper_driz(PyObject *module, PyObject *args) {
 			nxx, nyy, nwave, ncube, npt,linear, debug_cube_index,
 			&spaxel_flux, &spaxel_weight, &spaxel_var, &spaxel_iflux);
 
+  Py_END_ALLOW_THREADS
+
 
   if (status || status1) {
     goto fail;
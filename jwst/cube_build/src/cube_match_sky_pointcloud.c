@@ -576,6 +576,10 @@ static PyObject *cube_wrapper(PyObject *module, PyObject *args) {
   // if flag_dq_plane = 1, Set up the dq plane
   //______________________________________________________________________
   int status1 = 0;
+
+  // The matching routines only use the raw array data, so release the GIL
+  // to allow cubes to be built on several threads at once.
+  Py_BEGIN_ALLOW_THREADS
   if(flag_dq_plane){
     if (instrument == 0){
       status1 = dq_miri(start_region, end_region,overlap_partial, overlap_full,
@@ -646,6 +650,8 @@ static PyObject *cube_wrapper(PyObject *module, PyObject *args) {
 			     &spaxel_flux, &spaxel_weight, &spaxel_var, &spaxel_iflux);
   }
 
+  Py_END_ALLOW_THREADS
+
 
   if (status || status1) {
     goto fail;
@@ -18,6 +18,22 @@ a spaxel.  We are only dealing with the spatial dimensions in this routine.
 #define CP_TOP 3
 
 
+void set_memory_error(const char *msg) {
+
+  /*
+    Raise a MemoryError. Safe to call whether or not the calling thread
+    holds the GIL, so that the matching routines may run with it released.
+
+   msg : char
+      Error message
+  */
+
+  PyGILState_STATE gstate = PyGILState_Ensure();
+  PyErr_SetString(PyExc_MemoryError, msg);
+  PyGILState_Release(gstate);
+}
+
+
 int alloc_flux_arrays(int nelem, double **fluxv, double **weightv, double **varv,  double **ifluxv) {
 
   /*
@@ -39,25 +55,25 @@ int alloc_flux_arrays(int nelem, double **fluxv, double **weightv, double **varv
 
     // flux:
     if (!(*fluxv  = (double*)calloc(nelem, sizeof(double)))) {
-        PyErr_SetString(PyExc_MemoryError, msg);
+        set_memory_error(msg);
         goto failed_mem_alloc1;
     }
 
     //weight
     if (!(*weightv  = (double*)calloc(nelem, sizeof(double)))) {
-      PyErr_SetString(PyExc_MemoryError, msg);
+      set_memory_error(msg);
       goto failed_mem_alloc2;
     }
 
     //variance
     if (!(*varv  = (double*)calloc(nelem, sizeof(double)))) {
-      PyErr_SetString(PyExc_MemoryError, msg);
+      set_memory_error(msg);
       goto failed_mem_alloc3;
     }
 
     //iflux
     if (!(*ifluxv  = (double*)calloc(nelem, sizeof(double)))) {
-      PyErr_SetString(PyExc_MemoryError, msg);
+      set_memory_error(msg);
       goto failed_mem_alloc4;
     }
 
@@ -0,0 +1,164 @@
+"""
+Unit test for the cache of detector pixels mapped to the sky
+"""
+
+import numpy as np
+import pytest
+from astropy.modeling.models import Shift
+from gwcs import coordinate_frames as cf
+from gwcs import wcs
+from stdatamodels.jwst import datamodels
+
+from jwst.cube_build import ifu_cube
+from jwst.cube_build.point_cloud_cache import PointCloudCache
+
+
+def _make_point_cloud(npt, seed=0, corners=True):
+    """Make a point cloud as returned by map_nirspec_pixel_to_sky."""
+    rng = np.random.default_rng(seed)
+    x = np.arange(npt, dtype=float)
+    y = np.zeros(npt)
+    ra = rng.uniform(10.0, 10.001, npt)
+    dec = rng.uniform(0.0, 0.001, npt)
+    wave = rng.uniform(5.0, 5.2, npt)
+    slice_no = rng.integers(0, 30, npt)
+    dwave = np.full(npt, 0.001)
+    corner_coord = [rng.uniform(size=npt) for _ in range(8)] if corners else None
+    return x, y, ra, dec, wave, slice_no, dwave, corner_coord
+
+
+def _assert_point_cloud_equal(result, expected):
+    *values, corner_coord = result
+    *expected_values, expected_corners = expected
+    for value, expected_value in zip(values, expected_values, strict=True):
+        if expected_value is None:
+            assert value is None
+        else:
+            np.testing.assert_array_equal(value, expected_value)
+    if expected_corners is None:
+        assert corner_coord is None
+    else:
+        assert len(corner_coord) == len(expected_corners)
+        for corner, expected_corner in zip(corner_coord, expected_corners, strict=True):
+            np.testing.assert_array_equal(corner, expected_corner)
+
+
+@pytest.mark.parametrize("corners", [True, False])
+def test_roundtrip(corners):
+    cache = PointCloudCache(max_memory=1e6)
+    sky_result = _make_point_cloud(100, corners=corners)
+    if not corners:
+        # MIRI point clouds without drizzle have no slice numbers or corners
+        sky_result = (*sky_result[:5], None, None, None)
+
+    key = ("file.fits", "wcsinfo", "MIRI", "1", False)
+    assert cache.get(key) is None
+    stored = cache.put(key, sky_result)
+    _assert_point_cloud_equal(stored, sky_result)
+    _assert_point_cloud_equal(cache.get(key), sky_result)
+    assert key in cache
+    assert len(cache) == 1
+
+
+def test_read_only():
+    cache = PointCloudCache(max_memory=1e6)
+    sky_result = _make_point_cloud(100)
+    key = ("file.fits",)
+    stored = cache.put(key, sky_result)
+
+    # The cache takes ownership of the arrays without copying them
+    assert stored[2] is sky_result[2]
+    cached = cache.get(key)
+    with pytest.raises(ValueError, match="read-only"):
+        sky_result[2][0] = 0.0
+    with pytest.raises(ValueError, match="read-only"):
+        cached[2][0] = 0.0
+    with pytest.raises(ValueError, match="read-only"):
+        cached[7][0][0] = 0.0
+
+
+def test_disabled():
+    cache = PointCloudCache()
+    assert not cache.enabled
+    sky_result = _make_point_cloud(10)
+    assert cache.put(("file.fits",), sky_result) is sky_result
+    assert cache.get(("file.fits",)) is None
+    assert len(cache) == 0
+
+    # Models without a file name are not cached
+    cache.configure(1e6)
+    cache.put(None, sky_result)
+    assert cache.get(None) is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    nbytes = sum(a.nbytes for a in _make_point_cloud(100)[:7]) + 8 * 100 * 8
+    cache = PointCloudCache(max_memory=2.5 * nbytes)
+    for i in range(3):
+        cache.put((i,), _make_point_cloud(100, seed=i))
+    assert cache.nbytes == 2 * nbytes
+    assert (0,) not in cache
+
+    # Using 1 makes 2 the least recently used
+    cache.get((1,))
+    cache.put((3,), _make_point_cloud(100, seed=3))
+    assert (1,) in cache
+    assert (2,) not in cache
+    assert cache.nbytes <= cache.max_memory
+
+    # Reducing the limit evicts more
+    cache.configure(1.5 * nbytes)
+    assert len(cache) == 1
+    assert (3,) in cache
+
+
+def test_spill_to_disk(tmp_path):
+    nbytes = sum(a.nbytes for a in _make_point_cloud(100)[:7]) + 8 * 100 * 8
+    cache = PointCloudCache(max_memory=1.5 * nbytes, spill_dir=tmp_path)
+    clouds = [_make_point_cloud(100, seed=i) for i in range(3)]
+    for i, cloud in enumerate(clouds):
+        cache.put((i,), cloud)
+    assert len(cache) == 3
+    assert cache.nbytes == nbytes
+    assert len(list(tmp_path.glob("jwst_point_cloud_*/*.npy"))) == 2 * 15
+
+    for i, cloud in enumerate(clouds):
+        result = cache.get((i,))
+        _assert_point_cloud_equal(result, cloud)
+        if i < 2:
+            assert isinstance(result[2], np.memmap)
+            assert not result[2].flags.writeable
+
+    # Disabling the cache removes the spilled files
+    cache.configure(0)
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+    assert not list(tmp_path.glob("jwst_point_cloud_*"))
+
+
+def test_point_cloud_key(monkeypatch):
+    cube = ifu_cube.IFUCubeData(
+        2, None, "TEMP", "multi", "MIRI", ["1"], ["short"], None, None, debug_spaxel="0 0 0"
+    )
+    model = datamodels.IFUImageModel((10, 10))
+    model.meta.filename = "test_cal.fits"
+    model.meta.ref_file.distortion.name = "distortion_0001.asdf"
+    det = cf.Frame2D(name="detector", axes_order=(0, 1))
+    world = cf.Frame2D(name="world", axes_order=(0, 1))
+    model.meta.wcs = wcs.WCS([(det, Shift(1) & Shift(2)), (world, None)])
+
+    # No key while the cache is disabled
+    assert cube.point_cloud_key(model) is None
+    monkeypatch.setattr(ifu_cube, "POINT_CLOUD_CACHE", PointCloudCache(max_memory=1e6))
+    key = cube.point_cloud_key(model, "1")
+    assert cube.point_cloud_key(model.copy(), "1") == key
+    assert cube.point_cloud_key(model, "2") != key
+
+    # Pixels are mapped again with another WCS transform or reference file
+    other = model.copy()
+    other.meta.wcs.forward_transform[0].offset = 1.5
+    assert cube.point_cloud_key(other, "1") != key
+    other = model.copy()
+    other.meta.ref_file.distortion.name = "distortion_0002.asdf"
+    assert cube.point_cloud_key(other, "1") != key
@@ -0,0 +1,168 @@
+"""
+Unit test for building an IFU cube in parallel wavelength slabs
+"""
+
+from functools import partial
+
+import numpy as np
+import pytest
+
+from jwst.cube_build import ifu_cube
+from jwst.lib import pipe_utils
+
+
+def _make_cube(maximum_cores):
+    """Set up a NIRSpec IFU cube with a linear wavelength grid."""
+    pars_cube = {
+        "scalexy": 0.0,
+        "scalew": 0.0,
+        "interpolation": "drizzle",
+        "weighting": "drizzle",
+        "weight_power": 2,
+        "coord_system": "skyalign",
+        "rois": 0.0,
+        "roiw": 0.0,
+        "wavemin": None,
+        "wavemax": None,
+        "skip_dqflagging": False,
+        "debug_spaxel": "-1 -1 -1",
+        "maximum_cores": maximum_cores,
+    }
+    cube = ifu_cube.IFUCubeData(
+        3, None, None, "band", "NIRSPEC", ["g395h"], ["f290lp"], None, None, **pars_cube
+    )
+    cube.rot_angle = 0.0
+    cube.cdelt1 = 0.1
+    cube.cdelt2 = 0.1
+    cube.cdelt3 = 0.001
+    cube.linear_wavelength = True
+    cube.set_geometry(
+        np.array([10.0, 10.0005, 10.0005, 10.0]),
+        np.array([0.0, 0.0, 0.0005, 0.0005]),
+        5.0,
+        5.2,
+    )
+
+    total_num = cube.naxis1 * cube.naxis2 * cube.naxis3
+    cube.spaxel_flux = np.zeros(total_num, dtype=np.float64)
+    cube.spaxel_weight = np.zeros(total_num, dtype=np.float64)
+    cube.spaxel_var = np.zeros(total_num, dtype=np.float64)
+    cube.spaxel_iflux = np.zeros(total_num, dtype=np.float64)
+    cube.spaxel_dq = np.zeros(total_num, dtype=np.uint32)
+    return cube
+
+
+@pytest.fixture(scope="module")
+def point_cloud():
+    """Make detector pixels mapped to the cube coordinates."""
+    rng = np.random.default_rng(12)
+    npt = 5000
+    coord1 = rng.uniform(-0.8, 0.8, npt)
+    coord2 = rng.uniform(-0.8, 0.8, npt)
+    wave = rng.uniform(5.0, 5.2, npt)
+    flux = rng.uniform(1.0, 10.0, npt)
+    err = 0.1 * flux
+    slice_no = np.floor((coord2 + 0.8) / 0.1)
+    dwave = np.full(npt, 0.0012)
+    half = 0.05
+    corners = (
+        coord1 - half,
+        coord2 - half,
+        coord1 + half,
+        coord2 - half,
+        coord1 + half,
+        coord2 + half,
+        coord1 - half,
+        coord2 + half,
+    )
+    return coord1, coord2, wave, flux, err, slice_no, corners, dwave
+
+
+@pytest.mark.parametrize("weighting", ["emsm", "msm", "drizzle"])
+def test_wavelength_slabs(monkeypatch, point_cloud, weighting):
+    """Test the cube is the same built in wavelength slabs or all at once"""
+    monkeypatch.setattr(pipe_utils.os, "cpu_count", lambda: 4)
+    coord1, coord2, wave, flux, err, slice_no, corners, dwave = point_cloud
+    npt = wave.size
+
+    cubes = []
+    for maximum_cores in ["1", "all"]:
+        cube = _make_cube(maximum_cores)
+        if weighting == "drizzle":
+            cdelt3_mean = np.nanmean(cube.cdelt3_normal)
+            match_slab = partial(
+                cube.match_drizzle_slab,
+                (1, 1, 0, 0),
+                (coord1, coord2, wave, flux, err, slice_no, *corners, dwave),
+                (np.arange(npt, dtype=float), np.zeros(npt)),
+                cdelt3_mean,
+                1,
+                -1,
+            )
+            margin = max(np.max(dwave) + np.max(cube.cdelt3_normal), cdelt3_mean)
+        else:
+            roiw_pixel = np.full(npt, 0.002)
+            roiw_ave = np.mean(roiw_pixel)
+            match_slab = partial(
+                cube.match_pointcloud_slab,
+                (1, 1, int(weighting == "msm"), 0, 0),
+                (
+                    coord1,
+                    coord2,
+                    wave,
+                    flux,
+                    err,
+                    slice_no,
+                    np.full(npt, 0.15),
+                    roiw_pixel,
+                    np.full(npt, 0.05),
+                    np.full(npt, 2.0),
+                    np.full(npt, 0.01),
+                ),
+                roiw_ave,
+            )
+            margin = max(np.max(roiw_pixel), roiw_ave)
+        cube.map_wavelength_slabs(match_slab, wave, margin)
+        cubes.append(cube)
+
+    serial, parallel = cubes
+    assert np.count_nonzero(serial.spaxel_weight) > 0
+    assert np.count_nonzero(serial.spaxel_dq) > 0
+    for name in ["spaxel_flux", "spaxel_weight", "spaxel_var", "spaxel_iflux", "spaxel_dq"]:
+        np.testing.assert_array_equal(getattr(parallel, name), getattr(serial, name))
+
+
+def test_drizzle_slab_fewer_pixels_than_planes(monkeypatch, point_cloud):
+    """Test drizzling slabs holding fewer detector pixels than wavelength planes"""
+    monkeypatch.setattr(pipe_utils.os, "cpu_count", lambda: 4)
+    # Keep a handful of pixels, so each slab selects fewer pixels than it has planes
+    keep = slice(0, 3)
+    coord1, coord2, wave, flux, err, slice_no, corners, dwave = (
+        values[keep] if isinstance(values, np.ndarray) else tuple(c[keep] for c in values)
+        for values in point_cloud
+    )
+    npt = wave.size
+
+    cubes = []
+    for maximum_cores in ["1", "all"]:
+        cube = _make_cube(maximum_cores)
+        cdelt3_mean = np.nanmean(cube.cdelt3_normal)
+        match_slab = partial(
+            cube.match_drizzle_slab,
+            (1, 1, 0, 0),
+            (coord1, coord2, wave, flux, err, slice_no, *corners, dwave),
+            (np.arange(npt, dtype=float), np.zeros(npt)),
+            cdelt3_mean,
+            1,
+            -1,
+        )
+        margin = max(np.max(dwave) + np.max(cube.cdelt3_normal), cdelt3_mean)
+        cube.map_wavelength_slabs(match_slab, wave, margin)
+        cubes.append(cube)
+
+    serial, parallel = cubes
+    nslabs = ifu_cube.SLABS_PER_CORE * 4
+    assert npt < serial.naxis3 // nslabs
+    assert np.count_nonzero(serial.spaxel_weight) > 0
+    for name in ["spaxel_flux", "spaxel_weight", "spaxel_var", "spaxel_iflux", "spaxel_dq"]:
+        np.testing.assert_array_equal(getattr(parallel, name), getattr(serial, name))
@@ -42,8 +42,8 @@ class DarkCurrentStep(Step):
                 input_model.meta.cal_step.dark = "SKIPPED"
                 return input_model
 
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             # Create name for the intermediate dark, if desired.
             dark_output = self.dark_output
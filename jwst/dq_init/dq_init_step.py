@@ -72,8 +72,8 @@ class DQInitStep(Step):
             input_model.meta.cal_step.dq_init = "SKIPPED"
             return input_model
 
-        # Work on a copy
-        result = input_model.copy()
+        # Work on a copy, unless running in place
+        result = self.copy_input(input_model)
 
         # Load the reference file
         mask_model = datamodels.MaskModel(self.mask_filename)
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 import datetime
 import logging
 import warnings
@@ -36,6 +37,7 @@ def apply_emicorr(
     onthefly_corr_freq=None,
     use_n_cycles=3,
     fit_ints_separately=False,
+    ncores=1,
 ):
     """
     Apply an EMI correction to MIRI ramps.
@@ -102,6 +104,8 @@ def apply_emicorr(
         when `algorithm` is 'sequential'.
     fit_ints_separately : bool, optional
         If True, fit each integration separately, when `algorithm` is 'joint'.
+    ncores : int, optional
+        Number of threads used to process integrations in parallel.
 
     Returns
     -------
@@ -191,6 +195,7 @@ def apply_emicorr(
             rowclocks,
             frameclocks,
             fit_ints_separately=fit_ints_separately,
+            ncores=ncores,
         )
     else:
         output_model = _run_sequential_algorithm(
@@ -206,6 +211,7 @@ def apply_emicorr(
             nbins=nbins,
             scale_reference=scale_reference,
             use_n_cycles=use_n_cycles,
+            ncores=ncores,
         )
 
     return output_model
@@ -219,6 +225,7 @@ def _run_joint_algorithm(
     rowclocks,
     frameclocks,
     fit_ints_separately=False,
+    ncores=1,
 ):
     """
     Remove EMI noise with a joint fit to ramps and EMI signal.
@@ -242,6 +249,8 @@ def _run_joint_algorithm(
         Fit the integrations separately? If True, fit amplitude and phase
         for refwave independently for each integration.  If False, fit
         for a single amplitude and phase across all integrations.
+    ncores : int, optional
+        Number of threads used to process integrations in parallel.
 
     Returns
     -------
@@ -268,6 +277,7 @@ def _run_joint_algorithm(
             _frameclocks,
             period_in_pixels,
             fit_ints_separately=fit_ints_separately,
+            ncores=ncores,
         )
 
         # Data is updated in place, so it is corrected iteratively
@@ -290,6 +300,7 @@ def _run_sequential_algorithm(
     nbins=None,
     scale_reference=True,
     use_n_cycles=3,
+    ncores=1,
 ):
     """
     Remove EMI noise with a sequential fit to ramps and EMI signal.
@@ -323,6 +334,8 @@ def _run_sequential_algorithm(
     use_n_cycles : int, optional
         Only use N cycles to calculate the phase to reduce code running time,
         when `algorithm` is 'sequential'.
+    ncores : int, optional
+        Number of threads used to process integrations in parallel.
 
     Returns
     -------
@@ -379,7 +392,6 @@ def _run_sequential_algorithm(
         # int, with less risk of datatype overflow. Still, use the largest datatype available
         # for the time_this_int array.
 
-        times_this_int = np.zeros((ngroups, ny, nx4), dtype="ulonglong")
         phaseall = np.zeros((nints, ngroups, ny, nx4))
 
         # non-roi rowclocks between subarray frames (this will be 0 for fullframe)
@@ -403,7 +415,7 @@ def _run_sequential_algorithm(
             if nints_to_phase > nints:
                 nints_to_phase = nints
 
-        start_time, ref_pix_sample = 0, 3
+        ref_pix_sample = 3
 
         # Need colstop for phase calculation in case of last refpixel in a row. Technically,
         # this number comes from the subarray definition (see subarray_cases dict above), but
@@ -412,69 +424,42 @@ def _run_sequential_algorithm(
         colstop = int(xsize / 4 + xstart - 1)
         log.info("Doing phase calculation per integration")
 
+        # Start times of the rows of each frame of the first integration: the
+        # first pixel of each row follows the "end-of-row" pad of the previous
+        # row, and the first row of each frame follows the "end-of-frame" pad.
+        frame_time = ny * rowclocks + extra_rowclocks
+        row_start_times = np.arange(ngroups)[:, np.newaxis] * frame_time + np.arange(ny) * rowclocks
+        pixel_times = np.arange(nx4, dtype="ulonglong") * nsamples
+
+        # add a frame time to account for the extra frame reset between MIRI integrations
+        int_time = ngroups * frame_time
+        if readpatt.upper() == "FASTR1" or readpatt.upper() == "SLOWR1":
+            int_time += frameclocks
+
+        # Remove source signal and fixed bias from each integration ramp,
+        # and average the output channels. Integrations are cleaned independently.
+        for ninti, dd in enumerate(
+            _map_integrations(clean_integration, input_model.data, ncores=ncores)
+        ):
+            # This is the quad-averaged, cleaned, input image data for the exposure
+            dd_all[ninti] = dd
+
         for ninti in range(nints):
-            log.debug(f"  Working on integration: {ninti + 1}")
-            # Read in this integration
-            data = input_model.data[ninti].copy()
-
-            # Remove source signal and fixed bias from each integration ramp
-            # (linear is good enough for phase finding)
-
-            # do linear fit for source + sky
-            s0, mm0 = sloper(data[1 : ngroups - 1, :, :])
-
-            # subtract source+sky from each frame of this ramp
-            for ngroupi in range(ngroups):
-                data[ngroupi, ...] = input_model.data[ninti, ngroupi, ...] - (s0 * ngroupi)
-
-            # make a self-superbias
-            m0 = minmed(data[1 : ngroups - 1, :, :])
-
-            # subtract self-superbias from each frame of this ramp
-            for ngroupi in range(ngroups):
-                data[ngroupi, ...] = data[ngroupi, ...] - m0
-
-                # de-interleave each frame into the 4 separate output channels and
-                # average (or median) them together for S/N
-                d0 = data[ngroupi, :, 0:nx:4]
-                d1 = data[ngroupi, :, 1:nx:4]
-                d2 = data[ngroupi, :, 2:nx:4]
-                d3 = data[ngroupi, :, 3:nx:4]
-                dd = (d0 + d1 + d2 + d3) / 4.0
-
-                # fix a bad ref col
-                dd[:, 1] = (dd[:, 0] + dd[:, 3]) / 2
-                dd[:, 2] = (dd[:, 0] + dd[:, 3]) / 2
-                # This is the quad-averaged, cleaned, input image data for the exposure
-                dd_all[ninti, ngroupi, ...] = dd - np.median(dd)
-
-            for k in range(ngroups):  # frames
-                for j in range(ny):  # rows
-                    # nsamples= 1 for fast, 9 for slow (from metadata)
-                    times_this_int[k, j, :] = (
-                        np.arange(nx4, dtype="ulonglong") * nsamples + start_time
-                    )
-
-                    # If the last pixel in a row is a reference pixel, need to push it out
-                    # by ref_pix_sample sample times. The same thing happens for the first
-                    # ref pix in each row, but that gets absorbed into the inter-row pad and
-                    # can be ignored here. Since none of the current subarrays hit the
-                    # right-hand reference pixel, this correction is not in play, but for
-                    # fast and slow fullframe (e.g. 10Hz) it should be applied. And even
-                    # then, leaving this out adds just a *tiny* phase error on the last ref
-                    # pix in a row (only) - it does not affect the phase of the other pixels.
-
-                    if colstop == 258:
-                        ulonglong_ref_pix_sample = ref_pix_sample + 2**32
-                        times_this_int[k, j, nx4 - 1] = (
-                            times_this_int[k, j, nx4 - 1] + ulonglong_ref_pix_sample
-                        )
-
-                    # point to the first pixel of the next row (add "end-of-row" pad)
-                    start_time += rowclocks
-
-                # point to the first pixel of the next frame (add "end-of-frame" pad)
-                start_time += extra_rowclocks
+            # Times of all pixels in this integration. nsamples = 1 for fast, 9 for slow
+            times_this_int = (
+                pixel_times + (ninti * int_time + row_start_times)[:, :, np.newaxis]
+            ).astype("ulonglong")
+
+            # If the last pixel in a row is a reference pixel, need to push it out
+            # by ref_pix_sample sample times. The same thing happens for the first
+            # ref pix in each row, but that gets absorbed into the inter-row pad and
+            # can be ignored here. Since none of the current subarrays hit the
+            # right-hand reference pixel, this correction is not in play, but for
+            # fast and slow fullframe (e.g. 10Hz) it should be applied. And even
+            # then, leaving this out adds just a *tiny* phase error on the last ref
+            # pix in a row (only) - it does not affect the phase of the other pixels.
+            if colstop == 258:
+                times_this_int[:, :, nx4 - 1] += ref_pix_sample + 2**32
 
             # Convert "times" to phase each integration. Note that times has units of
             # number of 10us from the first data pixel in this integration, so to
@@ -482,10 +467,6 @@ def _run_sequential_algorithm(
             phase_this_int = times_this_int / period_in_pixels
             phaseall[ninti, ...] = phase_this_int - phase_this_int.astype("ulonglong")
 
-            # add a frame time to account for the extra frame reset between MIRI integrations
-            if readpatt.upper() == "FASTR1" or readpatt.upper() == "SLOWR1":
-                start_time += frameclocks
-
         # use phaseall vs dd_all
 
         # Define the sizew of 1 wave of the phased waveform vector, then bin the whole
@@ -506,20 +487,16 @@ def _run_sequential_algorithm(
 
         # bin the whole set
         log.info(f"Calculating the phase amplitude for {nbins} bins")
-        # Define the binned waveform amplitude (pa = phase amplitude)
+        # Define the binned waveform amplitude (pa = phase amplitude),
+        # for the phases in (nb / nbins, (nb + 1) / nbins]
         pa = np.arange(nbins, dtype=float)
-        # keep track of n per bin to check for low n
-        nb_over_nbins = [nb / nbins for nb in range(nbins)]
-        nbp1_over_nbins = [(nb + 1) / nbins for nb in range(nbins)]
-        # Construct a phase map and dd map for only the nints_to_phase
-        phase_temp = phaseall[0:nints_to_phase, :, :, :]
-        dd_temp = dd_all[0:nints_to_phase, :, :, :]
-        for nb in range(nbins):
-            u = (phase_temp > nb_over_nbins[nb]) & (phase_temp <= nbp1_over_nbins[nb])
+        for nb, values in enumerate(
+            bin_by_phase(phaseall[0:nints_to_phase], dd_all[0:nints_to_phase], nbins)
+        ):
             # calculate the sigma-clipped mean
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore", RuntimeWarning)
-                dmean, _, _ = scs(dd_temp[u])
+                dmean, _, _ = scs(values)
             pa[nb] = dmean  # amplitude in this bin
 
         pa -= np.median(pa)
@@ -546,19 +523,12 @@ def _run_sequential_algorithm(
             reference_wave = np.array(reference_wave_list[fi])
             reference_wave_size = np.size(reference_wave)
             rebinned_pa = rebin(pa, [reference_wave_size])
-            cc = np.zeros(reference_wave_size)
-            for i in range(reference_wave_size):
-                shifted_ref_wave = np.roll(reference_wave, i)
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore", RuntimeWarning)
-                    pears_coeff = np.corrcoef(shifted_ref_wave, rebinned_pa)
-                cc[i] = pears_coeff[0, 1]
 
             # Use the reference file (shifted to match the phase of pa,
             # and optionally amplitude scaled)
             # shift and resample reference_wave at pa's phase
-            # u[0] is the phase shift of reference_wave *to* pa
-            u = np.argmax(cc)
+            # u is the phase shift of reference_wave *to* pa
+            u = best_phase_shift(reference_wave, rebinned_pa)
             lut_reference = rebin(np.roll(reference_wave, u), [period_in_pixels])
 
             # Scale reference wave amplitude to match the pa amplitude from this dataset by
@@ -596,7 +566,6 @@ def _run_sequential_algorithm(
 
         # clean up
         del dd_all
-        del times_this_int
         del phaseall
         del dd_noise
 
@@ -682,6 +651,133 @@ def minmed(data):
     return medimg
 
 
+def bin_by_phase(phase, data, nbins):
+    """
+    Group data values into bins of phase.
+
+    Bin ``nb`` holds the values with phases in ``(nb / nbins, (nb + 1) / nbins]``,
+    in the order in which they appear in the flattened input.
+
+    Parameters
+    ----------
+    phase : ndarray
+        Phases of the data values, between 0 and 1.
+    data : ndarray
+        Data values, with the same shape as `phase`.
+    nbins : int
+        Number of phase bins.
+
+    Returns
+    -------
+    list of ndarray
+        The data values in each bin.
+    """
+    edges = np.arange(nbins + 1) / nbins
+    bin_index = np.searchsorted(edges, phase.ravel(), side="left") - 1
+    in_bin = (bin_index >= 0) & (bin_index < nbins)
+    bin_index = bin_index[in_bin]
+
+    # Sort the values by bin, keeping their order within each bin
+    order = np.argsort(bin_index, kind="stable")
+    values = data.ravel()[in_bin][order]
+    counts = np.bincount(bin_index, minlength=nbins)
+    return np.split(values, np.cumsum(counts)[:-1])
+
+
+def best_phase_shift(reference_wave, wave):
+    """
+    Find the circular shift of a reference waveform that best matches a waveform.
+
+    The Pearson correlation coefficients of all circular shifts of the
+    reference waveform with the waveform are computed at once, by
+    cross-correlation with FFTs.
+
+    Parameters
+    ----------
+    reference_wave : ndarray
+        1-D reference waveform.
+    wave : ndarray
+        1-D waveform to match, with the same size as `reference_wave`.
+
+    Returns
+    -------
+    int
+        The shift ``u`` for which ``np.roll(reference_wave, u)`` is the most
+        correlated with `wave`.  If the correlation is undefined, 0 is returned.
+    """
+    size = reference_wave.size
+    ref_fft = np.fft.rfft(reference_wave - np.mean(reference_wave))
+    wave_fft = np.fft.rfft(wave - np.mean(wave))
+
+    # The normalization of the correlation coefficients does not depend
+    # on the shift, so the covariances are compared directly
+    covariance = np.fft.irfft(np.conj(ref_fft) * wave_fft, n=size)
+    return int(np.argmax(covariance))
+
+
+def clean_integration(data):
+    """
+    Remove the source signal and bias from an integration, and average its outputs.
+
+    Parameters
+    ----------
+    data : ndarray
+        3-D integration data array, with shape (ngroups, ny, nx).
+
+    Returns
+    -------
+    ndarray
+        The cleaned data averaged over the four output channels,
+        with shape (ngroups, ny, nx // 4).
+    """
+    ngroups, _, nx = data.shape
+
+    # Remove source signal and fixed bias from the ramp
+    # (linear is good enough for phase finding)
+
+    # do linear fit for source + sky, and subtract it from each frame of this ramp
+    s0, _ = sloper(data[1 : ngroups - 1, :, :])
+    data = (data - s0 * np.arange(ngroups)[:, np.newaxis, np.newaxis]).astype(data.dtype)
+
+    # make a self-superbias, and subtract it from each frame of this ramp
+    data -= minmed(data[1 : ngroups - 1, :, :])
+
+    # de-interleave each frame into the 4 separate output channels and
+    # average (or median) them together for S/N
+    dd = (data[:, :, 0:nx:4] + data[:, :, 1:nx:4] + data[:, :, 2:nx:4] + data[:, :, 3:nx:4]) / 4.0
+
+    # fix a bad ref col
+    dd[:, :, 1] = (dd[:, :, 0] + dd[:, :, 3]) / 2
+    dd[:, :, 2] = (dd[:, :, 0] + dd[:, :, 3]) / 2
+    return dd - np.median(dd, axis=(1, 2), keepdims=True)
+
+
+def _map_integrations(func, *arrays, ncores=1):
+    """
+    Apply a function to each integration, on a thread pool if requested.
+
+    Parameters
+    ----------
+    func : callable
+        Function called with the values of `arrays` for one integration.
+    *arrays : ndarray
+        Arrays with integrations along their first axis.
+    ncores : int, optional
+        Number of threads to use.
+
+    Yields
+    ------
+    Any
+        The result of `func` for each integration, in order.
+    """
+    nints = len(arrays[0])
+    if ncores > 1 and nints > 1:
+        with ThreadPoolExecutor(max_workers=min(ncores, nints)) as executor:
+            yield from executor.map(func, *arrays)
+    else:
+        yield from map(func, *arrays)
+
+
 def get_subarcase(emi_model, subarray, readpatt, detector):
     """
     Get the rowclocks and frameclocks values for the given configuration.
@@ -858,6 +954,7 @@ def emicorr_refwave(
     period_in_pixels,
     fit_ints_separately=False,
     nphases_opt=500,
+    ncores=1,
 ):
     """
     Derive the best amplitude and phase for the EMI waveform, subtract it off.
@@ -892,6 +989,8 @@ def emicorr_refwave(
         for a single amplitude and phase across all integrations.
     nphases_opt : int, optional
         Number of phases to sample chi squared as a function of phase
+    ncores : int, optional
+        Number of threads used to process integrations in parallel.
 
     Returns
     -------
@@ -949,22 +1048,32 @@ def emicorr_refwave(
     pixel_std = np.std(data, axis=1)
     pixel_ok = (pixel_std < 2 * np.median(pixel_std)) & (pdq == 0)
 
-    for j in range(ny):
-        for k in range(nx4):
-            # Bad reference column
-            if k == 1 or k == 2:
-                continue
-
-            # Choose the index corresponding to our phase.
-            # phases_template has the midpoints of the intervals,
-            # so rounding down here is appropriate.
-
-            indx = int(phase[j, k] * nphases)
-            # All four output channels.
-            for l in range(4):
-                pixok = pixel_ok[:, j, k * 4 + l]
-                all_y[:, indx] += data[:, :, j, k * 4 + l] * pixok[:, np.newaxis]
-                all_n[:, indx] += pixok
+    # Choose the index corresponding to the phase of each pixel.
+    # phases_template has the midpoints of the intervals,
+    # so rounding down here is appropriate.  Skip the bad
+    # reference columns.
+    use_column = np.ones(nx4, dtype=bool)
+    use_column[1:3] = False
+    indx = (phase[:, use_column] * nphases).astype(int).ravel()
+
+    def bin_integration(data_int, pixel_ok_int):
+        # Sum the good pixels of all four output channels
+        pixok = pixel_ok_int[:, : 4 * nx4].reshape((ny, nx4, 4))[:, use_column]
+        y = data_int[:, :, : 4 * nx4].reshape((ngroups, ny, nx4, 4))[:, :, use_column]
+        y = np.sum(y * pixok, axis=3, dtype=np.float64).reshape((ngroups, -1))
+        n = np.sum(pixok, axis=2).ravel()
+
+        # Sum the pixels at each phase, for all groups at once
+        group_indx = (np.arange(ngroups)[:, np.newaxis] * nphases + indx).ravel()
+        sum_y = np.bincount(group_indx, weights=y.ravel(), minlength=ngroups * nphases)
+        sum_n = np.bincount(indx, weights=n, minlength=nphases)
+        return sum_y.reshape((ngroups, nphases)).T, sum_n
+
+    for i, (sum_y, sum_n) in enumerate(
+        _map_integrations(bin_integration, data, pixel_ok, ncores=ncores)
+    ):
+        all_y[i] = sum_y
+        all_n[i] = sum_n
 
     # We'll compute chi2 at nphases_opt evenly spaced phases.
     phaselist = np.arange(nphases_opt) * 1.0 / nphases_opt
@@ -1004,14 +1113,15 @@ def emicorr_refwave(
 
         amplitudes_to_correct = c * nints
 
-    for i in range(nints):
-        for j in range(ngroups):
-            # Place the reference waveform at the appropriate phase,
-            # scale, and subtract from each output channel.
+    def correct_integration(i):
+        # Place the reference waveform at the appropriate phase,
+        # scale, and subtract from each output channel.
+        group_phase = dphase * grouptimes[:, np.newaxis, np.newaxis]
+        phased_emi = phasefunc((phase + group_phase + phases_to_correct[i]) % 1)
+        for k in range(4):
+            data[i, :, :, k::4] -= amplitudes_to_correct[i] * phased_emi
 
-            phased_emi = phasefunc((phase + dphase * j + phases_to_correct[i]) % 1)
-            for k in range(4):
-                data[i, j, :, k::4] -= amplitudes_to_correct[i] * phased_emi
+    list(_map_integrations(correct_integration, range(nints), ncores=ncores))
 
     return data
 
@@ -1107,71 +1217,44 @@ def calc_chisq_amplitudes(emifitter, ints=None, phases=None):
 
     if ints is None:
         ints = np.arange(ef.nints)
+    ints = np.asarray(ints, dtype=int)
 
     # By default, calculate chi squared and the best-fit amplitude
     # for every phase in the input EMIfitter's phaselist.
 
     if phases is None:
         phases = ef.phaselist
-
-    chisq = []
-    amplitudes = []
+    phases = np.asarray(phases, dtype=float)
 
     # Compute the best chi squared and the best amplitude at every
-    # requested phase using the math in the writeup.
-
-    for phase in phases:
-        a_ = 0
-        b_ = 0
-
-        for i in ints:
-            y = ef.all_y[i]
-            n_ = ef.all_n[i]
-            s_y = ef.all_sy[i]
-            s_ty = ef.all_sty[i]
-
-            # Phase difference between the start of this integration
-            # and the start of the first integration
-
-            phase_diff = ef.dphase_frame * i
-
-            # Choose the closest phase in emifitter's phaselist
-
-            k = np.argmin(np.abs((ef.phaselist - phase - phase_diff) % 1))
-
-            z = ef.zlist[k]
-            s_tz = ef.stzlist[k]
-            s_z = ef.szlist[k]
-            s_zz = ef.szzlist[k]
-            s_yz = np.sum(z * y, axis=1)
-
-            a_ += np.sum(
-                n_
-                / ef.delta
-                * (
-                    -ef.s_tt * s_z**2
-                    + 2 * ef.s_t * s_z * s_tz
-                    - ef.ngroups * s_tz**2
-                    + s_zz * ef.delta
-                )
-            )
-            b_ += (2 / ef.delta) * np.sum(
-                ef.s_tt * s_z * s_y
-                - ef.s_t * s_tz * s_y
-                - ef.s_t * s_z * s_ty
-                + ef.ngroups * s_tz * s_ty
-            )
-            b_ -= 2 * np.sum(s_yz)
-
-        if a_ == 0 or ~np.isfinite(a_) or ~np.isfinite(b_):
-            chisq.append(np.nan)
-            amplitudes.append(0.0)
-        else:
-            c = -b_ / (2 * a_)
-            chisq.append(a_ * c**2 + b_ * c)
-            amplitudes.append(c)
+    # requested phase using the math in the writeup.  The terms for each
+    # integration and phase in the phaselist are precomputed by EMIfitter,
+    # so only the ones for the phase of each integration need to be summed.
+    # Integrations are summed in chunks to limit memory use.
+
+    a_ = np.zeros(phases.size)
+    b_ = np.zeros(phases.size)
+    chunk_size = 256
+    for start in range(0, ints.size, chunk_size):
+        ints_chunk = ints[start : start + chunk_size]
+
+        # Phase difference between the start of each integration
+        # and the start of the first integration
+
+        phase_diff = ef.dphase_frame * ints_chunk
+
+        # Choose the closest phase in emifitter's phaselist
+
+        k = ef.phase_index(phases[:, np.newaxis], phase_diff[np.newaxis, :])
+        a_ += np.sum(ef.a_table[ints_chunk, k], axis=1)
+        b_ += np.sum(ef.b_table[ints_chunk, k], axis=1)
 
-    return chisq, amplitudes
+    valid = (a_ != 0) & np.isfinite(a_) & np.isfinite(b_)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        amplitudes = np.where(valid, -b_ / (2 * a_), 0.0)
+    chisq = np.where(valid, a_ * amplitudes**2 + b_ * amplitudes, np.nan)
+
+    return chisq.tolist(), amplitudes.tolist()
 
 
 class EMIfitter:
@@ -1206,8 +1289,8 @@ class EMIfitter:
             2D array of phases corresponding to all_y[0]
         phaselist : ndarray
             1D array of phases at which to pre-compute quantities
-            needed for chi squared, amplitude calculation.  Typically
-            uniformly spaced between 0 and 1.
+            needed for chi squared, amplitude calculation, in increasing
+            order.  Typically uniformly spaced between 0 and 1.
         dphase_frame : float
             Phase difference between successive integrations
         """
@@ -1230,20 +1313,67 @@ class EMIfitter:
         self.phasefunc = phasefunc
         self.dphase_frame = dphase_frame
 
-        self.zlist = []
-        self.szlist = []
-        self.stzlist = []
-        self.szzlist = []
+        # Waveform for each pixel when the first one is at each phase
+        # in phaselist, with shape (len(phaselist), nphases, ngroups).
+        # The transposes help ensure that similar phases are evaluated
+        # consecutively, which significantly improves runtime when
+        # there is a very large number of groups.
+
+        z = self.phasefunc((self.phases_template.T + phaselist[:, np.newaxis, np.newaxis]) % 1)
+        self.zlist = np.transpose(z, (0, 2, 1))
+        self.stzlist = np.sum(self.grouptimes * self.zlist, axis=2)
+        self.szlist = np.sum(self.zlist, axis=2)
+        self.szzlist = np.sum(self.zlist**2, axis=2)
+
+        # Terms of the chi squared for each integration and each phase in
+        # phaselist, with shape (nints, len(phaselist)).  The chi squared
+        # for a given amplitude c is a_ * c**2 + b_ * c, where a_ and b_ are
+        # the sums of these terms over integrations.
+
+        s_z, s_tz, s_zz = self.szlist, self.stzlist, self.szzlist
+        a_terms = (
+            -self.s_tt * s_z**2
+            + 2 * self.s_t * s_z * s_tz
+            - self.ngroups * s_tz**2
+            + s_zz * self.delta
+        ) / self.delta
+        self.a_table = self.all_n @ a_terms.T
+        self.b_table = (2 / self.delta) * (
+            self.all_sy @ (self.s_tt * s_z - self.s_t * s_tz).T
+            + self.all_sty @ (self.ngroups * s_tz - self.s_t * s_z).T
+        )
+        self.b_table -= 2 * (
+            self.all_y.reshape((self.nints, -1)) @ self.zlist.reshape((len(phaselist), -1)).T
+        )
 
-        # Waveform for each pixel when the first one is at dphaseval.
-        for dphaseval in phaselist:
-            # The transposes help ensure that similar phases are evaluated
-            # consecutively, which significantly improves runtime when
-            # there is a very large number of groups.
+    def phase_index(self, phase, phase_diff):
+        """
+        Find the phases in phaselist matching phases of integrations.
 
-            z = self.phasefunc((self.phases_template.T + dphaseval) % 1).T
+        For each phase, this is the index of the first phase in phaselist
+        at or after ``phase + phase_diff``, wrapping around at 1.
 
-            self.zlist += [z]
-            self.stzlist += [np.sum(self.grouptimes * z, axis=1)]
-            self.szlist += [np.sum(z, axis=1)]
-            self.szzlist += [np.sum(z**2, axis=1)]
+        Parameters
+        ----------
+        phase : ndarray
+            Phases of the first integration.
+        phase_diff : ndarray
+            Phase differences between the integrations and the first one,
+            broadcastable with `phase`.
+
+        Returns
+        -------
+        ndarray
+            Indices into phaselist, with the broadcast shape of the inputs.
+        """
+        phase, phase_diff = np.broadcast_arrays(phase, phase_diff)
+        nphases = len(self.phaselist)
+
+        # Candidates around the phase, allowing for rounding errors
+        first = np.searchsorted(self.phaselist, (phase + phase_diff) % 1)
+        candidates = (first[..., np.newaxis] + np.arange(-1, 2)) % nphases
+        distance = np.abs(
+            (self.phaselist[candidates] - phase[..., np.newaxis] - phase_diff[..., np.newaxis]) % 1
+        )
+        best = np.argmin(distance, axis=-1)
+        return np.take_along_axis(candidates, best[..., np.newaxis], axis=-1)[..., 0]
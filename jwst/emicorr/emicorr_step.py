@@ -3,6 +3,7 @@
 from stdatamodels.jwst import datamodels
 from jwst.stpipe import Step
 from jwst.emicorr import emicorr
+from jwst.lib import pipe_utils
 
 
 __all__ = ["EmiCorrStep"]
@@ -23,6 +24,7 @@ class EmiCorrStep(Step):
         fit_ints_separately = boolean(default=False)  # If True and algorithm is 'joint', each integration is separately fit.
         user_supplied_reffile = string(default=None)  # ASDF user-supplied reference file
         save_intermediate_results = boolean(default=False)  # If True and a reference file is created on the fly, save it to disk
+        maximum_cores = string(default='1')  # Number of threads to process integrations: an integer, 'quarter', 'half', or 'all'
         skip = boolean(default=True)  # Skip the step
     """  # noqa: E501
 
@@ -58,8 +60,8 @@ class EmiCorrStep(Step):
                 input_model.meta.cal_step.emicorr = "SKIPPED"
                 return input_model
 
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             # Setup parameters
             pars = {
@@ -70,6 +72,7 @@ class EmiCorrStep(Step):
                 "onthefly_corr_freq": self.onthefly_corr_freq,
                 "use_n_cycles": self.use_n_cycles,
                 "fit_ints_separately": self.fit_ints_separately,
+                "ncores": pipe_utils.compute_num_cores(self.maximum_cores),
             }
 
             # Get the reference file
@@ -403,6 +403,19 @@ def test_apply_emicorr_separate_ints(data_without_emi_3int, data_with_emi_3int,
     assert np.allclose(outmdl.data, expected_model.data, rtol=1e-2)
 
 
+@pytest.mark.parametrize("algorithm", ["sequential", "joint"])
+@pytest.mark.parametrize("fit_ints_separately", [False, True])
+def test_apply_emicorr_ncores(data_with_emi_3int, model_with_emi, algorithm, fit_ints_separately):
+    input_model = mk_data_mdl(data_with_emi_3int, "FULL", "FAST", "MIRIMAGE")
+    pars = {"algorithm": algorithm, "fit_ints_separately": fit_ints_separately}
+
+    expected = emicorr.apply_emicorr(input_model.copy(), model_with_emi, **pars)
+    outmdl = emicorr.apply_emicorr(input_model.copy(), model_with_emi, ncores=3, **pars)
+
+    # Integrations processed in parallel give the same result
+    np.testing.assert_array_equal(outmdl.data, expected.data)
+
+
 @pytest.mark.parametrize("algorithm", ["sequential", "joint"])
 @pytest.mark.parametrize("model_placeholder", ["bad_model", None])
 @pytest.mark.parametrize("output_ext", ["fits", "asdf"])
@@ -608,3 +621,50 @@ def test_rebin_error():
     data = np.ones(10)
     with pytest.raises(ValueError, match="dimensions must match"):
         emicorr.rebin(data, (10, 10))
+
+
+def test_bin_by_phase():
+    rng = np.random.default_rng(0)
+    phase = rng.uniform(0, 1, (3, 4, 50))
+    phase[0, 0, :5] = [0.0, 0.1, 0.2, 0.25, 1.0]
+    data = rng.normal(size=phase.shape)
+    nbins = 20
+
+    binned = emicorr.bin_by_phase(phase, data, nbins)
+
+    assert len(binned) == nbins
+    for nb in range(nbins):
+        in_bin = (phase > nb / nbins) & (phase <= (nb + 1) / nbins)
+        np.testing.assert_array_equal(binned[nb], data[in_bin])
+
+
+@pytest.mark.parametrize("size", [20, 21])
+def test_best_phase_shift(size):
+    rng = np.random.default_rng(1)
+    reference_wave = np.sin(2 * np.pi * np.arange(size) / size) + 0.3 * rng.normal(size=size)
+    wave = 2 * np.roll(reference_wave, 7) + 0.1 * rng.normal(size=size) + 5
+
+    # Same as the maximum correlation of all circular shifts
+    cc = [np.corrcoef(np.roll(reference_wave, i), wave)[0, 1] for i in range(size)]
+    assert emicorr.best_phase_shift(reference_wave, wave) == np.argmax(cc) == 7
+
+    # Undefined correlations give no shift
+    wave[3] = np.nan
+    assert emicorr.best_phase_shift(reference_wave, wave) == 0
+
+
+def test_emifitter_phase_index():
+    nphases_opt = 500
+    phaselist = np.arange(nphases_opt) * 1.0 / nphases_opt
+    all_y = np.ones((4, 10, 3))
+    all_n = np.ones((4, 10))
+    phases_template = np.linspace(0, 1, 30, endpoint=False).reshape((10, 3))
+    emifitter = emicorr.EMIfitter(all_y, all_n, np.cos, phases_template, phaselist, 0.3)
+
+    phases = np.concatenate([phaselist, [0.1234, 0.9999, 0.0]])
+    phase_diff = 0.3 * np.arange(4)
+    index = emifitter.phase_index(phases[:, np.newaxis], phase_diff)
+    assert index.shape == (len(phases), 4)
+    for i, phase in enumerate(phases):
+        for j, diff in enumerate(phase_diff):
+            assert index[i, j] == np.argmin(np.abs((phaselist - phase - diff) % 1))
@@ -27,6 +27,7 @@ def extract2d(
     extract_orders=None,
     mmag_extract=None,
     nbright=None,
+    ncores=1,
 ):
     """
     Extract rectangular cutouts around each spectrum from a spectral dataset.
@@ -56,6 +57,8 @@ def extract2d(
         Minimum (faintest) abmag to extract for WFSS mode.
     nbright : float
         Number of brightest objects to extract, WFSS mode.
+    ncores : int, optional
+        Number of threads used to extract the objects, WFSS mode.
 
     Returns
     -------
@@ -103,6 +106,7 @@ def extract2d(
                 mmag_extract=mmag_extract,
                 wfss_extract_half_height=wfss_extract_half_height,
                 nbright=nbright,
+                ncores=ncores,
             )
 
     else:
@@ -1,6 +1,7 @@
 #! /usr/bin/env python
 from stdatamodels.jwst import datamodels
 
+from jwst.lib.pipe_utils import compute_num_cores
 from jwst.stpipe import Step
 from . import extract_2d
 
@@ -22,6 +23,7 @@ class Extract2dStep(Step):
         wfss_extract_half_height =  integer(default=5)  # extraction half height in pixels, WFSS mode
         wfss_mmag_extract = float(default=None)  # minimum abmag to extract, WFSS mode
         wfss_nbright = integer(default=1000)  # number of brightest objects to extract, WFSS mode
+        maximum_cores = string(default='1')  # Number of threads to use to extract the objects, WFSS mode: an integer, 'quarter', 'half', or 'all'
     """  # noqa: E501
 
     reference_file_types = ["wavelengthrange"]
@@ -60,6 +62,7 @@ class Extract2dStep(Step):
                 extract_orders=self.extract_orders,
                 mmag_extract=self.wfss_mmag_extract,
                 nbright=self.wfss_nbright,
+                ncores=compute_num_cores(self.maximum_cores),
             )
 
         return output_model
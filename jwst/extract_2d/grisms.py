@@ -2,6 +2,7 @@
 #  Module for 2d extraction of grism spectra
 #
 
+from concurrent.futures import ThreadPoolExecutor
 import copy
 import logging
 
@@ -289,6 +290,7 @@ def extract_grism_objects(
     compute_wavelength=True,
     wfss_extract_half_height=None,
     nbright=None,
+    ncores=1,
 ):
     """
     Extract 2d boxes around each objects spectra for each order.
@@ -321,6 +323,9 @@ def extract_grism_objects(
     nbright : int
         Number of brightest objects to extract for WFSS mode.
 
+    ncores : int, optional
+        Number of threads used to extract the objects.
+
     Returns
     -------
     output_model : `~jwst.datamodels.MultiSlitModel`
@@ -402,6 +407,52 @@ def extract_grism_objects(
     output_model = datamodels.MultiSlitModel()
     output_model.update(input_model)
 
+    # For easy reference here, GrismObjects has:
+    #
+    # xcenter,ycenter: in direct image pixels
+    # order_bounding in grism_detector pixels
+    # sky_centroid: SkyCoord of object center
+    # sky_bbox_ :lower and upper bounding box in SkyCoord
+    # sid: catalog ID of the object
+
+    cutouts = [(obj, order) for obj in grism_objects for order in obj.order_bounding.keys()]
+
+    def extract(cutout):
+        obj, order = cutout
+        return _extract_grism_slit(input_model, obj, order, compute_wavelength)
+
+    # The cutouts of the objects are independent, so they can be made in parallel
+    if ncores > 1 and len(cutouts) > 1:
+        with ThreadPoolExecutor(max_workers=min(ncores, len(cutouts))) as executor:
+            slits = list(executor.map(extract, cutouts))
+    else:
+        slits = [extract(cutout) for cutout in cutouts]
+    output_model.slits.extend([slit for slit in slits if slit is not None])
+    log.info("Finished extractions")
+    return output_model
+
+
+def _extract_grism_slit(input_model, obj, order, compute_wavelength=True):
+    """
+    Extract the 2d box around the spectrum of one order of an object.
+
+    Parameters
+    ----------
+    input_model : `~jwst.datamodels.ImageModel`
+        The grism image.
+    obj : GrismObject
+        The object to extract.
+    order : int
+        The spectral order to extract.
+    compute_wavelength : bool
+        Compute a wavelength array for the datamodel.
+
+    Returns
+    -------
+    new_slit : `~jwst.datamodels.SlitModel` or None
+        The extracted spectrum, or None if the box has zero size once
+        limited to the detector.
+    """
     # One WCS model can be used to govern all the extractions
     # and in fact the model transforms rely on the full frame
     # coordinates of the input pixel location. So the WCS
@@ -412,138 +463,111 @@ def extract_grism_objects(
     # the output model as source_[x/y]pos
     inwcs = input_model.meta.wcs
 
-    # For easy reference here, GrismObjects has:
+    # Add the shift to the lower corner to each subarray WCS object
+    # The shift should just be the lower bounding box corner
+    # also replace the object center location inputs to the GrismDispersion
+    # model with the known object center and order information (in pixels of direct image)
+    # This is changes the user input to the model from (x,y,x0,y0,order) -> (x,y)
     #
-    # xcenter,ycenter: in direct image pixels
-    # order_bounding in grism_detector pixels
-    # sky_centroid: SkyCoord of object center
-    # sky_bbox_ :lower and upper bounding box in SkyCoord
-    # sid: catalog ID of the object
-
-    slits = []
-    for obj in grism_objects:
-        for order in obj.order_bounding.keys():
-            # Add the shift to the lower corner to each subarray WCS object
-            # The shift should just be the lower bounding box corner
-            # also replace the object center location inputs to the GrismDispersion
-            # model with the known object center and order information (in pixels of direct image)
-            # This is changes the user input to the model from (x,y,x0,y0,order) -> (x,y)
-            #
-            # The bounding boxes here are also limited to the size of the detector
-            # The check for boxes entirely off the detector is done in create_grism_bbox right now
-            y, x = obj.order_bounding[order]
-            log.debug(f"YYY, {y}, {clamp(y[0], 0, input_model.meta.subarray.ysize)}")
-
-            # limit the boxes to the detector
-            ymin = clamp(y[0], 0, input_model.meta.subarray.ysize)
-            ymax = clamp(y[1], 0, input_model.meta.subarray.ysize)
-            xmin = clamp(x[0], 0, input_model.meta.subarray.xsize)
-            xmax = clamp(x[1], 0, input_model.meta.subarray.xsize)
-
-            # don't extract anything that ended up with zero dimensions in one axis
-            # this means that it was identified as a partial order but only on one
-            # row or column of the detector
-            if ymax - ymin > 0 and xmax - xmin > 0:
-                subwcs = copy.deepcopy(inwcs)
-                log.info(f"Subarray extracted for obj: {obj.sid} order: {order}:")
-                log.info(
-                    f"Subarray extents are: (xmin:{xmin}, xmax:{xmax}), (ymin:{ymin}, ymax:{ymax})"
-                )
-
-                # only the first two numbers in the Mapping are used
-                # the order and source position are put directly into
-                # the new wcs for the subarray for the forward transform
-                xcenter_model = Const1D(obj.xcentroid)
-                xcenter_model.inverse = Const1D(obj.xcentroid)
-
-                ycenter_model = Const1D(obj.ycentroid)
-                ycenter_model.inverse = Const1D(obj.ycentroid)
-
-                order_model = Const1D(order)
-                order_model.inverse = Const1D(order)
-
-                tr = inwcs.get_transform("grism_detector", "detector")
-                tr = (
-                    Mapping((0, 1, 0, 0, 0))
-                    | (Shift(xmin) & Shift(ymin) & xcenter_model & ycenter_model & order_model)
-                    | tr
-                )
-                y_slice = slice(_toindex(ymin), _toindex(ymax) + 1)
-                x_slice = slice(_toindex(xmin), _toindex(xmax) + 1)
-
-                ext_data = input_model.data[y_slice, x_slice].copy()
-                ext_err = input_model.err[y_slice, x_slice].copy()
-                ext_dq = input_model.dq[y_slice, x_slice].copy()
-                if input_model.var_poisson is not None and np.size(input_model.var_poisson) > 0:
-                    var_poisson = input_model.var_poisson[y_slice, x_slice].copy()
-                else:
-                    var_poisson = None
-                if input_model.var_rnoise is not None and np.size(input_model.var_rnoise) > 0:
-                    var_rnoise = input_model.var_rnoise[y_slice, x_slice].copy()
-                else:
-                    var_rnoise = None
-                if input_model.var_flat is not None and np.size(input_model.var_flat) > 0:
-                    var_flat = input_model.var_flat[y_slice, x_slice].copy()
-                else:
-                    var_flat = None
-
-                bind_bounding_box(
-                    tr, util.transform_bbox_from_shape(ext_data.shape, order="F"), order="F"
-                )
-                subwcs.set_transform("grism_detector", "detector", tr)
-
-                new_slit = datamodels.SlitModel(
-                    data=ext_data,
-                    err=ext_err,
-                    dq=ext_dq,
-                    var_poisson=var_poisson,
-                    var_rnoise=var_rnoise,
-                    var_flat=var_flat,
-                )
-                new_slit.meta.wcsinfo.spectral_order = order
-                new_slit.meta.wcsinfo.dispersion_direction = (
-                    input_model.meta.wcsinfo.dispersion_direction
-                )
-                new_slit.meta.wcsinfo.specsys = input_model.meta.wcsinfo.specsys
-                new_slit.meta.coordinates = input_model.meta.coordinates
-                new_slit.meta.wcs = subwcs
-
-                if compute_wavelength:
-                    log.debug("Computing wavelengths")
-                    new_slit.wavelength = compute_wfss_wavelength(new_slit)
-
-                # set x/ystart values relative to the image (screen) frame.
-                # The overall subarray offset is recorded in model.meta.subarray.
-                # nslit = obj.sid - 1  # catalog id starts at zero
-                new_slit.name = f"{obj.sid}"
-                new_slit.is_extended = obj.is_extended
-                new_slit.xstart = _toindex(xmin) + 1  # fits pixels
-                new_slit.xsize = ext_data.shape[1]
-                new_slit.ystart = _toindex(ymin) + 1  # fits pixels
-                new_slit.ysize = ext_data.shape[0]
-                new_slit.source_xpos = float(obj.xcentroid)
-                new_slit.source_ypos = float(obj.ycentroid)
-                new_slit.source_id = obj.sid
-                new_slit.source_dec = obj.sky_centroid.dec.value
-                new_slit.source_ra = obj.sky_centroid.ra.value
-                new_slit.bunit_data = input_model.meta.bunit_data
-                new_slit.bunit_err = input_model.meta.bunit_err
-                slits.append(new_slit)
-    output_model.slits.extend(slits)
-    # In the case that there are no spectra to extract deleting the variables
-    # will fail so add the try block.
-    try:
-        del subwcs
-    except UnboundLocalError:
-        pass
-    try:
-        del new_slit
-    except UnboundLocalError:
-        pass
-    # del subwcs
-    # del new_slit
-    log.info("Finished extractions")
-    return output_model
+    # The bounding boxes here are also limited to the size of the detector
+    # The check for boxes entirely off the detector is done in create_grism_bbox right now
+    y, x = obj.order_bounding[order]
+    log.debug(f"YYY, {y}, {clamp(y[0], 0, input_model.meta.subarray.ysize)}")
+
+    # limit the boxes to the detector
+    ymin = clamp(y[0], 0, input_model.meta.subarray.ysize)
+    ymax = clamp(y[1], 0, input_model.meta.subarray.ysize)
+    xmin = clamp(x[0], 0, input_model.meta.subarray.xsize)
+    xmax = clamp(x[1], 0, input_model.meta.subarray.xsize)
+
+    # don't extract anything that ended up with zero dimensions in one axis
+    # this means that it was identified as a partial order but only on one
+    # row or column of the detector
+    if ymax - ymin <= 0 or xmax - xmin <= 0:
+        return None
+
+    subwcs = copy.deepcopy(inwcs)
+    log.info(f"Subarray extracted for obj: {obj.sid} order: {order}:")
+    log.info(f"Subarray extents are: (xmin:{xmin}, xmax:{xmax}), (ymin:{ymin}, ymax:{ymax})")
+
+    # only the first two numbers in the Mapping are used
+    # the order and source position are put directly into
+    # the new wcs for the subarray for the forward transform
+    xcenter_model = Const1D(obj.xcentroid)
+    xcenter_model.inverse = Const1D(obj.xcentroid)
+
+    ycenter_model = Const1D(obj.ycentroid)
+    ycenter_model.inverse = Const1D(obj.ycentroid)
+
+    order_model = Const1D(order)
+    order_model.inverse = Const1D(order)
+
+    tr = inwcs.get_transform("grism_detector", "detector")
+    tr = (
+        Mapping((0, 1, 0, 0, 0))
+        | (Shift(xmin) & Shift(ymin) & xcenter_model & ycenter_model & order_model)
+        | tr
+    )
+    y_slice = slice(_toindex(ymin), _toindex(ymax) + 1)
+    x_slice = slice(_toindex(xmin), _toindex(xmax) + 1)
+
+    ext_data = input_model.data[y_slice, x_slice].copy()
+    ext_err = input_model.err[y_slice, x_slice].copy()
+    ext_dq = input_model.dq[y_slice, x_slice].copy()
+    if input_model.var_poisson is not None and np.size(input_model.var_poisson) > 0:
+        var_poisson = input_model.var_poisson[y_slice, x_slice].copy()
+    else:
+        var_poisson = None
+    if input_model.var_rnoise is not None and np.size(input_model.var_rnoise) > 0:
+        var_rnoise = input_model.var_rnoise[y_slice, x_slice].copy()
+    else:
+        var_rnoise = None
+    if input_model.var_flat is not None and np.size(input_model.var_flat) > 0:
+        var_flat = input_model.var_flat[y_slice, x_slice].copy()
+    else:
+        var_flat = None
+
+    bind_bounding_box(tr, util.transform_bbox_from_shape(ext_data.shape, order="F"), order="F")
+    subwcs.set_transform("grism_detector", "detector", tr)
+
+    # The slit is validated as a whole when it is added to the output model,
+    # which is much faster than validating each of the values set here
+    new_slit = datamodels.SlitModel(
+        data=ext_data,
+        err=ext_err,
+        dq=ext_dq,
+        var_poisson=var_poisson,
+        var_rnoise=var_rnoise,
+        var_flat=var_flat,
+        validate_on_assignment=False,
+    )
+    new_slit.meta.wcsinfo.spectral_order = order
+    new_slit.meta.wcsinfo.dispersion_direction = input_model.meta.wcsinfo.dispersion_direction
+    new_slit.meta.wcsinfo.specsys = input_model.meta.wcsinfo.specsys
+    new_slit.meta.coordinates = input_model.meta.coordinates
+    new_slit.meta.wcs = subwcs
+
+    if compute_wavelength:
+        log.debug("Computing wavelengths")
+        new_slit.wavelength = compute_wfss_wavelength(new_slit)
+
+    # set x/ystart values relative to the image (screen) frame.
+    # The overall subarray offset is recorded in model.meta.subarray.
+    # nslit = obj.sid - 1  # catalog id starts at zero
+    new_slit.name = f"{obj.sid}"
+    new_slit.is_extended = obj.is_extended
+    new_slit.xstart = _toindex(xmin) + 1  # fits pixels
+    new_slit.xsize = ext_data.shape[1]
+    new_slit.ystart = _toindex(ymin) + 1  # fits pixels
+    new_slit.ysize = ext_data.shape[0]
+    new_slit.source_xpos = float(obj.xcentroid)
+    new_slit.source_ypos = float(obj.ycentroid)
+    new_slit.source_id = obj.sid
+    new_slit.source_dec = obj.sky_centroid.dec.value
+    new_slit.source_ra = obj.sky_centroid.ra.value
+    new_slit.bunit_data = input_model.meta.bunit_data
+    new_slit.bunit_err = input_model.meta.bunit_err
+    return new_slit
 
 
 def clamp(value, minval, maxval):
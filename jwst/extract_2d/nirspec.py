@@ -81,6 +81,10 @@ def nrs_extract2d(input_model, slit_names=None, source_ids=None):
         output_model.update(input_model)
         slits = []
 
+        # Map the pixels of all slits through the WCS together;
+        # the grids are cached and used for each slit below.
+        nirspec.nrs_slit_grids(input_model, [slit.name for slit in open_slits])
+
         # Loop over all slit instances that are present
         for slit in open_slits:
             new_model, xlo, xhi, ylo, yhi = process_slit(input_model, slit)
@@ -329,9 +333,14 @@ def extract_slit(input_model, slit):
 
     slit_wcs.bounding_box = util.wcs_bbox_from_shape(ext_data.shape)
 
-    # compute wavelengths
-    x, y = wcstools.grid_from_bounding_box(slit_wcs.bounding_box, step=(1, 1))
-    ra, dec, lam = slit_wcs(x, y)
+    # compute wavelengths, reusing the slit pixels mapped through the WCS
+    # if they match the extracted region
+    grids = nirspec.nrs_slit_grids(input_model, [slit.name])[slit.name]
+    if grids[0].shape == ext_data.shape[-2:]:
+        lam = grids[-1]
+    else:
+        x, y = wcstools.grid_from_bounding_box(slit_wcs.bounding_box, step=(1, 1))
+        ra, dec, lam = slit_wcs(x, y)
     lam = lam.astype(np.float32)
     new_model = datamodels.SlitModel(
         data=ext_data,
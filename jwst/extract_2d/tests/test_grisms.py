@@ -451,6 +451,27 @@ def test_extract_wfss_object():
         extract_tso_object(wcsimage, reference_files=refs)
 
 
+@pytest.mark.filterwarnings("ignore: Card is too long")
+def test_extract_wfss_object_ncores():
+    """Test that extracting the objects in parallel gives the same slits."""
+    source_catalog = get_pkg_data_filename(
+        "data/step_SourceCatalogStep_cat.ecsv", package="jwst.extract_2d.tests"
+    )
+    wcsimage = create_wfss_image(pupil="GRISMR")
+    wcsimage.meta.source_catalog = source_catalog
+    refs = get_reference_files(wcsimage)
+    expected = extract_grism_objects(wcsimage, reference_files=refs)
+    outmodel = extract_grism_objects(wcsimage, reference_files=refs, ncores=2)
+
+    assert len(outmodel.slits) == len(expected.slits)
+    for slit, expected_slit in zip(outmodel.slits, expected.slits, strict=True):
+        assert slit.name == expected_slit.name
+        assert slit.meta.wcsinfo.spectral_order == expected_slit.meta.wcsinfo.spectral_order
+        assert (slit.xstart, slit.ystart) == (expected_slit.xstart, expected_slit.ystart)
+        np.testing.assert_array_equal(slit.data, expected_slit.data)
+        np.testing.assert_array_equal(slit.wavelength, expected_slit.wavelength)
+
+
 def test_wfss_extract_custom_height():
     """Test WFSS extraction with a user supplied half height.
 
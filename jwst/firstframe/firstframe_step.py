@@ -44,8 +44,8 @@ class FirstFrameStep(Step):
                 input_model.meta.cal_step.firstframe = "SKIPPED"
                 return input_model
 
-            # Cork on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             # Do the firstframe correction subtraction
             result = firstframe_sub.do_correction(result, bright_use_group1=self.bright_use_group1)
@@ -66,8 +66,8 @@ class GroupScaleStep(Step):
                 input_model.meta.cal_step.group_scale = "SKIPPED"
                 return input_model
 
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             # Do the scaling
             group_scale.do_correction(result)
@@ -46,8 +46,8 @@ class IPCStep(Step):
             # Open the ipc reference file data model
             ipc_model = datamodels.IPCModel(self.ipc_name)
 
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             # Do the ipc correction
             result = ipc_corr.do_correction(result, ipc_model)
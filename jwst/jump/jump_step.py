@@ -92,8 +92,8 @@ class JumpStep(Step):
             if self.maximum_cores != "none":
                 self.log.info("Maximum cores to use = %s", self.maximum_cores)
 
-            # Detect jumps using a copy of the input data model.
-            result = input_model.copy()
+            # Detect jumps using a copy of the input data model, unless running in place.
+            result = self.copy_input(input_model)
             jump_data = self._setup_jump_data(result)
             new_gdq, new_pdq, number_crs, number_extended_events, stddev = detect_jumps_data(
                 jump_data
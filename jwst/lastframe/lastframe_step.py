@@ -43,8 +43,8 @@ class LastFrameStep(Step):
                 input_model.meta.cal_step.lastframe = "SKIPPED"
                 return input_model
 
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             # Do the lastframe correction subtraction
             result = lastframe_sub.do_correction(result)
@@ -1,6 +1,10 @@
 """Pipeline utilities objects."""
 
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
 import logging
+import multiprocessing
+import os
 
 import numpy as np
 from stdatamodels.properties import ObjectNode
@@ -153,3 +157,139 @@ def match_nans_and_flags(input_model):
     # Update the DQ extension
     if input_model.dq.shape == data_shape:
         input_model.dq[is_invalid] |= dqflags.pixel["DO_NOT_USE"]
+
+
+def compute_num_cores(max_cores, max_jobs=None):
+    """
+    Determine the number of worker processes to use for multiprocessing.
+
+    Parameters
+    ----------
+    max_cores : str or int
+        The requested number of cores. May be an integer (or a string
+        representation of one), or one of 'none', 'quarter', 'half',
+        or 'all', indicating the fraction of the available cores to use.
+        The available cores include SMT cores (Hyper Threading for Intel).
+    max_jobs : int, optional
+        The number of independent jobs to be processed. If provided,
+        the number of cores returned will not exceed this value.
+
+    Returns
+    -------
+    ncpus : int
+        The number of cores to use; always at least 1.
+    """
+    num_cores = os.cpu_count() or 1
+    max_cores = str(max_cores).strip().lower()
+    if max_cores in ("none", ""):
+        ncpus = 1
+    elif max_cores == "quarter":
+        ncpus = num_cores // 4
+    elif max_cores == "half":
+        ncpus = num_cores // 2
+    elif max_cores == "all":
+        ncpus = num_cores
+    else:
+        try:
+            ncpus = min(int(max_cores), num_cores)
+        except ValueError:
+            log.warning(f"Unrecognized value for maximum_cores: '{max_cores}'; using 1 core")
+            ncpus = 1
+
+    if max_jobs is not None:
+        ncpus = min(ncpus, max_jobs)
+    ncpus = max(ncpus, 1)
+    log.debug(f"Found {num_cores} cores; using {ncpus}")
+    return ncpus
+
+
+def limit_forked_workers(nworkers):
+    """
+    Limit the number of worker processes to those that can be forked.
+
+    Worker processes must be forked to inherit, rather than pickle, the
+    data models and other objects they work on. Where the 'fork' start
+    method is not available, work is done serially.
+
+    Parameters
+    ----------
+    nworkers : int
+        The requested number of worker processes.
+
+    Returns
+    -------
+    int
+        The number of worker processes to use.
+    """
+    if nworkers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        log.warning("Parallel processing requires the 'fork' start method; processing serially")
+        return 1
+    return max(nworkers, 1)
+
+
+# Function and arguments shared by all jobs, inherited by forked worker processes
+_worker_task = None
+
+
+def _init_worker(func, args):
+    global _worker_task
+    _worker_task = (func, args)
+
+
+def _run_worker_job(job):
+    func, args = _worker_task
+    return func(job, *args)
+
+
+def map_forked_workers(func, jobs, nworkers, args=()):
+    """
+    Apply a function to each job in a pool of forked worker processes.
+
+    Worker processes are forked, so ``func`` and ``args`` are inherited
+    rather than pickled; only the jobs and their results are passed
+    between processes, so both must be picklable. No more than
+    ``nworkers`` jobs are submitted at any time, bounding the number of
+    results held in memory before they are consumed. If only one worker
+    is used, or processes cannot be forked, jobs are run serially in
+    this process.
+
+    Parameters
+    ----------
+    func : callable
+        The function to apply, called as ``func(job, *args)``.
+    jobs : iterable
+        The jobs, e.g. indices of the models to process.
+    nworkers : int
+        Number of worker processes.
+    args : tuple, optional
+        Additional arguments to ``func``, shared by all jobs.
+
+    Yields
+    ------
+    i : int
+        Index of the job, in the order of ``jobs``. When run in parallel,
+        jobs are yielded as they complete, in any order.
+    result : object
+        The return value of ``func`` for that job.
+    """
+    jobs = iter(enumerate(jobs))
+    nworkers = limit_forked_workers(nworkers)
+    if nworkers == 1:
+        for i, job in jobs:
+            yield i, func(job, *args)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=nworkers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_worker,
+        initargs=(func, args),
+    ) as executor:
+        pending = {executor.submit(_run_worker_job, job): i for i, job in islice(jobs, nworkers)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = pending.pop(future)
+                for j, job in islice(jobs, 1):
+                    pending[executor.submit(_run_worker_job, job)] = j
+                yield i, future.result()
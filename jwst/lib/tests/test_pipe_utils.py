@@ -1,5 +1,7 @@
 """Test utilities"""
 
+import os
+
 import pytest
 
 import numpy as np
@@ -214,3 +216,50 @@ def test_match_nans_and_flags_shape_mismatch():
 
     model.close()
     model_copy.close()
+
+
+@pytest.mark.parametrize(
+    "max_cores, expected",
+    [("none", 1), ("1", 1), (1, 1), ("quarter", 2), ("half", 4), ("all", 8), ("3", 3), ("64", 8)],
+)
+def test_compute_num_cores(monkeypatch, max_cores, expected):
+    monkeypatch.setattr(pipe_utils.os, "cpu_count", lambda: 8)
+    assert pipe_utils.compute_num_cores(max_cores) == expected
+
+
+def test_compute_num_cores_limits(monkeypatch):
+    monkeypatch.setattr(pipe_utils.os, "cpu_count", lambda: 8)
+
+    # never more than the number of jobs
+    assert pipe_utils.compute_num_cores("all", max_jobs=3) == 3
+
+    # always at least one core
+    monkeypatch.setattr(pipe_utils.os, "cpu_count", lambda: 2)
+    assert pipe_utils.compute_num_cores("quarter") == 1
+    assert pipe_utils.compute_num_cores("bad_value") == 1
+
+
+def test_limit_forked_workers(monkeypatch):
+    assert pipe_utils.limit_forked_workers(3) == 3
+    assert pipe_utils.limit_forked_workers(0) == 1
+
+    monkeypatch.setattr(pipe_utils.multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    assert pipe_utils.limit_forked_workers(3) == 1
+
+
+def _scale_job(job, values, factor):
+    return values[job] * factor, os.getpid()
+
+
+@pytest.mark.parametrize("nworkers", [1, 3])
+def test_map_forked_workers(nworkers):
+    # Arrays shared by all jobs are inherited by the workers, not pickled
+    values = np.arange(10.0)
+    results = dict(pipe_utils.map_forked_workers(_scale_job, [2, 5, 5, 9], nworkers, (values, 2)))
+    assert {i: value for i, (value, _) in results.items()} == {0: 4.0, 1: 10.0, 2: 10.0, 3: 18.0}
+
+    pids = {pid for _, pid in results.values()}
+    if nworkers == 1:
+        assert pids == {os.getpid()}
+    else:
+        assert os.getpid() not in pids
@@ -1,15 +1,21 @@
 import numpy as np
+import pytest
 from numpy.testing import assert_allclose
 
 from astropy import units as u
 from astropy import coordinates as coord
-from astropy.modeling.models import Mapping, Identity, Shift, Scale
+from astropy.modeling.models import Mapping, Identity, Shift, Scale, Tabular1D
 from gwcs import wcstools, wcs
 from gwcs import coordinate_frames as cf
 
 from stdatamodels.jwst import datamodels
 from stdatamodels.jwst.transforms.models import NirissSOSSModel
-from jwst.lib.wcs_utils import get_wavelengths
+from jwst.lib.wcs_utils import (
+    COORDINATE_GRID_CACHE,
+    CoordinateGridCache,
+    get_wavelengths,
+    wcs_fingerprint,
+)
 from jwst.assign_wcs import util
 
 
@@ -151,3 +157,117 @@ def test_get_wavelength_wavecorr():
 
     wl_uncorr = get_wavelengths(model, use_wavecorr=False)
     assert_allclose(wl_uncorr, wl_og)
+
+
+@pytest.fixture
+def coordinate_cache():
+    """Enable the shared coordinate grid cache for one test."""
+    COORDINATE_GRID_CACHE.configure(1e6)
+    yield COORDINATE_GRID_CACHE
+    COORDINATE_GRID_CACHE.configure(0)
+
+
+def test_coordinate_grid_cache():
+    model = create_model()
+    model.meta.filename = "test_cal.fits"
+    cache = CoordinateGridCache(max_memory=1e6)
+
+    coords = cache.evaluate(model)
+    assert len(coords) == 3
+    assert_allclose(coords[2], create_mock_wl())
+    assert not coords[2].flags.writeable
+    assert cache.statistics()["ncomputed"] == 1
+
+    # Copies of the model reuse the coordinates
+    again = cache.evaluate(model.copy())
+    assert again[2] is coords[2]
+    stats = cache.statistics()
+    assert stats["nreused"] == 1
+    assert stats["time_saved"] == stats["time_computing"]
+    assert "reused 1 grids" in cache.report()
+    assert cache.report(since=stats) is None
+
+    # Partial transforms are cached separately
+    partial = cache.evaluate(model, [("detector", "slit_frame")])
+    assert partial[2] is not coords[2]
+    assert len(cache) == 2
+    assert cache.nbytes == 6 * coords[2].nbytes
+
+    # Clearing keeps the statistics
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.statistics()["nreused"] == 1
+
+
+def test_coordinate_grid_cache_wcs_change():
+    model = create_model()
+    cache = CoordinateGridCache(max_memory=1e6)
+    before = cache.evaluate(model)[2]
+
+    # Changing a parameter in place changes the coordinates
+    model.meta.wcs.pipeline[0].transform[-1].offset = 1.5
+    after = cache.evaluate(model)[2]
+    assert_allclose(after, before + 1.0)
+    assert cache.statistics()["nreused"] == 0
+
+    # So does inserting a frame
+    slit_spatial = cf.Frame2D(name="slit_spatial", axes_order=(0, 1), unit=("", ""))
+    spec = cf.SpectralFrame(name="spectral", axes_order=(2,), unit=(u.micron,))
+    wcorr_frame = cf.CompositeFrame([slit_spatial, spec], name="wavecorr_frame")
+    model.meta.wcs.insert_frame("slit_frame", Identity(2) & Shift(0.1), wcorr_frame)
+    assert_allclose(cache.evaluate(model)[2], before + 1.1)
+    assert len(cache) == 3
+
+
+@pytest.mark.parametrize(
+    "transform, other",
+    [
+        # Models differing only by attributes other than parameters
+        (Mapping((0, 1)) | (Shift(1) & Scale(2)), Mapping((1, 0)) | (Shift(1) & Scale(2))),
+        (
+            Tabular1D(points=[1.0, 2.0], lookup_table=[1.0, 2.0]) & Identity(1),
+            Tabular1D(points=[1.0, 2.0], lookup_table=[1.0, 3.0]) & Identity(1),
+        ),
+        (
+            Tabular1D(points=[1.0, 2.0], lookup_table=[1.0, 2.0], fill_value=0.0) & Identity(1),
+            Tabular1D(points=[1.0, 2.0], lookup_table=[1.0, 2.0]) & Identity(1),
+        ),
+    ],
+)
+def test_wcs_fingerprint(transform, other):
+    def make_wcs(forward):
+        det = cf.Frame2D(name="detector", axes_order=(0, 1))
+        out = cf.Frame2D(name="out", axes_order=(0, 1))
+        return wcs.WCS([(det, forward), (out, None)])
+
+    assert wcs_fingerprint(make_wcs(transform)) == wcs_fingerprint(make_wcs(transform.copy()))
+    assert wcs_fingerprint(make_wcs(transform)) != wcs_fingerprint(make_wcs(other))
+
+
+def test_coordinate_grid_cache_eviction():
+    model = create_model()
+    cache = CoordinateGridCache()
+    assert not cache.enabled
+    cache.evaluate(model)
+    cache.evaluate(model)
+    assert len(cache) == 0
+    assert cache.report() is None
+
+    # Room for one grid of 3 x 10 x 10 values
+    cache.configure(3 * 100 * 8)
+    first = cache.evaluate(model)
+    cache.evaluate(model, [("detector", "slit_frame")])
+    assert len(cache) == 1
+    assert cache.evaluate(model)[2] is not first[2]
+
+
+def test_get_wavelengths_cached(coordinate_cache):
+    model = create_model()
+    del model.wavelength
+    wl = get_wavelengths(model)
+    assert_allclose(wl, create_mock_wl())
+
+    # The returned array is a writeable copy of the cached one
+    wl[0, 0] = -1.0
+    assert_allclose(get_wavelengths(model), create_mock_wl())
+    assert coordinate_cache.nreused >= 1
@@ -1,11 +1,290 @@
+from collections import OrderedDict
+import hashlib
+import logging
+import time
 import warnings
 
 import numpy as np
+from astropy.modeling import CompoundModel, Model, Parameter
 
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
 
 WFSS_EXPTYPES = ["NIS_WFSS", "NRC_WFSS", "NRC_GRISM", "NRC_TSGRISM"]
 
 
+class CoordinateGridCache:
+    """
+    Cache of WCS coordinates evaluated on the pixel grid of a datamodel.
+
+    Several steps of a pipeline evaluate the WCS of the same exposure or
+    slit on the same pixels, e.g. to compute uncorrected wavelengths.
+    Steps work on copies of their input, so cached coordinates are
+    identified by a fingerprint of the WCS transforms and bounding box,
+    together with the file name and slit name of the model, rather than by
+    the WCS object. Any change to the WCS, such as the frame inserted by
+    ``wavecorr``, leads to new coordinates being computed.
+
+    Coordinates are kept up to ``max_memory`` bytes, evicting the least
+    recently used first. Cached arrays are read-only. While enabled, the
+    cache also keeps statistics on the time spent computing coordinates and
+    the time saved by reusing them.
+    """
+
+    def __init__(self, max_memory=0):
+        """
+        Initialize an empty cache.
+
+        Parameters
+        ----------
+        max_memory : float, optional
+            Maximum memory, in bytes, used by cached coordinates.
+            If 0, the cache is disabled.
+        """
+        self._grids = OrderedDict()
+        self._nbytes = 0
+        self.max_memory = 0
+        self.reset_statistics()
+        self.configure(max_memory)
+
+    @property
+    def enabled(self):  # numpydoc ignore=RT01
+        """Whether coordinates are cached."""
+        return self.max_memory > 0
+
+    @property
+    def nbytes(self):  # numpydoc ignore=RT01
+        """Memory used by cached coordinates, in bytes."""
+        return self._nbytes
+
+    def __len__(self):
+        return len(self._grids)
+
+    def configure(self, max_memory):
+        """
+        Set the memory limit of the cache.
+
+        Parameters
+        ----------
+        max_memory : float
+            Maximum memory, in bytes, used by cached coordinates.
+            If 0, the cache is disabled and cleared.
+        """
+        self.max_memory = max(max_memory, 0)
+        self._evict()
+
+    def clear(self):
+        """Remove all cached coordinates, keeping the statistics."""
+        self._grids.clear()
+        self._nbytes = 0
+
+    def reset_statistics(self):
+        """Reset the usage statistics."""
+        self.ncomputed = 0
+        self.nreused = 0
+        self.time_computing = 0.0
+        self.time_saved = 0.0
+
+    def statistics(self):
+        """
+        Return the usage statistics of the cache.
+
+        Returns
+        -------
+        dict
+            The number of coordinate grids computed and reused, the time spent
+            computing them and the time saved by reusing them, in seconds.
+        """
+        return {
+            "ncomputed": self.ncomputed,
+            "nreused": self.nreused,
+            "time_computing": self.time_computing,
+            "time_saved": self.time_saved,
+        }
+
+    def report(self, since=None):
+        """
+        Summarize the usage of the cache.
+
+        Parameters
+        ----------
+        since : dict or None, optional
+            Statistics previously returned by `statistics`. If provided,
+            only the usage since then is summarized.
+
+        Returns
+        -------
+        str or None
+            The summary, or None if no coordinates were computed or reused.
+        """
+        stats = self.statistics()
+        if since is not None:
+            stats = {key: value - since[key] for key, value in stats.items()}
+        if stats["ncomputed"] == 0 and stats["nreused"] == 0:
+            return None
+        return (
+            f"Coordinate grid cache: computed {stats['ncomputed']} grids "
+            f"in {stats['time_computing']:.2f} s; reused {stats['nreused']} grids, "
+            f"saving {stats['time_saved']:.2f} s"
+        )
+
+    def evaluate(self, model, frames=None):
+        """
+        Evaluate the WCS of a model on the pixel grid of its data.
+
+        Parameters
+        ----------
+        model : `~jwst.datamodels.JwstDataModel`
+            The science data, or a slit from a `~jwst.datamodels.MultiSlitModel`,
+            with a WCS in ``meta.wcs``.
+        frames : list of tuple of str, optional
+            Pairs of (from_frame, to_frame) names, whose transforms are chained
+            and evaluated without the bounding box. If not provided, the full
+            WCS is evaluated, setting coordinates outside the bounding box to NaN.
+
+        Returns
+        -------
+        tuple of ndarray
+            The output coordinates for each pixel of the last two axes of
+            ``model.data``. The arrays are read-only if the cache is enabled.
+        """
+        wcs = model.meta.wcs
+        shape = model.data.shape[-2:]
+        key = None
+        if self.enabled:
+            frame_path = None if frames is None else tuple(tuple(pair) for pair in frames)
+            key = (
+                model.meta.filename,
+                getattr(model, "name", None),
+                wcs_fingerprint(wcs),
+                shape,
+                frame_path,
+            )
+            if key in self._grids:
+                self._grids.move_to_end(key)
+                coords, elapsed = self._grids[key]
+                self.nreused += 1
+                self.time_saved += elapsed
+                return coords
+
+        start = time.perf_counter()
+        grid = np.indices(shape, dtype=np.float64)
+        if frames is None:
+            coords = wcs(grid[1], grid[0])
+        else:
+            transform = wcs.get_transform(*frames[0])
+            for from_frame, to_frame in frames[1:]:
+                transform = transform | wcs.get_transform(from_frame, to_frame)
+            coords = transform(grid[1], grid[0])
+        if not isinstance(coords, tuple):
+            coords = (coords,)
+        if key is not None:
+            elapsed = time.perf_counter() - start
+            self.ncomputed += 1
+            self.time_computing += elapsed
+            for value in coords:
+                value.setflags(write=False)
+            self._grids[key] = (coords, elapsed)
+            self._nbytes += sum(value.nbytes for value in coords)
+            self._evict()
+        return coords
+
+    def _evict(self):
+        """Evict least recently used coordinates until within the memory limit."""
+        while self._nbytes > self.max_memory and self._grids:
+            _, (coords, _) = self._grids.popitem(last=False)
+            self._nbytes -= sum(value.nbytes for value in coords)
+
+
+# Attributes common to all astropy models that do not affect their evaluation,
+# or that are covered by the parameter values
+_MODEL_INTERNALS = {
+    "_name",
+    "_mconstraints",
+    "_param_metrics",
+    "_parameters",
+    "_constraints_cache",
+    "_input_units_strict",
+    "_input_units_allow_dimensionless",
+}
+
+
+def wcs_fingerprint(wcs):
+    """
+    Summarize the frames, transforms and bounding box of a WCS.
+
+    Parameters
+    ----------
+    wcs : `~gwcs.wcs.WCS`
+        The WCS object.
+
+    Returns
+    -------
+    str
+        A digest of the frame names, the transforms and the bounding box.
+    """
+    digest = hashlib.sha1()  # noqa: S324
+    for step in wcs.pipeline:
+        digest.update(str(getattr(step.frame, "name", step.frame)).encode())
+        _update_digest(digest, step.transform)
+    digest.update(repr(wcs.bounding_box).encode())
+    return digest.hexdigest()
+
+
+def _update_digest(digest, value):
+    """
+    Add a transform, or any value held by a transform, to a digest.
+
+    Models contribute their class, their parameter values and all other
+    instance attributes, such as the ``mapping`` of a `Mapping`, the
+    lookup tables of tabular models, or the slits and polynomial models
+    held by the JWST selector and dispersion models. Compound models
+    contribute their operator and both operands. Values of unknown types
+    contribute their ``repr``, so that values which cannot be summarized
+    reliably only lead to coordinates being computed again.
+
+    Parameters
+    ----------
+    digest : hashlib hash object
+        The digest to update.
+    value : object
+        The model, or attribute value, to add.
+    """
+    if isinstance(value, CompoundModel):
+        digest.update(f"({value.op}".encode())
+        _update_digest(digest, value.left)
+        _update_digest(digest, value.right)
+        digest.update(b")")
+    elif isinstance(value, Model):
+        digest.update(f"{type(value).__module__}.{type(value).__qualname__}".encode())
+        digest.update(np.asarray(value.parameters, dtype=np.float64).tobytes())
+        for name, attribute in sorted(vars(value).items()):
+            if name in _MODEL_INTERNALS or isinstance(attribute, Parameter):
+                continue
+            digest.update(name.encode())
+            _update_digest(digest, attribute)
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype.str}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value, key=repr):
+            digest.update(repr(key).encode())
+            _update_digest(digest, value[key])
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}[".encode())
+        for item in value:
+            _update_digest(digest, item)
+        digest.update(b"]")
+    else:
+        digest.update(repr(value).encode())
+
+
+# Cache shared by all steps in this process, configured by the pipelines that use it
+COORDINATE_GRID_CACHE = CoordinateGridCache()
+
+
 def get_wavelengths(model, exp_type="", order=None, use_wavecorr=None):
     """
     Read or compute wavelengths.
@@ -68,10 +347,8 @@ def get_wavelengths(model, exp_type="", order=None, use_wavecorr=None):
             and hasattr(model.meta, "wcs")
             and "wavecorr_frame" in model.meta.wcs.available_frames
         ):
-            wcs = model.meta.wcs
-            detector2slit = wcs.get_transform("detector", "slit_frame")
-            wavecorr2world = wcs.get_transform("wavecorr_frame", "world")
-            wl_array = (detector2slit | wavecorr2world)(grid[1], grid[0])[2]
+            frames = [("detector", "slit_frame"), ("wavecorr_frame", "world")]
+            wl_array = COORDINATE_GRID_CACHE.evaluate(model, frames)[2].copy()
             return wl_array
 
     # If no existing wavelength array, compute one
@@ -91,6 +368,6 @@ def get_wavelengths(model, exp_type="", order=None, use_wavecorr=None):
                     # Keep wavelength; ignore RA and Dec
                     wl_array[..., j, i] = wcs(i, j)[2]
         else:
-            wl_array = wcs(grid[1], grid[0])[2]
+            wl_array = COORDINATE_GRID_CACHE.evaluate(model)[2].copy()
 
     return wl_array
@@ -46,8 +46,8 @@ class LinearityStep(Step):
             # Open the linearity reference file data model
             lin_model = datamodels.LinearityModel(self.lin_name)
 
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             # Do the linearity correction
             result = linearity.do_correction(result, lin_model)
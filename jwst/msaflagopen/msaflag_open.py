@@ -12,6 +12,7 @@ from stdatamodels.jwst.transforms.models import Slit
 
 from jwst.assign_wcs.nirspec import (
     generate_compound_bbox,
+    nrs_wcs_evaluate_slits,
     nrs_wcs_set_input,
     slitlets_wcs,
     log as nirspec_log,
@@ -103,18 +104,27 @@ def flag(input_datamodel, failed_slitlets, wcs_refnames):
     temporary_copy.meta.wcs.bounding_box = generate_compound_bbox(temporary_copy, failed_slitlets)
 
     dq_array = input_datamodel.dq
+    slit_coords = {}
+    slit_indices = {}
     for slitlet in failed_slitlets:
         # Pick the WCS for this slitlet from the WCS of the exposure
         thiswcs = nrs_wcs_set_input(temporary_copy, slitlet.name)
 
         # Convert the bounding box for this slitlet to a set of indices to use as a slice
         xmin, xmax, ymin, ymax = boundingbox_to_indices(temporary_copy, thiswcs.bounding_box)
+        slit_indices[slitlet.name] = xmin, xmax, ymin, ymax
 
         # Make a grid of points within the slice
         y_indices, x_indices = np.mgrid[ymin:ymax, xmin:xmax]
+        slit_coords[slitlet.name] = x_indices, y_indices
 
-        # Calculate the arrays of coordinates for each pixel in the slice
-        coordinate_array = thiswcs(x_indices, y_indices)
+    # Calculate the arrays of coordinates for each pixel in the slices,
+    # for all slitlets together
+    coordinate_arrays = nrs_wcs_evaluate_slits(temporary_copy, slit_coords)
+
+    for slitlet in failed_slitlets:
+        xmin, xmax, ymin, ymax = slit_indices[slitlet.name]
+        coordinate_array = coordinate_arrays[slitlet.name]
 
         # The coordinate_array is a tuple of arrays, one for each output coordinate
         # In this case there should be 3 arrays, one each for RA, Dec and Wavelength
@@ -37,6 +37,9 @@ def detect_outliers(
     fillval,
     in_memory,
     make_output_path,
+    max_cores="1",
+    median_method="exact",
+    median_nbins=64,
 ):
     """
     Flag outliers in imaging data.
@@ -80,6 +83,14 @@ def detect_outliers(
     make_output_path : function
         The functools.partial instance to pass to save_blot. Must be
         specified if save_blot is True.
+    max_cores : str or int, optional
+        Number of processes used to drizzle exposure groups in parallel.
+        May be an integer, 'none', 'quarter', 'half' or 'all'.
+    median_method : {"exact", "approximate"}, optional
+        The method used to compute the median image. "approximate" uses
+        per-pixel histograms, limiting memory use for large stacks.
+    median_nbins : int, optional
+        Number of histogram bins per pixel for the approximate median.
 
     Returns
     -------
@@ -114,6 +125,9 @@ def detect_outliers(
             maskpt,
             save_intermediate_results=save_intermediate_results,
             make_output_path=make_output_path,
+            max_cores=max_cores,
+            median_method=median_method,
+            median_nbins=median_nbins,
         )
     else:
         median_data, median_wcs = median_without_resampling(
@@ -123,6 +137,8 @@ def detect_outliers(
             good_bits,
             save_intermediate_results=save_intermediate_results,
             make_output_path=make_output_path,
+            median_method=median_method,
+            median_nbins=median_nbins,
         )
 
     # Perform outlier detection using statistical comparisons between
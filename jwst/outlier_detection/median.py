@@ -0,0 +1,281 @@
+"""Approximate median computation over large stacks of images."""
+
+import logging
+import warnings
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+
+__all__ = ["ApproximateMedianComputer"]
+
+# Number of valid values buffered per pixel before its histogram range is set
+CALIBRATION_VALUES = 9
+
+# Half-width of the histogram range, in units of the robust standard
+# deviation of the buffered values
+RANGE_NSIGMA = 5.0
+
+# Minimum number of pixels calibrated together for their typical noise
+# to set the lower bound on the noise estimate of later pixels
+MIN_FLOOR_PIXELS = 100
+
+# Number of pixels for which histograms are evaluated at once
+EVALUATE_BLOCK_SIZE = 1 << 16
+
+
+class ApproximateMedianComputer:
+    """
+    Compute an approximate per-pixel median in a single streaming pass.
+
+    Each appended image is folded into a per-pixel histogram with a fixed
+    number of bins, so memory use and run time depend on the image size
+    and the number of bins but not on the number of images in the stack.
+
+    The histogram range is set separately for each pixel: the first
+    few valid (non-NaN) values of a pixel are buffered exactly, and
+    the range is centered on their median with a half-width of
+    ``RANGE_NSIGMA`` times their robust standard deviation. Values
+    falling outside the range are counted in underflow and overflow
+    bins, bounded by the running minimum and maximum.
+
+    The median is estimated from the cumulative histogram, interpolating
+    linearly within the bin containing the median rank. When the median
+    falls within the histogram range, the error is no larger than the bin
+    width, ``2 * RANGE_NSIGMA * sigma / nbins``, and is typically much
+    smaller. If most of the buffered values of a pixel are outliers (e.g.
+    cosmic rays), the median may fall in an underflow or overflow bin and
+    is then only bounded by the data extrema. Pixels with no more valid
+    values than the calibration buffer holds are computed exactly.
+
+    This class provides the same ``append``/``evaluate`` interface as
+    `stcal.outlier_detection.median.MedianComputer`.
+    """
+
+    def __init__(self, full_shape, nbins=64, dtype="float32"):
+        """
+        Initialize the histogram and calibration buffers.
+
+        Parameters
+        ----------
+        full_shape : tuple
+            The shape of the full input stack, (n_images, ny, nx).
+        nbins : int, optional
+            The number of histogram bins per pixel. Larger values reduce the
+            approximation error at the cost of memory.
+        dtype : str or np.dtype, optional
+            The data type of the input data.
+        """
+        if nbins < 2:
+            raise ValueError(f"Number of histogram bins must be at least 2; got {nbins}")
+
+        self.full_shape = tuple(full_shape)
+        self.nbins = nbins
+        self.dtype = np.dtype(dtype)
+
+        nimages = self.full_shape[0]
+        npix = int(np.prod(self.full_shape[1:]))
+        self._npix = npix
+        self._ncal = max(1, min(CALIBRATION_VALUES, nimages))
+
+        # Exact values for pixels whose histogram range is not yet set
+        self._buffer = np.full((self._ncal, npix), np.nan, dtype=self.dtype)
+        self._nbuffer = np.zeros(npix, dtype=np.min_scalar_type(self._ncal))
+        self._calibrated = np.zeros(npix, dtype=bool)
+
+        # Histogram bins, with bin 0 for underflow, bin nbins + 1 for overflow,
+        # and a last bin collecting ignored values from whole-image updates
+        self._counts = np.zeros((npix, nbins + 3), dtype=np.min_scalar_type(nimages))
+        self._offsets = np.arange(npix) * (nbins + 3)
+        self._lower = np.zeros(npix, dtype=np.float64)
+        self._inv_width = np.zeros(npix, dtype=np.float64)
+        self._min = np.full(npix, np.inf, dtype=self.dtype)
+        self._max = np.full(npix, -np.inf, dtype=self.dtype)
+        self._sigma_floor = 0.0
+
+    def append(self, data, idx=None):  # noqa: ARG002
+        """
+        Fold one image into the running median estimate.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            The image to add. Must have shape ``full_shape[1:]``.
+        idx : int, optional
+            The index of the image in the stack. Images may be appended
+            in any order, so this argument is accepted for compatibility
+            with `~stcal.outlier_detection.median.MedianComputer` and
+            otherwise ignored.
+        """
+        if data.shape != self.full_shape[1:]:
+            raise ValueError(
+                f"Data shape {data.shape} does not match image shape {self.full_shape[1:]}"
+            )
+        values = data.reshape(-1)
+        valid = np.isfinite(values)
+
+        # Bin values for pixels that already have a histogram range
+        binned = valid & self._calibrated
+        if binned.any():
+            self._add_image_to_histogram(values, binned)
+
+        # Buffer values for the remaining pixels
+        buffered = np.flatnonzero(valid & ~self._calibrated)
+        if buffered.size == 0:
+            return
+        self._buffer[self._nbuffer[buffered], buffered] = values[buffered]
+        self._nbuffer[buffered] += 1
+
+        # Set the histogram range for pixels with a full buffer
+        full = buffered[self._nbuffer[buffered] == self._ncal]
+        if full.size > 0 and self._ncal < self.full_shape[0]:
+            self._calibrate(full)
+
+    def evaluate(self):
+        """
+        Compute the approximate median image.
+
+        Returns
+        -------
+        np.ndarray
+            The median image, with shape ``full_shape[1:]``. Pixels with
+            no valid data are set to NaN.
+        """
+        median = np.full(self._npix, np.nan, dtype=self.dtype)
+
+        # Pixels with few values are computed exactly from the buffer
+        exact = np.flatnonzero(~self._calibrated & (self._nbuffer > 0))
+        if exact.size > 0:
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", category=RuntimeWarning)
+                median[exact] = np.nanmedian(self._buffer[:, exact], axis=0)
+
+        # Evaluate histograms in blocks to limit the size of temporary arrays
+        calibrated = np.flatnonzero(self._calibrated)
+        for start in range(0, calibrated.size, EVALUATE_BLOCK_SIZE):
+            pixels = calibrated[start : start + EVALUATE_BLOCK_SIZE]
+            median[pixels] = self._histogram_median(pixels)
+
+        return median.reshape(self.full_shape[1:])
+
+    def _calibrate(self, pixels):
+        """Set the histogram range from the buffered values and bin them."""
+        buffer = np.sort(self._buffer[:, pixels], axis=0)
+        center = np.median(buffer, axis=0)
+        sigma = 1.4826 * np.median(np.abs(buffer - center), axis=0)
+
+        # A few buffered values may by chance cluster tightly, so the noise
+        # estimate is bounded below by the typical noise of the image, and
+        # the range is widened (by up to a factor of 2) to span the buffered
+        # values once the most extreme ones on each side are excluded.
+        if pixels.size >= MIN_FLOOR_PIXELS or self._sigma_floor == 0:
+            self._sigma_floor = 0.5 * float(np.median(sigma))
+        sigma = np.maximum(sigma, self._sigma_floor)
+        half_range = RANGE_NSIGMA * sigma.astype(np.float64)
+        trim = (self._ncal - 1) // 4
+        extent = np.maximum(buffer[-1 - trim] - center, center - buffer[trim])
+        half_range = np.clip(2.0 * extent, half_range, 2.0 * half_range)
+
+        # Guard against degenerate ranges from repeated values
+        floor = np.maximum(np.abs(center), 1.0) * np.finfo(self.dtype).eps * self.nbins
+        half_range = np.maximum(half_range, floor)
+
+        self._lower[pixels] = center - half_range
+        self._inv_width[pixels] = self.nbins / (2.0 * half_range)
+        self._calibrated[pixels] = True
+
+        for row in buffer:
+            self._add_to_histogram(pixels, row)
+
+    def _bin_index(self, values, lower, inv_width):
+        """
+        Compute histogram bin numbers, including under- and overflow bins.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The values to bin.
+        lower : np.ndarray
+            The lower edge of the histogram range of each value.
+        inv_width : np.ndarray
+            The inverse of the bin width of each value.
+
+        Returns
+        -------
+        np.ndarray
+            The bin number of each value, 0 for underflow and ``nbins + 1``
+            for overflow.
+        """
+        with np.errstate(invalid="ignore"):
+            position = (values - lower) * inv_width
+            np.floor(position, out=position)
+            np.clip(position, -1, self.nbins, out=position)
+            bins = position.astype(np.intp)
+        bins += 1
+        return bins
+
+    def _add_image_to_histogram(self, values, mask):
+        """Increment the histogram bin of each value of a whole image where mask is set."""
+        bins = self._bin_index(values, self._lower, self._inv_width)
+        np.copyto(bins, self.nbins + 2, where=~mask)
+
+        # Each pixel occurs once, so unbuffered fancy-index addition is safe
+        bins += self._offsets
+        self._counts.reshape(-1)[bins] += 1
+        np.fmin(self._min, values, out=self._min, where=mask)
+        np.fmax(self._max, values, out=self._max, where=mask)
+
+    def _add_to_histogram(self, pixels, values):
+        """Increment the histogram bin of each value for a set of unique pixels."""
+        bins = self._bin_index(values, self._lower[pixels], self._inv_width[pixels])
+        bins += self._offsets[pixels]
+        self._counts.reshape(-1)[bins] += 1
+        self._min[pixels] = np.minimum(self._min[pixels], values)
+        self._max[pixels] = np.maximum(self._max[pixels], values)
+
+    def _histogram_median(self, pixels):
+        """
+        Interpolate the median value from the cumulative histograms.
+
+        Parameters
+        ----------
+        pixels : np.ndarray
+            Indices of the calibrated pixels to evaluate.
+
+        Returns
+        -------
+        np.ndarray
+            The approximate median of each pixel.
+        """
+        counts = self._counts[pixels, : self.nbins + 2]
+        cumulative = np.cumsum(counts, axis=1, dtype=np.int32)
+        npixvals = cumulative[:, -1]
+
+        # Fractional, zero-based rank of the median
+        rank = 0.5 * (npixvals - 1)
+        median_bin = np.argmax(cumulative > rank[:, np.newaxis], axis=1)
+        index = np.arange(pixels.size)
+        in_bin = counts[index, median_bin]
+        below = cumulative[index, median_bin] - in_bin
+
+        # Edges of the median bin, using the data extrema for under/overflow
+        lower = self._lower[pixels]
+        width = 1.0 / self._inv_width[pixels]
+        bin_low = lower + (median_bin - 1) * width
+        bin_width = width
+        underflow = median_bin == 0
+        overflow = median_bin == self.nbins + 1
+        bin_low[underflow] = self._min[pixels][underflow]
+        bin_width[underflow] = lower[underflow] - bin_low[underflow]
+        bin_low[overflow] = lower[overflow] + self.nbins * width[overflow]
+        bin_width[overflow] = self._max[pixels][overflow] - bin_low[overflow]
+
+        n_out = np.count_nonzero(underflow | overflow)
+        if n_out > 0:
+            log.debug(f"Approximate median outside histogram range for {n_out} pixels")
+
+        # Assume values are evenly spread within the bin
+        fraction = (rank - below + 0.5) / in_bin
+        return bin_low + np.clip(fraction, 0.0, 1.0) * bin_width
@@ -53,6 +53,9 @@ class OutlierDetectionStep(Step):
         good_bits = string(default="~DO_NOT_USE")  # DQ flags to allow
         search_output_file = boolean(default=False)
         in_memory = boolean(default=True) # in_memory flag ignored if run within the pipeline; set at pipeline level instead
+        maximum_cores = string(default='1') # cores for drizzling groups in parallel. Can be an integer, 'half', 'quarter', or 'all'
+        median_method = option('exact', 'approximate', default='exact') # approximate uses per-pixel histograms to bound memory
+        median_nbins = integer(min=2, default=64) # histogram bins per pixel for the approximate median
     """  # noqa: E501
 
     def process(self, input_data):
@@ -92,6 +95,7 @@ class OutlierDetectionStep(Step):
                 self.rolling_window_width,
                 snr1,
                 self.make_output_path,
+                in_memory=self.in_memory,
             )
         elif mode == "coron":
             result_models = coron.detect_outliers(
@@ -120,6 +124,9 @@ class OutlierDetectionStep(Step):
                 self.fillval,
                 self.in_memory,
                 self.make_output_path,
+                max_cores=self.maximum_cores,
+                median_method=self.median_method,
+                median_nbins=self.median_nbins,
             )
         elif mode == "spec":
             result_models = spec.detect_outliers(
@@ -138,6 +145,9 @@ class OutlierDetectionStep(Step):
                 self.kernel,
                 self.fillval,
                 self.make_output_path,
+                max_cores=self.maximum_cores,
+                median_method=self.median_method,
+                median_nbins=self.median_nbins,
             )
         elif mode == "ifu":
             result_models = ifu.detect_outliers(
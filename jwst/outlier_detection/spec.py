@@ -36,6 +36,9 @@ def detect_outliers(
     kernel,
     fillval,
     make_output_path,
+    max_cores="1",
+    median_method="exact",
+    median_nbins=64,
 ):
     """
     Flag outliers in slit-like spectroscopic data.
@@ -76,6 +79,14 @@ def detect_outliers(
     make_output_path : function
         The functools.partial instance to pass to save_blot. Must be
         specified if save_blot is True.
+    max_cores : str or int, optional
+        Number of processes used to drizzle exposure groups in parallel.
+        May be an integer, 'none', 'quarter', 'half' or 'all'.
+    median_method : {"exact", "approximate"}, optional
+        The method used to compute the median image. "approximate" uses
+        per-pixel histograms, limiting memory use for large stacks.
+    median_nbins : int, optional
+        Number of histogram bins per pixel for the approximate median.
 
     Returns
     -------
@@ -118,6 +129,9 @@ def detect_outliers(
             save_intermediate_results=save_intermediate_results,
             make_output_path=make_output_path,
             return_error=True,
+            max_cores=max_cores,
+            median_method=median_method,
+            median_nbins=median_nbins,
         )
     else:
         median_data, median_wcs, median_err = median_without_resampling(
@@ -128,6 +142,8 @@ def detect_outliers(
             save_intermediate_results=save_intermediate_results,
             make_output_path=make_output_path,
             return_error=True,
+            median_method=median_method,
+            median_nbins=median_nbins,
         )
 
     # Perform outlier detection using statistical comparisons between
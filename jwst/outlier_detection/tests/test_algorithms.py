@@ -1,6 +1,9 @@
 import numpy as np
+import pytest
+from stdatamodels.jwst import datamodels
 
-from jwst.outlier_detection.tso import moving_median_over_zeroth_axis
+from jwst.outlier_detection import tso
+from jwst.outlier_detection.tso import compute_rolling_median, moving_median_over_zeroth_axis
 
 
 def test_rolling_median():
@@ -13,3 +16,40 @@ def test_rolling_median():
     result = moving_median_over_zeroth_axis(arr, w)
     expected = expected_time_axis[:, np.newaxis, np.newaxis] * spatial_axis[np.newaxis, :, :]
     assert np.allclose(result, expected)
+
+
+def rolling_median_loop(arr, w):
+    """Rolling median computed window by window."""
+    arr = arr.astype(np.float64)
+    nwindows = arr.shape[0] - w + 1
+    windows = np.array([np.median(arr[i : i + w], axis=0) for i in range(nwindows)])
+    index = np.clip(np.arange(arr.shape[0]) - w // 2, 0, nwindows - 1)
+    return windows[index]
+
+
+@pytest.mark.parametrize("w", [2, 5, 10, 11, 24, 40])
+def test_rolling_median_windows(monkeypatch, w):
+    """Direct and incremental medians match medians of each window."""
+    monkeypatch.setattr(tso, "ROLLING_MEDIAN_BUFFER_SIZE", 1 << 16)
+    rng = np.random.default_rng(w)
+    arr = rng.normal(size=(40, 6, 7)).astype(np.float32)
+    arr[rng.uniform(size=arr.shape) < 0.01] = np.nan
+    arr[:, 0, 0] = np.round(arr[:, 0, 0])
+    arr[:, 0, 1] = 1.0
+    arr[10:, 1, 1] = np.inf
+
+    result = moving_median_over_zeroth_axis(arr, w)
+    np.testing.assert_array_equal(result, rolling_median_loop(arr, w))
+
+
+def test_rolling_median_on_disk():
+    """The rolling median can be stored in a temporary file."""
+    rng = np.random.default_rng(1)
+    model = datamodels.CubeModel(data=rng.normal(size=(30, 5, 5)).astype(np.float32))
+    model.wht = np.ones(model.shape, dtype=np.float32)
+    model.wht[3, 2, 2] = 0.0
+    expected = rolling_median_loop(np.where(model.wht > 0.5, model.data, np.nan), 12)
+
+    result = compute_rolling_median(model, 0.5, w=12, in_memory=False)
+    assert isinstance(result, np.memmap)
+    np.testing.assert_array_equal(result, expected)
@@ -0,0 +1,130 @@
+import logging
+import time
+
+import numpy as np
+import pytest
+from stcal.outlier_detection.median import MedianComputer, nanmedian3D
+
+from jwst.outlier_detection.median import ApproximateMedianComputer, CALIBRATION_VALUES
+
+log = logging.getLogger(__name__)
+
+
+def _make_stack(nimages, shape, cr_fraction=0.02, nan_fraction=0.1, seed=42):
+    """Make a stack of noisy images with cosmic rays and NaNs."""
+    rng = np.random.default_rng(seed)
+    background = rng.uniform(10.0, 100.0, size=shape)
+    stack = background + rng.normal(0.0, 1.0, size=(nimages,) + shape)
+    stack[rng.random(stack.shape) < cr_fraction] += 1000.0
+    stack[rng.random(stack.shape) < nan_fraction] = np.nan
+    return stack.astype(np.float32)
+
+
+def _approximate_median(stack, nbins=64):
+    computer = ApproximateMedianComputer(stack.shape, nbins=nbins, dtype=stack.dtype)
+    for i, image in enumerate(stack):
+        computer.append(image, i)
+    return computer.evaluate()
+
+
+@pytest.mark.parametrize("nbins", [16, 64])
+def test_approximate_median_accuracy(nbins):
+    stack = _make_stack(40, (50, 60))
+    expected = nanmedian3D(stack, overwrite_input=False)
+    result = _approximate_median(stack, nbins=nbins)
+
+    assert result.shape == expected.shape
+    assert result.dtype == stack.dtype
+
+    # Noise is 1, so the range spans no more than 20 units
+    error = np.abs(result - expected)
+    assert np.all(error < 20.0 / nbins)
+    assert np.mean(error) < 0.1
+
+
+def test_approximate_median_exact_for_short_stack():
+    stack = _make_stack(CALIBRATION_VALUES, (20, 30))
+    result = _approximate_median(stack)
+    np.testing.assert_allclose(result, nanmedian3D(stack, overwrite_input=False), rtol=1e-6)
+
+
+def test_approximate_median_nan_handling():
+    stack = _make_stack(20, (10, 10), nan_fraction=0.0)
+
+    # One pixel with no valid values, one with only a few
+    stack[:, 0, 0] = np.nan
+    stack[3:, 1, 1] = np.nan
+
+    result = _approximate_median(stack)
+    expected = nanmedian3D(stack, overwrite_input=False)
+    assert np.isnan(result[0, 0])
+    np.testing.assert_allclose(result[1, 1], expected[1, 1], rtol=1e-6)
+    assert np.isfinite(result).sum() == result.size - 1
+
+
+def test_approximate_median_constant():
+    stack = np.full((30, 5, 5), 7.5, dtype=np.float32)
+    result = _approximate_median(stack)
+    np.testing.assert_allclose(result, 7.5, rtol=1e-5)
+
+
+def test_approximate_median_ignores_invalid_extrema():
+    # Most values fall above the histogram range set from the first
+    # images, so the median is bounded by the maximum of the valid values
+    rng = np.random.default_rng(7)
+    stack = np.full((30, 4, 4), 100.0, dtype=np.float32)
+    stack[:CALIBRATION_VALUES] = rng.normal(10.0, 1.0, (CALIBRATION_VALUES, 4, 4))
+    stack[15, 0, 0] = np.inf
+    stack[15, 1, 1] = -np.inf
+
+    result = _approximate_median(stack)
+    assert np.all(np.isfinite(result))
+    assert np.all(result <= 100.0)
+    assert np.all(result > 10.0)
+
+
+def test_approximate_median_append_order():
+    stack = _make_stack(25, (10, 10), nan_fraction=0.0)
+    computer = ApproximateMedianComputer(stack.shape)
+    for i in range(stack.shape[0])[::-1]:
+        computer.append(stack[i], i)
+    result = computer.evaluate()
+    assert np.all(np.abs(result - nanmedian3D(stack, overwrite_input=False)) < 20.0 / 64)
+
+
+def test_approximate_median_bad_shape():
+    computer = ApproximateMedianComputer((5, 10, 10))
+    with pytest.raises(ValueError, match="does not match"):
+        computer.append(np.zeros((10, 11), dtype=np.float32))
+
+
+def test_approximate_median_bad_nbins():
+    with pytest.raises(ValueError, match="at least 2"):
+        ApproximateMedianComputer((5, 10, 10), nbins=1)
+
+
+@pytest.mark.slow
+def test_approximate_median_benchmark():
+    """Compare accuracy and run time of the approximate and exact medians."""
+    stack = _make_stack(100, (512, 512))
+
+    start = time.perf_counter()
+    exact_computer = MedianComputer(stack.shape, True, None, stack.dtype)
+    for i, image in enumerate(stack):
+        exact_computer.append(image, i)
+    expected = exact_computer.evaluate()
+    exact_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = _approximate_median(stack)
+    approx_time = time.perf_counter() - start
+
+    error = np.abs(result - expected)
+    log.info(
+        f"Exact median: {exact_time:.2f} s; approximate median: {approx_time:.2f} s; "
+        f"max error: {error.max():.3f}; mean error: {error.mean():.4f}"
+    )
+    # Pixels whose first few values are mostly outliers may have the median
+    # outside the histogram range, so the bound is checked statistically
+    assert np.percentile(error, 99.99) < 20.0 / 64
+    assert np.mean(error) < 0.05
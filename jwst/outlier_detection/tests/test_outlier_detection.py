@@ -665,6 +665,19 @@ def test_same_median_on_disk(three_sci_as_asn, tmp_cwd):
     assert np.allclose(median_on_disk, median_in_memory, equal_nan=True)
 
 
+def test_approximate_median_without_resampling(three_sci_as_asn, tmp_cwd):
+    """Test the approximate median matches the exact one for a short stack"""
+    lib = ModelLibrary(three_sci_as_asn, on_disk=False)
+    median_exact, _ = median_without_resampling(lib, 0.7, "ivm", "~DO_NOT_USE")
+    median_approx, _ = median_without_resampling(
+        lib, 0.7, "ivm", "~DO_NOT_USE", median_method="approximate", median_nbins=16
+    )
+    assert np.allclose(median_approx, median_exact, equal_nan=True)
+
+    with pytest.raises(ValueError, match="Unknown median method"):
+        median_without_resampling(lib, 0.7, "ivm", "~DO_NOT_USE", median_method="mode")
+
+
 def test_drizzle_and_median_with_resample(three_sci_as_asn, tmp_cwd):
     lib = ModelLibrary(three_sci_as_asn, on_disk=False)
 
@@ -697,3 +710,47 @@ def make_resamp(input_models):
         compute_err="driz_err",
     )
     return resamp
+
+
+@pytest.mark.parametrize("save_intermediate", [False, True])
+def test_median_with_resampling_parallel(three_sci_as_asn, tmp_cwd, save_intermediate):
+    """Test that drizzling groups in parallel gives the same median as serial"""
+    lib = ModelLibrary(three_sci_as_asn, on_disk=False)
+    make_output_path = OutlierDetectionStep().make_output_path
+
+    resamp = make_resamp(lib)
+    median_serial, _, err_serial = median_with_resampling(
+        lib,
+        resamp,
+        0.7,
+        return_error=True,
+        save_intermediate_results=save_intermediate,
+        make_output_path=make_output_path,
+    )
+    if save_intermediate:
+        serial_median_file = glob("*median.fits")[0]
+        with datamodels.open(serial_median_file) as median_model:
+            serial_meta = median_model.meta.instance.copy()
+        os.remove(serial_median_file)
+
+    resamp = make_resamp(lib)
+    median_parallel, wcs, err_parallel = median_with_resampling(
+        lib,
+        resamp,
+        0.7,
+        return_error=True,
+        save_intermediate_results=save_intermediate,
+        make_output_path=make_output_path,
+        max_cores=2,
+    )
+
+    assert isinstance(wcs, WCS)
+    assert_allclose(median_parallel, median_serial, equal_nan=True)
+    assert_allclose(err_parallel, err_serial, equal_nan=True)
+
+    if save_intermediate:
+        assert len(glob("*outlier_i2d.fits")) == len(lib)
+        with datamodels.open(glob("*median.fits")[0]) as median_model:
+            assert_allclose(median_model.data, median_serial, equal_nan=True)
+            assert median_model.meta.filename == serial_meta["filename"]
+            assert median_model.meta.exposure.type == serial_meta["exposure"]["type"]
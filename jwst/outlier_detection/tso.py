@@ -1,4 +1,7 @@
+import tempfile
+
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from jwst.resample.resample_utils import build_mask
 
 from jwst import datamodels as dm
@@ -12,6 +15,15 @@ import logging
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
+# Approximate memory, in bytes, used to compute the rolling median of a chunk of pixels
+ROLLING_MEDIAN_BUFFER_SIZE = 1 << 28
+
+# Windows narrower than this are sorted directly rather than incrementally
+SORTED_WINDOW_MIN_WIDTH = 10
+
+# Bytes used per value of a pixel in the rolling median computation
+_BYTES_PER_VALUE = 80
+
 
 __all__ = ["detect_outliers"]
 
@@ -24,6 +36,7 @@ def detect_outliers(
     rolling_window_width,
     snr,
     make_output_path,
+    in_memory=True,
 ):
     """
     Flag outliers in tso data.
@@ -44,6 +57,9 @@ def detect_outliers(
         The signal-to-noise ratio threshold for flagging outliers.
     make_output_path : callable
         A function that generates a path for saving intermediate results.
+    in_memory : bool, optional
+        If False, the rolling median is stored in a temporary file rather
+        than in memory.
 
     Returns
     -------
@@ -59,7 +75,9 @@ def detect_outliers(
     weight_threshold = compute_weight_threshold(weighted_cube.wht, maskpt)
 
     if (rolling_window_width > 1) and (rolling_window_width < weighted_cube.shape[0]):
-        medians = compute_rolling_median(weighted_cube, weight_threshold, w=rolling_window_width)
+        medians = compute_rolling_median(
+            weighted_cube, weight_threshold, w=rolling_window_width, in_memory=in_memory
+        )
 
     else:
         medians = nanmedian3D(weighted_cube.data, overwrite_input=False)
@@ -126,6 +144,7 @@ def compute_rolling_median(
     model: dm.CubeModel,  # type: ignore[name-defined]
     weight_threshold: np.ndarray,
     w: int = 25,
+    in_memory: bool = True,
 ) -> np.ndarray:
     """
     Set bad and low-weight data to NaN, then compute the rolling median over the time axis.
@@ -141,6 +160,10 @@ def compute_rolling_median(
     w : int
         The window size for the rolling median.
 
+    in_memory : bool
+        If False, the rolling median is stored in a memory-mapped temporary
+        file, which is deleted when the returned array is released.
+
     Returns
     -------
     np.ndarray
@@ -157,21 +180,36 @@ def compute_rolling_median(
 
     if w > sci.shape[0]:
         raise ValueError("Window size must be less than the number of integrations.")
-    meds = moving_median_over_zeroth_axis(sci, w)
+    if in_memory:
+        out = None
+    else:
+        # The memory map keeps the file until it is released
+        with tempfile.TemporaryFile() as median_file:
+            out = np.memmap(median_file, dtype=np.float64, mode="w+", shape=sci.shape)
+    meds = moving_median_over_zeroth_axis(sci, w, out=out)
 
     del sci
     return meds
 
 
-def moving_median_over_zeroth_axis(x: np.ndarray, w: int) -> np.ndarray:
+def moving_median_over_zeroth_axis(
+    x: np.ndarray, w: int, out: np.ndarray | None = None
+) -> np.ndarray:
     """
     Calculate the median of a moving window over the zeroth axis of an N-d array.
 
-    Algorithm works by expanding the array into an additional dimension
-    where the new axis has the same length as the window size. Each entry in that
-    axis is a copy of the original array shifted by 1 with respect to the previous
-    entry, such that the rolling median is simply the median over the new axis.
-    modified from https://stackoverflow.com/a/71154394, see link for more details.
+    The median of each window of ``w`` consecutive planes is assigned to the
+    plane at the center of the window. Planes closer than half a window to
+    either end of the array are given the median of the nearest full window.
+    Medians of windows containing NaN are NaN.
+
+    For windows of at least ``SORTED_WINDOW_MIN_WIDTH`` planes, the medians
+    of all windows are computed incrementally with sorted linked lists of
+    the values of each pixel (see `_rolling_window_medians`), so the run
+    time grows linearly with the number of planes and only logarithmically
+    with the window size. Medians of narrower windows are computed directly.
+    Pixels are processed in chunks so that the memory used, beyond the
+    input and output arrays, is bounded by ``ROLLING_MEDIAN_BUFFER_SIZE``.
 
     Parameters
     ----------
@@ -179,6 +217,10 @@ def moving_median_over_zeroth_axis(x: np.ndarray, w: int) -> np.ndarray:
         The input array.
     w : int
         The window size.
+    out : np.ndarray, optional
+        Contiguous float64 array with the same shape as ``x`` in which to
+        store the result, e.g. a memory-mapped file. If not provided, a
+        new array is allocated.
 
     Returns
     -------
@@ -187,17 +229,178 @@ def moving_median_over_zeroth_axis(x: np.ndarray, w: int) -> np.ndarray:
     """
     if w <= 1:
         raise ValueError("Rolling median window size must be greater than 1.")
-    shifted = np.zeros((x.shape[0] + w - 1, w, *x.shape[1:])) * np.nan
-    for idx in range(w - 1):
-        shifted[idx : -w + idx + 1, idx] = x
-    shifted[idx + 1 :, idx + 1] = x
-    medians: np.ndarray = np.median(shifted, axis=1)
-    for idx in range(w - 1):
-        medians[idx] = np.median(shifted[idx, : idx + 1])
-        medians[-idx - 1] = np.median(shifted[-idx - 1, -idx - 1 :])
-    medians = medians[(w - 1) // 2 : -(w - 1) // 2]
+    if w > x.shape[0]:
+        raise ValueError("Window size must be less than the number of integrations.")
+    if out is None:
+        out = np.empty(x.shape, dtype=np.float64)
+
+    nplanes = x.shape[0]
+    x_pixels = x.reshape(nplanes, -1)
+    out_pixels = out.reshape(nplanes, -1)
+    npix = x_pixels.shape[1]
+    if w < SORTED_WINDOW_MIN_WIDTH:
+        window_medians = _window_medians
+        chunk_size = ROLLING_MEDIAN_BUFFER_SIZE // (_BYTES_PER_VALUE * w * nplanes)
+    else:
+        window_medians = _rolling_window_medians
+        chunk_size = ROLLING_MEDIAN_BUFFER_SIZE // (_BYTES_PER_VALUE * (2 * w + 2))
+    chunk_size = max(1, chunk_size)
+    for start in range(0, npix, chunk_size):
+        chunk = slice(start, min(start + chunk_size, npix))
+        window_medians(x_pixels[:, chunk], w, out_pixels[w // 2 :, chunk])
 
     # Fill in the edges with the nearest valid value
-    medians[: w // 2] = medians[w // 2]
-    medians[-w // 2 :] = medians[-w // 2]
-    return medians
+    nwindows = nplanes - w + 1
+    out[: w // 2] = out[w // 2]
+    out[w // 2 + nwindows :] = out[w // 2 + nwindows - 1]
+    return out
+
+
+def _window_medians(x, w, out):
+    """
+    Compute the medians of all windows of consecutive rows of a 2D array directly.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Input array of shape (nrows, ncols).
+    w : int
+        The window size.
+    out : np.ndarray
+        Output array, in which the median of window ``x[s : s + w]`` is
+        stored at row ``s``, for all ``nrows - w + 1`` windows.
+    """
+    windows = sliding_window_view(np.asarray(x, dtype=np.float64), w, axis=0)
+    out[: windows.shape[0]] = np.median(windows, axis=-1)
+
+
+def _rolling_window_medians(x, w, out):
+    """
+    Compute the medians of all windows of consecutive rows of a 2D array.
+
+    This is the block algorithm of Suomela (2014, arXiv:1406.1717),
+    vectorized over the columns. Windows are processed in blocks of ``w``
+    consecutive windows: the windows of a block starting at row ``s0``
+    are made of the rows of block ``A = x[s0 : s0 + w]``, which leave the
+    window one at a time, and of the rows of block ``B = x[s0 + w : s0 + 2w]``,
+    which enter it one at a time. The rows of both blocks are ranked once,
+    by sorting them together, and each block is kept as a doubly linked
+    list of ranks in increasing order. Removing a row from ``A`` unlinks it,
+    and adding a row to ``B`` links it back in, by first unlinking all rows
+    of ``B`` in reverse order. The median is tracked by a cut between the
+    two lists, given by the first element of each list after the cut,
+    which moves by at most one element per window.
+
+    Values are ranked with NaN sorted last, and the medians of windows
+    containing NaN are set to NaN.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Input array of shape (nrows, ncols).
+    w : int
+        The window size.
+    out : np.ndarray
+        Output array, in which the median of window ``x[s : s + w]`` is
+        stored at row ``s``, for all ``nrows - w + 1`` windows.
+    """
+    nrows, ncols = x.shape
+    nwindows = nrows - w + 1
+    # Rank of the lower median, counted from 0
+    k = (w - 1) // 2
+    columns = np.arange(ncols)
+
+    def flat(rank):
+        # Index of the ranks of all columns in the flattened lists
+        return rank * ncols + columns
+
+    for s0 in range(0, nwindows, w):
+        nblock = min(w, nwindows - s0)
+        span = np.asarray(x[s0 : s0 + w + nblock - 1], dtype=np.float64)
+        nspan = span.shape[0]
+        is_nan = np.isnan(span)
+
+        # Rank the values of the block rows: ranks go from 1 to nspan,
+        # with 0 and nspan + 1 for the head and tail of the lists
+        head, tail = 0, nspan + 1
+        order = np.argsort(np.where(is_nan, np.inf, span), axis=0, kind="stable")
+        rank = np.empty(span.shape, dtype=np.intp)
+        np.put_along_axis(rank, order, np.arange(1, nspan + 1)[:, np.newaxis], axis=0)
+        sorted_values = np.empty((nspan + 2, ncols))
+        sorted_values[1:-1] = np.take_along_axis(span, order, axis=0)
+
+        # Link the ranks of each block in increasing order
+        next_a, prev_a, next_b, prev_b = (
+            np.empty((nspan + 2) * ncols, dtype=np.intp) for _ in range(4)
+        )
+        sorted_a = np.sort(rank[:w], axis=0)
+        for ranks, next_rank, prev_rank in [
+            (sorted_a, next_a, prev_a),
+            (np.sort(rank[w:], axis=0), next_b, prev_b),
+        ]:
+            chain = np.empty((ranks.shape[0] + 2, ncols), dtype=np.intp)
+            chain[0] = head
+            chain[1:-1] = ranks
+            chain[-1] = tail
+            next_rank[flat(chain[:-1])] = chain[1:]
+            prev_rank[flat(chain[1:])] = chain[:-1]
+
+        # Unlink B rows in reverse order, so they can be linked back in order
+        for row in range(nspan - 1, w - 1, -1):
+            index = flat(rank[row])
+            next_b[flat(prev_b[index])] = next_b[index]
+            prev_b[flat(next_b[index])] = prev_b[index]
+
+        # Number of rows containing NaN in each window of the block
+        nan_count = np.zeros((nspan + 1, ncols), dtype=np.intp)
+        np.cumsum(is_nan, axis=0, out=nan_count[1:])
+        has_nan = nan_count[w : w + nblock] > nan_count[:nblock]
+
+        # The window starts with all of A: its median is the k-th rank of A
+        cut_a = sorted_a[k].copy()
+        cut_b = np.full(ncols, tail, dtype=np.intp)
+        for j in range(nblock):
+            if j > 0:
+                # Remove row j - 1 of A from the window
+                removed = rank[j - 1]
+                index = flat(removed)
+                nbefore = -(removed < cut_a).astype(np.intp)
+                cut_a = np.where(removed == cut_a, next_a[index], cut_a)
+                next_a[flat(prev_a[index])] = next_a[index]
+                prev_a[flat(next_a[index])] = prev_a[index]
+
+                # Add row j - 1 of B to the window
+                added = rank[w + j - 1]
+                index = flat(added)
+                next_b[flat(prev_b[index])] = added
+                prev_b[flat(next_b[index])] = added
+                before = added < np.minimum(cut_a, cut_b)
+                nbefore += before
+                cut_b = np.where(~before & (added < cut_b), added, cut_b)
+
+                # Move the cut back or forward so that k elements are before it
+                back = nbefore > 0
+                if np.any(back):
+                    last_a = prev_a[flat(cut_a)]
+                    last_b = prev_b[flat(cut_b)]
+                    cut_a = np.where(back & (last_a > last_b), last_a, cut_a)
+                    cut_b = np.where(back & (last_a < last_b), last_b, cut_b)
+                forward = nbefore < 0
+                if np.any(forward):
+                    in_a = cut_a < cut_b
+                    cut_a = np.where(forward & in_a, next_a[flat(cut_a)], cut_a)
+                    cut_b = np.where(forward & ~in_a, next_b[flat(cut_b)], cut_b)
+
+            median_rank = np.minimum(cut_a, cut_b)
+            median = sorted_values[median_rank, columns]
+            if w % 2 == 0:
+                # Average with the next element after the cut
+                in_a = cut_a < cut_b
+                next_rank = np.where(
+                    in_a,
+                    np.minimum(next_a[flat(np.where(in_a, cut_a, head))], cut_b),
+                    np.minimum(next_b[flat(np.where(in_a, head, cut_b))], cut_a),
+                )
+                median = (median + sorted_values[next_rank, columns]) / 2.0
+            median[has_nan[j]] = np.nan
+            out[s0 + j] = median
@@ -4,7 +4,12 @@ import copy
 from functools import partial
 import numpy as np
 
-from jwst.lib.pipe_utils import match_nans_and_flags
+from jwst.lib.pipe_utils import (
+    compute_num_cores,
+    limit_forked_workers,
+    map_forked_workers,
+    match_nans_and_flags,
+)
 from jwst.resample.resample import compute_image_pixel_area
 from stcal.resample.utils import build_driz_weight
 from stcal.outlier_detection.utils import (
@@ -16,6 +21,7 @@ from stcal.outlier_detection.utils import (
 from stcal.outlier_detection.median import MedianComputer, nanmedian3D
 from stdatamodels.jwst import datamodels
 from . import _fileio
+from .median import ApproximateMedianComputer
 
 import logging
 
@@ -54,6 +60,39 @@ def create_cube_median(cube_model, maskpt):
     return nanmedian3D(masked_cube, overwrite_input=False)
 
 
+def _make_median_computer(input_shape, in_memory, buffer_size, dtype, median_method, nbins):
+    """
+    Create the object accumulating images for the median computation.
+
+    Parameters
+    ----------
+    input_shape : tuple
+        The shape of the full stack of images, (n_images, ny, nx).
+    in_memory : bool
+        For the exact median, whether to hold the full stack in memory or
+        in temporary files on disk.
+    buffer_size : int or None
+        For the exact median computed on disk, the size of chunk in bytes
+        read into memory at once.
+    dtype : np.dtype
+        The data type of the images.
+    median_method : {"exact", "approximate"}
+        The method used to compute the median.
+    nbins : int
+        For the approximate median, the number of histogram bins per pixel.
+
+    Returns
+    -------
+    MedianComputer or ApproximateMedianComputer
+        An object with ``append`` and ``evaluate`` methods.
+    """
+    if median_method == "approximate":
+        return ApproximateMedianComputer(input_shape, nbins=nbins, dtype=dtype)
+    elif median_method != "exact":
+        raise ValueError(f"Unknown median method: '{median_method}'")
+    return MedianComputer(input_shape, in_memory, buffer_size, dtype)
+
+
 def median_without_resampling(
     input_models,
     maskpt,
@@ -63,6 +102,8 @@ def median_without_resampling(
     make_output_path=None,
     buffer_size=None,
     return_error=False,
+    median_method="exact",
+    median_nbins=64,
 ):
     """
     Compute a median image without resampling.
@@ -94,6 +135,13 @@ def median_without_resampling(
     return_error : bool, optional
         If True, an approximate median error is computed alongside the
         median science image.
+    median_method : {"exact", "approximate"}, optional
+        The method used to compute the median. "exact" computes the nanmedian
+        of the full stack; "approximate" streams each image into per-pixel
+        histograms with `~jwst.outlier_detection.median.ApproximateMedianComputer`,
+        so that memory use does not grow with the number of images.
+    median_nbins : int, optional
+        Number of histogram bins per pixel for the approximate median.
 
     Returns
     -------
@@ -129,9 +177,13 @@ def median_without_resampling(
                 median_wcs = copy.deepcopy(drizzled_model.meta.wcs)
                 input_shape = (ngroups,) + drizzled_data.shape
                 dtype = drizzled_data.dtype
-                computer = MedianComputer(input_shape, in_memory, buffer_size, dtype)
+                computer = _make_median_computer(
+                    input_shape, in_memory, buffer_size, dtype, median_method, median_nbins
+                )
                 if return_error:
-                    err_computer = MedianComputer(input_shape, in_memory, buffer_size, dtype)
+                    err_computer = _make_median_computer(
+                        input_shape, in_memory, buffer_size, dtype, median_method, median_nbins
+                    )
                 else:
                     err_computer = None
                 if save_intermediate_results:
@@ -177,6 +229,9 @@ def median_with_resampling(
     make_output_path=None,
     buffer_size=None,
     return_error=False,
+    max_cores="1",
+    median_method="exact",
+    median_nbins=64,
 ):
     """
     Compute a median image with resampling.
@@ -204,6 +259,19 @@ def median_with_resampling(
     return_error : bool, optional
         If True, an approximate median error is computed alongside the
         median science image.
+    max_cores : str or int, optional
+        Number of worker processes used to drizzle exposure groups
+        concurrently. May be an integer, 'none', 'quarter', 'half' or 'all'.
+        Drizzled groups are passed to the median computation as they
+        complete, so at most this many drizzled groups are held in memory
+        at once. The default ('1') drizzles the groups serially.
+    median_method : {"exact", "approximate"}, optional
+        The method used to compute the median. "exact" computes the nanmedian
+        of the full stack; "approximate" streams each image into per-pixel
+        histograms with `~jwst.outlier_detection.median.ApproximateMedianComputer`,
+        so that memory use does not grow with the number of images.
+    median_nbins : int, optional
+        Number of histogram bins per pixel for the approximate median.
 
     Returns
     -------
@@ -236,34 +304,39 @@ def median_with_resampling(
         # create an empty image model for the median data
         median_model = datamodels.ImageModel(None)
 
-    for i, indices in enumerate(indices_by_group):
-        drizzled_model = resamp.resample_group(indices)
-
-        if save_intermediate_results:
-            # write the drizzled model to file
-            _fileio.save_drizzled(drizzled_model, make_output_path)
-
-        if i == 0:
-            median_wcs = resamp.output_wcs
-            input_shape = (ngroups,) + drizzled_model.data.shape
-            dtype = drizzled_model.data.dtype
-            computer = MedianComputer(input_shape, in_memory, buffer_size, dtype)
+    drizzle_args = (resamp, maskpt, eval_med_err, save_intermediate_results, make_output_path)
+    ncpus = limit_forked_workers(compute_num_cores(max_cores, max_jobs=ngroups))
+    if ncpus > 1:
+        log.info(f"Drizzling {ngroups} groups using {ncpus} processes")
+    # Worker processes inherit the resampling object and the input library;
+    # only group indices and drizzled arrays are passed between processes
+    drizzled_groups = map_forked_workers(_drizzle_group, indices_by_group, ncpus, drizzle_args)
+
+    median_wcs = resamp.output_wcs
+    computer = None
+    for i, drizzled in drizzled_groups:
+        # groups may complete in any order when drizzled in parallel
+        if computer is None:
+            input_shape = (ngroups,) + drizzled["data"].shape
+            dtype = drizzled["data"].dtype
+            computer = _make_median_computer(
+                input_shape, in_memory, buffer_size, dtype, median_method, median_nbins
+            )
             if eval_med_err:
-                err_computer = MedianComputer(input_shape, in_memory, buffer_size, dtype)
+                err_computer = _make_median_computer(
+                    input_shape, in_memory, buffer_size, dtype, median_method, median_nbins
+                )
             else:
                 err_computer = None
-            if save_intermediate_results:
-                # update median model's meta with meta from the first model:
-                median_model.update(drizzled_model)
-                median_model.meta.wcs = median_wcs
-
-        weight_threshold = compute_weight_threshold(drizzled_model.wht, maskpt)
-        drizzled_model.data[drizzled_model.wht < weight_threshold] = np.nan
-        computer.append(drizzled_model.data, i)
+        if save_intermediate_results and i == 0:
+            # update median model's meta with meta from the first model:
+            median_model.update({"meta": drizzled["meta"]})
+            median_model.meta.wcs = median_wcs
+
+        computer.append(drizzled["data"], i)
         if eval_med_err:
-            drizzled_model.err[drizzled_model.wht < weight_threshold] = np.nan
-            err_computer.append(drizzled_model.err, i)
-        del drizzled_model
+            err_computer.append(drizzled["err"], i)
+        del drizzled
 
     # Perform median combination on set of drizzled mosaics
     median_data = computer.evaluate()
@@ -285,6 +358,55 @@ def median_with_resampling(
         return median_data, median_wcs
 
 
+def _drizzle_group(
+    indices, resamp, maskpt, eval_med_err, save_intermediate_results, make_output_path
+):
+    """
+    Drizzle one exposure group and mask its low-weight pixels.
+
+    Parameters
+    ----------
+    indices : list of int
+        Indices of the models in the input library belonging to the group.
+    resamp : resample.resample.ResampleImage object
+        The controlling object for the resampling process.
+    maskpt : float
+        The weight threshold for masking out low weight pixels.
+    eval_med_err : bool
+        If True, the drizzled error array is masked and returned.
+    save_intermediate_results : bool
+        If True, save the drizzled model to fits.
+    make_output_path : function
+        The functools.partial instance to pass to save_drizzled.
+
+    Returns
+    -------
+    dict
+        The masked drizzled "data" and "err" (None if ``eval_med_err``
+        is False) arrays, and the drizzled model's "meta" tree, without
+        its WCS, if ``save_intermediate_results`` is True.
+    """
+    drizzled_model = resamp.resample_group(indices)
+
+    if save_intermediate_results:
+        # write the drizzled model to file
+        _fileio.save_drizzled(drizzled_model, make_output_path)
+        meta = {k: v for k, v in drizzled_model.meta.instance.items() if k != "wcs"}
+    else:
+        meta = None
+
+    weight_threshold = compute_weight_threshold(drizzled_model.wht, maskpt)
+    low_weight = drizzled_model.wht < weight_threshold
+    drizzled_model.data[low_weight] = np.nan
+    if eval_med_err:
+        drizzled_model.err[low_weight] = np.nan
+        err = drizzled_model.err
+    else:
+        err = None
+
+    return {"data": drizzled_model.data, "err": err, "meta": meta}
+
+
 def flag_crs_in_models(input_models, median_data, snr1, median_err=None):
     """
     Flag outliers in all input models without resampling.
@@ -4,6 +4,7 @@
 import math
 import numpy as np
 import logging
+from pathlib import Path
 
 from stdatamodels.jwst import datamodels
 from stdatamodels.jwst.datamodels import dqflags
@@ -16,6 +17,10 @@ SCALEFACTOR = 2.0
 from traps, compared with photon-generated charges.
 """
 
+# Trapsfilled models most recently stored, by file path, with the
+# modification time of the file when they were stored
+_STORED_TRAPSFILLED: dict[str, tuple[int, datamodels.TrapsFilledModel]] = {}
+
 
 def no_nan(
     input_model,
@@ -66,6 +71,107 @@ def no_nan(
         return temp
 
 
+def stored_trapsfilled_path(store_dir, detector):
+    """
+    Get the path of the stored trapsfilled file for a detector.
+
+    Parameters
+    ----------
+    store_dir : str or Path
+        Directory holding the latest trapsfilled file of each detector.
+
+    detector : str
+        The detector name.
+
+    Returns
+    -------
+    Path
+        The path of the trapsfilled file for the detector.
+    """
+    return Path(store_dir) / f"{detector.lower()}_trapsfilled.fits"
+
+
+def load_stored_trapsfilled(store_dir, input_model):
+    """
+    Load the stored trap state for the detector of an exposure.
+
+    The trap state stored by the previous exposure run in the same
+    process is reused without reading the file again, unless the file
+    was modified since.  The returned model may be modified in place.
+
+    Parameters
+    ----------
+    store_dir : str or Path
+        Directory holding the latest trapsfilled file of each detector.
+
+    input_model : JWST data model
+        The science exposure.
+
+    Returns
+    -------
+    `TrapsFilledModel` or None
+        The stored trap state, or None if there is no stored state for the
+        detector or if it was stored after the start of the exposure.
+    """
+    path = stored_trapsfilled_path(store_dir, input_model.meta.instrument.detector)
+    if not path.exists():
+        log.info(f"No stored trapsfilled file {path}")
+        return None
+
+    mtime, traps_filled = _STORED_TRAPSFILLED.pop(str(path.resolve()), (None, None))
+    if traps_filled is None or mtime != path.stat().st_mtime_ns:
+        log.info(f"Reading stored trapsfilled file {path}")
+        traps_filled = datamodels.TrapsFilledModel(path)
+    else:
+        log.info(f"Using trap state stored in {path}")
+
+    end_time = traps_filled.meta.exposure.end_time
+    start_time = input_model.meta.exposure.start_time
+    if end_time is not None and start_time is not None and end_time > start_time:
+        log.warning(
+            f"Stored trapsfilled file {path} is for an exposure ending after "
+            "the start of the current exposure; it will not be used."
+        )
+        return None
+    return traps_filled
+
+
+def store_trapsfilled(store_dir, traps_filled):
+    """
+    Store the trap state at the end of an exposure, for the next exposure.
+
+    The file for the detector is replaced, and the model is kept in memory
+    so that the next exposure run in the same process does not read it.
+
+    Parameters
+    ----------
+    store_dir : str or Path
+        Directory holding the latest trapsfilled file of each detector.
+
+    traps_filled : `TrapsFilledModel`
+        The trap state at the end of the exposure.
+
+    Returns
+    -------
+    Path
+        The path of the stored trapsfilled file.
+    """
+    path = stored_trapsfilled_path(store_dir, traps_filled.meta.instrument.detector)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write to a temporary file first, so that an interrupted write does
+    # not leave a truncated file for the next exposure
+    temp_path = path.with_name(f"{path.stem}_tmp{path.suffix}")
+    filename = traps_filled.meta.filename
+    traps_filled.save(temp_path)
+    traps_filled.meta.filename = filename
+    temp_path.replace(path)
+
+    _STORED_TRAPSFILLED[str(path.resolve())] = (path.stat().st_mtime_ns, traps_filled)
+    log.info(f"Stored trap state in {path}")
+    return path
+
+
 class DataSet:
     """
     Input dataset to which persistence will be applied.
@@ -268,11 +374,8 @@ class DataSet:
             mjd_end = self.traps_filled.meta.exposure.end_time
             to_start = (mjd_start - mjd_end) * 86400.0
             log.debug("Decay time for previous traps-filled file = %g s", to_start)
-            for k in range(nfamilies):
-                decay_param_k = self.get_decay_param(par, k)
-                decay = self.compute_decay(self.traps_filled.data[k], decay_param_k, to_start)
-                self.traps_filled.data[k, :, :] -= decay
-                del decay
+            traps = self.traps_filled.data
+            traps -= traps * self.get_decay_fractions(par, to_start, traps.dtype)
 
         """
         These will be full-frame:
@@ -328,68 +431,75 @@ class DataSet:
         else:
             self.output_pers = None
 
-        # Buffer for accumulating the number of decayed traps from the
-        # start of an integration to the current group (in the loop below).
-        decayed = np.zeros((nfamilies, det_ny, det_nx), dtype=np.float64)
+        # All trap families are processed together, as planes of the
+        # traps_filled cube.  Only the section of traps_filled that matches
+        # the science data is needed to compute persistence; the rest of the
+        # frame only decays, which is applied once per integration.
+        traps = self.traps_filled.data
+        if is_subarray:
+            sci_traps = traps[:, save_slice[0], save_slice[1]]
+        else:
+            sci_traps = traps
+        group_fractions = self.get_decay_fractions(par, t_group, traps.dtype)
+
+        # Scratch buffer for the number of traps of each family that decay
+        # during one group.  The persistence buffer accumulates the decays
+        # of all families from the start of an integration to the current
+        # group (in the loop below).
+        decayed_in_group = np.empty((nfamilies, ny, nx), dtype=traps.dtype)
 
         # self.traps_filled will be updated with each integration, to
         # account for charge capture and decay of traps.
-        filled = -1  # just to ensure that it exists
         for integ in range(nints):
             self.get_group_info(integ)  # self.tgroup, etc.
-            decayed[:, :, :] = 0.0  # initialize
+            persistence[:, :] = 0.0  # initialize
             # slope has to be computed early in the loop over integrations,
             # before the data are modified by subtracting persistence.
             # The slope is needed for computing charge captures.
             (grp_slope, slope) = self.compute_slope(integ)
+
+            # Decays during the reset at the beginning of the first
+            # integration have already been accounted for.
+            if integ > 0 and self.nresets > 0:
+                reset_time = self.tframe * self.nresets
+                reset_fractions = self.get_decay_fractions(par, reset_time, traps.dtype)
+            else:
+                reset_fractions = None
+
+            if is_subarray:
+                remaining = (1.0 - group_fractions.astype(np.float64)) ** ngroups
+                if reset_fractions is not None:
+                    remaining *= 1.0 - reset_fractions
+                sci_section = sci_traps.copy()
+                traps *= remaining
+                sci_traps[:, :, :] = sci_section
+                del sci_section
+
             for group in range(ngroups):
-                persistence[:, :] = 0.0  # initialize
-                for k in range(nfamilies):
-                    decay_param_k = self.get_decay_param(par, k)
-                    # Compute and subtract the decays during the reset.
-                    # Decays during the reset at the beginning of the
-                    # first integration have already been accounted for.
-                    if integ > 0 and group == 0 and self.nresets > 0:
-                        reset_time = self.tframe * self.nresets
-                        decay_during_reset = self.compute_decay(
-                            self.traps_filled.data[k], decay_param_k, reset_time
-                        )
-                        self.traps_filled.data[k, :, :] -= decay_during_reset
-                    # Decays during current group, for current trap family.
-                    decayed_in_group = self.compute_decay(
-                        self.traps_filled.data[k], decay_param_k, t_group
-                    )
-                    # Cumulative decay to the end of the current group.
-                    decayed[k, :, :] += decayed_in_group
-                    self.traps_filled.data[k, :, :] -= decayed_in_group
-                    if is_subarray:
-                        persistence += decayed[k, save_slice[0], save_slice[1]]
-                    else:
-                        persistence += decayed[k, :, :]
-                    del decayed_in_group
+                # Compute and subtract the decays during the reset.
+                if group == 0 and reset_fractions is not None:
+                    np.multiply(sci_traps, reset_fractions, out=decayed_in_group)
+                    sci_traps -= decayed_in_group
+                # Decays during current group, for all trap families.
+                np.multiply(sci_traps, group_fractions, out=decayed_in_group)
+                sci_traps -= decayed_in_group
+                # Cumulative decay to the end of the current group.
+                for decayed_k in decayed_in_group:
+                    persistence += decayed_k
 
                 # Persistence was computed in DN.
                 self.output_obj.data[integ, group, :, :] -= persistence
                 if self.save_persistence:
-                    self.output_pers.data[integ, group, :, :] = persistence.copy()
+                    self.output_pers.data[integ, group, :, :] = persistence
                 if persistence.max() >= self.flag_pers_cutoff:
                     mask = np.where(persistence >= self.flag_pers_cutoff)
                     self.output_obj.pixeldq[mask] |= dqflags.pixel["PERSISTENCE"]
 
             # Update traps_filled with the number of traps that captured
             # a charge during the current integration.
-            for k in range(nfamilies):
-                capture_param_k = self.get_capture_param(par, k)
-                # This may be a subarray.
-                filled = self.predict_capture(
-                    capture_param_k, self.trap_density.data, integ, grp_slope, slope
-                )
-                if is_subarray:
-                    self.traps_filled.data[k, save_slice[0], save_slice[1]] += filled
-                else:
-                    self.traps_filled.data[k, :, :] += filled
-
-        del filled
+            sci_traps += self.predict_captures(par, self.trap_density.data, integ, grp_slope, slope)
+
+        del decayed_in_group
 
         # Update the start and end times (and other stuff) in the
         # traps_filled image to the times for the current exposure.
@@ -622,12 +732,9 @@ class DataSet:
         really_bad = np.where(upper < 0)
         upper[really_bad] = 0  # for the comparison with indx below
         del really_bad
-        temp = np.arange(ngroups - 1, dtype=np.int32)
-        temp2 = np.repeat(temp, nx * ny)
-        indx = temp2.reshape((ngroups - 1, ny, nx))
-        mask = np.where(indx >= upper)
-        sdiff[mask] = 0.0  # zero values won't affect the sum
-        del temp, temp2, indx, mask
+        indx = np.arange(ngroups - 1, dtype=np.int32).reshape((ngroups - 1, 1, 1))
+        sdiff[indx >= upper] = 0.0  # zero values won't affect the sum
+        del indx
         bad = np.where(upper <= 0)
         upper[bad] = 1  # so we can divide by upper
 
@@ -699,6 +806,39 @@ class DataSet:
 
         return par3[k]
 
+    def get_decay_fractions(self, par, delta_t, dtype):
+        """
+        Compute the fraction of filled traps that decay, for all trap families.
+
+        Parameters
+        ----------
+        par : tuple of ndarray
+            These were read from the trap parameters reference table.
+            Each element of the tuple is a column from the table.  Each
+            row of the table is for a different trap family.
+
+        delta_t : float
+            The time interval (unit = second) over which the trap decay
+            is to be computed.
+
+        dtype : numpy dtype
+            The data type of the traps_filled array.
+
+        Returns
+        -------
+        ndarray, 3-D
+            The fraction of filled traps that decay in `delta_t`, with
+            shape (nfamilies, 1, 1) so as to broadcast against traps_filled.
+            The fractions are rounded to `dtype`, as when a traps_filled
+            image of one trap family is multiplied by a Python float.
+        """
+        decay_param = np.asarray(par[3], dtype=np.float64)
+        fractions = np.zeros(len(decay_param), dtype=np.float64)
+        nonzero = decay_param != 0.0
+        tau = 1.0 / np.abs(decay_param[nonzero])
+        fractions[nonzero] = 1.0 - np.exp(-delta_t / tau)
+        return fractions.astype(dtype).reshape((-1, 1, 1))
+
     def get_group_info(self, integ):
         """
         Get some metadata.
@@ -777,6 +917,126 @@ class DataSet:
         ndarray, 2-D
             The computed traps_filled at the end of the integration.
         """
+        saturation = self.saturation_times(integ)
+        jumps = self.find_jumps(integ, grp_slope)
+        return self._capture(capture_param_k, trap_density, slope, saturation, jumps)
+
+    def predict_captures(self, par, trap_density, integ, grp_slope, slope):
+        """
+        Compute the number of traps filled during an integration, for all trap families.
+
+        Saturation times and cosmic-ray jumps do not depend on the trap
+        family, so they are found once for all families.
+
+        Parameters
+        ----------
+        par : tuple of ndarray
+            These were read from the trap parameters reference table.
+            Each element of the tuple is a column from the table.  Each
+            row of the table is for a different trap family.
+
+        trap_density : ndarray, 2-D
+            Image of the total number of traps per pixel.
+
+        integ : int
+            Integration number.
+
+        grp_slope : ndarray, 2-D
+            The slope of the ramp at each pixel, in units of counts (DN)
+            per group.
+
+        slope : ndarray, 2-D
+            The slope of the ramp at each pixel, in units of
+            fraction of the persistence saturation limit per second.
+
+        Returns
+        -------
+        ndarray, 3-D
+            The computed traps_filled at the end of the integration, with
+            one plane for each trap family.
+        """
+        saturation = self.saturation_times(integ)
+        jumps = self.find_jumps(integ, grp_slope)
+        nfamilies = len(par[0])
+        filled = np.empty((nfamilies,) + trap_density.shape, dtype=np.float64)
+        for k in range(nfamilies):
+            capture_param_k = self.get_capture_param(par, k)
+            filled[k] = self._capture(capture_param_k, trap_density, slope, saturation, jumps)
+        return filled
+
+    def _capture(self, capture_param_k, trap_density, slope, saturation, jumps):
+        """
+        Compute the number of traps filled during an integration, for one trap family.
+
+        Parameters
+        ----------
+        capture_param_k : tuple of three floats
+            The capture parameters for the current trap family.
+
+        trap_density : ndarray, 2-D
+            Image of the total number of traps per pixel.
+
+        slope : ndarray, 2-D
+            The slope of the ramp at each pixel, in units of
+            fraction of the persistence saturation limit per second.
+
+        saturation : tuple of ndarray
+            The number of saturated groups, the saturated time and the
+            unsaturated time for each pixel, from `saturation_times`.
+
+        jumps : tuple of ndarray
+            Locations and amplitudes of cosmic-ray jumps, from `find_jumps`.
+
+        Returns
+        -------
+        ndarray, 2-D
+            The computed traps_filled at the end of the integration.
+        """
+        sat_count, sattime, dt = saturation
+
+        # Traps that were filled due to the linear portion of the ramp.
+        filled = self.predict_ramp_capture(capture_param_k, trap_density, slope, dt)
+
+        mask = sat_count > 0
+        if np.any(mask):
+            # Traps that were filled due to the saturated portion of the ramp.
+            filled[mask] = self.predict_saturation_capture(
+                capture_param_k,
+                trap_density[mask],
+                filled[mask],
+                sattime[mask],
+                sat_count[mask],
+                self.ngroups,
+            )
+
+        # Traps that were filled due to cosmic-ray jumps.
+        filled += self._jump_capture(
+            capture_param_k, trap_density, jumps, self.ngroups, self.tgroup
+        )
+
+        return filled
+
+    def saturation_times(self, integ):
+        """
+        Find the time each pixel spent above the persistence saturation limit.
+
+        Parameters
+        ----------
+        integ : int
+            Integration number.
+
+        Returns
+        -------
+        sat_count : ndarray, 2-D
+            The number of groups with value exceeding the persistence
+            saturation limit.
+
+        sattime : ndarray, 2-D
+            The time (seconds) during which each pixel was saturated.
+
+        dt : ndarray, 2-D
+            The time (seconds) during which each pixel was not saturated.
+        """
         data = self.output_obj.data[integ, :, :, :]
 
         t_frame = self.tframe
@@ -793,11 +1053,7 @@ class DataSet:
         pflag = data > self.persistencesat.data
         if hasattr(self.persistencesat, "dq"):
             mask = np.bitwise_and(self.persistencesat.dq, dqflags.pixel["DO_NOT_USE"]) > 0
-            mshape = mask.shape
-            mask = mask.reshape((1,) + mshape)
-            m3 = np.repeat(mask, ngroups, 0)
-            pflag[m3] = False
-            del mask, m3
+            pflag &= ~mask
 
         # All of these are 2-D arrays.
         sat_count = pflag.sum(axis=0, dtype=np.intp)
@@ -805,31 +1061,81 @@ class DataSet:
         sattime = sat_count.astype(np.float64) * t_group
         dt = totaltime - sattime
 
-        # Traps that were filled due to the linear portion of the ramp.
-        ramp_traps_filled = self.predict_ramp_capture(capture_param_k, trap_density, slope, dt)
+        return sat_count, sattime, dt
 
-        filled = ramp_traps_filled.copy()
-        mask = sat_count > 0
-        any_saturated = np.any(mask)
-        if any_saturated:
-            # Traps that were filled due to the saturated portion of the ramp.
-            filled[mask] = self.predict_saturation_capture(
-                capture_param_k,
-                trap_density[mask],
-                ramp_traps_filled[mask],
-                sattime[mask],
-                sat_count[mask],
-                ngroups,
-            )
-        del sat_count, sattime, ramp_traps_filled, mask
+    def find_jumps(self, integ, grp_slope):
+        """
+        Find the cosmic-ray jumps in an integration.
 
-        # Traps that were filled due to cosmic-ray jumps.
-        cr_filled = self.delta_fcn_capture(
-            capture_param_k, trap_density, integ, grp_slope, ngroups, t_group
-        )
-        filled += cr_filled
+        If there's a CR hit in the first group, we can't determine its
+        amplitude, so the first group is skipped.
 
-        return filled
+        Parameters
+        ----------
+        integ : int
+            Integration number.
+
+        grp_slope : ndarray, 2-D
+            Array of the slope of the ramp at each pixel, in units of
+            counts (DN) per group.
+
+        Returns
+        -------
+        group, y, x : ndarray of int
+            The group and pixel indices of each jump.
+
+        jump : ndarray
+            The amplitude of each jump above the slope, with negative
+            values set to zero.
+        """
+        data = self.output_obj.data[integ, :, :, :]
+        gdq = self.output_obj.groupdq[integ, 1:, :, :]
+        group, y, x = np.nonzero(np.bitwise_and(gdq, dqflags.group["JUMP_DET"]))
+        group += 1
+        jump = data[group, y, x] - data[group - 1, y, x] - grp_slope[y, x]
+        jump = np.where(jump < 0.0, 0.0, jump)
+        return group, y, x, jump
+
+    def _jump_capture(self, capture_param_k, trap_density, jumps, ngroups, t_group):
+        """
+        Compute number of traps filled due to cosmic-ray jumps.
+
+        See `delta_fcn_capture`.
+
+        Parameters
+        ----------
+        capture_param_k : tuple of three floats
+            The capture parameters for the current trap family.
+
+        trap_density : ndarray, 2-D
+            Image of the total number of traps per pixel.
+
+        jumps : tuple of ndarray
+            Locations and amplitudes of cosmic-ray jumps, from `find_jumps`.
+
+        ngroups : int
+            Total number of groups in the integration.
+
+        t_group : float
+            The time (seconds) from the start of one group to the start
+            of the next group.
+
+        Returns
+        -------
+        ndarray, 2-D
+            The computed cr_filled at the end of the integration.
+        """
+        (par0, par1, par2) = capture_param_k
+        group, y, x, jump = jumps
+        delta_t = (ngroups - group - 0.5) * t_group
+        cr_filled = np.zeros_like(trap_density)
+        np.add.at(
+            cr_filled,
+            (y, x),
+            trap_density[y, x] * jump * (par0 * (1.0 - np.exp(par1 * delta_t)) + par2),
+        )
+        cr_filled *= SCALEFACTOR
+        return cr_filled
 
     def predict_ramp_capture(self, capture_param_k, trap_density, slope, dt):
         """
@@ -1000,38 +1306,8 @@ class DataSet:
         ndarray, 2-D
             The computed cr_filled at the end of the integration.
         """
-        (par0, par1, par2) = capture_param_k
-        # cr_filled will be incremented group-by-group, depending on
-        # where cosmic rays were found in each group.
-        cr_filled = np.zeros_like(trap_density)
-        data = self.output_obj.data[integ, :, :, :]
-        gdq = self.output_obj.groupdq[integ, :, :, :]
-        gdqflags = dqflags.group
-
-        # If there's a CR hit in the first group, we can't determine its
-        # amplitude, so skip the first group.  Loop over all subsequent
-        # groups, checking (via the groupdq extension) for cosmic-ray hits.
-        for group in range(1, ngroups):
-            cr_flag = np.where(np.bitwise_and(gdq[group, :, :], gdqflags["JUMP_DET"]) > 0)
-            if len(cr_flag[0]) > 0:
-                delta_t = (float(ngroups - group) - 0.5) * t_group
-                # z and z_prev are index arrays.
-                z = np.empty(len(cr_flag[0]), dtype=np.intp)
-                z[:] = group
-                z_prev = z - 1
-                # jump is a 1-D array, just for the CRs in the current group.
-                jump = (
-                    data[z, cr_flag[0], cr_flag[1]]
-                    - data[z_prev, cr_flag[0], cr_flag[1]]
-                    - grp_slope[cr_flag]
-                )
-                jump = np.where(jump < 0.0, 0.0, jump)
-                cr_filled[cr_flag] += (
-                    trap_density[cr_flag] * jump * (par0 * (1.0 - math.exp(par1 * delta_t)) + par2)
-                )
-
-        cr_filled *= SCALEFACTOR
-        return cr_filled
+        jumps = self.find_jumps(integ, grp_slope)
+        return self._jump_capture(capture_param_k, trap_density, jumps, ngroups, t_group)
 
     def compute_decay(self, traps_filled, decay_param, delta_t):
         """
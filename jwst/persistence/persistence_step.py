@@ -17,6 +17,7 @@ class PersistenceStep(Step):
         flag_pers_cutoff = float(default=40.) # Pixels with persistence correction >= this value in DN will be flagged in the DQ
         save_persistence = boolean(default=False) # Save subtracted persistence to an output file with suffix '_output_pers'
         save_trapsfilled = boolean(default=True) # Save updated trapsfilled file with suffix '_trapsfilled'
+        trapsfilled_dir = string(default=None) # Directory keeping the latest trapsfilled file of each detector, used when input_trapsfilled is not set
         modify_input = boolean(default=False)
     """  # noqa: E501
 
@@ -68,13 +69,17 @@ class PersistenceStep(Step):
                 input_model.meta.cal_step.persistence = "SKIPPED"
                 return input_model
 
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
-            if self.input_trapsfilled is None:
-                traps_filled_model = None
-            else:
+            if self.input_trapsfilled is not None:
                 traps_filled_model = datamodels.TrapsFilledModel(self.input_trapsfilled)
+            elif self.trapsfilled_dir is not None:
+                traps_filled_model = persistence.load_stored_trapsfilled(
+                    self.trapsfilled_dir, input_model
+                )
+            else:
+                traps_filled_model = None
             trap_density_model = datamodels.TrapDensityModel(self.trap_density_filename)
             trappars_model = datamodels.TrapParsModel(self.trappars_filename)
             persat_model = datamodels.PersistenceSatModel(self.persat_filename)
@@ -99,6 +104,8 @@ class PersistenceStep(Step):
             if traps_filled is not None:  # output traps_filled
                 # Save the traps_filled image with suffix 'trapsfilled'.
                 self.save_model(traps_filled, "trapsfilled", force=self.save_trapsfilled)
+                if self.trapsfilled_dir is not None and not skipped:
+                    persistence.store_trapsfilled(self.trapsfilled_dir, traps_filled)
                 del traps_filled
 
             if output_pers is not None:  # output file of persistence
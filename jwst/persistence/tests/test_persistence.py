@@ -5,6 +5,7 @@ from astropy.io import fits
 import pytest
 
 from jwst import datamodels
+from stdatamodels.jwst.datamodels import dqflags
 
 from jwst.persistence import persistence
 
@@ -307,3 +308,65 @@ def test_do_all(create_sci_model, create_traps_filled_model, create_trap_density
     assert np.allclose(
         output_trapsfilled_model.data[0, 100, 100], 0.0010368865, rtol=1.0e-7, atol=1.0e-7
     )
+
+
+def test_predict_captures(create_sci_model, create_trap_density_model):
+    """Captures for all trap families match captures computed for each family."""
+    rng = np.random.default_rng(0)
+    input_model = create_sci_model(2, 6, 20, 30, 1, 1)
+    input_model.data[:] = np.cumsum(rng.uniform(0.0, 20.0, input_model.shape), axis=1)
+    input_model.groupdq[rng.uniform(size=input_model.shape) > 0.95] = dqflags.group["JUMP_DET"]
+    input_model.data[input_model.groupdq > 0] += 50.0
+    persat_model = datamodels.PersistenceSatModel(data=np.full((20, 30), 80.0, dtype=np.float32))
+
+    ds = persistence.DataSet(
+        input_model,
+        None,
+        40.0,
+        False,
+        create_trap_density_model(20, 30),
+        create_trappars_model(),
+        persat_model,
+    )
+    par = ds.get_parameters()
+    ds.get_group_info(1)
+    grp_slope, slope = ds.compute_slope(1)
+    filled = ds.predict_captures(par, ds.trap_density.data, 1, grp_slope, slope)
+
+    assert filled.shape == (3, 20, 30)
+    for k in range(3):
+        capture_param_k = ds.get_capture_param(par, k)
+        expected = ds.predict_capture(capture_param_k, ds.trap_density.data, 1, grp_slope, slope)
+        np.testing.assert_allclose(filled[k], expected, rtol=1e-6)
+
+
+def test_stored_trapsfilled(tmp_path, create_sci_model, create_traps_filled_model):
+    """The trap state is stored by detector and reused by the next exposure."""
+    input_model = create_sci_model(1, 2, 10, 10, 1, 1)
+    traps_filled = create_traps_filled_model(10, 10)
+    traps_filled.meta.instrument.detector = "NRCA1"
+    traps_filled.meta.exposure.end_time = input_model.meta.exposure.start_time - 0.01
+
+    # Nothing stored yet
+    assert persistence.load_stored_trapsfilled(tmp_path, input_model) is None
+
+    path = persistence.store_trapsfilled(tmp_path, traps_filled)
+    assert path == tmp_path / "nrca1_trapsfilled.fits"
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+    # The stored model is reused without reading the file
+    assert persistence.load_stored_trapsfilled(tmp_path, input_model) is traps_filled
+
+    # Once used, it is read from the file
+    loaded = persistence.load_stored_trapsfilled(tmp_path, input_model)
+    assert loaded is not traps_filled
+    np.testing.assert_array_equal(loaded.data, traps_filled.data)
+
+    # A state stored after the start of the exposure is not used
+    loaded.meta.exposure.end_time = input_model.meta.exposure.start_time + 0.01
+    persistence.store_trapsfilled(tmp_path, loaded)
+    assert persistence.load_stored_trapsfilled(tmp_path, input_model) is None
+
+    # Other detectors are stored separately
+    input_model.meta.instrument.detector = "NRCA2"
+    assert persistence.load_stored_trapsfilled(tmp_path, input_model) is None
@@ -1,8 +1,16 @@
 #!/usr/bin/env python
 import logging
+from pathlib import Path
+import tempfile
+import warnings
 
+import numpy as np
+from astropy.io import fits
+from stdatamodels import filetype
 from stdatamodels.jwst import datamodels
+from stdatamodels.jwst.datamodels import dqflags
 
+from jwst.lib.pipe_utils import compute_num_cores, limit_forked_workers, map_forked_workers
 from jwst.stpipe import Pipeline
 
 # step imports
@@ -47,8 +55,35 @@ class Detector1Pipeline(Pipeline):
 
     spec = """
         save_calibrated_ramp = boolean(default=False)
+        integration_chunk_size = integer(default=0, min=0) # Number of integrations processed at a time; 0 processes all at once
+        maximum_cores = string(default='1') # Cores for processing integration chunks. Can be an integer, 'half', 'quarter', or 'all'
+        in_place = boolean(default=False) # Let steps modify the ramp directly instead of working on copies
+        scratch_dir = string(default=None) # Directory for memory-mapped scratch files holding the ramp when running in place, or the slopes of integration chunks
     """  # noqa: E501
 
+    # Steps run separately on each chunk of integrations, or on its slopes
+    chunk_steps = [
+        "group_scale",
+        "dq_init",
+        "emicorr",
+        "saturation",
+        "ipc",
+        "superbias",
+        "refpix",
+        "rscd",
+        "firstframe",
+        "lastframe",
+        "linearity",
+        "dark_current",
+        "reset",
+        "persistence",
+        "charge_migration",
+        "jump",
+        "clean_flicker_noise",
+        "ramp_fit",
+        "gain_scale",
+    ]
+
     # Define aliases to steps
     step_defs = {
         "group_scale": group_scale_step.GroupScaleStep,
@@ -89,97 +124,251 @@ class Detector1Pipeline(Pipeline):
         """
         log.info("Starting calwebb_detector1 ...")
 
-        # open the input data as a RampModel
-        input_data = datamodels.RampModel(input_data)
+        # open the input data as a RampModel; FITS files are left closed
+        # until it is known whether they are read in chunks of integrations
+        input_is_model = isinstance(input_data, datamodels.JwstDataModel)
+        if input_is_model or not _is_fits_file(input_data):
+            input_data = datamodels.RampModel(input_data)
+        if self.in_place and input_is_model:
+            # steps modify the ramp directly, so leave the caller's model intact
+            input_data = input_data.copy()
 
         # propagate output_dir to steps that might need it
         self.dark_current.output_dir = self.output_dir
         self.ramp_fit.output_dir = self.output_dir
 
+        nints = _ramp_shape(input_data)[0]
+        chunk_size = self.integration_chunk_size
+        chunked = 0 < chunk_size < nints and not self.ramp_fit.skip
+        if chunked:
+            input_data, ints_model = self.process_chunks(input_data)
+        else:
+            if not isinstance(input_data, datamodels.JwstDataModel):
+                input_data = datamodels.RampModel(input_data)
+            scratch = None
+            if self.in_place and self.scratch_dir is not None:
+                scratch = _ScratchRamp(input_data, self.scratch_dir)
+            try:
+                input_data = self.calibrate_ramp(input_data, scratch=scratch)
+
+                # save the corrected ramp data, if requested
+                if self.save_calibrated_ramp:
+                    self.save_model(input_data, "ramp")
+
+                # apply the ramp_fit step
+                # This explicit test on self.ramp_fit.skip is a temporary workaround
+                # to fix the problem that the ramp_fit step ordinarily returns two
+                # objects, but when the step is skipped due to `skip = True`,
+                # only the input is returned when the step is invoked.
+                if self.ramp_fit.skip:
+                    input_data = self.ramp_fit.run(input_data)
+                    ints_model = None
+                else:
+                    input_data, ints_model = self.ramp_fit.run(input_data)
+            finally:
+                if scratch is not None:
+                    scratch.close()
+
+        # apply the gain_scale step to the exposure-level product
+        if input_data is not None:
+            self.gain_scale.suffix = "gain_scale"
+            input_data = self.gain_scale.run(input_data)
+        else:
+            log.info("NoneType returned from ramp_fit.  Gain Scale step skipped.")
+
+        # apply the gain scale step to the multi-integration product,
+        # if it exists and was not already scaled chunk by chunk, and then save it
+        if ints_model is not None and not chunked:
+            self.gain_scale.suffix = "gain_scaleints"
+            ints_model = self.gain_scale.run(ints_model)
+        if ints_model is not None:
+            self.save_model(ints_model, "rateints")
+
+        # setup output_file for saving
+        self.setup_output(input_data)
+
+        log.info("... ending calwebb_detector1")
+
+        return input_data
+
+    def calibrate_ramp(self, input_data, scratch=None):
+        """
+        Apply the detector-level corrections to a ramp, up to jump detection and flicker noise.
+
+        Parameters
+        ----------
+        input_data : `~jwst.datamodels.RampModel`
+            The ramp to calibrate.
+        scratch : `_ScratchRamp` or None, optional
+            Memory-mapped scratch file in which the ramp data is stored after
+            each step.
+
+        Returns
+        -------
+        `~jwst.datamodels.RampModel`
+            The calibrated ramp.
+        """
         instrument = input_data.meta.instrument.name
         if instrument == "MIRI":
             # process MIRI exposures;
             # the steps are in a different order than NIR
             log.debug("Processing a MIRI exposure")
 
-            input_data = self.group_scale.run(input_data)
-            input_data = self.dq_init.run(input_data)
-            input_data = self.emicorr.run(input_data)
-            input_data = self.saturation.run(input_data)
-            input_data = self.ipc.run(input_data)
-            input_data = self.firstframe.run(input_data)
-            input_data = self.lastframe.run(input_data)
-            input_data = self.reset.run(input_data)
-            input_data = self.linearity.run(input_data)
-            input_data = self.rscd.run(input_data)
-            input_data = self.dark_current.run(input_data)
-            input_data = self.refpix.run(input_data)
-
-            # skip until MIRI team has figured out an algorithm
-            # input_data = self.persistence(input_data)
+            steps = [
+                self.group_scale,
+                self.dq_init,
+                self.emicorr,
+                self.saturation,
+                self.ipc,
+                self.firstframe,
+                self.lastframe,
+                self.reset,
+                self.linearity,
+                self.rscd,
+                self.dark_current,
+                self.refpix,
+            ]
+
+            # skip persistence until MIRI team has figured out an algorithm
 
         else:
             # process Near-IR exposures
             log.debug("Processing a Near-IR exposure")
 
-            input_data = self.group_scale.run(input_data)
-            input_data = self.dq_init.run(input_data)
-            input_data = self.saturation.run(input_data)
-            input_data = self.ipc.run(input_data)
-            input_data = self.superbias.run(input_data)
-            input_data = self.refpix.run(input_data)
-            input_data = self.linearity.run(input_data)
+            steps = [
+                self.group_scale,
+                self.dq_init,
+                self.saturation,
+                self.ipc,
+                self.superbias,
+                self.refpix,
+                self.linearity,
+            ]
 
             # skip persistence for NIRSpec
             if instrument != "NIRSPEC":
-                input_data = self.persistence.run(input_data)
-
-            input_data = self.dark_current.run(input_data)
+                steps.append(self.persistence)
 
-        # apply the charge_migration step
-        input_data = self.charge_migration.run(input_data)
+            steps.append(self.dark_current)
 
-        # apply the jump step
-        input_data = self.jump.run(input_data)
+        # apply the charge_migration, jump and clean_flicker_noise steps
+        steps.extend([self.charge_migration, self.jump, self.clean_flicker_noise])
 
-        # apply the clean_flicker_noise step
-        input_data = self.clean_flicker_noise.run(input_data)
+        for step in steps:
+            input_data = step.run(input_data)
+            if scratch is not None:
+                scratch.store(input_data)
 
-        # save the corrected ramp data, if requested
-        if self.save_calibrated_ramp:
-            self.save_model(input_data, "ramp")
-
-        # apply the ramp_fit step
-        # This explicit test on self.ramp_fit.skip is a temporary workaround
-        # to fix the problem that the ramp_fit step ordinarily returns two
-        # objects, but when the step is skipped due to `skip = True`,
-        # only the input is returned when the step is invoked.
-        if self.ramp_fit.skip:
-            input_data = self.ramp_fit.run(input_data)
-            ints_model = None
-        else:
-            input_data, ints_model = self.ramp_fit.run(input_data)
+        return input_data
 
-        # apply the gain_scale step to the exposure-level product
-        if input_data is not None:
-            self.gain_scale.suffix = "gain_scale"
-            input_data = self.gain_scale.run(input_data)
-        else:
-            log.info("NoneType returned from ramp_fit.  Gain Scale step skipped.")
+    def process_chunks(self, input_data):
+        """
+        Calibrate and fit a ramp in chunks of integrations.
+
+        Each chunk of ``integration_chunk_size`` integrations is processed from
+        group_scale through ramp_fit as a segment of the exposure, so only the
+        chunks being processed are calibrated in memory at any time. Chunks
+        are processed in parallel worker processes if ``maximum_cores`` allows.
+        If the ramp is given as a FITS file, each chunk is read from the file
+        by the process calibrating it, and the full ramp is never read.
+
+        The slopes of each chunk are scaled by gain_scale and written to
+        memory-mapped scratch files in ``scratch_dir`` (or the default
+        temporary directory), which are removed once the per-integration
+        product is released. Corrections that depend on earlier integrations
+        (e.g. persistence) are computed separately for each chunk, as for
+        segmented exposures. The slopes of all integrations are combined with
+        inverse-variance weights into the rate product, as they are summed
+        over the chunks.
 
-        # apply the gain scale step to the multi-integration product,
-        # if it exists, and then save it
-        if ints_model is not None:
-            self.gain_scale.suffix = "gain_scaleints"
-            ints_model = self.gain_scale.run(ints_model)
-            self.save_model(ints_model, "rateints")
+        Parameters
+        ----------
+        input_data : str, Path or `~jwst.datamodels.RampModel`
+            The ramp to process, or the name of the FITS file holding it.
 
-        # setup output_file for saving
-        self.setup_output(input_data)
+        Returns
+        -------
+        rate_model : `~jwst.datamodels.ImageModel`
+            The slopes combined over all integrations.
+        ints_model : `~jwst.datamodels.CubeModel`
+            The slopes of each integration.
+        """
+        nints, _, ny, nx = _ramp_shape(input_data)
+        chunk_size = self.integration_chunk_size
+        chunks = [(start, min(start + chunk_size, nints)) for start in range(0, nints, chunk_size)]
+        ncpus = limit_forked_workers(compute_num_cores(self.maximum_cores, max_jobs=len(chunks)))
+        log.info(
+            f"Processing {nints} integrations in {len(chunks)} chunks "
+            f"of up to {chunk_size} integrations using {ncpus} processes"
+        )
+        if self.save_calibrated_ramp:
+            log.warning(
+                "The calibrated ramp is not saved when integrations are processed in chunks"
+            )
+
+        # Intermediate products of the chunks would overwrite each other,
+        # and steps run in worker processes should not start more processes
+        saved_pars = {}
+        for name in self.chunk_steps:
+            step = getattr(self, name)
+            saved_pars[name] = {"save_results": step.save_results}
+            step.save_results = False
+            if ncpus > 1 and hasattr(step, "maximum_cores"):
+                saved_pars[name]["maximum_cores"] = step.maximum_cores
+                step.maximum_cores = "1"
+
+        if self.scratch_dir is not None:
+            Path(self.scratch_dir).mkdir(parents=True, exist_ok=True)
+        ints_arrays = {
+            name: _scratch_array((nints, ny, nx), dtype, self.scratch_dir)
+            for name, dtype in _INTS_ARRAYS.items()
+        }
+        sums = None
+        meta = None
+        try:
+            # Worker processes inherit the pipeline, the input ramp and the
+            # memory-mapped slope arrays, in which they write the slopes of
+            # their chunk; only integration ranges, sums over the integrations
+            # of the chunk and metadata are passed between processes
+            fitted = map_forked_workers(
+                _process_chunk, chunks, ncpus, (self, input_data, ints_arrays)
+            )
+            for i, fitted_chunk in fitted:
+                # chunks may complete in any order when processed in parallel
+                start, stop = chunks[i]
+                if fitted_chunk is None:
+                    log.warning(f"No slopes fit for integrations {start + 1} to {stop}")
+                    for name, array in ints_arrays.items():
+                        array[start:stop] = dqflags.pixel["DO_NOT_USE"] if name == "dq" else np.nan
+                    continue
+                sums = _add_sums(sums, fitted_chunk["sums"])
+                if meta is None or i == 0:
+                    meta = fitted_chunk["meta"]
+                del fitted_chunk
+        finally:
+            for name, pars in saved_pars.items():
+                for key, value in pars.items():
+                    setattr(getattr(self, name), key, value)
+
+        if meta is None:
+            log.warning("No slopes fit for any integration")
+            return None, None
+
+        # The exposure metadata and integration times, without reading the ramp
+        if isinstance(input_data, datamodels.JwstDataModel):
+            exposure = input_data
+        else:
+            exposure = _read_ramp(input_data, 0, 0)
 
-        log.info("... ending calwebb_detector1")
+        ints_model = datamodels.CubeModel(**ints_arrays)
+        ints_model.update({"meta": meta})
+        ints_model.meta.exposure.integration_start = exposure.meta.exposure.integration_start
+        ints_model.meta.exposure.integration_end = exposure.meta.exposure.integration_end
+        if exposure.hasattr("int_times"):
+            ints_model.int_times = exposure.int_times.copy()
 
-        return input_data
+        rate_model = _combine_integrations(sums, ints_model)
+        return rate_model, ints_model
 
     def setup_output(self, input_data):
         """
@@ -197,3 +386,374 @@ class Detector1Pipeline(Pipeline):
             self.suffix = "rate"
         else:
             self.suffix = "ramp"
+
+
+class _ScratchRamp:
+    """
+    Ramp data array backed by a memory-mapped scratch file.
+
+    The data array of the ramp is replaced by a memory-mapped array, so that
+    the operating system can page it out to the scratch file rather than hold
+    it in memory. Steps that modify the data in place keep it on disk; data
+    arrays replaced by a step are copied back to the scratch file by `store`.
+    """
+
+    def __init__(self, model, scratch_dir):
+        """
+        Move the data array of a ramp to a scratch file.
+
+        Parameters
+        ----------
+        model : `~jwst.datamodels.RampModel`
+            The ramp, whose data array is replaced.
+        scratch_dir : str
+            Directory in which to create the scratch file.
+        """
+        Path(scratch_dir).mkdir(parents=True, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(
+            dir=scratch_dir, prefix="jwst_ramp_", suffix=".dat"
+        )
+        self.data = np.memmap(self._file, dtype=model.data.dtype, mode="w+", shape=model.data.shape)
+        log.info(f"Holding the ramp data in scratch file {self._file.name}")
+        self.store(model)
+
+    def store(self, model):
+        """
+        Copy the data array of a ramp to the scratch file, and use the copy.
+
+        Parameters
+        ----------
+        model : `~jwst.datamodels.RampModel`
+            The ramp, whose data array is replaced.
+        """
+        data = model.data
+        if data is self.data:
+            return
+        if data.shape != self.data.shape or data.dtype != self.data.dtype:
+            log.debug("Ramp data does not fit the scratch file; keeping it in memory")
+            return
+        self.data[...] = data
+        model.data = self.data
+
+    def close(self):
+        """
+        Remove the scratch file.
+
+        Arrays mapped to the file remain valid until they are released.
+        """
+        self.data = None
+        self._file.close()
+
+
+# Names and types of the arrays of the per-integration slope product
+_INTS_ARRAYS = {
+    "data": np.float32,
+    "dq": np.uint32,
+    "err": np.float32,
+    "var_poisson": np.float32,
+    "var_rnoise": np.float32,
+}
+
+
+def _is_fits_file(input_data):
+    """
+    Check whether the input of the pipeline is the name of a FITS file.
+
+    Parameters
+    ----------
+    input_data : str, Path or `~jwst.datamodels.JwstDataModel`
+        The input of the pipeline.
+
+    Returns
+    -------
+    bool
+        True if the input is a FITS file name.
+    """
+    if not isinstance(input_data, (str, Path)):
+        return False
+    try:
+        return filetype.check(input_data) == "fits"
+    except ValueError:
+        return False
+
+
+def _ramp_shape(input_data):
+    """
+    Get the shape of the data array of a ramp, without reading a ramp file.
+
+    Parameters
+    ----------
+    input_data : str, Path or `~jwst.datamodels.RampModel`
+        The ramp, or the name of the FITS file holding it.
+
+    Returns
+    -------
+    tuple of int
+        The number of integrations, groups, rows and columns of the ramp.
+    """
+    if isinstance(input_data, datamodels.JwstDataModel):
+        return input_data.data.shape
+    with fits.open(input_data) as hdulist:
+        return hdulist["SCI"].shape
+
+
+def _read_ramp(filename, start, stop):
+    """
+    Read a range of integrations of a ramp from a FITS file.
+
+    Only the selected integrations of the arrays indexed by integration are
+    read from the file; all other extensions are read in full.
+
+    Parameters
+    ----------
+    filename : str or Path
+        The name of the FITS file holding the ramp.
+    start, stop : int
+        Indices of the first integration, and one past the last integration,
+        to read.
+
+    Returns
+    -------
+    `~jwst.datamodels.RampModel`
+        The ramp of the selected integrations, with the metadata and
+        integration times of the full exposure.
+    """
+    with fits.open(filename, memmap=False) as hdulist:
+        nints = hdulist["SCI"].shape[0]
+        hdus = []
+        for hdu in hdulist:
+            if isinstance(hdu, fits.ImageHDU) and len(hdu.shape) >= 3 and hdu.shape[0] == nints:
+                hdu = fits.ImageHDU(data=hdu.section[start:stop], header=hdu.header)
+            hdus.append(hdu)
+        return datamodels.RampModel(fits.HDUList(hdus))
+
+
+def _integration_chunk(input_data, start, stop):
+    """
+    Copy a range of integrations from a ramp into a new ramp model.
+
+    Parameters
+    ----------
+    input_data : str, Path or `~jwst.datamodels.RampModel`
+        The ramp of the full exposure, or the name of the FITS file holding it.
+    start, stop : int
+        Indices of the first integration, and one past the last integration,
+        to copy.
+
+    Returns
+    -------
+    `~jwst.datamodels.RampModel`
+        The ramp of the selected integrations, with the metadata of the input,
+        and ``meta.exposure.integration_start`` and ``integration_end`` set as
+        for a segment of the exposure.
+    """
+    if isinstance(input_data, datamodels.JwstDataModel):
+        nints = input_data.data.shape[0]
+        chunk = datamodels.RampModel()
+        chunk.update(input_data)
+        for key, value in input_data.instance.items():
+            if key == "meta":
+                continue
+            if isinstance(value, np.ndarray) and value.ndim >= 3 and value.shape[0] == nints:
+                setattr(chunk, key, value[start:stop].copy())
+            elif isinstance(value, np.ndarray):
+                setattr(chunk, key, value.copy())
+            else:
+                setattr(chunk, key, value)
+    else:
+        chunk = _read_ramp(input_data, start, stop)
+
+    int_start = chunk.meta.exposure.integration_start or 1
+    if chunk.hasattr("int_times") and len(chunk.int_times) > 0:
+        numbers = chunk.int_times["integration_number"]
+        in_chunk = (numbers >= int_start + start) & (numbers < int_start + stop)
+        chunk.int_times = chunk.int_times[in_chunk]
+
+    chunk.meta.exposure.integration_start = int_start + start
+    chunk.meta.exposure.integration_end = int_start + stop - 1
+    return chunk
+
+
+def _scratch_array(shape, dtype, scratch_dir=None):
+    """
+    Create an array backed by a temporary file.
+
+    The file has no name and its space is freed once the array is released.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        Shape of the array.
+    dtype : numpy.dtype
+        Type of the array elements.
+    scratch_dir : str or None, optional
+        Directory in which to create the file, or None for the default
+        temporary directory.
+
+    Returns
+    -------
+    numpy.memmap
+        The array, filled with zeros.
+    """
+    with tempfile.TemporaryFile(dir=scratch_dir, prefix="jwst_rateints_") as scratch_file:
+        return np.memmap(scratch_file, dtype=dtype, mode="w+", shape=shape)
+
+
+def _process_chunk(chunk, pipeline, input_data, ints_arrays):
+    """
+    Calibrate and fit the ramps of a range of integrations.
+
+    The slopes of the integrations, scaled by gain_scale, are written to the
+    per-integration slope arrays of the exposure.
+
+    Parameters
+    ----------
+    chunk : tuple of int
+        Indices of the first integration, and one past the last integration,
+        to process.
+    pipeline : Detector1Pipeline
+        The pipeline whose steps are run.
+    input_data : str, Path or `~jwst.datamodels.RampModel`
+        The ramp of the full exposure, or the name of the FITS file holding it.
+    ints_arrays : dict
+        The per-integration slope arrays of the exposure, by name.
+
+    Returns
+    -------
+    dict or None
+        The "sums" over the integrations of the chunk from which the rate is
+        computed, and the "meta" tree of the per-integration slope product,
+        or None if no slopes were fit.
+    """
+    start, stop = chunk
+    ramp = _integration_chunk(input_data, start, stop)
+    ramp = pipeline.calibrate_ramp(ramp)
+    _, ints_model = pipeline.ramp_fit.run(ramp)
+    del ramp
+    if ints_model is None:
+        return None
+
+    # The rate is computed from the slopes before gain scaling, as the
+    # rate product is scaled separately
+    sums = _integration_sums(ints_model)
+    ints_model = pipeline.gain_scale.run(ints_model)
+    for name, array in ints_arrays.items():
+        array[start:stop] = getattr(ints_model, name)
+    return {"sums": sums, "meta": ints_model.meta.instance}
+
+
+def _integration_sums(ints_model):
+    """
+    Sum the slopes and inverse variances of the valid integrations.
+
+    Integrations flagged DO_NOT_USE, or with invalid slopes or variances, are
+    excluded from the sums.
+
+    Parameters
+    ----------
+    ints_model : `~jwst.datamodels.CubeModel`
+        The slopes of each integration.
+
+    Returns
+    -------
+    dict
+        The sums of the slopes weighted by the inverse of their total
+        variance ("weighted_data"), of the weights ("weight") and of the
+        inverse Poisson and read noise variances ("inv_var_poisson",
+        "inv_var_rnoise"), the bitwise OR of the DQ flags of all
+        integrations ("dq") and whether any integration is valid ("valid"),
+        for each pixel.
+    """
+    do_not_use = dqflags.pixel["DO_NOT_USE"]
+    var_poisson = ints_model.var_poisson.astype(np.float64)
+    var_rnoise = ints_model.var_rnoise.astype(np.float64)
+    var_total = var_poisson + var_rnoise
+    valid = ((ints_model.dq & do_not_use) == 0) & np.isfinite(ints_model.data) & (var_total > 0)
+
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.filterwarnings("ignore", category=RuntimeWarning)
+        weight = np.where(valid, 1.0 / var_total, 0.0)
+        return {
+            "weighted_data": np.sum(np.where(valid, ints_model.data, 0.0) * weight, axis=0),
+            "weight": weight.sum(axis=0),
+            "inv_var_poisson": np.sum(np.where(valid, 1.0 / var_poisson, 0.0), axis=0),
+            "inv_var_rnoise": np.sum(np.where(valid, 1.0 / var_rnoise, 0.0), axis=0),
+            "dq": np.bitwise_or.reduce(ints_model.dq, axis=0),
+            "valid": valid.any(axis=0),
+        }
+
+
+def _add_sums(total, sums):
+    """
+    Add the sums over the integrations of a chunk to those of other chunks.
+
+    Parameters
+    ----------
+    total : dict or None
+        Sums over the integrations of the chunks processed so far, from
+        `_integration_sums`, or None for the first chunk. Updated in place.
+    sums : dict
+        Sums over the integrations of a chunk.
+
+    Returns
+    -------
+    dict
+        The updated sums.
+    """
+    if total is None:
+        return sums
+    for name, value in sums.items():
+        if name in ["dq", "valid"]:
+            total[name] |= value
+        else:
+            total[name] += value
+    return total
+
+
+def _combine_integrations(sums, ints_model):
+    """
+    Combine the slopes of all integrations into a rate product.
+
+    The rate is the mean of the valid slopes of each integration, weighted by
+    the inverse of their total variance. The Poisson and read noise variances
+    are combined as the inverse of the sum of their inverses, as is done by
+    ramp fitting for the segments of a ramp. This is the same as fitting
+    all integrations at once when each integration is fit as a single segment.
+    The DQ flags are the bitwise OR of the flags of all integrations, with
+    DO_NOT_USE set only for pixels without any valid integration.
+
+    Parameters
+    ----------
+    sums : dict
+        Sums over all integrations, from `_integration_sums`.
+    ints_model : `~jwst.datamodels.CubeModel`
+        The slopes of each integration, whose metadata is copied.
+
+    Returns
+    -------
+    `~jwst.datamodels.ImageModel`
+        The combined slopes, with the metadata of ``ints_model``.
+    """
+    do_not_use = np.uint32(dqflags.pixel["DO_NOT_USE"])
+    any_valid = sums["valid"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = sums["weighted_data"] / sums["weight"]
+        combined_poisson = 1.0 / sums["inv_var_poisson"]
+        combined_rnoise = 1.0 / sums["inv_var_rnoise"]
+    rate[~any_valid] = np.nan
+    combined_poisson[~any_valid] = np.nan
+    combined_rnoise[~any_valid] = np.nan
+
+    dq = sums["dq"].copy()
+    dq[any_valid] &= ~do_not_use
+    dq[~any_valid] |= do_not_use
+
+    rate_model = datamodels.ImageModel(
+        data=rate.astype(np.float32),
+        dq=dq,
+        err=np.sqrt(combined_poisson + combined_rnoise).astype(np.float32),
+        var_poisson=combined_poisson.astype(np.float32),
+        var_rnoise=combined_rnoise.astype(np.float32),
+    )
+    rate_model.update(ints_model)
+    return rate_model
@@ -1,5 +1,7 @@
 from pathlib import Path
 from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
 import traceback
 import numpy as np
 
@@ -8,6 +10,7 @@ from jwst.stpipe import query_step_status
 
 from jwst.assign_wcs.util import NoDataOnDetectorError
 from jwst.lib.exposure_types import is_nrs_ifu_flatlamp, is_nrs_ifu_linelamp, is_nrs_slit_linelamp
+from jwst.lib.wcs_utils import COORDINATE_GRID_CACHE
 from jwst.stpipe import Pipeline
 
 # step imports
@@ -67,6 +70,7 @@ class Spec2Pipeline(Pipeline):
         save_bsub = boolean(default=False)        # Save background-subtracted science
         fail_on_exception = boolean(default=True) # Fail if any product fails.
         save_wfss_esec = boolean(default=False)   # Save WFSS e-/sec image
+        coordinate_cache_size = float(default=0.0) # Memory (GB) for WCS coordinates shared between steps; 0 disables
     """  # noqa: E501
 
     # Define aliases to steps
@@ -138,12 +142,17 @@ class Spec2Pipeline(Pipeline):
                 self.output_file = product["name"]
             if not hasattr(asn, "filename"):
                 asn.filename = "singleton"
+
+            # Share the WCS coordinates computed by each step with later steps,
+            # for this exposure only
+            COORDINATE_GRID_CACHE.configure(self.coordinate_cache_size * 1024**3)
             try:
-                result = self.process_exposure_product(
-                    product,
-                    asn["asn_pool"],
-                    asn.filename,
-                )
+                with self._report_coordinate_cache():
+                    result = self.process_exposure_product(
+                        product,
+                        asn["asn_pool"],
+                        asn.filename,
+                    )
             except NoDataOnDetectorError:
                 # This error merits a special return
                 # status if run from the command line.
@@ -155,6 +164,8 @@ class Spec2Pipeline(Pipeline):
             else:
                 if result is not None:
                     results.append(result)
+            finally:
+                COORDINATE_GRID_CACHE.configure(0)
             self.output_file = None  # handles multiple products in the association
 
         if len(failures) > 0 and self.fail_on_exception:
@@ -167,6 +178,48 @@ class Spec2Pipeline(Pipeline):
         self.suffix = False
         return results
 
+    @contextmanager
+    def _report_coordinate_cache(self):
+        """
+        Log the use of the coordinate grid cache by each step.
+
+        While the cache is enabled, the ``run`` method of each step is wrapped
+        to log the number of coordinate grids computed and reused by the step,
+        and the time saved, for the duration of the context.
+
+        Yields
+        ------
+        None
+            Control is returned to the caller while steps are reported.
+        """
+        if not COORDINATE_GRID_CACHE.enabled:
+            yield
+            return
+
+        def report_run(step):
+            run = step.run
+
+            @wraps(run)
+            def run_and_report(*args, **kwargs):
+                statistics = COORDINATE_GRID_CACHE.statistics()
+                try:
+                    return run(*args, **kwargs)
+                finally:
+                    report = COORDINATE_GRID_CACHE.report(since=statistics)
+                    if report is not None:
+                        self.log.info(f"{report} in step {step.name}")
+
+            return run_and_report
+
+        steps = [getattr(self, name) for name in self.step_defs]
+        for step in steps:
+            step.run = report_run(step)
+        try:
+            yield
+        finally:
+            for step in steps:
+                del step.run
+
     # Process each exposure
     def process_exposure_product(
         self,
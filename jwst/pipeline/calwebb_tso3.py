@@ -6,6 +6,7 @@ from astropy.table import vstack
 from stdatamodels.jwst import datamodels
 
 
+from jwst.datamodels import ModelLibrary
 from jwst.stpipe import Pipeline
 
 from jwst.outlier_detection import outlier_detection_step
@@ -37,6 +38,7 @@ class Tso3Pipeline(Pipeline):
     class_alias = "calwebb_tso3"
 
     spec = """
+    in_memory = boolean(default=True)  # If False, load one segment at a time to bound memory usage
     """  # noqa: E501
 
     # Define alias to steps
@@ -62,117 +64,81 @@ class Tso3Pipeline(Pipeline):
         self.log.info("Starting calwebb_tso3...")
         asn_exptypes = ["science"]
 
-        input_models = datamodels.open(input_data, asn_exptypes=asn_exptypes)
-
-        # Sanity check the input data
-        input_tsovisit = is_tso(input_models[0])
-        if not input_tsovisit:
-            self.log.error("INPUT DATA ARE NOT TSO MODE. ABORTING PROCESSING.")
-            return
+        if self.in_memory:
+            input_models = datamodels.open(input_data, asn_exptypes=asn_exptypes)
+            asn = input_models.asn_table
+        else:
+            # Segments are read from disk as they are processed, and their
+            # rolling medians are stored in temporary files
+            input_models = ModelLibrary(input_data, asn_exptypes=asn_exptypes, on_disk=True)
+            asn = input_models.asn
+            self.outlier_detection.in_memory = False
 
         if self.output_file is None:
-            self.output_file = input_models.asn_table["products"][0]["name"]
+            self.output_file = asn["products"][0]["name"]
 
         # This asn_id assignment is important as it allows outlier detection
         # to know the asn_id since that step receives the cube as input.
-        self.asn_id = input_models.asn_table["asn_id"]
+        self.asn_id = asn["asn_id"]
         self.outlier_detection.mode = "tso"
 
-        # Input may consist of multiple exposures, so loop over each of them
+        # Create final photometry results as a single output
+        # regardless of how many input members there may be
+        phot_result_list = []
+        x1d_result = None
         input_exptype = None
-        for i, cube in enumerate(input_models):
+        imaging = False
+        run_outlier_detection = True
+
+        # Input may consist of multiple exposures, so loop over each of them
+        for cube in _iterate_segments(input_models):
             if input_exptype is None:
+                # Sanity check the input data
+                if not is_tso(cube):
+                    self.log.error("INPUT DATA ARE NOT TSO MODE. ABORTING PROCESSING.")
+                    return
+
                 input_exptype = cube.meta.exposure.type
+                imaging = input_exptype == "NRC_TSIMAGE" or input_exptype == "MIR_IMAGE"
 
             # Can't do outlier detection if there isn't a stack of images
-            if len(cube.data.shape) < 3:
+            if run_outlier_detection and len(cube.data.shape) < 3:
                 self.log.warning("Input data are 2D; skipping outlier_detection")
-                break
-
-            self.log.info("Performing outlier detection on input images ...")
-            cube = self.outlier_detection.run(cube)
-
-            # Save crfints products
-            if cube.meta.cal_step.outlier_detection == "COMPLETE":
-                self.log.info("Saving crfints products with updated DQ arrays ...")
-                # preserve output filename
-                original_filename = cube.meta.filename
-
-                # ensure output filename will not have duplicate asn_id
-                if "_" + self.asn_id in original_filename:
-                    original_filename = original_filename.replace("_" + self.asn_id, "")
-                self.save_model(
-                    cube, output_file=original_filename, suffix="crfints", asn_id=self.asn_id
-                )
-                cube.meta.filename = original_filename
-            input_models[i] = cube
+                run_outlier_detection = False
 
-        # Create final photometry results as a single output
-        # regardless of how many input members there may be
-        phot_result_list = []
+            if run_outlier_detection:
+                cube = self._detect_outliers(cube)
+
+            # Imaging
+            if imaging:
+                # Extract Photometry from imaging data
+                phot_result_list.append(self.tso_photometry.run(cube))
+
+            # Spectroscopy
+            else:
+                if x1d_result is None:
+                    x1d_result = self._make_x1d_result(cube)
+                self._extract_spectra(cube, x1d_result)
 
         # Imaging
-        if input_exptype == "NRC_TSIMAGE" or (input_exptype == "MIR_IMAGE" and input_tsovisit):
+        if imaging:
             # Create name for extracted photometry (Level 3) product
             phot_tab_suffix = "phot"
 
-            for cube in input_models:
-                # Extract Photometry from imaging data
-                phot_result_list.append(self.tso_photometry.run(cube))
-
         # Spectroscopy
         else:
             # Create name for extracted white-light (Level 3) product
             phot_tab_suffix = "whtlt"
 
-            # Working with spectroscopic TSO data;
-            # define output for x1d (level 3) products
-
-            x1d_result = datamodels.TSOMultiSpecModel()
-            x1d_result.update(input_models[0], only="PRIMARY")
-            x1d_result.int_times = FITS_rec.from_columns(
-                input_models[0].int_times.columns, nrows=input_models[0].meta.exposure.nints
-            )
-
-            # Remove source_type from the output model, if it exists, to prevent
-            # the creation of an empty SCI extension just for that keyword.
-            x1d_result.meta.target.source_type = None
-
-            # For each exposure in the TSO...
-            for cube in input_models:
-                # interpolate pixels that have a NaN value or are flagged
-                # as DO_NOT_USE or NON_SCIENCE.
-                cube = self.pixel_replace.run(cube)
-                state = cube.meta.cal_step.pixel_replace
-                # Process spectroscopic TSO data
-                # extract 1D
-                self.log.info("Extracting 1-D spectra ...")
-                result = self.extract_1d.run(cube)
-                for row in cube.int_times:
-                    # Subtract one to assign 1-indexed int_nums to int_times array locations
-                    x1d_result.int_times[row[0] - 1] = row
-
-                # SOSS F277W may return None - don't bother with that
-                if (result is None) or (result.meta.cal_step.extract_1d == "SKIPPED"):
-                    continue
-
-                if input_exptype == "NIS_SOSS":
-                    # SOSS data have yet to be photometrically calibrated
-                    # Calibrate 1D spectra here.
-                    result = self.photom.run(result)
-
-                x1d_result.spec.extend(result.spec)
-
             # perform white-light photometry on all 1d extracted data
             self.log.info("Performing white-light photometry ...")
             phot_result_list.append(self.white_light.run(x1d_result))
 
             # Update some metadata from the association
-            x1d_result.meta.asn.pool_name = input_models.asn_table["asn_pool"]
+            x1d_result.meta.asn.pool_name = asn["asn_pool"]
             x1d_result.meta.asn.table_name = Path(input_data).name
 
             # Save the final x1d Multispec model
-            x1d_result.meta.cal_step.pixel_replace = state
             if len(x1d_result.spec) == 0:
                 self.log.warning("extract_1d step could not be completed for any integrations")
                 self.log.warning("x1dints products will not be created.")
@@ -180,7 +146,8 @@ class Tso3Pipeline(Pipeline):
                 self.save_model(x1d_result, suffix="x1dints")
 
         # Done with all the inputs
-        input_models.close()
+        if self.in_memory:
+            input_models.close()
 
         # Check for all null photometry results before saving
         all_none = np.all([(x is None) for x in phot_result_list])
@@ -197,3 +164,123 @@ class Tso3Pipeline(Pipeline):
         # All done. Nothing to return, because all products have
         # been created here.
         return
+
+    def _detect_outliers(self, cube):
+        """
+        Flag outliers in a segment and save the CR-flagged product.
+
+        Parameters
+        ----------
+        cube : `~jwst.datamodels.CubeModel`
+            The calibrated segment.
+
+        Returns
+        -------
+        `~jwst.datamodels.CubeModel`
+            The segment with outliers flagged.
+        """
+        self.log.info("Performing outlier detection on input images ...")
+        cube = self.outlier_detection.run(cube)
+
+        # Save crfints products
+        if cube.meta.cal_step.outlier_detection == "COMPLETE":
+            self.log.info("Saving crfints products with updated DQ arrays ...")
+            # preserve output filename
+            original_filename = cube.meta.filename
+
+            # ensure output filename will not have duplicate asn_id
+            if "_" + self.asn_id in original_filename:
+                original_filename = original_filename.replace("_" + self.asn_id, "")
+            self.save_model(
+                cube, output_file=original_filename, suffix="crfints", asn_id=self.asn_id
+            )
+            cube.meta.filename = original_filename
+        return cube
+
+    def _make_x1d_result(self, cube):
+        """
+        Make the x1d (level 3) product for the spectra of all segments.
+
+        Parameters
+        ----------
+        cube : `~jwst.datamodels.CubeModel`
+            The first segment.
+
+        Returns
+        -------
+        `~jwst.datamodels.TSOMultiSpecModel`
+            The product, with an empty integration times table for all
+            integrations in the exposure.
+        """
+        x1d_result = datamodels.TSOMultiSpecModel()
+        x1d_result.update(cube, only="PRIMARY")
+        x1d_result.int_times = FITS_rec.from_columns(
+            cube.int_times.columns, nrows=cube.meta.exposure.nints
+        )
+
+        # Remove source_type from the output model, if it exists, to prevent
+        # the creation of an empty SCI extension just for that keyword.
+        x1d_result.meta.target.source_type = None
+        return x1d_result
+
+    def _extract_spectra(self, cube, x1d_result):
+        """
+        Extract the spectra of a segment and add them to the x1d product.
+
+        Parameters
+        ----------
+        cube : `~jwst.datamodels.CubeModel`
+            The segment.
+        x1d_result : `~jwst.datamodels.TSOMultiSpecModel`
+            The x1d product for all segments, updated in place.
+        """
+        # interpolate pixels that have a NaN value or are flagged
+        # as DO_NOT_USE or NON_SCIENCE.
+        cube = self.pixel_replace.run(cube)
+        x1d_result.meta.cal_step.pixel_replace = cube.meta.cal_step.pixel_replace
+        # Process spectroscopic TSO data
+        # extract 1D
+        self.log.info("Extracting 1-D spectra ...")
+        result = self.extract_1d.run(cube)
+        for row in cube.int_times:
+            # Subtract one to assign 1-indexed int_nums to int_times array locations
+            x1d_result.int_times[row[0] - 1] = row
+
+        # SOSS F277W may return None - don't bother with that
+        if (result is None) or (result.meta.cal_step.extract_1d == "SKIPPED"):
+            return
+
+        if cube.meta.exposure.type == "NIS_SOSS":
+            # SOSS data have yet to be photometrically calibrated
+            # Calibrate 1D spectra here.
+            result = self.photom.run(result)
+
+        x1d_result.spec.extend(result.spec)
+
+
+def _iterate_segments(input_models):
+    """
+    Iterate over the segments of a TSO association.
+
+    Parameters
+    ----------
+    input_models : `~jwst.datamodels.ModelContainer` or `~jwst.datamodels.ModelLibrary`
+        The segments. Segments in a library are read when they are reached,
+        and released after they are processed.
+
+    Yields
+    ------
+    `~jwst.datamodels.CubeModel`
+        The segments, in order.
+    """
+    if isinstance(input_models, ModelLibrary):
+        with input_models:
+            for i in range(len(input_models)):
+                cube = input_models.borrow(i)
+                try:
+                    yield cube
+                finally:
+                    input_models.shelve(cube, i, modify=False)
+                    cube.close()
+    else:
+        yield from input_models
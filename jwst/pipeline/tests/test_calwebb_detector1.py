@@ -0,0 +1,331 @@
+import numpy as np
+import pytest
+from stdatamodels.jwst.datamodels import (
+    CubeModel,
+    GainModel,
+    RampModel,
+    ReadnoiseModel,
+    dqflags,
+)
+
+from jwst.lib import pipe_utils
+from jwst.lib.tests.test_reffile_utils import generate_test_refmodel_metadata
+from jwst.pipeline import Detector1Pipeline, calwebb_detector1
+from jwst.pipeline.calwebb_detector1 import (
+    _add_sums,
+    _combine_integrations,
+    _integration_chunk,
+    _integration_sums,
+    _read_ramp,
+    _ScratchRamp,
+)
+from jwst.saturation import SaturationStep
+
+NINTS, NGROUPS, NROWS, NCOLS = 7, 5, 6, 5
+GROUP_TIME = 3.0
+
+
+def make_ramp():
+    """Make a MIRI ramp with a constant slope per pixel and read noise."""
+    rng = np.random.default_rng(1)
+    model = RampModel((NINTS, NGROUPS, NROWS, NCOLS))
+    int_times = np.zeros(NINTS, dtype=model.int_times.dtype)
+    int_times["integration_number"] = np.arange(1, NINTS + 1)
+    int_times["int_start_MJD_UTC"] = 60000.0 + np.arange(NINTS)
+    model.int_times = int_times
+    model.meta.filename = "test_uncal.fits"
+    model.meta.instrument.name = "MIRI"
+    model.meta.instrument.detector = "MIRIMAGE"
+    model.meta.instrument.filter = "F480M"
+    model.meta.observation.date = "2015-10-13"
+    model.meta.exposure.type = "MIR_IMAGE"
+    model.meta.exposure.readpatt = "FAST"
+    model.meta.exposure.nints = NINTS
+    model.meta.exposure.ngroups = NGROUPS
+    model.meta.exposure.nframes = 1
+    model.meta.exposure.groupgap = 0
+    model.meta.exposure.frame_time = GROUP_TIME
+    model.meta.exposure.group_time = GROUP_TIME
+    model.meta.exposure.drop_frames1 = 0
+    model.meta.subarray.name = "FULL"
+    model.meta.subarray.xstart = 1
+    model.meta.subarray.ystart = 1
+    model.meta.subarray.xsize = NCOLS
+    model.meta.subarray.ysize = NROWS
+
+    slopes = rng.uniform(10.0, 100.0, (NROWS, NCOLS))
+    ramp = slopes * GROUP_TIME * np.arange(1, NGROUPS + 1)[:, np.newaxis, np.newaxis]
+    model.data[:] = ramp + rng.normal(0.0, 5.0, model.data.shape)
+    model.groupdq[3, 2:, 1, 1] = dqflags.group["SATURATED"]
+    return model
+
+
+def make_reference(model_class, value):
+    ref = model_class(data=np.full((NROWS, NCOLS), value))
+    ref.meta.instrument.name = "MIRI"
+    ref.meta.subarray.name = "FULL"
+    ref.meta.subarray.xstart = 1
+    ref.meta.subarray.ystart = 1
+    ref.meta.subarray.xsize = NCOLS
+    ref.meta.subarray.ysize = NROWS
+    generate_test_refmodel_metadata(ref)
+    return ref
+
+
+def test_integration_chunk():
+    model = make_ramp()
+    chunk = _integration_chunk(model, 3, 6)
+
+    assert chunk.data.shape == (3, NGROUPS, NROWS, NCOLS)
+    np.testing.assert_array_equal(chunk.data, model.data[3:6])
+    np.testing.assert_array_equal(chunk.groupdq, model.groupdq[3:6])
+    np.testing.assert_array_equal(chunk.pixeldq, model.pixeldq)
+    np.testing.assert_array_equal(chunk.int_times["integration_number"], [4, 5, 6])
+    assert chunk.meta.exposure.integration_start == 4
+    assert chunk.meta.exposure.integration_end == 6
+    assert chunk.meta.exposure.nints == NINTS
+    assert chunk.meta.instrument.name == "MIRI"
+
+    # The chunk does not share data with the input
+    chunk.data[:] = 0.0
+    chunk.pixeldq[:] = 1
+    assert np.all(model.data[3:6] != 0.0)
+    assert np.all(model.pixeldq == 0)
+
+    # Chunks of a segment are numbered from the start of the segment
+    model.meta.exposure.integration_start = 11
+    chunk = _integration_chunk(model, 0, 2)
+    assert chunk.meta.exposure.integration_start == 11
+    assert chunk.meta.exposure.integration_end == 12
+
+
+def test_integration_chunk_file(tmp_path):
+    model = make_ramp()
+    model.meta.exposure.integration_start = 11
+    model.meta.exposure.integration_end = 17
+    filename = tmp_path / "test_uncal.fits"
+    model.save(filename)
+
+    # Only the chunk is read from the file
+    expected = _integration_chunk(model, 3, 6)
+    chunk = _integration_chunk(filename, 3, 6)
+    assert chunk.data.shape == (3, NGROUPS, NROWS, NCOLS)
+    for name in ["data", "groupdq", "pixeldq", "int_times"]:
+        np.testing.assert_array_equal(getattr(chunk, name), getattr(expected, name))
+    assert chunk.meta.exposure.integration_start == 14
+    assert chunk.meta.exposure.integration_end == 16
+    assert chunk.meta.exposure.nints == NINTS
+
+    # The metadata of the exposure can be read without its integrations
+    exposure = _read_ramp(filename, 0, 0)
+    assert exposure.data.shape == (0, NGROUPS, NROWS, NCOLS)
+    assert exposure.meta.exposure.integration_start == 11
+    assert exposure.meta.exposure.integration_end == 17
+    assert len(exposure.int_times) == NINTS
+
+
+def test_combine_integrations():
+    rng = np.random.default_rng(2)
+    shape = (4, 3, 3)
+    ints_model = CubeModel(shape)
+    ints_model.data = rng.uniform(1.0, 2.0, shape).astype(np.float32)
+    ints_model.var_poisson = rng.uniform(0.1, 0.2, shape).astype(np.float32)
+    ints_model.var_rnoise = np.full(shape, 0.05, dtype=np.float32)
+    ints_model.dq[1, 0, 0] = dqflags.pixel["DO_NOT_USE"] | dqflags.pixel["SATURATED"]
+    ints_model.dq[:, 2, 2] = dqflags.pixel["DO_NOT_USE"]
+    ints_model.dq[2, 1, 1] = dqflags.pixel["JUMP_DET"]
+    ints_model.meta.exposure.type = "MIR_IMAGE"
+
+    rate = _combine_integrations(_integration_sums(ints_model), ints_model)
+
+    weight = 1.0 / (ints_model.var_poisson[:, 1, 2] + ints_model.var_rnoise[:, 1, 2])
+    expected = np.sum(ints_model.data[:, 1, 2] * weight) / np.sum(weight)
+    np.testing.assert_allclose(rate.data[1, 2], expected, rtol=1e-6)
+    np.testing.assert_allclose(
+        rate.var_poisson[1, 2], 1.0 / np.sum(1.0 / ints_model.var_poisson[:, 1, 2]), rtol=1e-6
+    )
+    np.testing.assert_allclose(rate.var_rnoise[1, 2], 0.05 / 4, rtol=1e-6)
+    np.testing.assert_allclose(rate.err**2, rate.var_poisson + rate.var_rnoise, rtol=1e-5)
+
+    # Integrations not to be used are excluded
+    valid = [0, 2, 3]
+    weight = 1.0 / (ints_model.var_poisson[valid, 0, 0] + 0.05)
+    expected = np.sum(ints_model.data[valid, 0, 0] * weight) / np.sum(weight)
+    np.testing.assert_allclose(rate.data[0, 0], expected, rtol=1e-6)
+    assert rate.dq[0, 0] == dqflags.pixel["SATURATED"]
+    assert rate.dq[1, 1] == dqflags.pixel["JUMP_DET"]
+    assert np.isnan(rate.data[2, 2])
+    assert rate.dq[2, 2] == dqflags.pixel["DO_NOT_USE"]
+    assert rate.meta.exposure.type == "MIR_IMAGE"
+
+    # Sums over chunks of integrations give the same rate
+    names = ["data", "dq", "err", "var_poisson", "var_rnoise"]
+    sums = None
+    for start in [0, 2]:
+        chunk = CubeModel(**{name: getattr(ints_model, name)[start : start + 2] for name in names})
+        sums = _add_sums(sums, _integration_sums(chunk))
+    chunked = _combine_integrations(sums, ints_model)
+    for name in names:
+        np.testing.assert_allclose(getattr(chunked, name), getattr(rate, name), rtol=1e-6)
+
+
+@pytest.mark.parametrize("from_file", [False, True])
+@pytest.mark.parametrize("maximum_cores", ["1", "all"])
+def test_process_chunks(tmp_path, monkeypatch, maximum_cores, from_file):
+    monkeypatch.setattr(pipe_utils.os, "cpu_count", lambda: 2)
+    model = make_ramp()
+    steps = {name: {"skip": True} for name in Detector1Pipeline.chunk_steps}
+    steps["ramp_fit"] = {
+        "override_gain": make_reference(GainModel, 5.0),
+        "override_readnoise": make_reference(ReadnoiseModel, 7.0),
+    }
+
+    pipeline = Detector1Pipeline(steps=steps)
+    expected_rate, expected_ints = pipeline.ramp_fit.run(pipeline.calibrate_ramp(model.copy()))
+
+    input_data = model
+    if from_file:
+        input_data = str(tmp_path / "test_uncal.fits")
+        model.save(input_data)
+    scratch_dir = tmp_path / "scratch"
+    pipeline = Detector1Pipeline(
+        steps=steps,
+        integration_chunk_size=3,
+        maximum_cores=maximum_cores,
+        scratch_dir=str(scratch_dir),
+    )
+    pipeline.ramp_fit.maximum_cores = "half"
+
+    # Record the step cores in use while the chunks are processed
+    chunk_cores = []
+
+    def map_and_record(func, jobs, nworkers, args=()):
+        chunk_cores.append(pipeline.ramp_fit.maximum_cores)
+        return pipe_utils.map_forked_workers(func, jobs, nworkers, args)
+
+    monkeypatch.setattr(calwebb_detector1, "map_forked_workers", map_and_record)
+    rate, ints_model = pipeline.process_chunks(input_data)
+
+    # The slopes of each integration are held in scratch files, which have
+    # no name and are removed once the slopes are released
+    for name in ["data", "dq", "err", "var_poisson", "var_rnoise"]:
+        assert isinstance(getattr(ints_model, name), np.memmap)
+    assert scratch_dir.is_dir()
+    assert not list(scratch_dir.iterdir())
+
+    # Integrations are fit independently
+    for name in ["data", "dq", "var_rnoise"]:
+        np.testing.assert_allclose(getattr(ints_model, name), getattr(expected_ints, name))
+    np.testing.assert_array_equal(
+        ints_model.int_times["integration_number"], np.arange(1, NINTS + 1)
+    )
+    assert ints_model.meta.exposure.integration_start is None
+    assert ints_model.meta.cal_step.ramp_fit == "COMPLETE"
+
+    # The Poisson noise depends on the typical slope of the integrations fit together
+    np.testing.assert_allclose(ints_model.var_poisson, expected_ints.var_poisson, rtol=0.1)
+    np.testing.assert_allclose(rate.data, expected_rate.data, rtol=1e-3)
+    np.testing.assert_allclose(rate.err, expected_rate.err, rtol=1e-3)
+    np.testing.assert_array_equal(rate.dq, expected_rate.dq)
+    assert rate.meta.cal_step.ramp_fit == "COMPLETE"
+
+    # Steps run serially within parallel chunks, and are restored afterwards
+    assert chunk_cores == ["1" if maximum_cores == "all" else "half"]
+    assert pipeline.ramp_fit.maximum_cores == "half"
+    assert not pipeline.ramp_fit.save_results
+
+
+def test_chunked_products(tmp_path):
+    """Chunked processing differs from fitting the exposure at once only within tolerances."""
+    model = make_ramp()
+    rng = np.random.default_rng(3)
+    for i, y, x in zip(
+        rng.integers(0, NINTS, 5), rng.integers(0, NROWS, 5), rng.integers(0, NCOLS, 5)
+    ):
+        model.data[i, 3:, y, x] += 2000.0
+    steps = {name: {"skip": True} for name in Detector1Pipeline.chunk_steps}
+    steps["jump"] = {
+        "override_gain": make_reference(GainModel, 5.0),
+        "override_readnoise": make_reference(ReadnoiseModel, 7.0),
+    }
+    steps["ramp_fit"] = dict(steps["jump"])
+    filename = str(tmp_path / "test_uncal.fits")
+    model.save(filename)
+
+    pipeline = Detector1Pipeline(steps=steps)
+    expected_rate, expected_ints = pipeline.ramp_fit.run(pipeline.calibrate_ramp(model.copy()))
+
+    pipeline = Detector1Pipeline(steps=steps, integration_chunk_size=2)
+    rate, ints_model = pipeline.process_chunks(filename)
+
+    # Jumps are detected independently for each integration
+    np.testing.assert_array_equal(ints_model.dq, expected_ints.dq)
+    jumps = (ints_model.dq & dqflags.pixel["JUMP_DET"]) != 0
+    assert np.any(jumps)
+    np.testing.assert_allclose(ints_model.data[~jumps], expected_ints.data[~jumps], rtol=1e-5)
+    np.testing.assert_allclose(ints_model.var_rnoise, expected_ints.var_rnoise, rtol=1e-5)
+
+    # The Poisson variance of each integration, and so the weights of the ramp
+    # segments between jumps, depend on the median slope of the integrations
+    # fit together, and so on the chunks
+    np.testing.assert_allclose(ints_model.data[jumps], expected_ints.data[jumps], rtol=1e-3)
+    np.testing.assert_allclose(ints_model.var_poisson, expected_ints.var_poisson, rtol=0.1)
+
+    # The rate is combined from the slopes of the integrations, rather than
+    # from all ramp segments at once by ramp fitting
+    np.testing.assert_allclose(rate.data, expected_rate.data, rtol=1e-3)
+    np.testing.assert_allclose(rate.var_rnoise, expected_rate.var_rnoise, rtol=1e-3)
+    np.testing.assert_allclose(rate.var_poisson, expected_rate.var_poisson, rtol=0.1)
+    np.testing.assert_array_equal(rate.dq, expected_rate.dq)
+
+
+def test_copy_input():
+    model = make_ramp()
+    assert SaturationStep().copy_input(model) is not model
+    assert Detector1Pipeline().saturation.copy_input(model) is not model
+    assert Detector1Pipeline(in_place=True).saturation.copy_input(model) is model
+
+
+def test_scratch_ramp(tmp_path):
+    model = make_ramp()
+    data = model.data.copy()
+    scratch = _ScratchRamp(model, tmp_path)
+    assert isinstance(model.data, np.memmap)
+    np.testing.assert_array_equal(model.data, data)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # Data arrays replaced by a step are moved to the scratch file
+    model.data = model.data * 2.0
+    assert not isinstance(model.data, np.memmap)
+    scratch.store(model)
+    assert model.data is scratch.data
+    np.testing.assert_array_equal(model.data, 2.0 * data)
+
+    scratch.close()
+    assert not list(tmp_path.iterdir())
+    np.testing.assert_array_equal(model.data, 2.0 * data)
+
+
+def test_in_place(tmp_path):
+    model = make_ramp()
+    steps = {name: {"skip": True} for name in Detector1Pipeline.chunk_steps}
+    steps["ramp_fit"] = {
+        "override_gain": make_reference(GainModel, 5.0),
+        "override_readnoise": make_reference(ReadnoiseModel, 7.0),
+        "firstgroup": 1,
+    }
+    expected_rate, expected_ints = Detector1Pipeline(steps=steps).ramp_fit.run(model)
+    assert not np.any(model.groupdq[:, 0] & dqflags.group["DO_NOT_USE"])
+
+    pipeline = Detector1Pipeline(steps=steps, in_place=True, scratch_dir=str(tmp_path))
+    scratch = _ScratchRamp(model, pipeline.scratch_dir)
+    ramp = pipeline.calibrate_ramp(model, scratch=scratch)
+    rate, ints_model = pipeline.ramp_fit.run(ramp)
+    scratch.close()
+
+    # The steps modified the input ramp rather than a copy
+    assert ramp is model
+    assert np.all(model.groupdq[:, 0] & dqflags.group["DO_NOT_USE"])
+    for name in ["data", "dq", "err"]:
+        np.testing.assert_allclose(getattr(rate, name), getattr(expected_rate, name))
+        np.testing.assert_allclose(getattr(ints_model, name), getattr(expected_ints, name))
@@ -3,9 +3,11 @@ import shutil
 
 import pytest
 
+from jwst.lib.wcs_utils import COORDINATE_GRID_CACHE
 from jwst.pipeline.calwebb_spec2 import Spec2Pipeline
+from jwst.srctype.srctype_step import SourceTypeStep
 from jwst.stpipe import Step
-from jwst.datamodels import IFUImageModel  # type: ignore[attr-defined]
+from jwst.datamodels import IFUImageModel, ImageModel  # type: ignore[attr-defined]
 
 
 INPUT_FILE = "dummy_rate.fits"
@@ -167,3 +169,22 @@ def test_filenotfounderror_raised(capsys):
     # Verify the failure is printed to stderr
     captured = capsys.readouterr()
     assert "FileNotFoundError" in captured.err
+
+
+def test_report_coordinate_cache(monkeypatch, caplog):
+    def process(self, input_data):
+        COORDINATE_GRID_CACHE.nreused += 1
+        return input_data
+
+    monkeypatch.setattr(SourceTypeStep, "process", process)
+    pipeline = Spec2Pipeline()
+    COORDINATE_GRID_CACHE.configure(1e6)
+    try:
+        with pipeline._report_coordinate_cache():
+            pipeline.srctype.run(ImageModel((10, 10)))
+    finally:
+        COORDINATE_GRID_CACHE.configure(0)
+
+    # Steps are only reported on while the pipeline processes an exposure
+    assert "run" not in vars(pipeline.srctype)
+    assert "reused 1 grids, saving 0.00 s in step srctype" in caplog.text
@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+from astropy import coordinates as coord
+from astropy import units as u
+from astropy.modeling import models
+from astropy.table import Table
+from gwcs import coordinate_frames as cf
+from gwcs import wcs
+from stdatamodels.jwst import datamodels
+
+from jwst.associations import asn_from_list
+from jwst.associations.lib.rules_level3_base import DMS_Level3_Base
+from jwst.lib.tests.test_reffile_utils import generate_test_refmodel_metadata
+from jwst.pipeline import Tso3Pipeline
+
+NSEGMENTS, NINTS, NROWS, NCOLS = 3, 8, 32, 40
+PRODUCT_NAME = "test_tso3"
+
+
+def make_wcs():
+    """Make a simple imaging WCS."""
+    transform = (
+        (models.Shift(-20.0) & models.Shift(-16.0))
+        | (models.Scale(1e-5) & models.Scale(1e-5))
+        | models.Pix2Sky_TAN()
+        | models.RotateNative2Celestial(15.0, 28.0, 180.0)
+    )
+    detector = cf.Frame2D(name="detector", axes_order=(0, 1), unit=(u.pix, u.pix))
+    sky = cf.CelestialFrame(reference_frame=coord.ICRS(), name="world")
+    return wcs.WCS([(detector, transform), (sky, None)])
+
+
+def make_segment(segment, rng):
+    """Make an imaging TSO segment with a star and a cosmic ray."""
+    model = datamodels.CubeModel((NINTS, NROWS, NCOLS))
+    yy, xx = np.mgrid[:NROWS, :NCOLS]
+    star = 100.0 * np.exp(-((xx - 20.0) ** 2 + (yy - 16.0) ** 2) / 8.0)
+    model.data[:] = star + rng.normal(1.0, 0.1, model.data.shape)
+    model.data[segment, 5, 5] += 1000.0
+    model.err[:] = 0.1
+
+    start = segment * NINTS
+    int_times = np.zeros(NINTS, dtype=model.int_times.dtype)
+    int_times["integration_number"] = start + np.arange(1, NINTS + 1)
+    int_times["int_mid_MJD_UTC"] = 60000.0 + (start + np.arange(NINTS)) / 1000.0
+    int_times["int_mid_BJD_TDB"] = int_times["int_mid_MJD_UTC"] + 0.001
+    model.int_times = int_times
+
+    model.meta.filename = f"test_seg{segment + 1:03d}_calints.fits"
+    model.meta.visit.tsovisit = True
+    model.meta.instrument.name = "NIRCAM"
+    model.meta.instrument.detector = "NRCA3"
+    model.meta.instrument.channel = "SHORT"
+    model.meta.instrument.filter = "F210M"
+    model.meta.instrument.pupil = "CLEAR"
+    model.meta.exposure.type = "NRC_TSIMAGE"
+    model.meta.exposure.nints = NSEGMENTS * NINTS
+    model.meta.exposure.integration_time = 10.0
+    model.meta.exposure.integration_start = start + 1
+    model.meta.exposure.integration_end = start + NINTS
+    model.meta.observation.date = "2024-01-01"
+    model.meta.observation.time = "00:00:00"
+    model.meta.subarray.name = "FULL"
+    model.meta.subarray.xstart = 1
+    model.meta.subarray.ystart = 1
+    model.meta.subarray.xsize = NCOLS
+    model.meta.subarray.ysize = NROWS
+    model.meta.wcsinfo.siaf_xref_sci = 21.0
+    model.meta.wcsinfo.siaf_yref_sci = 17.0
+    model.meta.bunit_data = "DN/s"
+    model.meta.bunit_err = "DN/s"
+    model.meta.wcs = make_wcs()
+    return model
+
+
+@pytest.fixture()
+def tso_asn(tmp_cwd):
+    """Save the segments of an imaging TSO exposure and their association."""
+    rng = np.random.default_rng(0)
+    filenames = []
+    for segment in range(NSEGMENTS):
+        model = make_segment(segment, rng)
+        model.save(model.meta.filename)
+        filenames.append(model.meta.filename)
+
+    asn = asn_from_list.asn_from_list(filenames, rule=DMS_Level3_Base, product_name=PRODUCT_NAME)
+    asn.data["asn_id"] = "a3001"
+    _, serialized = asn.dump()
+    with open("test_asn.json", "w") as asn_file:
+        asn_file.write(serialized)
+    return "test_asn.json"
+
+
+def make_references():
+    """Make the gain and aperture references for TSO photometry."""
+    gain = datamodels.GainModel(data=np.full((NROWS, NCOLS), 2.0, dtype=np.float32))
+    gain.meta.instrument.name = "NIRCAM"
+    gain.meta.subarray.xstart = 1
+    gain.meta.subarray.ystart = 1
+    gain.meta.subarray.xsize = NCOLS
+    gain.meta.subarray.ysize = NROWS
+    generate_test_refmodel_metadata(gain)
+
+    tsophot = datamodels.TsoPhotModel()
+    tsophot.radii = [{"pupil": "ANY", "radius": 4.0, "radius_inner": 6.0, "radius_outer": 10.0}]
+    generate_test_refmodel_metadata(tsophot)
+    return gain, tsophot
+
+
+def run_tso3(asn_file, in_memory):
+    gain, tsophot = make_references()
+    steps = {
+        "outlier_detection": {"rolling_window_width": 5},
+        "tso_photometry": {"override_gain": gain, "override_tsophot": tsophot},
+    }
+    pipeline = Tso3Pipeline(steps=steps, in_memory=in_memory)
+    pipeline.prefetch_references = False
+    pipeline.run(asn_file)
+
+    crfints = []
+    for segment in range(NSEGMENTS):
+        with datamodels.open(f"test_seg{segment + 1:03d}_a3001_crfints.fits") as model:
+            crfints.append((model.data.copy(), model.dq.copy()))
+    phot = Table.read(f"{PRODUCT_NAME}_phot.ecsv")
+    return crfints, phot
+
+
+def test_tso3_segments_on_disk(tso_asn):
+    """Processing one segment at a time gives the same products as in memory."""
+    expected_crfints, expected_phot = run_tso3(tso_asn, True)
+    crfints, phot = run_tso3(tso_asn, False)
+
+    for segment in range(NSEGMENTS):
+        data, dq = crfints[segment]
+        expected_data, expected_dq = expected_crfints[segment]
+        assert expected_dq[segment, 5, 5] != 0
+        np.testing.assert_array_equal(dq, expected_dq)
+        np.testing.assert_allclose(data, expected_data)
+
+    # The star is measured in every integration, and all columns agree
+    assert len(phot) == NSEGMENTS * NINTS
+    assert phot.colnames == expected_phot.colnames
+    assert np.all(expected_phot["net_aperture_sum"].value > 0)
+    for name in phot.colnames:
+        np.testing.assert_allclose(phot[name], expected_phot[name])
@@ -58,7 +58,9 @@ def get_reference_file_subarrays(model, readnoise_model, gain_model):
         log.info("Extracting readnoise subarray to match science data")
         readnoise_2d = reffile_utils.get_subarray_model(model, readnoise_model).data
 
-    return readnoise_2d, gain_2d
+    # Ramp fitting scales the read noise in place, so keep the
+    # reference model intact for later runs of the step
+    return readnoise_2d.copy(), gain_2d
 
 
 def create_image_model(input_model, image_info):
@@ -206,8 +208,8 @@ class RampFitStep(Step):
         """
         # Open the input data model
         with datamodels.RampModel(step_input) as input_model:
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             max_cores = self.maximum_cores
             readnoise_filename = self.get_reference_file(result, "readnoise")
@@ -215,6 +215,28 @@ def test_ramp_fit_step(generate_miri_reffiles, setup_inputs, max_cores):
     assert slopes.meta.cal_step.ramp_fit == "COMPLETE"
 
 
+def test_override_readnoise_unchanged(generate_miri_reffiles, setup_inputs):
+    """Ramp fitting must not rescale the read noise of an override model."""
+    override_gain, override_readnoise = generate_miri_reffiles
+    model, *_ = setup_inputs(ngroups=5, readnoise=7, nints=1, nrows=2, ncols=2, gain=6)
+    model.data[0, :, :, :] = np.arange(5)[:, np.newaxis, np.newaxis]
+    readnoise = override_readnoise.data.copy()
+
+    results = []
+    for _ in range(2):
+        slopes, _ = RampFitStep.call(
+            model.copy(),
+            override_gain=override_gain,
+            override_readnoise=override_readnoise,
+            maximum_cores="none",
+        )
+        results.append(slopes)
+
+    np.testing.assert_array_equal(override_readnoise.data, readnoise)
+    np.testing.assert_array_equal(results[0].var_rnoise, results[1].var_rnoise)
+    np.testing.assert_array_equal(results[0].data, results[1].data)
+
+
 def test_subarray_5groups(tmp_path_factory):
     # all pixel values are zero. So slope should be zero
     gainfile = tmp_path_factory.mktemp("data") / "gain.fits"
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 import numpy as np
@@ -11,7 +12,13 @@ log.setLevel(logging.DEBUG)
 
 
 def correct_model(
-    output_model, irs2_model, scipix_n_default=16, refpix_r_default=4, pad=8, preserve_refpix=False
+    output_model,
+    irs2_model,
+    scipix_n_default=16,
+    refpix_r_default=4,
+    pad=8,
+    preserve_refpix=False,
+    ncores=1,
 ):
     """
     Correct an input NIRSpec IRS2 datamodel using reference pixels.
@@ -42,6 +49,10 @@ def correct_model(
         This is not used in the science pipeline, but is necessary to
         create new bias files for IRS2 mode.
 
+    ncores : int
+        Number of threads used to correct the four amplifier sectors
+        in parallel.
+
     Returns
     -------
     output_model : ramp model
@@ -166,7 +177,15 @@ def correct_model(
         # below.  The last axis of output_model.data should be 2048.
         data0 = data[integ, :, :, :]
         data0 = subtract_reference(
-            data0, alpha, beta, irs2_mask, scipix_n, refpix_r, pad, preserve_refpix=preserve_refpix
+            data0,
+            alpha,
+            beta,
+            irs2_mask,
+            scipix_n,
+            refpix_r,
+            pad,
+            preserve_refpix=preserve_refpix,
+            ncores=ncores,
         )
         if not preserve_refpix:
             data[integ, :, :, nx - ny :] = data0
@@ -679,7 +698,7 @@ def flag_bad_refpix(datamodel, n_sigma=3.0, flag_only=False, replace_only=False)
 
 
 def subtract_reference(
-    data0, alpha, beta, irs2_mask, scipix_n, refpix_r, pad, preserve_refpix=False
+    data0, alpha, beta, irs2_mask, scipix_n, refpix_r, pad, preserve_refpix=False, ncores=1
 ):
     """
     Subtract reference output and pixels for the current integration.
@@ -718,6 +737,9 @@ def subtract_reference(
         If True, reference pixels will be preserved in the output.
         This is not used in the science pipeline, but is necessary to
         create new bias files for IRS2 mode.
+    ncores : int, optional
+        Number of threads used to correct the four amplifier sectors
+        in parallel.
 
     Returns
     -------
@@ -814,7 +836,9 @@ def subtract_reference(
 
     # Fill in bad pixels, gaps, and reference data locations in the normal
     # data, using Fourier filtering/interpolation
-    fill_bad_regions(data0, ngroups, ny, nx, row, scipix_n, refpix_r, pad, hnorm, hnorm1)
+    fill_bad_regions(
+        data0, ngroups, ny, nx, row, scipix_n, refpix_r, pad, hnorm, hnorm1, ncores=ncores
+    )
 
     # Setup various lists of indices that will be used in subsequent
     # sections for keeping/shuffling reference pixels in various arrays
@@ -859,87 +883,72 @@ def subtract_reference(
         temp_hs = temp_hs[:, ::-1]
         hs = temp_hs.flatten()
 
-    # Construct the reference data: this is done in a big loop over the
+    # Construct the reference data: this is done separately for each of the
     # four "sectors" of data in the image, corresponding to the amp regions.
     # Data from each sector is operated on independently and ultimately
     # the corrections are subtracted from each sector independently.
     shape_d = data0.shape
-    for k in range(1, 5):
+    npix = shape_d[2] * shape_d[3]
+
+    # The data are real, so the filtering is done with real FFTs of the
+    # time sequences.  Only the real part of the filtered sequences is used,
+    # which only depends on the Hermitian part of the filter coefficients.
+    # Note that where the IDL code uses alpha, we use beta, and vice versa.
+    beta_h = hermitian_part(beta)
+
+    # The reference output is the same for all sectors, so transform it once.
+    # IDL:  refout0 = reform(data0[*,*,*,0], sd[1] * sd[2], sd[3])
+    # IDL:  refout0 = fft(refout0, dim=1, /over)
+    refout0 = None
+    alpha_h = None
+    if alpha is not None:
+        alpha_h = hermitian_part(alpha)
+        refout0 = np.fft.rfft(data0[0, :, :, :].reshape((shape_d[1], npix)), axis=1)
+
+    if not preserve_refpix:
+        keep = hnorm1
+    else:
+        keep = unpad
+
+    def correct_sector(k):
         log.debug(f"processing sector {k}")
 
         # At this point in the processing data0 has shape (5, ngroups, 2048, 712),
         # assuming normal IRS2 readout settings. r0k contains a subset of the
-        # data from 1 sector of data0, with shape (ngroups, 2048, 256)
+        # data from 1 sector of data0, with shape (ngroups, 2048, 712)
         r0k = np.zeros((shape_d[1], shape_d[2], shape_d[3]), dtype=np.float32)
-        temp = data0[k, :, :, hs].copy()
-        temp = np.transpose(temp, (1, 2, 0))
-        r0k[:, :, ht] = temp
+        temp = data0[k, :, :, hs]
+        r0k[:, :, ht] = np.transpose(temp, (1, 2, 0))
         del temp
 
-        # data0 has shape (5, ngroups, ny, row).  See the section above where
-        # d0 was created, then copied (moved) to data0.
-        # sd[1] = shape_d[3]   row (712)
-        # sd[2] = shape_d[2]   ny (2048)
-        # sd[3] = shape_d[1]   ngroups
-        # sd[4] = shape_d[0]   5
-        # s is used below, so for convenience, here are the values again:
-        # s[1] = shape[2] = nx
-        # s[2] = shape[1] = ny
-        # s[3] = shape[0] = ngroups
-
-        # IDL and numpy differ in where they apply the normalization for the
-        # FFT.  This really shouldn't matter.
-        normalization = float(shape_d[2] * shape_d[3])
-
-        # Set up refout if alpha was provided
-        refout0 = None
-        if alpha is not None:
-            # IDL:  refout0 = reform(data0[*,*,*,0], sd[1] * sd[2], sd[3])
-            refout0 = data0[0, :, :, :].reshape((shape_d[1], shape_d[2] * shape_d[3]))
-
-            # IDL:  refout0 = fft(refout0, dim=1, /over)
-            # Divide by the length of the axis to be consistent with IDL.
-            refout0 = np.fft.fft(refout0, axis=1) / normalization
-
         # IDL:  r0 = reform(r0, sd[1] * sd[2], sd[3], 5, /over)
-        r0k = r0k.reshape((shape_d[1], shape_d[2] * shape_d[3]))
-        r0k = r0k.astype(np.complex64)
-        r0k_fft = np.fft.fft(r0k, axis=1) / normalization
-
-        # Note that where the IDL code uses alpha, we use beta, and vice versa.
         # IDL:  for k=0,3 do oBridge[k]->Execute,
         #           "for i=0, s3-1 do r0[*,i] *= alpha"
-        r0k_fft *= beta[k - 1]
-
         # IDL:  for k=0,3 do oBridge[k]->Execute,
         #           "for i=0, s3-1 do r0[*,i] += beta * refout0[*,i]"
-        if alpha is not None:
-            r0k_fft += alpha[k - 1] * refout0
-        del refout0
-
         # IDL:  for k=0,3 do oBridge[k]->Execute,
         #           "r0 = fft(r0, 1, dim=1, /overwrite)", /nowait
-        r0k = np.fft.ifft(r0k_fft, axis=1) * normalization
-        del r0k_fft
+        r0k = filter_reference(
+            r0k.reshape((shape_d[1], npix)),
+            beta_h[k - 1],
+            refout0,
+            None if alpha_h is None else alpha_h[k - 1],
+        )
 
-        # sd[1] = shape_d[3]   row (712)
-        # sd[2] = shape_d[2]   ny (2048)
-        # sd[3] = shape_d[1]   ngroups
-        # sd[4] = shape_d[0]   5
         # IDL:  r0 = reform(r0, sd[1], sd[2], sd[3], 5, /over)
-        r0k = r0k.reshape(shape_d[1], shape_d[2], shape_d[3])
-        r0k = r0k.real
-        if not preserve_refpix:
-            r0k = r0k[:, :, hnorm1]
-        else:
-            r0k = r0k[:, :, unpad]
+        r0k = r0k.reshape(shape_d[1], shape_d[2], shape_d[3])[:, :, keep]
 
         # Subtract the correction from the data in this sector
-        if not preserve_refpix:
-            data0[k, :, :, hnorm1] -= np.transpose(r0k, (2, 0, 1))
-        else:
-            data0[k, :, :, unpad] -= np.transpose(r0k, (2, 0, 1))
-        del r0k
+        data0[k, :, :, keep] -= np.transpose(r0k, (2, 0, 1))
+
+    # Sectors only modify their own part of data0, so they can be
+    # corrected in parallel
+    if ncores > 1:
+        with ThreadPoolExecutor(max_workers=min(ncores, 4)) as executor:
+            list(executor.map(correct_sector, range(1, 5)))
+    else:
+        for k in range(1, 5):
+            correct_sector(k)
 
     # End of loop over 4 sectors
 
@@ -993,7 +1002,66 @@ def subtract_reference(
     return data0
 
 
-def fft_interp_norm(dd0, mask0, row, hnorm, hnorm1, ny, ngroups, aa, n_iter_norm):
+def hermitian_part(coeffs):
+    """
+    Compute the Hermitian part of filter coefficients for real FFTs.
+
+    Filtering a real sequence with coefficients ``c`` in Fourier space and
+    keeping the real part of the result is equivalent to filtering it with
+    the Hermitian part of ``c``, ``(c[f] + conj(c[-f])) / 2``, which only
+    needs to be known for non-negative frequencies.
+
+    Parameters
+    ----------
+    coeffs : ndarray
+        Complex filter coefficients, for the frequencies returned by
+        `numpy.fft.fft` along the last axis.
+
+    Returns
+    -------
+    ndarray
+        The Hermitian part of the coefficients for the frequencies returned
+        by `numpy.fft.rfft`, with the same leading dimensions as ``coeffs``.
+    """
+    n = coeffs.shape[-1]
+    freq = np.arange(n // 2 + 1)
+    return ((coeffs[..., freq] + np.conj(coeffs[..., -freq % n])) / 2).astype(coeffs.dtype)
+
+
+def filter_reference(r0k, beta_h, refout0=None, alpha_h=None):
+    """
+    Compute the correction for one sector from its reference pixels.
+
+    This computes the real part of
+    ``ifft(fft(r0k) * beta + fft(refout) * alpha)`` with real FFTs.
+
+    Parameters
+    ----------
+    r0k : ndarray
+        Time sequences of the reference pixels of the sector, with shape
+        (ngroups, npix).
+    beta_h : ndarray
+        Hermitian part of the reference pixel coefficients, as returned by
+        `hermitian_part`, with length ``npix // 2 + 1``.
+    refout0 : ndarray or None, optional
+        Real FFT of the time sequences of the reference output, with shape
+        (ngroups, npix // 2 + 1).
+    alpha_h : ndarray or None, optional
+        Hermitian part of the reference output coefficients.
+
+    Returns
+    -------
+    ndarray
+        The correction, with the same shape as ``r0k``.
+    """
+    r0k_fft = np.fft.rfft(r0k, axis=1)
+    r0k_fft *= beta_h
+    if refout0 is not None:
+        r0k_fft += alpha_h * refout0
+    return np.fft.irfft(r0k_fft, n=r0k.shape[1], axis=1)
+
+
+def fft_interp_norm(dd0, mask0, row, hnorm, hnorm1, ny, ngroups, aa, n_iter_norm, ncores=1):
     """
     Filter iteratively in FFT space of the normal pixels in each group.
 
@@ -1016,23 +1084,35 @@ def fft_interp_norm(dd0, mask0, row, hnorm, hnorm1, ny, ngroups, aa, n_iter_norm
     ngroups : int
         Number of groups.
     aa : ndarray
-        Filter to apply.
+        Filter to apply.  The filter is real and symmetric, so only the
+        values for non-negative frequencies are used.
     n_iter_norm : int
         Number of filtering iterations.
+    ncores : int, optional
+        Number of threads used to filter groups in parallel.
     """
     mm = np.zeros((ny, row), dtype=np.int8)
     mm[:, hnorm1] = mask0[:, hnorm]
-    hm = mm != 0  # 2-D boolean mask
-    for j in range(ngroups):
-        dd = dd0[j, :, :].copy()  # make a copy, not a view
-        p = dd.flatten()
+    hm = (mm != 0).ravel()  # 1-D boolean mask
+    npix = ny * row
+    aa = aa[: npix // 2 + 1].astype(np.float32)
+
+    def filter_group(j):
+        dd = dd0[j, :, :].ravel()
+        known = dd[hm]
+        p = dd.copy()
         for _it in range(n_iter_norm):
-            pp = np.fft.fft(p)
-            pp *= aa
-            p[:] = np.fft.ifft(pp).real
-            p[hm.ravel()] = dd[hm]
+            p = np.fft.irfft(np.fft.rfft(p) * aa, n=npix)
+            p[hm] = known
         dd0[j, :, :] = p.reshape((ny, row))
 
+    if ncores > 1 and ngroups > 1:
+        with ThreadPoolExecutor(max_workers=min(ncores, ngroups)) as executor:
+            list(executor.map(filter_group, range(ngroups)))
+    else:
+        for j in range(ngroups):
+            filter_group(j)
+
 
 def ols_line(x, y):
     """
@@ -1074,11 +1154,13 @@ def remove_slopes(data0, ngroups, ny, row):
     Remove slopes.
 
     Fitting and removal of slopes per frame to remove issues at frame boundaries.
+    Slopes are fit to the non-zero values of the first and last four rows,
+    for all outputs and groups at once.
 
     Parameters
     ----------
     data0 : ndarray
-        Input data array
+        Input data array, modified in place
     ngroups : int
         Number of groups in input data
     ny : int
@@ -1090,23 +1172,34 @@ def remove_slopes(data0, ngroups, ny, row):
     time_arr -= time_arr.mean(dtype=np.float64)
     row4plus4 = np.array([0, 1, 2, 3, 2044, 2045, 2046, 2047], dtype=np.intp)
 
-    # For ab_3, it should be OK to use the same index order as the IDL code.
-    ab_3 = np.zeros((2, ngroups, 5), dtype=np.float32)
-    for i in range(5):
-        for k in range(ngroups):
-            # mask is 2-D, since both row4plus4 and : have more than one element.
-            mask = data0[i, k, row4plus4, :] != 0.0
-            (intercept, slope) = ols_line(
-                time_arr[row4plus4, :][mask], data0[i, k, row4plus4, :][mask]
-            )
-            ab_3[0, k, i] = intercept
-            ab_3[1, k, i] = slope
+    # Ordinary least squares fit for each output and group, using only
+    # non-zero values.  Shapes are (5, ngroups).
+    x = time_arr[row4plus4, :].astype(np.float64)
+    y = data0[:, :, row4plus4, :]
+    mask = y != 0.0
+    n = mask.sum(axis=(2, 3))
+    sum_x = np.sum(x * mask, axis=(2, 3))
+    sum_y = np.sum(y, axis=(2, 3), dtype=np.float64)
+    sum_x2 = np.sum(x**2 * mask, axis=(2, 3))
+    sum_xy = np.sum(x * y, axis=(2, 3), dtype=np.float64)
+    del y, mask
+
+    fit = n > 0
+    n = np.where(fit, n, 1)
+    mean_x = sum_x / n
+    mean_y = sum_y / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (sum_xy - n * mean_x * mean_y) / (sum_x2 - n * mean_x**2)
+    intercept = mean_y - slope * mean_x
+    slope = np.where(fit, slope, 0.0).astype(np.float32)
+    intercept = np.where(fit, intercept, 0.0).astype(np.float32)
 
     for i in range(5):
-        for k in range(ngroups):
-            # weight is 0 where data0 is 0, else 1.
-            weight = (data0[i, k, :, :] != 0.0).astype(np.int8)
-            data0[i, k, :, :] -= (ab_3[0, k, i] + time_arr * ab_3[1, k, i]) * weight
+        # The fit is only subtracted where data0 is not 0.
+        a = intercept[i].reshape((ngroups, 1, 1))
+        b = slope[i].reshape((ngroups, 1, 1))
+        fitted = a + time_arr * b
+        data0[i] -= np.where(data0[i] != 0.0, fitted, 0.0)
 
 
 def replace_bad_pixels(data0, ngroups, ny, row):
@@ -1133,21 +1226,22 @@ def replace_bad_pixels(data0, ngroups, ny, row):
     w_ind = np.arange(1, 32, dtype=np.float32) / 32.0
     w = np.sin(w_ind * np.pi)
     kk = 0
-    for jj in range(ngroups):
-        dat = data0[kk, jj, :, :].reshape(row * ny)
-        mask = (dat != 0.0).astype(np.float32)
-        numerator = convolve1d(dat, w, mode="wrap")
-        denominator = convolve1d(mask, w, mode="wrap")
-        div_zero = denominator == 0.0  # check for divide by zero
-        numerator = np.where(div_zero, 0.0, numerator)
-        denominator = np.where(div_zero, 1.0, denominator)
-        dat = numerator / denominator
-        dat = dat.reshape(ny, row)
-        mask = mask.reshape(ny, row)
-        data0[kk, jj, :, :] += dat * (1.0 - mask)
-
-
-def fill_bad_regions(data0, ngroups, ny, nx, row, scipix_n, refpix_r, pad, hnorm, hnorm1):
+
+    # Interpolate the time sequences of all groups at once
+    dat = data0[kk, :, :, :].reshape((ngroups, row * ny))
+    mask = (dat != 0.0).astype(np.float32)
+    numerator = convolve1d(dat, w, axis=1, mode="wrap")
+    denominator = convolve1d(mask, w, axis=1, mode="wrap")
+    div_zero = denominator == 0.0  # check for divide by zero
+    numerator = np.where(div_zero, 0.0, numerator)
+    denominator = np.where(div_zero, 1.0, denominator)
+    dat = numerator / denominator
+    dat = dat.reshape((ngroups, ny, row))
+    mask = mask.reshape((ngroups, ny, row))
+    data0[kk, :, :, :] += dat * (1.0 - mask)
+
+
+def fill_bad_regions(data0, ngroups, ny, nx, row, scipix_n, refpix_r, pad, hnorm, hnorm1, ncores=1):
     """
     Fill the bad regions in the data.
 
@@ -1181,6 +1275,8 @@ def fill_bad_regions(data0, ngroups, ny, nx, row, scipix_n, refpix_r, pad, hnorm
         Array of column indices for normal pixels
     hnorm1 : ndarray
         Shifted index values for normal pixels
+    ncores : int, optional
+        Number of threads used to filter groups in parallel
     """
     # Parameters for the filter to be used:
     # length of apodization cosine filter
@@ -1230,6 +1326,7 @@ def fill_bad_regions(data0, ngroups, ny, nx, row, scipix_n, refpix_r, pad, hnorm
         ngroups,
         aa,
         n_iter_norm,
+        ncores=ncores,
     )
 
     data0[0, :, :, :] = dd0.copy()
@@ -45,6 +45,7 @@ import logging
 from copy import deepcopy
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy import stats
 
 from stdatamodels.jwst.datamodels import dqflags
@@ -1045,18 +1046,30 @@ class NIRDataset(Dataset):
         augmented_data = self.create_reflected(data, smoothing_length)
         augmented_dq = self.create_reflected(dq, smoothing_length)
         nrows, ncols = data.shape
-        result = np.zeros(nrows)
-        for i in range(nrows):
-            rowstart = i
-            rowstop = rowstart + smoothing_length
-            goodpixels = np.where(
-                np.bitwise_and(augmented_dq[rowstart:rowstop], dqflags.pixel["DO_NOT_USE"]) == 0
-            )
-            if len(goodpixels[0]) == 0:
-                result[i] = np.nan
-            else:
-                window = augmented_data[rowstart:rowstop][goodpixels]
-                result[i] = np.median(window)
+
+        # Stack the windows of all rows, with the pixels not to use set to NaN,
+        # and sort them so that the good pixels of each window come first
+        good = np.bitwise_and(augmented_dq, dqflags.pixel["DO_NOT_USE"]) == 0
+        windows = sliding_window_view(
+            np.where(good, augmented_data, np.nan), smoothing_length, axis=0
+        )[:nrows].reshape((nrows, ncols * smoothing_length))
+        windows = np.sort(windows, axis=1)
+        ngood = np.count_nonzero(
+            sliding_window_view(good, smoothing_length, axis=0)[:nrows], axis=(1, 2)
+        )
+
+        # The median is the mean of the middle good pixels
+        rows = np.arange(nrows)
+        low = windows[rows, (ngood - 1) // 2]
+        high = windows[rows, ngood // 2]
+        result = ((low + high) / 2).astype(np.float64)
+
+        # As for np.median, good pixels that are NaN make the median NaN
+        nan_good = good & np.isnan(augmented_data)
+        result[
+            np.any(sliding_window_view(nan_good, smoothing_length, axis=0)[:nrows], axis=(1, 2))
+        ] = np.nan
+        result[ngood == 0] = np.nan
         return result
 
     def calculate_side_ref_signal(self, group, colstart, colstop):
@@ -1105,8 +1118,7 @@ class NIRDataset(Dataset):
         """
         combined = self.combine_with_nans(left, right)
         sidegroup = np.zeros((2048, 2048))
-        for column in range(2048):
-            sidegroup[:, column] = combined
+        sidegroup[:, :] = combined[:, np.newaxis]
         return sidegroup
 
     def combine_with_nans(self, a, b):
@@ -27,6 +27,7 @@ class RefPixStep(Step):
         sigreject = float(default=4.0) # Number of sigmas to reject as outliers
         gaussmooth = float(default=1.0) # Width of Gaussian smoothing kernel to use as a low-pass filter
         halfwidth = integer(default=30) # Half-width of convolution kernel to build
+        maximum_cores = string(default='1') # Number of threads for the IRS2 correction: an integer, 'quarter', 'half', or 'all'
     """  # noqa: E501
 
     reference_file_types = ["refpix", "sirskernel"]
@@ -55,8 +56,8 @@ class RefPixStep(Step):
 
         # Open the input data model
         with datamodels.RampModel(step_input) as input_model:
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             if pipe_utils.is_irs2(result):
                 # Flag bad reference pixels first
@@ -98,8 +99,9 @@ class RefPixStep(Step):
                 irs2_model = datamodels.IRS2Model(self.irs2_name)
 
                 # Apply the IRS2 correction scheme
+                ncores = pipe_utils.compute_num_cores(self.maximum_cores)
                 result = irs2_subtract_reference.correct_model(
-                    result, irs2_model, preserve_refpix=self.preserve_irs2_refpix
+                    result, irs2_model, preserve_refpix=self.preserve_irs2_refpix, ncores=ncores
                 )
 
                 if result.meta.cal_step.refpix != "SKIPPED":
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from jwst.refpix.irs2_subtract_reference import (
+    fft_interp_norm,
+    filter_reference,
+    hermitian_part,
+    ols_line,
+    remove_slopes,
+    replace_bad_pixels,
+)
+
+
+def make_coeffs(rng, shape):
+    return (rng.normal(1.0, 0.1, shape) + 1j * rng.normal(0.0, 0.1, shape)).astype(np.complex64)
+
+
+@pytest.mark.parametrize("npix", [16, 17])
+def test_filter_reference(npix):
+    """Real FFTs with Hermitian coefficients give the real part of the complex filter."""
+    rng = np.random.default_rng(0)
+    r0k = rng.normal(size=(3, npix)).astype(np.float32)
+    refout = rng.normal(size=(3, npix)).astype(np.float32)
+    alpha = make_coeffs(rng, npix)
+    beta = make_coeffs(rng, npix)
+
+    expected = np.fft.ifft(np.fft.fft(r0k, axis=1) * beta, axis=1).real
+    result = filter_reference(r0k, hermitian_part(beta))
+    assert result.shape == r0k.shape
+    np.testing.assert_allclose(result, expected, atol=1e-5)
+
+    expected = np.fft.ifft(
+        np.fft.fft(r0k, axis=1) * beta + np.fft.fft(refout, axis=1) * alpha, axis=1
+    ).real
+    result = filter_reference(
+        r0k, hermitian_part(beta), np.fft.rfft(refout, axis=1), hermitian_part(alpha)
+    )
+    np.testing.assert_allclose(result, expected, atol=1e-5)
+
+
+@pytest.mark.parametrize("ncores", [1, 2])
+def test_fft_interp_norm(ncores):
+    """The real FFT filtering matches the complex FFT filtering of each group."""
+    rng = np.random.default_rng(1)
+    ngroups, ny, row = 3, 4, 10
+    hnorm = np.arange(6)
+    hnorm1 = np.arange(6) + 2
+    mask0 = (rng.uniform(size=(ny, 6)) > 0.3).astype(np.int8)
+    dd0 = rng.normal(size=(ngroups, ny, row)).astype(np.float32)
+    freq = np.fft.fftfreq(ny * row)
+    aa = np.exp(-((freq / 0.2) ** 2))
+
+    mm = np.zeros((ny, row), dtype=bool)
+    mm[:, hnorm1] = mask0[:, hnorm] != 0
+    expected = dd0.copy()
+    for j in range(ngroups):
+        p = dd0[j].ravel().copy()
+        for _ in range(3):
+            p = np.fft.ifft(np.fft.fft(p) * aa).real
+            p[mm.ravel()] = dd0[j][mm]
+        expected[j] = p.reshape((ny, row))
+
+    fft_interp_norm(dd0, mask0, row, hnorm, hnorm1, ny, ngroups, aa, 3, ncores=ncores)
+    np.testing.assert_allclose(dd0, expected, atol=1e-5)
+
+
+def test_remove_slopes():
+    """Slopes fit to all outputs and groups at once match fits to each of them."""
+    rng = np.random.default_rng(2)
+    ngroups, ny, row = 2, 2048, 6
+    data0 = rng.normal(10.0, 1.0, (5, ngroups, ny, row)).astype(np.float32)
+    data0[1, 0, :4, :3] = 0.0
+    data0[2, 1] = 0.0
+
+    time_arr = np.arange(ny * row, dtype=np.float32).reshape((ny, row))
+    time_arr -= time_arr.mean(dtype=np.float64)
+    rows = [0, 1, 2, 3, 2044, 2045, 2046, 2047]
+    expected = data0.copy()
+    for i in range(5):
+        for k in range(ngroups):
+            mask = data0[i, k, rows, :] != 0.0
+            intercept, slope = ols_line(time_arr[rows, :][mask], data0[i, k, rows, :][mask])
+            weight = data0[i, k] != 0.0
+            expected[i, k] -= (np.float32(intercept) + time_arr * np.float32(slope)) * weight
+
+    remove_slopes(data0, ngroups, ny, row)
+    np.testing.assert_allclose(data0, expected, rtol=1e-5, atol=1e-4)
+    assert np.all(data0[2, 1] == 0.0)
+
+
+def test_replace_bad_pixels():
+    """Zeros in the reference output are interpolated from their neighbors."""
+    ngroups, ny, row = 2, 4, 40
+    data0 = np.ones((5, ngroups, ny, row), dtype=np.float32)
+    data0[0, :, :, :] *= np.array([2.0, 3.0], dtype=np.float32)[:, np.newaxis, np.newaxis]
+    data0[0, :, 1, 10:15] = 0.0
+    data0[1, :, 1, 10:15] = 0.0
+
+    replace_bad_pixels(data0, ngroups, ny, row)
+    np.testing.assert_allclose(data0[0, 0], 2.0, rtol=1e-6)
+    np.testing.assert_allclose(data0[0, 1], 3.0, rtol=1e-6)
+
+    # Only the reference output is interpolated
+    assert np.all(data0[1, :, 1, 10:15] == 0.0)
@@ -828,6 +828,34 @@ def test_do_top_bottom_correction_no_even_odd(setup_cube):
         )
 
 
+@pytest.mark.parametrize("smoothing_length", [4, 11])
+def test_median_filter(setup_cube, smoothing_length):
+    """Test the running median of the side reference pixels against np.median."""
+    input_model = setup_cube("NIRCAM", "NRCALONG", 1, 2048, 2048)
+    init_dataset = NIRDataset(input_model, True, True, smoothing_length, 1.0, conv_kernel_params)
+
+    rng = np.random.default_rng(0)
+    data = rng.normal(10.0, 1.0, (100, 4))
+    dq = np.zeros(data.shape, dtype=np.uint32)
+    dq[rng.uniform(size=data.shape) < 0.3] = dqflags.pixel["DO_NOT_USE"]
+    dq[40:60] = dqflags.pixel["DO_NOT_USE"]
+    data[dq != 0] = np.nan
+    data[5, 2] = np.nan
+
+    augmented_data = init_dataset.create_reflected(data, smoothing_length)
+    augmented_dq = init_dataset.create_reflected(dq, smoothing_length)
+    expected = np.zeros(data.shape[0])
+    for row in range(data.shape[0]):
+        window = augmented_data[row : row + smoothing_length]
+        good = augmented_dq[row : row + smoothing_length] == 0
+        expected[row] = np.median(window[good]) if np.any(good) else np.nan
+
+    result = init_dataset.median_filter(data, dq, smoothing_length)
+    np.testing.assert_array_equal(result, expected)
+    assert np.isnan(result[5])
+    assert np.isnan(result[50])
+
+
 def make_rampmodel(ngroups, ysize, xsize, instrument="MIRI", fill_value=None):
     """
     Make MIRI or NIRSpec ramp model for testing.
@@ -19,6 +19,7 @@ from jwst.associations.asn_from_list import asn_from_list
 from jwst.model_blender.blender import ModelBlender
 from jwst.resample import resample_utils
 from jwst.assign_wcs import util as assign_wcs_util
+from jwst.lib.pipe_utils import limit_forked_workers, map_forked_workers
 
 
 log = logging.getLogger(__name__)
@@ -575,7 +576,7 @@ class ResampleImage(Resample):
         self.output_jwst_model.meta.filename = output_model_filename
         return self.output_jwst_model
 
-    def resample_many_to_many(self, in_memory=True):
+    def resample_many_to_many(self, in_memory=True, ncores=1, max_memory=None):
         """
         Resample many inputs to many outputs where outputs have a common frame.
 
@@ -593,27 +594,37 @@ class ResampleImage(Resample):
             files on disk and return a `ModelLibrary` with only the associacion
             info. See https://stpipe.readthedocs.io/en/latest/model_library.html#on-disk-mode
             for more details.
+        ncores : int, optional
+            Number of worker processes resampling groups in parallel. If 1,
+            groups are resampled one after the other.
+        max_memory : float, None, optional
+            Memory, in GB, allowed for the arrays of the groups resampled in
+            parallel. The number of worker processes is reduced so that the
+            output arrays of the groups resampled at the same time fit within
+            this limit. If `None`, the number of processes is not limited.
 
         Returns
         -------
         ModelLibrary
             A library of resampled models.
         """
-        output_models = []
-
-        for _group_id, indices in self.input_models.group_indices.items():
-            output_model = self.resample_group(indices)
-
-            if not in_memory:
-                # Write out model to disk, then return filename
-                output_name = output_model.meta.filename
-                if self.output_dir is not None:
-                    output_name = str(Path(self.output_dir) / output_name)
-                output_model.save(output_name)
-                log.info(f"Saved model in {output_name}")
-                output_models.append(output_name)
-            else:
-                output_models.append(output_model)
+        indices_by_group = list(self.input_models.group_indices.values())
+        ncores = self._limit_workers(min(ncores, len(indices_by_group)), max_memory)
+        if ncores > 1:
+            log.info(f"Resampling {len(indices_by_group)} groups using {ncores} processes")
+            # Worker processes inherit this object, with its output WCS, and
+            # the input library, and drizzle with their own output arrays
+            output_models = [None] * len(indices_by_group)
+            for i, output in map_forked_workers(
+                _resample_group_worker, indices_by_group, ncores, (self, in_memory)
+            ):
+                if in_memory:
+                    output = self._model_from_tree(*output)
+                output_models[i] = output
+        else:
+            output_models = [
+                _resample_group_output(self, indices, in_memory) for indices in indices_by_group
+            ]
 
         if in_memory:
             # build ModelLibrary as a list of in-memory models
@@ -625,6 +636,59 @@ class ResampleImage(Resample):
             asn_dict = json.loads(asn.dump()[1])  # serializes the asn and converts to dict
             return ModelLibrary(asn_dict, on_disk=True)
 
+    def _limit_workers(self, ncores, max_memory):
+        """
+        Limit the number of worker processes resampling groups in parallel.
+
+        Parameters
+        ----------
+        ncores : int
+            Requested number of worker processes.
+        max_memory : float, None
+            Memory, in GB, allowed for the output arrays of the groups
+            resampled at the same time.
+
+        Returns
+        -------
+        int
+            The number of worker processes to use.
+        """
+        ncores = limit_forked_workers(ncores)
+        if ncores > 1 and max_memory is not None:
+            # Each group drizzles the data and weight arrays, plus the context,
+            # error and variance arrays (and variance weights) when enabled
+            narrays = 2 + bool(self._enable_ctx) + bool(self._compute_err)
+            if self._enable_var:
+                narrays += 6
+            group_bytes = 4 * narrays * int(np.prod(self.output_array_shape))
+            nfit = max(int(max_memory * 1024**3 // group_bytes), 1)
+            if nfit < ncores:
+                log.info(
+                    f"Resampling at most {nfit} groups at once to use less than {max_memory} GB"
+                )
+                ncores = nfit
+        return max(ncores, 1)
+
+    def _model_from_tree(self, model_class, tree):
+        """
+        Rebuild a resampled model from the tree returned by a worker process.
+
+        Parameters
+        ----------
+        model_class : type
+            Class of the resampled model.
+        tree : dict
+            The model's tree, without its WCS.
+
+        Returns
+        -------
+        DataModel
+            The resampled model, with the output WCS.
+        """
+        model = model_class(tree)
+        model.meta.wcs = self.output_wcs
+        return model
+
     def resample_many_to_one(self):
         """
         Resample and coadd many inputs to a single output.
@@ -692,6 +756,49 @@ class ResampleImage(Resample):
                 del model.meta.wcsinfo.instance[key]
 
 
+def _resample_group_output(resamp, indices, in_memory):
+    """
+    Resample one group and, when not kept in memory, save the result to disk.
+
+    Parameters
+    ----------
+    resamp : ResampleImage
+        The controlling object for the resampling process.
+    indices : list
+        Indices of the models in the input library belonging to the group.
+    in_memory : bool
+        If `False`, the resampled model is saved to a file.
+
+    Returns
+    -------
+    DataModel or str
+        The resampled model, or the name of the file in which it was saved.
+    """
+    output_model = resamp.resample_group(indices)
+    if in_memory:
+        return output_model
+
+    # Write out model to disk, then return filename
+    output_name = output_model.meta.filename
+    if resamp.output_dir is not None:
+        output_name = str(Path(resamp.output_dir) / output_name)
+    output_model.save(output_name)
+    log.info(f"Saved model in {output_name}")
+    return output_name
+
+
+def _resample_group_worker(indices, resamp, in_memory):
+    output = _resample_group_output(resamp, indices, in_memory)
+    if not in_memory:
+        return output
+
+    # Data models cannot be pickled: return the model tree instead, leaving
+    # out the output WCS which the parent process already has
+    tree = dict(output.instance)
+    tree["meta"] = {k: v for k, v in tree["meta"].items() if k != "wcs"}
+    return type(output), tree
+
+
 def input_jwst_model_to_dict(model, weight_type, enable_var, compute_err):
     """
     Convert a data model to a dictionary of keywords and values expected by `stcal.resample`.
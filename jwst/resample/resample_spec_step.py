@@ -4,7 +4,7 @@ from stdatamodels.jwst import datamodels
 from stdatamodels.jwst.datamodels import MultiSlitModel, ImageModel
 
 from jwst.datamodels import ModelContainer, ModelLibrary
-from jwst.lib.pipe_utils import match_nans_and_flags
+from jwst.lib.pipe_utils import compute_num_cores, match_nans_and_flags
 from jwst.lib.wcs_utils import get_wavelengths
 from jwst.resample.resample_utils import load_custom_wcs, find_miri_lrs_sregion
 
@@ -35,6 +35,8 @@ class ResampleSpecStep(Step):
         single = boolean(default=False)  # Resample each input to its own output grid
         blendheaders = boolean(default=True)  # Blend metadata from inputs into output
         in_memory = boolean(default=True)  # Keep images in memory
+        maximum_cores = string(default='1')  # cores for resampling groups in parallel when single=True. Can be an integer, 'half', 'quarter', or 'all'
+        maximum_memory = float(default=None)  # memory (GB) for groups resampled in parallel; limits the number of processes
     """  # noqa: E501
 
     def process(self, input_data):
@@ -148,7 +150,11 @@ class ResampleSpecStep(Step):
                 resamp = resample_spec.ResampleSpec(
                     container, enable_var=False, compute_err="driz_err", **self.drizpars
                 )
-                drizzled_library = resamp.resample_many_to_many(in_memory=self.in_memory)
+                drizzled_library = resamp.resample_many_to_many(
+                    in_memory=self.in_memory,
+                    ncores=compute_num_cores(self.maximum_cores),
+                    max_memory=self.maximum_memory,
+                )
             else:
                 resamp = resample_spec.ResampleSpec(
                     container, enable_var=True, compute_err="from_var", **self.drizpars
@@ -241,7 +247,11 @@ class ResampleSpecStep(Step):
             resamp = resample_spec.ResampleSpec(
                 input_models, enable_var=False, compute_err="driz_err", **self.drizpars
             )
-            drizzled_library = resamp.resample_many_to_many(in_memory=self.in_memory)
+            drizzled_library = resamp.resample_many_to_many(
+                in_memory=self.in_memory,
+                ncores=compute_num_cores(self.maximum_cores),
+                max_memory=self.maximum_memory,
+            )
             with drizzled_library:
                 result = drizzled_library.borrow(0)
                 drizzled_library.shelve(result, 0, modify=False)
@@ -3,7 +3,7 @@ import logging
 from stdatamodels.jwst import datamodels as dm
 from stdatamodels import filetype
 from jwst.datamodels import ModelLibrary, ImageModel  # type: ignore[attr-defined]
-from jwst.lib.pipe_utils import match_nans_and_flags
+from jwst.lib.pipe_utils import compute_num_cores, match_nans_and_flags
 from jwst.resample.resample_utils import load_custom_wcs
 
 from . import resample
@@ -46,6 +46,8 @@ class ResampleStep(Step):
         single = boolean(default=False)  # Resample each input to its own output grid
         blendheaders = boolean(default=True)  # Blend metadata from inputs into output
         in_memory = boolean(default=True)  # Keep images in memory
+        maximum_cores = string(default='1')  # cores for resampling groups in parallel when single=True. Can be an integer, 'half', 'quarter', or 'all'
+        maximum_memory = float(default=None)  # memory (GB) for groups resampled in parallel; limits the number of processes
         enable_ctx = boolean(default=True)  # Compute and report the context array
         enable_err = boolean(default=True)  # Compute and report the err array
         report_var = boolean(default=True)  # Report the variance array
@@ -116,7 +118,11 @@ class ResampleStep(Step):
             resamp = resample.ResampleImage(
                 input_models, output=output, enable_var=False, compute_err="driz_err", **kwargs
             )
-            result = resamp.resample_many_to_many(in_memory=self.in_memory)
+            result = resamp.resample_many_to_many(
+                in_memory=self.in_memory,
+                ncores=compute_num_cores(self.maximum_cores),
+                max_memory=self.maximum_memory,
+            )
 
         else:
             if self.enable_err:
@@ -0,0 +1,153 @@
+"""Tests of resampling many exposure groups, serially and in parallel."""
+
+import logging
+import os
+import time
+
+import numpy as np
+import pytest
+from astropy import coordinates as coord
+from astropy import units as u
+from astropy.modeling import models
+from gwcs import coordinate_frames as cf
+from gwcs import wcs
+from numpy.testing import assert_allclose
+from stdatamodels.jwst import datamodels
+
+from jwst.datamodels import ModelLibrary
+from jwst.resample.resample import ResampleImage
+
+log = logging.getLogger(__name__)
+
+SHAPE = (40, 50)
+OUTPUT_SHAPE = (60, 110)
+
+
+def make_wcs(xref, yref, shape):
+    """Make a simple imaging WCS, with the form expected for resampled images."""
+    transform = (
+        (models.Shift(-xref) & models.Shift(-yref))
+        | models.AffineTransformation2D(np.eye(2), translation=[0.0, 0.0])
+        | (models.Scale(1e-5) & models.Scale(1e-5))
+        | models.Pix2Sky_TAN()
+        | models.RotateNative2Celestial(15.0, 28.0, 180.0)
+    )
+    detector = cf.Frame2D(name="detector", axes_order=(0, 1), unit=(u.pix, u.pix))
+    sky = cf.CelestialFrame(reference_frame=coord.ICRS(), name="world")
+    result = wcs.WCS([(detector, transform), (sky, None)])
+    result.bounding_box = ((-0.5, shape[1] - 0.5), (-0.5, shape[0] - 0.5))
+    result.array_shape = shape
+    return result
+
+
+def make_exposure(i, shape=SHAPE, step=1.3):
+    """Make a dithered exposure, in its own exposure group."""
+    rng = np.random.default_rng(i)
+    model = datamodels.ImageModel(shape)
+    model.data[:] = rng.normal(1.0, 0.1, shape)
+    model.err[:] = 0.1
+    model.var_rnoise[:] = 0.01
+    model.meta.filename = f"test_{i + 1:03d}_cal.fits"
+    model.meta.bunit_data = "MJy/sr"
+    model.meta.observation.program_number = "1"
+    model.meta.observation.observation_number = "1"
+    model.meta.observation.visit_number = "1"
+    model.meta.observation.visit_group = "1"
+    model.meta.observation.sequence_id = "1"
+    model.meta.observation.activity_id = "1"
+    model.meta.observation.exposure_number = str(i + 1)
+    model.meta.exposure.exposure_time = 100.0
+    model.meta.exposure.measurement_time = 90.0
+    model.meta.exposure.duration = 110.0
+    model.meta.exposure.start_time = 60000.0 + i / 100.0
+    model.meta.exposure.end_time = 60000.0 + (i + 0.5) / 100.0
+    model.meta.photometry.pixelarea_steradians = 2.35e-15
+    model.meta.photometry.pixelarea_arcsecsq = 1e-4
+    model.meta.wcs = make_wcs(shape[1] / 2 + i * step, shape[0] / 2, shape)
+    return model
+
+
+def make_resamp(library, output_shape=OUTPUT_SHAPE):
+    """Set up resampling to a common output frame, as for single=True."""
+    output_wcs = make_wcs(output_shape[1] / 2, output_shape[0] / 2, output_shape)
+    return ResampleImage(
+        library,
+        output_wcs={"wcs": output_wcs, "pixel_scale": 2.06},
+        blendheaders=False,
+        enable_var=False,
+        compute_err="driz_err",
+    )
+
+
+@pytest.mark.parametrize("in_memory", [True, False])
+def test_resample_many_to_many_parallel(tmp_cwd, in_memory):
+    """Resampling groups in parallel gives the same models as serially."""
+    library = ModelLibrary([make_exposure(i) for i in range(5)], on_disk=False)
+
+    expected = make_resamp(library).resample_many_to_many(in_memory=in_memory)
+    expected_models = []
+    with expected:
+        for model in expected:
+            expected_models.append(model.copy())
+            expected.shelve(model, modify=False)
+
+    result = make_resamp(library).resample_many_to_many(in_memory=in_memory, ncores=3)
+    assert len(result) == len(expected_models) == 5
+    with result:
+        for model, expected_model in zip(result, expected_models, strict=True):
+            assert type(model) is type(expected_model)
+            assert model.meta.filename == expected_model.meta.filename
+            assert model.meta.resample.pixfrac == 1.0
+            assert model.meta.cal_step.resample == "COMPLETE"
+            assert model.meta.wcs.array_shape == OUTPUT_SHAPE
+            for name in ["data", "wht", "con", "err"]:
+                assert_allclose(getattr(model, name), getattr(expected_model, name))
+            result.shelve(model, modify=False)
+
+
+def test_limit_workers(monkeypatch):
+    library = ModelLibrary([make_exposure(i) for i in range(3)], on_disk=False)
+    resamp = make_resamp(library)
+
+    # Data, weight, context and error arrays are drizzled for each group
+    group_gb = 4 * 4 * np.prod(OUTPUT_SHAPE) / 1024**3
+    assert resamp._limit_workers(3, None) == 3
+    assert resamp._limit_workers(3, 2.5 * group_gb) == 2
+    assert resamp._limit_workers(3, 0.5 * group_gb) == 1
+
+    monkeypatch.setattr("multiprocessing.get_all_start_methods", lambda: ["spawn"])
+    assert resamp._limit_workers(3, None) == 1
+
+
+@pytest.mark.slow
+def test_resample_many_to_many_benchmark(tmp_cwd):
+    """Time resampling a 50-exposure mosaic with increasing numbers of processes."""
+    shape = (1024, 1024)
+    library = ModelLibrary(
+        [make_exposure(i, shape=shape, step=40.0) for i in range(50)], on_disk=False
+    )
+    output_shape = (1100, 3100)
+
+    timings = {}
+    expected = None
+    ncpus = os.cpu_count() or 1
+    for ncores in sorted({1, 2, 4, 8, ncpus}):
+        if ncores > ncpus:
+            continue
+        resamp = make_resamp(library, output_shape=output_shape)
+        start = time.perf_counter()
+        result = resamp.resample_many_to_many(in_memory=False, ncores=ncores)
+        timings[ncores] = time.perf_counter() - start
+
+        with result:
+            model = result.borrow(49)
+            data = model.data.copy()
+            result.shelve(model, 49, modify=False)
+        if expected is None:
+            expected = data
+        assert_allclose(data, expected)
+
+    log.info(
+        "Resampling 50 exposures: "
+        + "; ".join(f"{ncores} processes: {t:.1f} s" for ncores, t in timings.items())
+    )
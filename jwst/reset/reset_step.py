@@ -54,8 +54,8 @@ class ResetStep(Step):
             # Open the reset ref file data model
             reset_model = datamodels.ResetModel(self.reset_name)
 
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             # Do the reset correction subtraction
             result = reset_sub.do_correction(result, reset_model)
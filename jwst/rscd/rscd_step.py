@@ -67,8 +67,8 @@ class RscdStep(Step):
             # Load the rscd ref file data model
             rscd_model = datamodels.RSCDModel(self.rscd_name)
 
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             # Do the rscd correction
             result = rscd_sub.do_correction(result, rscd_model)
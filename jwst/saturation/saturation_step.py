@@ -61,8 +61,8 @@ class SaturationStep(Step):
                 if not reffile_utils.ref_matches_sci(input_model, bias_model):
                     bias_model = reffile_utils.get_subarray_model(input_model, bias_model)
 
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             # Do the saturation check
             if pipe_utils.is_irs2(result):
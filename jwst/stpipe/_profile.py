@@ -0,0 +1,183 @@
+"""Time and memory profiling of pipeline steps."""
+
+from pathlib import Path
+import resource
+import sys
+import time
+import tracemalloc
+
+from stdatamodels.jwst.datamodels import JwstDataModel
+
+__all__ = ["StepProfile"]
+
+# Profiles of the steps currently running, outermost first
+_ACTIVE: list["StepProfile"] = []
+
+
+def _peak_rss():
+    """
+    Return the peak resident set size of the process.
+
+    Returns
+    -------
+    int
+        The peak resident set size, in bytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes, except on macOS
+    if sys.platform != "darwin":
+        peak *= 1024
+    return peak
+
+
+def _input_name(args):
+    """
+    Describe the primary input of a step.
+
+    Parameters
+    ----------
+    args : tuple
+        The arguments the step is run with.
+
+    Returns
+    -------
+    str or None
+        The file name of the primary input, the class name of an input without
+        a file name, or None if there is no input.
+    """
+    if len(args) == 0:
+        return None
+    obj = args[0]
+    if isinstance(obj, (str, Path)):
+        return Path(obj).name
+    if isinstance(obj, JwstDataModel) and obj.meta.filename is not None:
+        return obj.meta.filename
+    return type(obj).__name__
+
+
+class StepProfile:
+    """
+    Wall time, CPU time and memory used by one run of a step.
+
+    Profiles nest: a profile started while another one is running, such as
+    that of a step run by a pipeline, is recorded as a substep of the running
+    one. Memory allocated by Python and numpy arrays is traced with
+    `tracemalloc`, which is started by the outermost profile if it is not
+    already tracing.
+    """
+
+    def __init__(self, step, args):
+        """
+        Start profiling a step.
+
+        Parameters
+        ----------
+        step : `~jwst.stpipe.JwstStep`
+            The step being run.
+        args : tuple
+            The arguments the step is run with.
+        """
+        self.step_name = step.name
+        self.step_class = type(step).__name__
+        self.input_name = _input_name(args)
+        self.substeps = []
+        self.wall_time = None
+        self.cpu_time = None
+        self.peak_memory = None
+        self.peak_rss = None
+        self.rss_increase = None
+
+        self._parent = _ACTIVE[-1] if _ACTIVE else None
+        self._started_tracing = False
+        if self._parent is not None:
+            # Record the peak memory of the parent so far, before resetting it
+            self._parent.update_peak()
+        elif not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._traced_start = tracemalloc.get_traced_memory()[0]
+        self._traced_peak = self._traced_start
+        tracemalloc.reset_peak()
+        self._rss_start = _peak_rss()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        _ACTIVE.append(self)
+
+    @property
+    def running(self):  # numpydoc ignore=RT01
+        """Whether the profile is still recording."""
+        return self.wall_time is None
+
+    @property
+    def outermost(self):  # numpydoc ignore=RT01
+        """Whether the profile is not a substep of another profile."""
+        return self._parent is None
+
+    def update_peak(self, traced_peak=0):
+        """
+        Include the traced memory peak since the last update.
+
+        Parameters
+        ----------
+        traced_peak : int, optional
+            A traced memory peak, in bytes, reached by a substep.
+        """
+        self._traced_peak = max(self._traced_peak, traced_peak, tracemalloc.get_traced_memory()[1])
+
+    def stop(self):
+        """Stop recording, adding the profile to the substeps of its parent."""
+        if not self.running:
+            return
+        self.wall_time = time.perf_counter() - self._wall_start
+        self.cpu_time = time.process_time() - self._cpu_start
+        self.update_peak()
+        self.peak_memory = self._traced_peak - self._traced_start
+        self.peak_rss = _peak_rss()
+        self.rss_increase = self.peak_rss - self._rss_start
+
+        # Substeps that failed to stop are dropped with this profile
+        while _ACTIVE and _ACTIVE.pop() is not self:
+            pass
+        if self._parent is not None:
+            self._parent.update_peak(self._traced_peak)
+            self._parent.substeps.append(self)
+        elif self._started_tracing:
+            tracemalloc.stop()
+
+    def summary(self):
+        """
+        Summarize the profile in one line.
+
+        Returns
+        -------
+        str
+            The time and memory used by the step.
+        """
+        return (
+            f"Step {self.step_name} profile: wall time {self.wall_time:.2f} s, "
+            f"CPU time {self.cpu_time:.2f} s, "
+            f"peak array memory {self.peak_memory / 1024**2:.1f} MB, "
+            f"peak RSS {self.peak_rss / 1024**2:.1f} MB "
+            f"(+{self.rss_increase / 1024**2:.1f} MB)"
+        )
+
+    def to_dict(self):
+        """
+        Convert the profile and those of its substeps to a dictionary.
+
+        Returns
+        -------
+        dict
+            The profile, with times in seconds and memory in bytes.
+        """
+        return {
+            "step": self.step_name,
+            "class": self.step_class,
+            "input": self.input_name,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_memory": self.peak_memory,
+            "peak_rss": self.peak_rss,
+            "rss_increase": self.rss_increase,
+            "substeps": [substep.to_dict() for substep in self.substeps],
+        }
@@ -1,8 +1,10 @@
 """JWST-specific Step and Pipeline base classes."""
 
 from functools import wraps
+import json
 import logging
 from pathlib import Path
+import time
 
 from stdatamodels.jwst.datamodels import JwstDataModel, read_metadata
 from stdatamodels.jwst import datamodels
@@ -11,6 +13,7 @@ from stpipe import crds_client, Step, Pipeline
 from jwst import __version_commit__, __version__
 from jwst.datamodels import ModelLibrary, ModelContainer
 from ._cal_logs import _LOG_FORMATTER
+from ._profile import StepProfile
 from jwst.lib.suffix import remove_suffix
 
 
@@ -23,6 +26,7 @@ class JwstStep(Step):
 
     spec = """
     output_ext = string(default='.fits')  # Output file type
+    profile = boolean(default=False)  # Record time and memory used by the step and its substeps
     """  # noqa: E501
 
     _log_records_formatter = _LOG_FORMATTER
@@ -141,6 +145,13 @@ class JwstStep(Step):
         reference_files_used : list of tuple
             The names and file paths of reference files used.
         """
+        # Stop profiling before results are saved, so that the summary
+        # is recorded in the cal logs
+        profile = getattr(self, "_profile", None)
+        if profile is not None and profile.running:
+            profile.stop()
+            self.log.info(profile.summary())
+
         if isinstance(result, JwstDataModel):
             result.meta.calibration_software_revision = __version_commit__ or "RELEASE"
             result.meta.calibration_software_version = __version__
@@ -177,6 +188,83 @@ class JwstStep(Step):
         """
         return remove_suffix(name)
 
+    def _profiling(self):
+        """
+        Check whether profiling is enabled for this step or a parent pipeline.
+
+        Returns
+        -------
+        bool
+            True if the step should be profiled.
+        """
+        step = self
+        while step is not None:
+            if getattr(step, "profile", False):
+                return True
+            step = step.parent
+        return False
+
+    def _in_place(self):
+        """
+        Check whether a parent pipeline lets the step modify its input.
+
+        Returns
+        -------
+        bool
+            True if a parent pipeline has ``in_place`` set.
+        """
+        parent = self.parent
+        while parent is not None:
+            if getattr(parent, "in_place", False):
+                return True
+            parent = parent.parent
+        return False
+
+    def copy_input(self, input_model):
+        """
+        Copy the input model of the step, to be modified as the result.
+
+        When the step is run by a pipeline running in place, the pipeline owns
+        the input and discards it after the step, so the input is returned
+        without copying and the step modifies its arrays directly.
+
+        Parameters
+        ----------
+        input_model : `~jwst.datamodels.JwstDataModel`
+            The input model of the step.
+
+        Returns
+        -------
+        `~jwst.datamodels.JwstDataModel`
+            A copy of the input model, or the input model itself if running in place.
+        """
+        if self._in_place():
+            return input_model
+        return input_model.copy()
+
+    def _save_profile(self, profile):
+        """
+        Save the profile of a step and its substeps as JSON next to the products.
+
+        Parameters
+        ----------
+        profile : StepProfile
+            The profile to save.
+        """
+        report = {
+            "jwst_version": __version__,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()),
+            "profile": profile.to_dict(),
+        }
+        try:
+            output_path = self.make_output_path(suffix="profile", ext="json")
+        except (AttributeError, TypeError):
+            log.warning(f"Cannot determine a file name to save the profile of step {self.name}")
+            return
+        log.info(f"Saving profile to {output_path}")
+        with Path(output_path).open("w") as report_file:
+            json.dump(report, report_file, indent=2)
+
     @wraps(Step.run)
     def run(self, *args, **kwargs):
         """
@@ -194,7 +282,15 @@ class JwstStep(Step):
         result : Any
             The step output
         """
-        result = super().run(*args, **kwargs)
+        self._profile = StepProfile(self, args) if self._profiling() else None
+        try:
+            result = super().run(*args, **kwargs)
+        finally:
+            profile, self._profile = self._profile, None
+            if profile is not None:
+                profile.stop()
+        if profile is not None and profile.outermost:
+            self._save_profile(profile)
         if not self.parent:
             log.info(f"Results used jwst version: {__version__}")
         return result
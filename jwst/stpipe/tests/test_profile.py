@@ -0,0 +1,51 @@
+import json
+from types import SimpleNamespace
+
+import numpy as np
+
+from jwst.stpipe._profile import StepProfile
+from jwst.stpipe.tests.steps import CalLogsStep
+
+
+def test_profile_nesting():
+    pipeline = StepProfile(SimpleNamespace(name="pipeline"), ("foo_uncal.fits",))
+    assert pipeline.outermost
+    step = StepProfile(SimpleNamespace(name="step"), ())
+    assert not step.outermost
+
+    # Memory allocated by a substep counts towards its parent
+    data = np.ones(1024**2)
+    del data
+    step.stop()
+    pipeline.stop()
+    assert not pipeline.running
+
+    assert step.peak_memory >= 8 * 1024**2
+    assert pipeline.peak_memory >= step.peak_memory
+    assert pipeline.wall_time >= step.wall_time
+    assert pipeline.cpu_time >= 0
+    assert pipeline.peak_rss >= pipeline.rss_increase
+
+    report = pipeline.to_dict()
+    assert report["input"] == "foo_uncal.fits"
+    assert report["substeps"][0]["step"] == "step"
+    assert report["substeps"][0]["input"] is None
+    assert "wall time" in step.summary()
+
+
+def test_profile_step(tmp_path):
+    model = CalLogsStep(profile=True, output_dir=str(tmp_path)).run("foo")
+    assert any("CalLogsStep profile" in line for line in model.cal_logs.cal_logs_step)
+
+    with (tmp_path / "foo_profile.json").open() as report_file:
+        report = json.load(report_file)
+    assert report["profile"]["step"] == "CalLogsStep"
+    assert report["profile"]["input"] == "foo"
+    assert report["profile"]["wall_time"] > 0
+    assert report["profile"]["substeps"] == []
+
+
+def test_no_profile(tmp_path):
+    model = CalLogsStep(output_dir=str(tmp_path)).run("foo")
+    assert not any("CalLogsStep profile" in line for line in model.cal_logs.cal_logs_step)
+    assert not list(tmp_path.iterdir())
@@ -219,6 +219,7 @@ def test_saving_pars(tmp_path):
                     "pre_hooks": [],
                     "post_hooks": [],
                     "output_ext": ".fits",
+                    "profile": False,
                     "output_use_model": False,
                     "output_use_index": True,
                     "save_results": False,
@@ -270,6 +271,7 @@ def test_export_config(step_obj, expected, tmp_path):
                 "output_file": None,
                 "output_dir": None,
                 "output_ext": ".fits",
+                "profile": False,
                 "output_use_model": False,
                 "output_use_index": True,
                 "save_results": False,
@@ -296,6 +298,7 @@ def test_export_config(step_obj, expected, tmp_path):
                 "output_file": None,
                 "output_dir": None,
                 "output_ext": ".fits",
+                "profile": False,
                 "output_use_model": False,
                 "output_use_index": True,
                 "save_results": False,
@@ -311,6 +314,7 @@ def test_export_config(step_obj, expected, tmp_path):
                         "output_file": None,
                         "output_dir": None,
                         "output_ext": ".fits",
+                        "profile": False,
                         "output_use_model": False,
                         "output_use_index": True,
                         "save_results": False,
@@ -337,6 +341,7 @@ def test_export_config(step_obj, expected, tmp_path):
                 "output_file": None,
                 "output_dir": None,
                 "output_ext": ".fits",
+                "profile": False,
                 "output_use_model": False,
                 "output_use_index": True,
                 "save_results": False,
@@ -46,8 +46,8 @@ class SuperBiasStep(Step):
             # Open the superbias ref file data model
             bias_model = datamodels.SuperBiasModel(self.bias_name)
 
-            # Work on a copy
-            result = input_model.copy()
+            # Work on a copy, unless running in place
+            result = self.copy_input(input_model)
 
             # Do the bias subtraction
             result = bias_sub.do_correction(result, bias_model)
@@ -3,10 +3,12 @@ import math
 import numpy as np
 import pytest
 import astropy.units as u
+from photutils.aperture import ApertureStats, CircularAnnulus, CircularAperture
 
 from stdatamodels.jwst import datamodels
 from jwst.lib import reffile_utils
 from jwst.tso_photometry.tso_photometry_step import TSOPhotometryStep
+from jwst.tso_photometry import tso_photometry
 from jwst.tso_photometry.tso_photometry import tso_aperture_photometry
 
 shape = (7, 100, 150)
@@ -336,3 +338,27 @@ def test_tso_phot_5():
     assert math.isclose(catalog.meta["ycenter"], ycenter, abs_tol=0.01)
 
     assert catalog["aperture_sum"][0].unit == u.Unit("electron")
+
+
+def test_aperture_sums(monkeypatch):
+    """Sums over all integrations match the aperture statistics of each integration."""
+    monkeypatch.setattr(tso_photometry, "CHUNK_SIZE", 3)
+    rng = np.random.default_rng(0)
+    data = rng.normal(10.0, 1.0, shape).astype(np.float32)
+    err = rng.uniform(0.5, 1.0, shape).astype(np.float32)
+    data[1, 48:52, 73:77] = np.nan
+    err[2, 50, 75] = np.nan
+    data[4] = np.nan
+
+    apertures = [
+        CircularAperture((xcenter, ycenter), 5.5),
+        CircularAnnulus((xcenter, ycenter), 8.0, 60.0),
+        CircularAperture((1.3, 98.7), 5.5),
+        CircularAperture((-20.0, ycenter), 5.5),
+    ]
+    for aperture in apertures:
+        aperture_sum, aperture_sum_err = tso_photometry.aperture_sums(data, err, aperture)
+
+        stats = [ApertureStats(data[i], aperture, error=err[i]) for i in range(shape[0])]
+        np.testing.assert_allclose(aperture_sum, [s.sum for s in stats], rtol=1e-10)
+        np.testing.assert_allclose(aperture_sum_err, [s.sum_err for s in stats], rtol=1e-6)
@@ -6,13 +6,17 @@ import numpy as np
 from astropy.table import QTable
 from astropy.time import Time, TimeDelta
 import astropy.units as u
-from photutils.aperture import CircularAperture, CircularAnnulus, ApertureStats
+from photutils.aperture import CircularAperture, CircularAnnulus
 
 from stdatamodels.jwst.datamodels import CubeModel
 
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
+# Number of integrations measured together, which bounds the memory used
+# for copies of the pixels in the apertures
+CHUNK_SIZE = 1024
+
 
 def tso_aperture_photometry(
     datamodel, xcenter, ycenter, radius, radius_inner, radius_outer, gain_2d
@@ -80,11 +84,6 @@ def tso_aperture_photometry(
             "Photometry will be produced using the input units."
         )
 
-    aperture_sum = []
-    aperture_sum_err = []
-    annulus_sum = []
-    annulus_sum_err = []
-
     nimg = datamodel.data.shape[0]
 
     if sub64p_wlp8:
@@ -93,9 +92,11 @@ def tso_aperture_photometry(
             "subarray.  No background subtraction was performed."
         )
 
-        for i in np.arange(nimg):
-            aperture_sum.append(np.nansum(datamodel.data[i, :, :]))
-            aperture_sum_err.append(np.sqrt(np.nansum(datamodel.err[i, :, :] ** 2)))
+        aperture_sum = np.empty(nimg, dtype=datamodel.data.dtype)
+        aperture_sum_err = np.empty(nimg, dtype=datamodel.err.dtype)
+        for chunk in _chunks(nimg):
+            aperture_sum[chunk] = np.nansum(datamodel.data[chunk], axis=(1, 2))
+            aperture_sum_err[chunk] = np.sqrt(np.nansum(datamodel.err[chunk] ** 2, axis=(1, 2)))
     else:
         info = (
             f"Photometry measured in a circular aperture of r={radius} "
@@ -103,24 +104,8 @@ def tso_aperture_photometry(
             f"circular annulus with r_inner={radius_inner} pixels and "
             f"r_outer={radius_outer} pixels."
         )
-        for i in np.arange(nimg):
-            aperstats = ApertureStats(
-                datamodel.data[i, :, :], phot_aper, error=datamodel.err[i, :, :]
-            )
-
-            annstats = ApertureStats(
-                datamodel.data[i, :, :], bkg_aper, error=datamodel.err[i, :, :]
-            )
-
-            aperture_sum.append(aperstats.sum)
-            aperture_sum_err.append(aperstats.sum_err)
-            annulus_sum.append(annstats.sum)
-            annulus_sum_err.append(annstats.sum_err)
-
-    aperture_sum = np.array(aperture_sum)
-    aperture_sum_err = np.array(aperture_sum_err)
-    annulus_sum = np.array(annulus_sum)
-    annulus_sum_err = np.array(annulus_sum_err)
+        aperture_sum, aperture_sum_err = aperture_sums(datamodel.data, datamodel.err, phot_aper)
+        annulus_sum, annulus_sum_err = aperture_sums(datamodel.data, datamodel.err, bkg_aper)
 
     # construct metadata for output table
     meta = OrderedDict()
@@ -230,3 +215,74 @@ def tso_aperture_photometry(
         tbl["net_aperture_sum_err"] = aperture_sum_err << unit
 
     return tbl
+
+
+def aperture_sums(data, err, aperture):
+    """
+    Sum the data and errors within an aperture, for all integrations.
+
+    The pixel weights of the aperture (its exact overlap with each pixel)
+    are computed once and applied to all integrations together, in chunks
+    of `CHUNK_SIZE` integrations. The results are the same as the ``sum``
+    and ``sum_err`` of `~photutils.aperture.ApertureStats` computed for
+    each integration: non-finite data values are excluded, and the sums
+    are NaN if no pixel of the aperture has a finite value.
+
+    Parameters
+    ----------
+    data, err : ndarray
+        The 3D data and error arrays.
+
+    aperture : `~photutils.aperture.PixelAperture`
+        The aperture.
+
+    Returns
+    -------
+    aperture_sum, aperture_sum_err : ndarray
+        The sum of the data and its uncertainty in each integration.
+    """
+    nimg = data.shape[0]
+    aperture_sum = np.full(nimg, np.nan)
+    aperture_sum_err = np.full(nimg, np.nan)
+
+    aperture_mask = aperture.to_mask(method="exact")
+    slc_large, slc_small = aperture_mask.get_overlap_slices(data.shape[1:])
+    if slc_large is None:
+        # no overlap of the aperture with the data
+        return aperture_sum, aperture_sum_err
+
+    # Pixels outside the aperture have zero weight, and are excluded
+    weights = aperture_mask.data[slc_small].ravel()
+    in_aperture = weights > 0
+    yslice, xslice = slc_large
+
+    for chunk in _chunks(nimg):
+        values = data[chunk, yslice, xslice].reshape(-1, weights.size).astype(np.float64)
+        variance = np.square(err[chunk, yslice, xslice], dtype=np.float64)
+        valid = np.isfinite(values) & in_aperture
+        total = np.where(valid, values, 0.0) @ weights
+        total_variance = np.where(valid, variance.reshape(valid.shape), 0.0) @ weights
+
+        any_valid = np.any(valid, axis=1)
+        aperture_sum[chunk] = np.where(any_valid, total, np.nan)
+        aperture_sum_err[chunk] = np.where(any_valid, np.sqrt(total_variance), np.nan)
+
+    return aperture_sum, aperture_sum_err
+
+
+def _chunks(nimg):
+    """
+    Split integrations into chunks of `CHUNK_SIZE` integrations.
+
+    Parameters
+    ----------
+    nimg : int
+        The number of integrations.
+
+    Yields
+    ------
+    slice
+        The integrations in a chunk.
+    """
+    for start in range(0, nimg, CHUNK_SIZE):
+        yield slice(start, min(start + CHUNK_SIZE, nimg))
@@ -180,3 +180,200 @@ def dispersed_pixel(
     counts[no_cal] = 0.0  # set to zero where no flux cal info available
 
     return xs, ys, areas, lams, counts, source_id
+
+
+def direct_positions(x0, y0, order, seg_wcs, grism_wcs, xoffset=0, yoffset=0):
+    """
+    Transform pixels from the segmentation map to the direct image frame of the grism image.
+
+    Parameters
+    ----------
+    x0 : float array
+        Array of x-coordinates of the centers of the pixels.
+    y0 : float array
+        Array of y-coordinates of the centers of the pixels.
+    order : int
+        The spectral order.
+    seg_wcs : WCS object
+        The WCS object of the segmentation map.
+    grism_wcs : WCS object
+        The WCS object of the grism image.
+    xoffset : int
+        Pixel offset to apply to the x-coordinates (accounts for offset
+        from source cutout to full frame)
+    yoffset : int
+        Pixel offset to apply to the y-coordinates (accounts for offset
+        from source cutout to full frame)
+
+    Returns
+    -------
+    x0_xy : array
+        1D array of x-coordinates of the pixels in the direct image frame
+    y0_xy : array
+        1D array of y-coordinates of the pixels in the direct image frame
+    """
+    sky_to_imgxy = grism_wcs.get_transform("world", "detector")
+    x0_sky, y0_sky = seg_wcs(np.asarray(x0, dtype=float), np.asarray(y0, dtype=float))
+    x0_xy, y0_xy, _, _ = sky_to_imgxy(x0_sky, y0_sky, 1, order)
+    return np.atleast_1d(x0_xy) + xoffset, np.atleast_1d(y0_xy) + yoffset
+
+
+def dispersed_pixels(
+    x0,
+    y0,
+    width,
+    height,
+    fluxes,
+    order,
+    wmin,
+    wmax,
+    sens_waves,
+    sens_resp,
+    seg_wcs,
+    grism_wcs,
+    naxis,
+    oversample_factor=2,
+    xoffset=0,
+    yoffset=0,
+):
+    """
+    Transform many pixels from direct image to dispersed frame at once.
+
+    This gives the same dispersed pixels as calling `dispersed_pixel` for
+    each pixel with the flux of a single direct image, but evaluates the
+    WCS transforms and clips the dispersed pixels for all pixels and
+    wavelengths in one call each.
+
+    Parameters
+    ----------
+    x0 : float array
+        Array of x-coordinates of the centers of the pixels.
+    y0 : float array
+        Array of y-coordinates of the centers of the pixels.
+    width : float
+        Width of the pixels to be dispersed.
+    height : float
+        Height of the pixels to be dispersed.
+    fluxes : float array
+        Array of fluxes (flam) for the pixels contained in x0, y0, used at
+        all wavelengths.
+    order : int
+        The spectral order to disperse.
+    wmin : float
+        Min wavelength to be dispersed.
+    wmax : float
+        Max wavelength to be dispersed.
+    sens_waves : float array
+        Array of wavelengths corresponding to flux calibration (sens_resp) values.
+    sens_resp : float array
+        Flux calibration values as a function of wavelength.
+    seg_wcs : WCS object
+        The WCS object of the segmentation map.
+    grism_wcs : WCS object
+        The WCS object of the grism image.
+    naxis : tuple
+        Dimensions (shape) of grism image into which pixels are dispersed.
+    oversample_factor : int
+        The amount of oversampling required above that of the natural dispersion.
+        Default=2.
+    xoffset : int
+        Pixel offset to apply when computing the dispersion (accounts for offset
+        from source cutout to full frame)
+    yoffset : int
+        Pixel offset to apply when computing the dispersion (accounts for offset
+        from source cutout to full frame)
+
+    Returns
+    -------
+    xs : array
+        1D array of dispersed pixel x-coordinates
+    ys : array
+        1D array of dispersed pixel y-coordinates
+    areas : array
+        1D array of the areas of the incident pixel that,
+        when dispersed, falls on each dispersed pixel
+    lams : array
+        1D array of the wavelengths of each dispersed pixel
+    counts : array
+        1D array of counts for each dispersed pixel
+    index : array
+        1D array of the index of the incident pixel of each dispersed pixel
+    """
+    imgxy_to_grismxy = grism_wcs.get_transform("detector", "grism_detector")
+
+    # Get x/y positions of the pixels in the direct image frame corresponding
+    # to the grism image. These do not depend on wavelength, so they are
+    # computed once for each pixel.
+    x0_xy, y0_xy = direct_positions(x0, y0, order, seg_wcs, grism_wcs, xoffset, yoffset)
+
+    # Get x/y positions in the grism image corresponding to wmin and wmax
+    xwmin, ywmin = imgxy_to_grismxy(x0_xy, y0_xy, wmin, order)
+    xwmax, ywmax = imgxy_to_grismxy(x0_xy, y0_xy, wmax, order)
+    dxw = xwmax - xwmin
+    dyw = ywmax - ywmin
+
+    # Compute the delta-wave per pixel, and use the natural wavelength
+    # scale divided by the oversampling requested
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dw = np.abs((wmax - wmin) / (dyw - dxw))
+        dlam = dw / oversample_factor
+
+        # The wavelengths of each pixel are the same as
+        # np.arange(wmin, wmax + dlam, dlam) for that pixel
+        n_lam = np.ceil((wmax + dlam - wmin) / dlam)
+    n_lam = np.where(np.isfinite(n_lam) & (dlam > 0), n_lam, 0).astype(int)
+    starts = np.cumsum(n_lam) - n_lam
+    pixel = np.repeat(np.arange(n_lam.size), n_lam)
+    step = np.arange(pixel.size) - starts[pixel]
+    lambdas = wmin + step * ((wmin + dlam) - wmin)[pixel]
+
+    # Compute x/y positions in the grism image for
+    # the set of desired wavelengths of all pixels
+    x0s, y0s = imgxy_to_grismxy(x0_xy[pixel], y0_xy[pixel], lambdas, order)
+    x0s = np.atleast_1d(x0s)
+    y0s = np.atleast_1d(y0s)
+
+    # Skip pixels for which none of the dispersed pixel indexes
+    # are within the image frame
+    nonempty = n_lam > 0
+    in_frame = np.zeros(n_lam.size, dtype=bool)
+    if pixel.size > 0:
+        in_frame[nonempty] = (
+            (np.minimum.reduceat(x0s, starts[nonempty]) < naxis[0])
+            & (np.maximum.reduceat(x0s, starts[nonempty]) >= 0)
+            & (np.minimum.reduceat(y0s, starts[nonempty]) < naxis[1])
+            & (np.maximum.reduceat(y0s, starts[nonempty]) >= 0)
+        )
+    keep = in_frame[pixel]
+
+    # Compute arrays of dispersed pixel locations and areas
+    padding = 1
+    xs, ys, areas, index = get_clipped_pixels(
+        np.ascontiguousarray(x0s[keep], dtype=float),
+        np.ascontiguousarray(y0s[keep], dtype=float),
+        padding,
+        naxis[0],
+        naxis[1],
+        width,
+        height,
+    )
+    lams = lambdas[keep][index]
+    index = pixel[keep][index]
+
+    # Skip pixels which give no more than one dispersed pixel
+    many = (np.bincount(index, minlength=n_lam.size) > 1)[index]
+    xs, ys, areas, lams, index = xs[many], ys[many], areas[many], lams[many], index[many]
+
+    # compute 1D sensitivity array corresponding to list of wavelengths
+    sens, no_cal = create_1d_sens(lams, sens_waves, sens_resp)
+
+    # Compute countrates for dispersed pixels. Note that dispersed pixel
+    # values are naturally in units of physical fluxes, so we divide out
+    # the sensitivity (flux calibration) values to convert to units of
+    # countrate (DN/s).
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=RuntimeWarning, message="divide by zero")
+        counts = np.asarray(fluxes)[index] * areas / (sens * oversample_factor)
+    counts[no_cal] = 0.0  # set to zero where no flux cal info available
+
+    return xs, ys, areas, lams, counts, index
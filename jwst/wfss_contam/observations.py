@@ -1,12 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
 import time
 import multiprocessing
 import numpy as np
 
-from scipy import sparse
-
 from stdatamodels.jwst import datamodels
 
-from .disperse import dispersed_pixel
+from .disperse import direct_positions, dispersed_pixel, dispersed_pixels
+from .trace_cache import TRACE_CACHE, dispersion_fingerprint, place_trace, trace_key
 
 import logging
 
@@ -16,6 +16,9 @@ from astropy.stats import SigmaClip
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
+# Maximum number of pixels of a source dispersed together
+PIXEL_CHUNK_SIZE = 256
+
 
 def background_subtract(
     data, box_size=None, filter_size=(3, 3), sigma=3.0, exclude_percentile=30.0
@@ -64,6 +67,34 @@ def background_subtract(
     return data - bkg.background
 
 
+def _bin_counts(x, y, f):
+    """
+    Sum the countrates of dispersed pixels into the smallest image containing them.
+
+    Parameters
+    ----------
+    x, y : int array
+        Dispersed pixel coordinates
+    f : float array
+        Countrates of the dispersed pixels
+
+    Returns
+    -------
+    a : np.ndarray
+        2D image of the summed countrates
+    minx, maxx, miny, maxy : int
+        Extent of the image within the dispersed frame
+    """
+    minx = int(x.min())
+    maxx = int(x.max())
+    miny = int(y.min())
+    maxy = int(y.max())
+    shape = (maxy - miny + 1, maxx - minx + 1)
+    index = np.ravel_multi_index((y - miny, x - minx), shape)
+    a = np.bincount(index, weights=f, minlength=shape[0] * shape[1]).reshape(shape)
+    return a, minx, maxx, miny, maxy
+
+
 class Observation:
     """Define an observation leading to a single grism image."""
 
@@ -80,6 +111,7 @@ class Observation:
         offsets=None,
         renormalize=True,
         max_cpu=1,
+        max_shift=0.0,
     ):
         """
         Initialize all data and metadata for a given observation.
@@ -112,6 +144,9 @@ class Observation:
             Flag indicating whether to renormalize SED's
         max_cpu : int, optional, default 1
             Max number of cpu's to use when multiprocessing
+        max_shift : float, optional, default 0.0
+            Largest offset, in pixels, by which a trace cached from another
+            exposure is shifted and reused for a source
         """
         if boundaries is None:
             boundaries = []
@@ -129,6 +164,8 @@ class Observation:
         self.cache = False
         self.renormalize = renormalize
         self.max_cpu = max_cpu
+        self.max_shift = max_shift
+        self._fingerprints = {}
         self.xoffset = offsets[0]
         self.yoffset = offsets[1]
 
@@ -287,10 +324,255 @@ class Observation:
         self.sens_waves = sens_waves
         self.sens_resp = sens_resp
         log.info(f"Dispersing source {sid}, order {self.order}")
+        log.debug(f"source contains {len(self.xs[c])} pixels")
+
+        time1 = time.time()
+
+        # Initialize blank image for this source
+        this_object = np.zeros(self.dims, float)
+
+        # Reuse the trace of this source from the trace cache, if possible.
+        # Traces are not taken from the cache when caching the dispersed
+        # pixels of the source, which are not part of the cached trace.
+        key = None
+        cached = None
+        if TRACE_CACHE.enabled:
+            key, reference = self._trace_key(c)
+            if not self.cache:
+                cached = TRACE_CACHE.get(key)
+        if cached is not None:
+            trace, minx, miny = place_trace(cached, reference, self.max_shift)
+            if trace is not None:
+                log.debug("Using cached trace")
+                self._add_trace(trace, minx, miny, this_object)
+                return this_object
+
+        if len(self.fluxes) == 1:
+            all_res = self._disperse_pixels(c)
+        else:
+            all_res = self._disperse_pixel_list(c)
+
+        bounds = []
+        for x, y, w, f in all_res:
+            a, minx, maxx, miny, maxy = _bin_counts(x, y, f)
+
+            # Accumulate results into simulated images
+            self.simulated_image[miny : maxy + 1, minx : maxx + 1] += a
+            this_object[miny : maxy + 1, minx : maxx + 1] += a
+            bounds.append((minx, maxx, miny, maxy))
+
+            if self.cache:
+                self.cached_object[c]["x"].append(x)
+                self.cached_object[c]["y"].append(y)
+                self.cached_object[c]["f"].append(f)
+                self.cached_object[c]["w"].append(w)
+                self.cached_object[c]["minx"].append(minx)
+                self.cached_object[c]["maxx"].append(maxx)
+                self.cached_object[c]["miny"].append(miny)
+                self.cached_object[c]["maxy"].append(maxy)
+
+        if key is not None:
+            TRACE_CACHE.put(key, self._make_trace(this_object, bounds, reference))
+
+        time2 = time.time()
+        log.debug(f"Elapsed time {time2 - time1} sec")
+
+        return this_object
+
+    def _trace_key(self, c):
+        """
+        Compute the trace cache key and the reference position of a source.
+
+        Parameters
+        ----------
+        c : int
+            Chunk (source) number to process
+
+        Returns
+        -------
+        key : str
+            Key identifying the dispersed trace of the source
+        reference : tuple of float
+            Mean x, y position of the source pixels in the direct image
+            frame of the grism image
+        """
+        fingerprint_key = (self.order, self.wmin, self.wmax)
+        if fingerprint_key not in self._fingerprints:
+            self._fingerprints[fingerprint_key] = dispersion_fingerprint(
+                self.grism_wcs, self.order, self.wmin, self.wmax, self.dims[::-1]
+            )
+        fluxes = [self.fluxes[lm][c] for lm in sorted(self.fluxes.keys())]
+        filter_name = f"{self.filter} {sorted(self.fluxes.keys())} {self.extrapolate_sed}"
+        key = trace_key(
+            self.xs[c],
+            self.ys[c],
+            fluxes,
+            self.order,
+            self.wmin,
+            self.wmax,
+            self.sens_waves,
+            self.sens_resp,
+            filter_name,
+            self._fingerprints[fingerprint_key],
+        )
+        x0_xy, y0_xy = direct_positions(
+            self.xs[c] + 0.5,
+            self.ys[c] + 0.5,
+            self.order,
+            self.seg_wcs,
+            self.grism_wcs,
+            self.xoffset,
+            self.yoffset,
+        )
+        return key, (float(np.mean(x0_xy)), float(np.mean(y0_xy)))
+
+    def _make_trace(self, this_object, bounds, reference):
+        """
+        Cut out the dispersed trace of a source, for the trace cache.
+
+        Parameters
+        ----------
+        this_object : np.ndarray
+            2D dispersed image for the source
+        bounds : list of tuple
+            Extent (minx, maxx, miny, maxy) of each dispersed chunk of pixels
+        reference : tuple of float
+            Mean x, y position of the source pixels in the direct image
+            frame of the grism image
+
+        Returns
+        -------
+        dict
+            The trace arrays, as expected by `TraceCache.put`
+        """
+        if len(bounds) == 0:
+            return {
+                "trace": np.zeros((0, 0)),
+                "corner": np.zeros(2, dtype=int),
+                "reference": np.array(reference),
+                "complete": np.array(False),
+            }
+        minx, maxx, miny, maxy = np.array(bounds).T
+        minx, miny = minx.min(), miny.min()
+        maxx, maxy = maxx.max(), maxy.max()
+
+        # A trace reaching the edges of the image may have been cut by them
+        complete = minx > 0 and miny > 0 and maxx < self.dims[1] - 1 and maxy < self.dims[0] - 1
+        return {
+            "trace": this_object[miny : maxy + 1, minx : maxx + 1],
+            "corner": np.array([minx, miny]),
+            "reference": np.array(reference),
+            "complete": np.array(complete),
+        }
+
+    def _add_trace(self, trace, minx, miny, this_object):
+        """
+        Add a cached trace to the simulated images, clipped to the image extent.
+
+        Parameters
+        ----------
+        trace : np.ndarray
+            2D dispersed image of the source
+        minx, miny : int
+            Position of the lower left corner of the trace
+        this_object : np.ndarray
+            2D dispersed image for the source
+        """
+        x1, y1 = max(minx, 0), max(miny, 0)
+        x2 = min(minx + trace.shape[1], self.dims[1])
+        y2 = min(miny + trace.shape[0], self.dims[0])
+        if x2 <= x1 or y2 <= y1:
+            return
+        a = trace[y1 - miny : y2 - miny, x1 - minx : x2 - minx]
+        self.simulated_image[y1:y2, x1:x2] += a
+        this_object[y1:y2, x1:x2] += a
+
+    def _disperse_pixels(self, c):
+        """
+        Disperse all pixels of a source, for a single direct image flux per pixel.
+
+        The pixels are dispersed together, in chunks of at most
+        ``PIXEL_CHUNK_SIZE`` pixels to limit the memory used.
+
+        Parameters
+        ----------
+        c : int
+            Chunk (source) number to process
+
+        Yields
+        ------
+        x, y : int array
+            Dispersed pixel coordinates
+        w : float array
+            Wavelengths of the dispersed pixels
+        f : float array
+            Countrates of the dispersed pixels
+        """
+        # xc, yc are the coordinates of the centers of the direct image pixels
+        width = 1.0
+        height = 1.0
+        xc = self.xs[c] + 0.5 * width
+        yc = self.ys[c] + 0.5 * height
+
+        # "fluxes" is the array of pixel values from the direct image,
+        # used at all wavelengths
+        (fluxes,) = self.fluxes.values()
+        fluxes = fluxes[c]
+
+        def disperse(start):
+            chunk = slice(start, start + PIXEL_CHUNK_SIZE)
+            return dispersed_pixels(
+                xc[chunk],
+                yc[chunk],
+                width,
+                height,
+                fluxes[chunk],
+                self.order,
+                self.wmin,
+                self.wmax,
+                self.sens_waves,
+                self.sens_resp,
+                self.seg_wcs,
+                self.grism_wcs,
+                self.dims[::-1],
+                2,
+                self.xoffset,
+                self.yoffset,
+            )
+
+        starts = range(0, len(xc), PIXEL_CHUNK_SIZE)
+        if self.max_cpu > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_cpu, len(starts))) as executor:
+                all_res = list(executor.map(disperse, starts))
+        else:
+            all_res = map(disperse, starts)
+
+        for x, y, _, w, f, _ in all_res:
+            # skip results that don't have pixels in the field
+            if len(x) > 0:
+                yield x, y, w, f
+
+    def _disperse_pixel_list(self, c):
+        """
+        Disperse the pixels of a source one by one, for fluxes from several direct images.
+
+        Parameters
+        ----------
+        c : int
+            Chunk (source) number to process
+
+        Yields
+        ------
+        x, y : int array
+            Dispersed pixel coordinates
+        w : float array
+            Wavelengths of the dispersed pixels
+        f : float array
+            Countrates of the dispersed pixels
+        """
         pars = []  # initialize params for this object
 
         # Loop over all pixels in list for object "c"
-        log.debug(f"source contains {len(self.xs[c])} pixels")
         for i in range(len(self.xs[c])):
             # Here "i" just indexes the pixel list for the object being processed
 
@@ -303,12 +585,9 @@ class Observation:
 
             # "lams" is the array of wavelengths previously stored in flux list
             # and correspond to the central wavelengths of the filters used in
-            # the input direct image(s). For the simple case of 1 combined direct image,
-            # this contains a single value (e.g. 4.44 for F444W).
+            # the input direct image(s).
 
             # "fluxes" is the array of pixel values from the direct image(s).
-            # For the simple case of 1 combined direct image, this contains a
-            # a single value (just like "lams").
             fluxes, lams = map(
                 np.array,
                 zip(
@@ -346,7 +625,6 @@ class Observation:
             pars.append(pars_i)
             # now have full pars list for all pixels for this object
 
-        time1 = time.time()
         if self.max_cpu > 1:
             ctx = multiprocessing.get_context("forkserver")
             mypool = ctx.Pool(self.max_cpu)  # Create the pool
@@ -357,47 +635,15 @@ class Observation:
             for i in range(len(pars)):
                 all_res.append(dispersed_pixel(*pars[i]))
 
-        # Initialize blank image for this source
-        this_object = np.zeros(self.dims, float)
-
-        nres = 0
         for pp in all_res:
             if pp is None:
                 continue
 
-            nres += 1
             x, y, _, w, f, *_ = pp
 
             # skip results that don't have pixels in the field
-            if len(x) < 1:
-                continue
-
-            minx = int(min(x))
-            maxx = int(max(x))
-            miny = int(min(y))
-            maxy = int(max(y))
-            a = sparse.coo_matrix(
-                (f, (y - miny, x - minx)), shape=(maxy - miny + 1, maxx - minx + 1)
-            ).toarray()
-
-            # Accumulate results into simulated images
-            self.simulated_image[miny : maxy + 1, minx : maxx + 1] += a
-            this_object[miny : maxy + 1, minx : maxx + 1] += a
-
-            if self.cache:
-                self.cached_object[c]["x"].append(x)
-                self.cached_object[c]["y"].append(y)
-                self.cached_object[c]["f"].append(f)
-                self.cached_object[c]["w"].append(w)
-                self.cached_object[c]["minx"].append(minx)
-                self.cached_object[c]["maxx"].append(maxx)
-                self.cached_object[c]["miny"].append(miny)
-                self.cached_object[c]["maxy"].append(maxy)
-
-        time2 = time.time()
-        log.debug(f"Elapsed time {time2 - time1} sec")
-
-        return this_object
+            if len(x) > 0:
+                yield x, y, w, f
 
     def disperse_all_from_cache(self, trans=None):
         """
@@ -474,9 +720,7 @@ class Observation:
             miny = self.cached_object[c]["miny"][i]
             maxy = self.cached_object[c]["maxy"][i]
 
-            a = sparse.coo_matrix(
-                (f, (y - miny, x - minx)), shape=(maxy - miny + 1, maxx - minx + 1)
-            ).toarray()
+            a, *_ = _bin_counts(x, y, f)
 
             # Accumulate the results into the simulated images
             self.simulated_image[miny : maxy + 1, minx : maxx + 1] += a
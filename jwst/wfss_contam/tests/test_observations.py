@@ -10,8 +10,10 @@ from numpy.testing import assert_allclose
 from photutils.datasets import make_100gaussians_image
 from photutils.segmentation import make_2dgaussian_kernel, SourceFinder
 
-from jwst.wfss_contam.observations import background_subtract
-from jwst.wfss_contam.disperse import dispersed_pixel
+from jwst.wfss_contam import observations
+from jwst.wfss_contam.observations import background_subtract, Observation
+from jwst.wfss_contam.disperse import dispersed_pixel, dispersed_pixels
+from jwst.wfss_contam.trace_cache import TraceCache
 from jwst.datamodels import SegmentationMapModel, ImageModel  # type: ignore[attr-defined]
 
 DIR_IMAGE = "direct_image.fits"
@@ -160,3 +162,174 @@ def test_disperse_oversample_same_result(grism_wcs, segmentation_map):
     )
 
     assert_allclose(np.sum(counts_1), np.sum(counts_3), rtol=1 / sens_waves.size)
+
+
+def test_dispersed_pixels(grism_wcs, segmentation_map):
+    """Dispersing pixels all at once gives the same result as one at a time."""
+    rng = np.random.default_rng(0)
+    x0 = rng.integers(250, 350, 20) + 0.5
+    y0 = rng.integers(250, 350, 20) + 0.5
+    fluxes = rng.uniform(0.5, 2.0, 20)
+    order = 1
+    naxis = (300, 500)
+    sens_waves = np.linspace(1.708, 2.28, 100)
+    sens_resp = np.ones(100)
+    sens_resp[:10] = 0.0
+    wmin, wmax = 1.6, 2.3
+    seg_wcs = segmentation_map.meta.wcs
+    xoffset = 2000
+    yoffset = 1100
+
+    xs, ys, areas, lams, counts, index = dispersed_pixels(
+        x0,
+        y0,
+        1.0,
+        1.0,
+        fluxes,
+        order,
+        wmin,
+        wmax,
+        sens_waves,
+        sens_resp,
+        seg_wcs,
+        grism_wcs,
+        naxis,
+        xoffset=xoffset,
+        yoffset=yoffset,
+    )
+
+    for i in range(len(x0)):
+        result = dispersed_pixel(
+            x0[i],
+            y0[i],
+            1.0,
+            1.0,
+            [2.0],
+            [fluxes[i]],
+            order,
+            wmin,
+            wmax,
+            sens_waves,
+            sens_resp,
+            seg_wcs,
+            grism_wcs,
+            0,
+            naxis,
+            xoffset=xoffset,
+            yoffset=yoffset,
+        )
+        in_pixel = index == i
+        if result is None:
+            assert not np.any(in_pixel)
+            continue
+        for expected, value in zip(result[:5], [xs, ys, areas, lams, counts], strict=True):
+            assert_allclose(value[in_pixel], expected)
+
+    # Some pixels are dispersed off the image
+    assert 0 < len(np.unique(index)) < len(x0)
+
+
+@pytest.mark.parametrize("max_cpu", [1, 2])
+def test_disperse_chunk(
+    monkeypatch, direct_image_with_gradient, segmentation_map, grism_wcs, max_cpu
+):
+    """The dispersed source is the sum of its dispersed pixels."""
+    monkeypatch.setattr(observations, "PIXEL_CHUNK_SIZE", 16)
+    obs = Observation(
+        [DIR_IMAGE],
+        segmentation_map,
+        grism_wcs,
+        "F200W",
+        boundaries=[0, 499, 0, 299],
+        offsets=[2200, 1000],
+        max_cpu=max_cpu,
+    )
+    # Pick the largest source in the part of the direct image dispersed onto the grism image
+    sizes = [
+        len(xs) if xs.min() > 150 and ys.min() > 200 else 0
+        for xs, ys in zip(obs.xs, obs.ys, strict=True)
+    ]
+    c = int(np.argmax(sizes))
+    assert len(obs.xs[c]) > 16
+    sens_waves = np.linspace(1.708, 2.28, 100)
+    sens_resp = np.ones(100)
+    wmin, wmax = 1.708, 2.28
+
+    obs.simulated_image = np.zeros(obs.dims)
+    this_object = obs.disperse_chunk(c, 1, wmin, wmax, sens_waves, sens_resp)
+
+    expected = np.zeros(obs.dims)
+    (fluxes,) = obs.fluxes.values()
+    for x0, y0, flux in zip(obs.xs[c], obs.ys[c], fluxes[c], strict=True):
+        result = dispersed_pixel(
+            x0 + 0.5,
+            y0 + 0.5,
+            1.0,
+            1.0,
+            [2.0],
+            [flux],
+            1,
+            wmin,
+            wmax,
+            sens_waves,
+            sens_resp,
+            obs.seg_wcs,
+            grism_wcs,
+            0,
+            obs.dims[::-1],
+            xoffset=2200,
+            yoffset=1000,
+        )
+        if result is not None:
+            xs, ys, _, _, counts, _ = result
+            np.add.at(expected, (ys, xs), counts)
+
+    assert np.any(expected != 0)
+    assert_allclose(this_object, expected, atol=1e-10)
+    assert_allclose(obs.simulated_image, expected, atol=1e-10)
+
+
+def test_disperse_chunk_trace_cache(
+    monkeypatch, direct_image_with_gradient, segmentation_map, grism_wcs
+):
+    """Cached traces are reused for the same source, in place or shifted."""
+    cache = TraceCache(max_memory=1e8)
+    monkeypatch.setattr(observations, "TRACE_CACHE", cache)
+    sens_waves = np.linspace(1.708, 2.28, 100)
+    sens_resp = np.ones(100)
+    wmin, wmax = 1.708, 2.28
+
+    def disperse(xoffset, max_shift=0.0):
+        obs = Observation(
+            [DIR_IMAGE],
+            segmentation_map,
+            grism_wcs,
+            "F200W",
+            boundaries=[0, 499, 0, 299],
+            offsets=[xoffset, 1000],
+            max_shift=max_shift,
+        )
+        obs.disperse_all(1, wmin, wmax, sens_waves, sens_resp)
+        return obs.simulated_image
+
+    expected = disperse(2200)
+    assert np.any(expected != 0)
+    assert cache.hits == 0
+    assert cache.misses == len(cache) > 0
+
+    # The same exposure reuses all traces
+    result = disperse(2200)
+    assert cache.hits == len(cache)
+    assert_allclose(result, expected, atol=1e-10)
+
+    # A dithered exposure only reuses traces within the largest shift
+    expected_dithered = disperse(2205)
+    assert np.any(expected_dithered != expected)
+
+    cache.clear()
+    disperse(2200)
+    cache.hits = 0
+    result = disperse(2205, max_shift=10.0)
+    assert 0 < cache.hits == len(cache)
+    assert_allclose(result.sum(), expected_dithered.sum(), rtol=1e-6)
+    assert_allclose(result, expected_dithered, atol=1e-3 * expected_dithered.max())
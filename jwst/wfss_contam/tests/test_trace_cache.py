@@ -0,0 +1,135 @@
+"""Unit tests for the wfss_contam trace_cache module."""
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose, assert_array_equal
+
+from jwst.wfss_contam.trace_cache import TraceCache, place_trace, trace_key
+
+
+def make_arrays(value, complete=True):
+    return {
+        "trace": np.full((3, 5), value),
+        "corner": np.array([10, 20]),
+        "reference": np.array([5.0, 6.0]),
+        "complete": np.array(complete),
+    }
+
+
+def test_trace_key():
+    xs = np.array([1, 2, 3])
+    ys = np.array([4, 4, 5])
+    fluxes = [np.array([1.0, 2.0, 3.0])]
+    sens = np.linspace(1.0, 2.0, 10)
+    fingerprint = np.arange(6.0)
+
+    def key(**kwargs):
+        args = {
+            "xs": xs,
+            "ys": ys,
+            "fluxes": fluxes,
+            "order": 1,
+            "wmin": 1.0,
+            "wmax": 2.0,
+            "sens_waves": sens,
+            "sens_resp": sens,
+            "filter_name": "F200W",
+            "fingerprint": fingerprint,
+        }
+        args.update(kwargs)
+        return trace_key(**args)
+
+    assert key() == key()
+    assert key() != key(xs=xs + 1)
+    assert key() != key(fluxes=[fluxes[0] * 2])
+    assert key() != key(order=2)
+    assert key() != key(wmax=2.1)
+    assert key() != key(sens_resp=sens * 2)
+    assert key() != key(filter_name="F150W")
+    assert key() != key(fingerprint=fingerprint + 1)
+
+
+def test_place_trace():
+    arrays = make_arrays(1.0)
+
+    # A source at the same position uses the trace as is
+    trace, minx, miny = place_trace(arrays, (5.0, 6.0))
+    assert trace is arrays["trace"]
+    assert (minx, miny) == (10, 20)
+
+    # Traces are only shifted up to the largest shift
+    trace, *_ = place_trace(arrays, (8.0, 4.0))
+    assert trace is None
+    trace, minx, miny = place_trace(arrays, (8.0, 4.0), max_shift=3.0)
+    assert_array_equal(trace, arrays["trace"])
+    assert (minx, miny) == (13, 18)
+
+    # Fractions of pixels are shifted by interpolation, conserving the flux
+    trace, minx, miny = place_trace(arrays, (5.25, 5.5), max_shift=3.0)
+    assert trace.shape == (4, 6)
+    assert (minx, miny) == (10, 19)
+    assert_allclose(trace.sum(), arrays["trace"].sum())
+    assert_allclose(trace[0, 0], 0.75 * 0.5)
+    assert_allclose(trace[1:-1, 1:-1], 1.0)
+
+    # Traces cut by the image edges are not shifted
+    trace, *_ = place_trace(make_arrays(1.0, complete=False), (6.0, 6.0), max_shift=3.0)
+    assert trace is None
+
+
+def test_memory_cache():
+    # Room for two traces of 3 x 5 values
+    nbytes = sum(array.nbytes for array in make_arrays(1.0).values())
+    cache = TraceCache(max_memory=2.5 * nbytes)
+    assert cache.enabled
+    assert cache.get("a") is None
+
+    arrays = cache.put("a", make_arrays(1.0))
+    assert cache.get("a") is arrays
+    assert cache.nbytes == nbytes
+    for array in arrays.values():
+        assert not array.flags.writeable
+    with pytest.raises(ValueError):
+        arrays["trace"][...] = 0.0
+
+    # The least recently used trace is evicted
+    cache.put("b", make_arrays(2.0))
+    cache.get("a")
+    cache.put("c", make_arrays(3.0))
+    assert len(cache) == 2
+    assert cache.nbytes == 2 * nbytes
+    assert cache.get("b") is None
+    assert cache.get("a") is arrays
+    assert (cache.hits, cache.misses) == (3, 2)
+
+    # Replacing a trace does not count its memory twice
+    cache.put("a", make_arrays(4.0))
+    assert len(cache) == 2
+    assert cache.nbytes == 2 * nbytes
+
+    cache.configure(max_memory=0)
+    assert not cache.enabled
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+    cache.put("d", make_arrays(4.0))
+    assert cache.get("d") is None
+
+
+def test_disk_cache(tmp_path):
+    cache = TraceCache(cache_dir=str(tmp_path / "traces"))
+    assert cache.enabled
+    cache.put("a", make_arrays(1.0))
+    assert cache.path("a").exists()
+    assert list(cache.path("a").parent.iterdir()) == [cache.path("a")]
+
+    # Another cache, e.g. in a later run, reads the saved trace
+    other = TraceCache(cache_dir=str(tmp_path / "traces"))
+    arrays = other.get("a")
+    for name, array in make_arrays(1.0).items():
+        assert_array_equal(arrays[name], array)
+        assert not arrays[name].flags.writeable
+    assert other.get("b") is None
+
+    # Unreadable files are ignored
+    other.path("b").write_text("not a trace")
+    assert other.get("b") is None
@@ -0,0 +1,357 @@
+"""Cache of dispersed source traces, shared between WFSS exposures."""
+
+from collections import OrderedDict
+import hashlib
+import logging
+from pathlib import Path
+import tempfile
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+__all__ = ["TraceCache", "TRACE_CACHE", "dispersion_fingerprint", "place_trace", "trace_key"]
+
+# Arrays making up a cached trace, as set by Observation.disperse_chunk
+_NAMES = ["trace", "corner", "reference", "complete"]
+
+# Precision, in pixels, of the grism positions used to identify a dispersion model
+_FINGERPRINT_PRECISION = 0.01
+
+
+def dispersion_fingerprint(grism_wcs, order, wmin, wmax, naxis):
+    """
+    Summarize the dispersion model of a grism WCS for one spectral order.
+
+    The dispersion model (the transform from the direct image frame to the
+    grism image frame) is evaluated on a grid of direct image positions at
+    the shortest, central and longest wavelengths, and the resulting grism
+    positions are rounded to a hundredth of a pixel. Exposures taken with the
+    same grism, filter and detector share the same fingerprint, regardless of
+    their pointing.
+
+    Parameters
+    ----------
+    grism_wcs : gwcs.WCS
+        The WCS object of the grism image.
+    order : int
+        The spectral order.
+    wmin, wmax : float
+        Wavelength range of the dispersed spectra.
+    naxis : tuple
+        Dimensions (shape) of the grism image.
+
+    Returns
+    -------
+    fingerprint : np.ndarray
+        Rounded grism positions of the probed direct image positions.
+    """
+    imgxy_to_grismxy = grism_wcs.get_transform("detector", "grism_detector")
+    x = np.linspace(0.0, naxis[0] - 1.0, 3)
+    y = np.linspace(0.0, naxis[1] - 1.0, 3)
+    lam = np.array([wmin, 0.5 * (wmin + wmax), wmax])
+    x, y, lam = (a.ravel() for a in np.meshgrid(x, y, lam, indexing="ij"))
+    xg, yg = imgxy_to_grismxy(x, y, lam, order)
+    return np.round(np.array([xg, yg]) / _FINGERPRINT_PRECISION)
+
+
+def trace_key(xs, ys, fluxes, order, wmin, wmax, sens_waves, sens_resp, filter_name, fingerprint):
+    """
+    Compute the key identifying the dispersed trace of a source.
+
+    The key covers everything the trace depends on except the position of
+    the source on the grism image: the pixels of the source segment and
+    their fluxes, the spectral order and wavelength range, the sensitivity
+    curve, the filter and the dispersion model.
+
+    Parameters
+    ----------
+    xs, ys : int array
+        Pixel coordinates of the source in the segmentation map.
+    fluxes : list of float array
+        Direct image fluxes of the source pixels, one array per direct image.
+    order : int
+        The spectral order.
+    wmin, wmax : float
+        Wavelength range of the dispersed spectrum.
+    sens_waves, sens_resp : float array
+        Wavelengths and values of the sensitivity curve.
+    filter_name : str
+        Name of the filter.
+    fingerprint : np.ndarray
+        Summary of the dispersion model, from `dispersion_fingerprint`.
+
+    Returns
+    -------
+    key : str
+        Hexadecimal digest of the trace parameters.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{filter_name} {order}".encode())
+    digest.update(np.asarray([wmin, wmax], dtype=np.float64).tobytes())
+    for array in [xs, ys]:
+        digest.update(np.ascontiguousarray(array, dtype=np.int64).tobytes())
+    for array in [*fluxes, sens_waves, sens_resp, fingerprint]:
+        digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def place_trace(arrays, reference, max_shift=0.0):
+    """
+    Place a cached trace at the position of a source on a grism image.
+
+    A trace is reused as is for a source at the position where it was
+    computed. For a source at another position, for example in a dithered
+    exposure, the trace is shifted by the offset between the two positions:
+    by whole pixels, then by the remaining fraction of a pixel with bilinear
+    interpolation. The change of the trace shape across the offset is
+    neglected, so shifts are limited to ``max_shift`` pixels, and traces cut
+    by the edges of the image they were computed for are not shifted.
+
+    Parameters
+    ----------
+    arrays : dict
+        The cached trace, as returned by `TraceCache.get`.
+    reference : tuple of float
+        Mean x, y position of the source pixels in the grism image frame.
+    max_shift : float, optional
+        Largest offset, in pixels, by which the trace is shifted.
+
+    Returns
+    -------
+    trace : np.ndarray or None
+        2D image of the dispersed source, or None if the trace cannot be
+        placed at the given position.
+    minx, miny : int
+        Position of the lower left corner of the trace on the grism image.
+    """
+    shift = np.asarray(reference, dtype=np.float64) - arrays["reference"]
+    minx, miny = (int(c) for c in arrays["corner"])
+    if np.all(shift == 0):
+        return arrays["trace"], minx, miny
+    if not arrays["complete"] or np.max(np.abs(shift)) > max_shift:
+        return None, minx, miny
+
+    whole = np.floor(shift)
+    fx, fy = shift - whole
+    trace = arrays["trace"]
+    if fx != 0 or fy != 0:
+        shifted = np.zeros((trace.shape[0] + 1, trace.shape[1] + 1))
+        shifted[:-1, :-1] += (1 - fx) * (1 - fy) * trace
+        shifted[:-1, 1:] += fx * (1 - fy) * trace
+        shifted[1:, :-1] += (1 - fx) * fy * trace
+        shifted[1:, 1:] += fx * fy * trace
+        trace = shifted
+    return trace, minx + int(whole[0]), miny + int(whole[1])
+
+
+class TraceCache:
+    """
+    Least-recently-used cache of dispersed source traces.
+
+    Dispersing the pixels of every source in the segmentation map dominates
+    the time needed to correct a grism exposure for contamination. The
+    dispersed trace of a source depends only on the parameters in
+    `trace_key` and on the position of the source, so it can be reused by
+    the same source later in the same exposure and, shifted with
+    `place_trace`, by other exposures of the same field.
+
+    Traces are kept in memory up to ``max_memory`` bytes, evicting the least
+    recently used first. If ``cache_dir`` is set, traces are also saved to it
+    and read back by later runs, including runs in other processes. All
+    cached arrays are read-only.
+    """
+
+    def __init__(self, max_memory=0, cache_dir=None):
+        """
+        Initialize an empty cache.
+
+        Parameters
+        ----------
+        max_memory : float, optional
+            Maximum memory, in bytes, used by traces held in memory. If 0,
+            traces are not kept in memory.
+        cache_dir : str or None, optional
+            Directory in which traces are saved and looked up. If None,
+            traces are not saved to disk.
+        """
+        self._memory = OrderedDict()
+        self._nbytes = 0
+        self.max_memory = max_memory
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._memory)
+
+    @property
+    def enabled(self):  # numpydoc ignore=RT01
+        """Whether traces are kept in memory or saved to disk."""
+        return self.max_memory > 0 or self.cache_dir is not None
+
+    @property
+    def nbytes(self):  # numpydoc ignore=RT01
+        """Memory used by the traces held in memory, in bytes."""
+        return self._nbytes
+
+    def configure(self, max_memory=0, cache_dir=None):
+        """
+        Set the memory used by traces held in memory and the cache directory.
+
+        Parameters
+        ----------
+        max_memory : float, optional
+            Maximum memory, in bytes, used by traces held in memory.
+            If 0, traces held in memory are cleared.
+        cache_dir : str or None, optional
+            Directory in which traces are saved and looked up.
+        """
+        self.max_memory = max(max_memory, 0)
+        self.cache_dir = cache_dir
+        self._evict()
+
+    def clear(self):
+        """Remove all traces from memory, leaving any saved files in place."""
+        self._memory.clear()
+        self._nbytes = 0
+
+    def path(self, key):
+        """
+        Return the file in which a trace is saved.
+
+        Parameters
+        ----------
+        key : str
+            Key identifying the trace.
+
+        Returns
+        -------
+        Path or None
+            The file name, or None if traces are not saved to disk.
+        """
+        if self.cache_dir is None:
+            return None
+        return Path(self.cache_dir) / f"wfss_trace_{key}.npz"
+
+    def get(self, key):
+        """
+        Return a cached trace.
+
+        Parameters
+        ----------
+        key : str
+            Key identifying the trace.
+
+        Returns
+        -------
+        arrays : dict or None
+            The ``trace`` image, its lower left ``corner`` on the grism image,
+            the ``reference`` position of the source and whether the trace is
+            ``complete`` (not cut by the image edges), or None if it is not
+            cached.
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        path = self.path(key)
+        if path is not None and path.exists():
+            try:
+                with np.load(path) as saved:
+                    arrays = {name: saved[name] for name in _NAMES}
+            except (OSError, KeyError, ValueError) as err:
+                log.warning(f"Could not read cached trace {path}: {err}")
+            else:
+                log.debug(f"Using trace saved in {path}")
+                self.hits += 1
+                return self._store(key, arrays)
+
+        self.misses += 1
+        return None
+
+    def put(self, key, arrays):
+        """
+        Add a trace to the cache, replacing any trace with the same key.
+
+        Parameters
+        ----------
+        key : str
+            Key identifying the trace.
+        arrays : dict
+            The ``trace``, ``corner``, ``reference`` and ``complete`` arrays
+            of the trace.
+
+        Returns
+        -------
+        arrays : dict
+            The trace with read-only arrays, as returned by `get`.
+        """
+        path = self.path(key)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, so that concurrent runs never
+            # read a partially written trace
+            with tempfile.NamedTemporaryFile(
+                dir=path.parent, prefix=".wfss_trace_", suffix=".npz", delete=False
+            ) as temp_file:
+                np.savez(temp_file, **{name: arrays[name] for name in _NAMES})
+            Path(temp_file.name).replace(path)
+            log.debug(f"Saved trace to {path}")
+        return self._store(key, arrays)
+
+    def _store(self, key, arrays):
+        """
+        Make the arrays of a trace read-only and keep them in memory.
+
+        Parameters
+        ----------
+        key : str
+            Key identifying the trace.
+        arrays : dict
+            The arrays of the trace.
+
+        Returns
+        -------
+        arrays : dict
+            Read-only copies of the arrays.
+        """
+        arrays = {name: np.array(arrays[name]) for name in _NAMES}
+        for array in arrays.values():
+            array.setflags(write=False)
+        if self.max_memory > 0:
+            if key in self._memory:
+                self._nbytes -= _trace_nbytes(self._memory.pop(key))
+            self._memory[key] = arrays
+            self._nbytes += _trace_nbytes(arrays)
+            self._evict()
+        return arrays
+
+    def _evict(self):
+        """Evict least recently used traces until within the memory limit."""
+        while self._nbytes > self.max_memory and self._memory:
+            _, arrays = self._memory.popitem(last=False)
+            self._nbytes -= _trace_nbytes(arrays)
+
+
+def _trace_nbytes(arrays):
+    """
+    Compute the memory used by the arrays of a trace.
+
+    Parameters
+    ----------
+    arrays : dict
+        The arrays of the trace.
+
+    Returns
+    -------
+    int
+        Memory used by the arrays, in bytes.
+    """
+    return sum(array.nbytes for array in arrays.values())
+
+
+# Cache shared by all grism exposures in this process, configured by WfssContamStep
+TRACE_CACHE = TraceCache()
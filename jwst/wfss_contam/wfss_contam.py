@@ -13,7 +13,7 @@ log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
 
-def contam_corr(input_model, waverange, photom, max_cores):
+def contam_corr(input_model, waverange, photom, max_cores, max_shift=0.0):
     """
     Correct contamination in WFSS spectral cutouts.
 
@@ -31,6 +31,10 @@ def contam_corr(input_model, waverange, photom, max_cores):
         allowable values are 'quarter', 'half', and 'all', which indicate
         the fraction of cores to use for multi-proc. The total number of
         cores includes the SMT cores (Hyper Threading for Intel).
+    max_shift : float, optional
+        Largest offset, in pixels, by which the dispersed trace of a source
+        cached from another exposure is shifted and reused. If 0, traces are
+        only reused for sources at the same position.
 
     Returns
     -------
@@ -121,6 +125,7 @@ def contam_corr(input_model, waverange, photom, max_cores):
         boundaries=[0, 2047, 0, 2047],
         offsets=[xoffset, yoffset],
         max_cpu=ncpus,
+        max_shift=max_shift,
     )
 
     # Create simulated grism image for each order and sum them up
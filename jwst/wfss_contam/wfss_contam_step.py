@@ -3,6 +3,7 @@ from stdatamodels.jwst import datamodels
 
 from jwst.stpipe import Step
 from . import wfss_contam
+from .trace_cache import TRACE_CACHE
 
 
 __all__ = ["WfssContamStep"]
@@ -17,6 +18,9 @@ class WfssContamStep(Step):
         save_simulated_image = boolean(default=False)  # Save full-frame simulated image
         save_contam_images = boolean(default=False)  # Save source contam estimates
         maximum_cores = option('none', 'quarter', 'half', 'all', default='none')
+        trace_cache_size = float(default=0.0)  # Memory (GB) for dispersed source traces kept for reuse; 0 disables
+        trace_cache_dir = string(default=None)  # Directory in which to save dispersed traces for reuse by later runs
+        trace_max_shift = float(default=0.0)  # Largest offset, in pixels, by which traces cached from another exposure are shifted and reused
         skip = boolean(default=True)
     """  # noqa: E501
 
@@ -49,9 +53,23 @@ class WfssContamStep(Step):
             self.log.info(f"Using PHOTOM reference file {photom_ref}")
             photom_model = datamodels.open(photom_ref)
 
+            # Dispersed traces are reused within the exposure, by later
+            # exposures of the same field and, if a cache directory is
+            # given, by later runs
+            TRACE_CACHE.configure(
+                max_memory=self.trace_cache_size * 1024**3, cache_dir=self.trace_cache_dir
+            )
+            hits, misses = TRACE_CACHE.hits, TRACE_CACHE.misses
+
             result, simul, contam = wfss_contam.contam_corr(
-                dm, waverange_model, photom_model, max_cores
+                dm, waverange_model, photom_model, max_cores, max_shift=self.trace_max_shift
             )
+            if TRACE_CACHE.enabled:
+                self.log.info(
+                    f"Found {TRACE_CACHE.hits - hits} of "
+                    f"{TRACE_CACHE.hits - hits + TRACE_CACHE.misses - misses} "
+                    "dispersed traces in the trace cache"
+                )
 
             # Save intermediate results, if requested
             if self.save_simulated_image:
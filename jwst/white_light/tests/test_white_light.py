@@ -8,6 +8,7 @@ from stdatamodels.jwst import datamodels
 from jwst.datamodels.utils.tso_multispec import make_tso_specmodel
 from jwst.extract_1d.extract import populate_time_keywords
 from jwst.tests.helpers import LogWatcher
+from jwst.white_light import WhiteLightStep
 from jwst.white_light.white_light import white_light
 
 
@@ -237,3 +238,44 @@ def test_white_light_multi_detector(make_datamodel):
 
     assert_allclose(result["whitelight_flux_order_1_NRS1"], expected_flux_order_1, equal_nan=True)
     assert_allclose(result["whitelight_flux_order_2_NRS2"], expected_flux_order_2, equal_nan=True)
+
+
+def make_segments(model, splits):
+    """Split the spectra of a model into segments of integrations."""
+    segments = []
+    for integrations in splits:
+        segment = datamodels.TSOMultiSpecModel()
+        segment.update(model)
+        for spec in model.spec:
+            segment_spec = datamodels.TSOSpecModel(spec_table=spec.spec_table[integrations])
+            segment_spec.spectral_order = spec.spectral_order
+            segment_spec.detector = spec.detector
+            segment.spec.append(segment_spec)
+        segments.append(segment)
+    return segments
+
+
+@pytest.mark.parametrize("detectors", [(None, None), ("NRS1", "NRS2")])
+def test_white_light_segments(make_datamodel, tmp_path, detectors):
+    """Segments give the same table as a model containing all integrations."""
+    data = make_datamodel.copy()
+    for spec, detector in zip(data.spec, detectors, strict=True):
+        spec.detector = detector
+    expected = white_light(data, min_wave=11.5)
+
+    segments = make_segments(data, [slice(0, 2), slice(2, 5)])
+    filenames = []
+    for i, segment in enumerate(segments):
+        filenames.append(str(tmp_path / f"segment_{i}_x1dints.fits"))
+        segment.save(filenames[-1])
+
+    for segment_input in [segments, filenames]:
+        result = WhiteLightStep(min_wavelength=11.5).run(segment_input)
+        assert result.colnames == expected.colnames
+        for name in expected.colnames:
+            assert_allclose(result[name], expected[name], equal_nan=True)
+
+
+def test_white_light_no_segments():
+    with pytest.raises(ValueError, match="No segments"):
+        white_light([])
@@ -1,10 +1,12 @@
 """Sum the flux over all wavelengths in each integration as a function of time for the target."""
 
 import logging
+from pathlib import Path
 
 import numpy as np
 from collections import OrderedDict
 from astropy.table import QTable
+from stdatamodels.jwst import datamodels
 
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
@@ -14,10 +16,16 @@ def white_light(input_model, min_wave=None, max_wave=None):
     """
     Compute the integrated flux over all wavelengths for a multi-integration extracted spectrum.
 
+    The input may also be a list of the segments of an exposure, as models
+    or file names. Segments given as file names are opened one at a time
+    and closed once their fluxes are summed, so that all segments are never
+    in memory at once.
+
     Parameters
     ----------
-    input_model : TSOMultiSpecModel
-        Datamodel containing the multi-integration data.
+    input_model : TSOMultiSpecModel, or list of TSOMultiSpecModel or str
+        Datamodel containing the multi-integration data, or the segments of
+        an exposure.
     min_wave : float, optional
         Default wavelength minimum for integration.
     max_wave : float, optional
@@ -27,12 +35,24 @@ def white_light(input_model, min_wave=None, max_wave=None):
     -------
     tbl : astropy.table.table.QTable
         Table containing the integrated flux as a function of time.
+
+    Raises
+    ------
+    ValueError
+        If an empty list of segments is given.
     """
     if min_wave is None:
         min_wave = -1.0
     if max_wave is None:
         max_wave = 1.0e10
 
+    if isinstance(input_model, (list, tuple)):
+        if len(input_model) == 0:
+            raise ValueError("No segments were given for the white light curve")
+        segments = input_model
+    else:
+        segments = [input_model]
+
     # The input should contain separate spectra for each spectral
     # order or detector.  NIRISS SOSS data can contain up to three orders;
     # NIRSpec BOTS can contain up to two detectors.
@@ -45,62 +65,62 @@ def white_light(input_model, min_wave=None, max_wave=None):
     mid_tdbs = []
     flux_sums = []
 
-    # Loop over the spectra in the input model and find mid times and fluxes
-    for spec in input_model.spec:
-        n_spec = len(spec.spec_table)
-
-        # Figure out the spectral order for this spectrum
-        spectral_order = getattr(spec, "spectral_order", None)
-        if spectral_order not in sporders:
-            sporders.append(spectral_order)
-        order_list.extend([spectral_order] * n_spec)
-
-        # Do the same for the detector
-        detector = getattr(spec, "detector", None)
-        if detector not in detectors:
-            detectors.append(detector)
-        detector_list.extend([detector] * n_spec)
-
-        # Get mid times for all integrations in this order
-        mid_time = spec.spec_table["MJD-AVG"]
-        mid_tdb = spec.spec_table["TDB-MID"]
-        good = ~np.isnan(mid_time)
-        if len(mid_times) == 0:
-            mid_times = mid_time
-            mid_tdbs = mid_tdb
-        else:
-            mid_times = np.hstack([mid_times, mid_time])
-            mid_tdbs = np.hstack([mid_tdbs, mid_tdb])
-
-        # Create a wavelength mask, using cutoffs if specified, then
-        # compute the flux sum for each integration in the input.
-        wave_array = spec.spec_table["WAVELENGTH"]
-        wave_mask = (wave_array >= min_wave) & (wave_array <= max_wave) & good[:, None]
-        masked_flux = spec.spec_table["FLUX"].copy()
-        masked_flux[~wave_mask] = np.nan
-        flux_sum = np.nansum(masked_flux, axis=1)
-        if len(flux_sums) == 0:
-            flux_sums = flux_sum
+    tbl = None
+    for segment in segments:
+        if isinstance(segment, (str, Path)):
+            segment_model = datamodels.open(segment)
         else:
-            flux_sums = np.hstack([flux_sums, flux_sum])
-
-        problems = np.sum(~good)
-        if problems > 0:
-            log.warning(
-                f"There were {problems} spectra in order {spectral_order} "
-                f"with no mid time ({100.0 * problems / n_spec} percent of spectra). "
-                "These spectra will be ignored in the output table."
-            )
-
-    # Set up output table, removing problems
-    tbl = _make_empty_output_table(input_model)
+            segment_model = segment
+
+        try:
+            if tbl is None:
+                tbl = _make_empty_output_table(segment_model)
+
+            # Loop over the spectra in the input model and find mid times and fluxes
+            for spec in segment_model.spec:
+                spectral_order = getattr(spec, "spectral_order", None)
+                if spectral_order not in sporders:
+                    sporders.append(spectral_order)
+                detector = getattr(spec, "detector", None)
+                if detector not in detectors:
+                    detectors.append(detector)
+
+                mid_time, mid_tdb, flux_sum = _sum_spectra(spec, min_wave, max_wave)
+                mid_times.append(mid_time)
+                mid_tdbs.append(mid_tdb)
+                flux_sums.append(flux_sum)
+                order_list.append(np.full(mid_time.size, spectral_order))
+                detector_list.append(np.full(mid_time.size, detector))
+
+                n_spec = mid_time.size
+                problems = np.sum(np.isnan(mid_time))
+                if problems > 0:
+                    log.warning(
+                        f"There were {problems} spectra in order {spectral_order} "
+                        f"with no mid time ({100.0 * problems / n_spec} percent of spectra). "
+                        "These spectra will be ignored in the output table."
+                    )
+        finally:
+            if segment_model is not segment:
+                segment_model.close()
+
+    if len(mid_times) == 0:
+        return tbl
+
+    mid_times = np.concatenate(mid_times)
+    mid_tdbs = np.concatenate(mid_tdbs)
+    flux_sums = np.concatenate(flux_sums)
+    order_list = np.concatenate(order_list)
+    detector_list = np.concatenate(detector_list)
+
+    # Remove problems from the output table
     good = ~np.isnan(mid_times)
     mid_times = mid_times[good]
     mid_tdbs = mid_tdbs[good]
 
     flux_sums = flux_sums[good]
-    order_list = np.array(order_list)[good]
-    detector_list = np.array(detector_list)[good]
+    order_list = order_list[good]
+    detector_list = detector_list[good]
 
     # Get time stamps for each detector - they generally have different values.
     max_rows = 0
@@ -152,6 +172,38 @@ def white_light(input_model, min_wave=None, max_wave=None):
     return tbl
 
 
+def _sum_spectra(spec, min_wave, max_wave):
+    """
+    Sum the flux of all integrations of a spectrum within wavelength limits.
+
+    Parameters
+    ----------
+    spec : TSOSpecModel
+        The spectra of all integrations, as rows of the spectral table.
+    min_wave, max_wave : float
+        Wavelength limits for integration.
+
+    Returns
+    -------
+    mid_time, mid_tdb, flux_sum : ndarray
+        The mid times of the integrations, in MJD UTC and BJD TDB, and the
+        flux summed within the wavelength limits. The flux is zero for
+        integrations without a mid time.
+    """
+    spec_table = spec.spec_table
+    mid_time = np.asarray(spec_table["MJD-AVG"])
+    mid_tdb = np.asarray(spec_table["TDB-MID"])
+    good = ~np.isnan(mid_time)
+
+    # Create a wavelength mask, using cutoffs if specified, then
+    # compute the flux sum for each integration in the input.
+    wave_array = spec_table["WAVELENGTH"]
+    wave_mask = (wave_array >= min_wave) & (wave_array <= max_wave) & good[:, None]
+    flux_sum = np.nansum(spec_table["FLUX"], axis=1, where=wave_mask)
+
+    return mid_time, mid_tdb, flux_sum
+
+
 def _make_empty_output_table(input_model):
     """
     Create an empty output table with the same metadata as the input model.
@@ -32,22 +32,41 @@ class WhiteLightStep(Step):
 
         Parameters
         ----------
-        step_input : str or MultiSpecModel
-            Either the path to the file or the science data model for the sum.
+        step_input : str, MultiSpecModel, or list
+            Either the path to the file or the science data model for the sum,
+            or a list of them for the segments of an exposure. Segments given
+            as file names are read one at a time.
 
         Returns
         -------
         result : astropy.table.table.QTable
             Table containing the integrated flux as a function of time.
         """
+        if isinstance(step_input, (list, tuple)):
+            # Segments are opened as needed by the white light routine
+            result = white_light(step_input, self.min_wavelength, self.max_wavelength)
+            self._save_table(result)
+            return result
+
         # Load the input
         with datamodels.open(step_input) as input_model:
             # Call the white light curve generation routine
             result = white_light(input_model, self.min_wavelength, self.max_wavelength)
 
             # Write the output catalog
-            if self.save_results:
-                output_path = self.make_output_path()
-                result.write(output_path, format="ascii.ecsv", overwrite=True)
+            self._save_table(result)
 
         return result
+
+    def _save_table(self, result):
+        """
+        Save the output catalog, if requested.
+
+        Parameters
+        ----------
+        result : astropy.table.table.QTable
+            Table containing the integrated flux as a function of time.
+        """
+        if self.save_results:
+            output_path = self.make_output_path()
+            result.write(output_path, format="ascii.ecsv", overwrite=True)